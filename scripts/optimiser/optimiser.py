@@ -40,7 +40,13 @@ OPTIMISER
     )
 )
 
-
+With ``batch_mode: true`` in the ``numerics`` of the input file, the
+optimiser proposes ``batch_size`` points at a time, which are evaluated
+asynchronously on a pool of ``n_cores`` processes by a CASE_EVALUATOR.
+The costs are cached by parameter vector, including those of the cases
+loaded by PROCESS_PREVIOUS_CASES, so no point is evaluated twice. A case
+that raises an exception is recorded as failed with ``failed_cost``, as
+the cases whose solver does not converge.
 
 """
 
@@ -52,13 +58,15 @@ import argparse
 import warnings
 import random
 import pprint
+import multiprocessing
+import concurrent.futures
+import concurrent.futures.process
 import numpy as np
 import scipy
 import scipy.optimize as optimize
 from scipy.interpolate import Rbf
 import yaml
 import dill as pickle
-import GPyOpt
 
 
 import sharpy.sharpy_main
@@ -66,6 +74,9 @@ import sharpy.utils.exceptions as exc
 
 cases = list()
 
+# cost of the cases that do not converge or fail
+failed_cost = 15.
+
 loads_cost_array = None
 prev_result = None
 
@@ -118,6 +129,8 @@ def read_yaml(file_name):
 
 
 def optimiser(in_dict, previous_x, previous_y):
+    import GPyOpt
+
     settings_dict = in_dict['settings']
     case_dict = in_dict['case']
     base_dict = in_dict['base']
@@ -216,32 +229,44 @@ def optimiser(in_dict, previous_x, previous_y):
 
     print(constraints)
 
-    gpyopt_wrapper = lambda x: wrapper(x, in_dict)
+    # imported once here, such that the worker processes inherit it
+    import generate
+
     batch_size = in_dict['optimiser']['numerics']['batch_size']
     num_cores = in_dict['optimiser']['numerics']['n_cores']
-    opt = GPyOpt.methods.BayesianOptimization(
-        f=gpyopt_wrapper,
-        domain=bounds,
-        exact_feval=True,
-        model_type='GP',
-        acquisition_type='EI',
-        normalize_y=False,
-        initial_design_numdata=in_dict['optimiser']['numerics']['initial_design_numdata'],
-        evaluator_type='local_penalization',
-        batch_size=batch_size,
-        num_cores=num_cores,
-        acquisition_jitter=0,
-        de_duplication=True,
-        constraints=constraints,
-        X=previous_x,
-        Y=previous_y)
-
-    opt.run_optimization(in_dict['optimiser']['numerics']['n_iter'],
-                         report_file=output_route + 'report.log',
-                         evaluations_file=output_route + 'evaluations.log',
-                         models_file=output_route + 'models.log',
-                         verbosity=True
-                        )
+    batch_mode = in_dict['optimiser']['numerics'].get('batch_mode', False)
+    evaluator = CaseEvaluator(in_dict,
+                              num_processes=num_cores if batch_mode else 1,
+                              previous_x=previous_x,
+                              previous_y=previous_y)
+    gpyopt_wrapper = evaluator
+
+    if batch_mode:
+        opt = batch_optimisation(in_dict, bounds, constraints, evaluator)
+    else:
+        opt = GPyOpt.methods.BayesianOptimization(
+            f=gpyopt_wrapper,
+            domain=bounds,
+            exact_feval=True,
+            model_type='GP',
+            acquisition_type='EI',
+            normalize_y=False,
+            initial_design_numdata=in_dict['optimiser']['numerics']['initial_design_numdata'],
+            evaluator_type='local_penalization',
+            batch_size=batch_size,
+            num_cores=num_cores,
+            acquisition_jitter=0,
+            de_duplication=True,
+            constraints=constraints,
+            X=previous_x,
+            Y=previous_y)
+
+        opt.run_optimization(in_dict['optimiser']['numerics']['n_iter'],
+                             report_file=output_route + 'report.log',
+                             evaluations_file=output_route + 'evaluations.log',
+                             models_file=output_route + 'models.log',
+                             verbosity=True
+                            )
 
     print('*'*60)
     print('Best one cost: ', opt.fx_opt)
@@ -256,17 +281,77 @@ def optimiser(in_dict, previous_x, previous_y):
     if np.linalg.norm(opt.x_opt - local_x) < 1e-1:
         print('Results are very close, no need to dig deeper')
     else:
-        new_cost = gpyopt_wrapper(local_x)
+        new_cost = gpyopt_wrapper(local_x)[0, 0]
         print('New cost: ', new_cost)
         print('Improvement over the previous solution with the local min.: ',
               -(local_cost - opt.fx_opt)/opt.fx_opt*100, '%')
         print('The RBF estimation of the cost was off by: ',
               (local_cost - new_cost)/new_cost)
 
+    evaluator.shutdown()
     print('FINISHED')
 
     import pdb; pdb.set_trace()
 
+def batch_optimisation(in_dict, bounds, constraints, evaluator):
+    """batch_optimisation: Bayesian optimisation proposing batches of points
+
+    The points of every iteration are proposed by GPyOpt from all the
+    evaluations so far and evaluated in parallel by ``evaluator``.
+
+    Args:
+        in_dict (dict): input yaml dictionary
+        bounds (list): GPyOpt domain
+        constraints (list): GPyOpt constraints
+        evaluator (CaseEvaluator): evaluator of the batches
+
+    Returns:
+        GPyOpt.methods.BayesianOptimization: optimiser with the model
+            of all the evaluations and the best point in ``x_opt``
+    """
+    import GPyOpt
+
+    numerics = in_dict['optimiser']['numerics']
+    if evaluator.cache:
+        x_all, y_all = evaluator.evaluated()
+    else:
+        space = GPyOpt.Design_space(space=bounds, constraints=constraints)
+        x_all = GPyOpt.experiment_design.initial_design(
+            'random', space, numerics['initial_design_numdata'])
+        y_all = evaluator(x_all)
+
+    for i_iter in range(numerics['n_iter'] + 1):
+        opt = GPyOpt.methods.BayesianOptimization(
+            f=None,
+            domain=bounds,
+            exact_feval=True,
+            model_type='GP',
+            acquisition_type='EI',
+            normalize_y=False,
+            evaluator_type='local_penalization',
+            batch_size=numerics['batch_size'],
+            acquisition_jitter=0,
+            de_duplication=True,
+            constraints=constraints,
+            X=x_all,
+            Y=y_all)
+        if i_iter == numerics['n_iter']:
+            break
+
+        x_next = opt.suggest_next_locations()
+        y_next = evaluator(x_next)
+        x_all = np.vstack((x_all, x_next))
+        y_all = np.vstack((y_all, y_next))
+        print('Batch {:d}/{:d}: best cost = {:f}'.format(
+            i_iter + 1, numerics['n_iter'], np.min(y_all)))
+
+    opt.model.updateModel(x_all, y_all, None, None)
+    i_best = np.argmin(y_all[:, 0])
+    opt.x_opt = x_all[i_best, :]
+    opt.fx_opt = y_all[i_best, 0]
+    return opt
+
+
 def local_optimisation(opt, yaml_dict=None, min_method='Powell'):
     x_in = opt.X
     y_in = opt.Y
@@ -402,9 +487,10 @@ def evaluate(x_dict, yaml_dict):
                           '/' + yaml_dict['case']['name'] + '/')
             except FileExistsError:
                 pass
+            # one file per case, as several cases may run at once
             with open(yaml_dict['settings']['cases_folder'] +
                       '/' + yaml_dict['case']['name'] + '/' +
-                      'data.pkl', 'wb') as data_file:
+                      case_name + '.pkl', 'wb') as data_file:
                 pickle.dump(data, data_file, -1)
 
     return cost
@@ -416,6 +502,111 @@ def wrapper(x, yaml_dict):
     return cost
 
 
+class CaseEvaluator(object):
+    """CaseEvaluator: evaluates batches of points with a cache
+
+    The cost of every point is stored with its parameter vector, rounded
+    to the precision of the case names, as key. The points not yet
+    evaluated are run by ``wrapper`` on a pool of forked processes and
+    collected as they finish, while the cached ones are returned directly.
+    The points whose evaluation raises an exception are given
+    ``failed_cost`` and their keys kept in ``failed``.
+
+    Args:
+        yaml_dict (dict): input yaml dictionary
+        num_processes (int): number of cases run at once
+        previous_x (np.ndarray): parameters of previous cases (rows)
+        previous_y (np.ndarray): costs of previous cases
+    """
+    decimals = 5
+
+    def __init__(self, yaml_dict, num_processes=1,
+                 previous_x=None, previous_y=None):
+        self.yaml_dict = yaml_dict
+        self.num_processes = num_processes
+        self.executor = None
+
+        self.cache = dict()
+        self.failed = set()
+        if previous_x is not None:
+            for x, y in zip(previous_x, previous_y):
+                self.cache[self.key(x)] = (np.asarray(x).flatten(),
+                                          float(np.squeeze(y)))
+
+    def key(self, x):
+        return tuple(np.round(np.asarray(x, dtype=float).flatten(),
+                              self.decimals))
+
+    def evaluated(self):
+        """
+        Returns:
+            tuple: parameters and costs of all the cached points
+        """
+        x = np.array([v[0] for v in self.cache.values()])
+        y = np.array([[v[1]] for v in self.cache.values()])
+        return x, y
+
+    def __call__(self, x):
+        """
+        Args:
+            x (np.ndarray): points to evaluate, one per row
+
+        Returns:
+            np.ndarray: cost of every point as a column
+        """
+        x = np.atleast_2d(x)
+        keys = [self.key(row) for row in x]
+        pending = dict()
+        for key, row in zip(keys, x):
+            if key not in self.cache and key not in pending:
+                pending[key] = row
+
+        if self.num_processes > 1 and len(pending) > 1:
+            if self.executor is None:
+                self.executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.num_processes,
+                    mp_context=multiprocessing.get_context('fork'))
+            futures = {self.executor.submit(wrapper, row, self.yaml_dict): key
+                       for key, row in pending.items()}
+            for future in concurrent.futures.as_completed(futures):
+                key = futures[future]
+                try:
+                    cost = future.result()
+                except Exception as error:
+                    cost = self.failure(key, error)
+                    if isinstance(error, concurrent.futures.process.BrokenProcessPool):
+                        # a worker died, the pool is replaced in the next batch
+                        self.shutdown()
+                self.cache[key] = (pending[key], cost)
+        else:
+            for key, row in pending.items():
+                try:
+                    cost = wrapper(row, self.yaml_dict)
+                except Exception as error:
+                    cost = self.failure(key, error)
+                self.cache[key] = (row, cost)
+
+        print('Evaluated {:d} new points, {:d} from the cache'.format(
+            len(pending), len(keys) - len(pending)))
+        return np.array([[self.cache[key][1]] for key in keys])
+
+    def failure(self, key, error):
+        """
+        Records the point given by ``key`` as failed.
+
+        Returns:
+            float: cost of the failed point
+        """
+        print('Case with parameters {} failed: {}'.format(key, error))
+        self.failed.add(key)
+        return failed_cost
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
 def set_case(case_name, base_dict, x_dict, settings_dict, case_dict):
     """set_case: takes care of the setup of the case
 
@@ -460,7 +651,7 @@ def cost_function(data,
     output_dict = dict()
     # check for data == None:
     if data is None:
-        cost = 15.  # need a better way
+        cost = failed_cost  # need a better way
         return cost
     # ground clearance cost contribution
     try:
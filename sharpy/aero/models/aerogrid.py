@@ -9,6 +9,7 @@ import warnings
 import numpy as np
 import scipy.interpolate
 
+import sharpy.aero.utils.mapping as mapping
 import sharpy.utils.algebra as algebra
 import sharpy.utils.cout_utils as cout
 from sharpy.utils.datastructures import AeroTimeStepInfo
@@ -37,6 +38,7 @@ class Aerogrid(object):
         self.airfoil_db = dict()
         self.struct2aero_mapping = None
         self.aero2struct_mapping = []
+        self.mapping_tables = None
 
         self.n_node = 0
         self.n_elem = 0
@@ -245,16 +247,10 @@ class Aerogrid(object):
                     # master_elem = i_elem
                     # master_elem_node = i_local_node
 
-                # find the i_surf and i_n data from the mapping
-                i_n = -1
-                ii_surf = -1
-                for i in range(len(self.struct2aero_mapping[i_global_node])):
-                    i_n = self.struct2aero_mapping[i_global_node][i]['i_n']
-                    ii_surf = self.struct2aero_mapping[i_global_node][i]['i_surf']
-                    if ii_surf == i_surf:
-                        break
+                # find the i_n data from the mapping
+                i_n = self.mapping_tables.spanwise_index(i_global_node, i_surf)
                 # make sure it found it
-                if i_n == -1 or ii_surf == -1:
+                if i_n == -1:
                     raise AssertionError('Error 12958: Something failed with the mapping in aerogrid.py. Check/report!')
 
                 # control surface implementation
@@ -361,7 +357,7 @@ class Aerogrid(object):
         surf_n_counter = np.zeros((self.n_surf,), dtype=int)
         nodes_in_surface = []
         for i_surf in range(self.n_surf):
-            nodes_in_surface.append([])
+            nodes_in_surface.append(set())
 
         for i_elem in range(self.n_elem):
             i_surf = self.aero_dict['surface_distribution'][i_elem]
@@ -374,7 +370,7 @@ class Aerogrid(object):
                 if i_global_node in nodes_in_surface[i_surf]:
                     continue
                 else:
-                    nodes_in_surface[i_surf].append(i_global_node)
+                    nodes_in_surface[i_surf].add(i_global_node)
                     surf_n_counter[i_surf] += 1
                     try:
                         self.struct2aero_mapping[i_global_node][0]
@@ -385,26 +381,9 @@ class Aerogrid(object):
                 self.struct2aero_mapping[i_global_node].append({'i_surf': i_surf,
                                                                 'i_n': i_n})
 
-        nodes_in_surface = []
-        for i_surf in range(self.n_surf):
-            nodes_in_surface.append([])
-
-        for i_surf in range(self.n_surf):
-            self.aero2struct_mapping.append([-1]*(surf_n_counter[i_surf]))
-
-        for i_elem in range(self.n_elem):
-            for i_global_node in self.beam.elements[i_elem].global_connectivities:
-                for i in range(len(self.struct2aero_mapping[i_global_node])):
-                    try:
-                        i_surf = self.struct2aero_mapping[i_global_node][i]['i_surf']
-                        i_n = self.struct2aero_mapping[i_global_node][i]['i_n']
-                        if i_global_node in nodes_in_surface[i_surf]:
-                            continue
-                        else:
-                            nodes_in_surface[i_surf].append(i_global_node)
-                    except KeyError:
-                        continue
-                    self.aero2struct_mapping[i_surf][i_n] = i_global_node
+        # array tables, from which the inverse mapping is taken as well
+        self.mapping_tables = mapping.MappingTables(self.struct2aero_mapping, self.n_surf)
+        self.aero2struct_mapping = [aero2struct.tolist() for aero2struct in self.mapping_tables.aero2struct]
 
     def update_orientation(self, quat, ts=-1):
         rot = algebra.quat2rotation(quat)
@@ -3,6 +3,80 @@ import numpy as np
 import sharpy.utils.algebra as algebra
 
 
+class MappingTables(object):
+    """
+    Array representation of the mapping between structural nodes and spanwise aerodynamic grid nodes.
+
+    The legacy ``struct2aero_mapping`` of :class:`~sharpy.aero.models.aerogrid.Aerogrid` is a list with, for every
+    structural node, a list of dictionaries ``{'i_surf': i_surf, 'i_n': i_n}``, one per surface the node belongs to.
+    Here those pairs are stored in compressed sparse row form: the pairs of node ``i_node`` are the entries
+    ``node_ptr[i_node]`` to ``node_ptr[i_node + 1]`` of ``surf`` and ``i_n``.
+
+    Args:
+        struct2aero_mapping (list): Legacy structural to aerodynamic node mapping
+        n_surf (int): Number of surfaces. Taken as the largest surface index plus one if not given
+
+    Attributes:
+        node_ptr (np.ndarray): First entry of each structural node, of size ``n_node + 1``
+        node (np.ndarray): Structural node of each entry
+        surf (np.ndarray): Surface of each entry
+        i_n (np.ndarray): Spanwise grid node of each entry
+        surface_entries (list(np.ndarray)): Entries of each surface
+        aero2struct (list(np.ndarray)): Structural node of each spanwise grid node, per surface (``-1`` if none)
+        entry (list(np.ndarray)): Entry of each spanwise grid node, per surface (``-1`` if none)
+    """
+
+    def __init__(self, struct2aero_mapping, n_surf=None):
+        counts = np.array([len(node_mapping) for node_mapping in struct2aero_mapping], dtype=int)
+        self.node_ptr = np.zeros((len(counts) + 1,), dtype=int)
+        self.node_ptr[1:] = np.cumsum(counts)
+        self.node = np.repeat(np.arange(len(counts), dtype=int), counts)
+        self.surf = np.array([mapping['i_surf'] for node_mapping in struct2aero_mapping for mapping in node_mapping],
+                             dtype=int)
+        self.i_n = np.array([mapping['i_n'] for node_mapping in struct2aero_mapping for mapping in node_mapping],
+                            dtype=int)
+
+        if n_surf is None:
+            n_surf = self.surf.max() + 1 if self.n_entries else 0
+
+        self.surface_entries = []
+        self.aero2struct = []
+        self.entry = []
+        for i_surf in range(n_surf):
+            entries = np.where(self.surf == i_surf)[0]
+            n_span = self.i_n[entries].max() + 1 if entries.size else 0
+            aero2struct = -np.ones((n_span,), dtype=int)
+            aero2struct[self.i_n[entries]] = self.node[entries]
+            entry = -np.ones((n_span,), dtype=int)
+            entry[self.i_n[entries]] = entries
+
+            self.surface_entries.append(entries)
+            self.aero2struct.append(aero2struct)
+            self.entry.append(entry)
+
+    @property
+    def n_entries(self):
+        return self.node_ptr[-1]
+
+    def node_entries(self, i_node):
+        """
+        Returns:
+            range: Entries of the structural node ``i_node``
+        """
+        return range(self.node_ptr[i_node], self.node_ptr[i_node + 1])
+
+    def spanwise_index(self, i_node, i_surf):
+        """
+        Returns:
+            int: Spanwise grid node of the structural node ``i_node`` in the surface ``i_surf``, ``-1`` if it does not
+            belong to the surface
+        """
+        for i_entry in self.node_entries(i_node):
+            if self.surf[i_entry] == i_surf:
+                return self.i_n[i_entry]
+        return -1
+
+
 def aero2struct_force_mapping(aero_forces,
                               struct2aero_mapping,
                               zeta,
@@ -32,7 +106,8 @@ def aero2struct_force_mapping(aero_forces,
 
     Args:
         aero_forces (list): Aerodynamic forces from the UVLM in inertial frame of reference
-        struct2aero_mapping (dict): Structural to aerodynamic node mapping
+        struct2aero_mapping (MappingTables): Structural to aerodynamic node mapping. The legacy list of
+            dictionaries is accepted as well
         zeta (list): Aerodynamic grid coordinates
         pos_def (np.ndarray): Vector of structural node displacements
         psi_def (np.ndarray): Vector of structural node rotations (CRVs)
@@ -45,33 +120,43 @@ def aero2struct_force_mapping(aero_forces,
         np.ndarray: structural forces in an ``n_node x 6`` vector
     """
 
+    if not isinstance(struct2aero_mapping, MappingTables):
+        struct2aero_mapping = MappingTables(struct2aero_mapping, n_surf=len(aero_forces))
+    tables = struct2aero_mapping
+
     n_node, _ = pos_def.shape
-    n_elem, _, _ = psi_def.shape
     struct_forces = np.zeros((n_node, 6))
 
-    nodes = []
-
-    for i_elem in range(n_elem):
-        for i_local_node in range(3):
-
-            i_global_node = conn[i_elem, i_local_node]
-            if i_global_node in nodes:
-                continue
-
-            nodes.append(i_global_node)
-            for mapping in struct2aero_mapping[i_global_node]:
-                i_surf = mapping['i_surf']
-                i_n = mapping['i_n']
-                _, n_m, _ = aero_forces[i_surf].shape
-
-                crv = psi_def[i_elem, i_local_node, :]
-                cab = algebra.crv2rotation(crv)
-                cbg = np.dot(cab.T, cag)
-
-                for i_m in range(n_m):
-                    chi_g = zeta[i_surf][:, i_m, i_n] - np.dot(cag.T, pos_def[i_global_node, :])
-                    struct_forces[i_global_node, 0:3] += np.dot(cbg, aero_forces[i_surf][0:3, i_m, i_n])
-                    struct_forces[i_global_node, 3:6] += np.dot(cbg, aero_forces[i_surf][3:6, i_m, i_n])
-                    struct_forces[i_global_node, 3:6] += np.dot(cbg, algebra.cross3(chi_g, aero_forces[i_surf][0:3, i_m, i_n]))
+    # element and local node where each structural node is first found
+    n_elem, n_node_elem = conn.shape
+    first_elem = -np.ones((n_node,), dtype=int)
+    first_local_node = -np.ones((n_node,), dtype=int)
+    global_nodes, first_index = np.unique(conn.flatten(), return_index=True)
+    first_elem[global_nodes] = first_index // n_node_elem
+    first_local_node[global_nodes] = first_index % n_node_elem
+
+    # resultant of the forces at the grid vertices of every entry, in G and about the origin
+    resultants = np.zeros((tables.n_entries, 6))
+    for i_surf, entries in enumerate(tables.surface_entries):
+        if not entries.size:
+            continue
+        i_n = tables.i_n[entries]
+        forces = aero_forces[i_surf][:, :, i_n]
+        resultants[entries, 0:3] = np.sum(forces[0:3, :, :], axis=1).T
+        resultants[entries, 3:6] = (np.sum(forces[3:6, :, :], axis=1) +
+                                    np.sum(np.cross(zeta[i_surf][:, :, i_n], forces[0:3, :, :], axis=0), axis=1)).T
+
+    entries = np.where(first_elem[tables.node] >= 0)[0]
+    nodes = tables.node[entries]
+    # moments about the structural node
+    resultants[entries, 3:6] -= np.cross(np.dot(pos_def[nodes, :], cag), resultants[entries, 0:3])
+
+    cbg = np.zeros((n_node, 3, 3))
+    for i_global_node in np.unique(nodes):
+        cab = algebra.crv2rotation(psi_def[first_elem[i_global_node], first_local_node[i_global_node], :])
+        cbg[i_global_node] = np.dot(cab.T, cag)
+
+    np.add.at(struct_forces, (nodes, slice(0, 3)), np.einsum('eij,ej->ei', cbg[nodes], resultants[entries, 0:3]))
+    np.add.at(struct_forces, (nodes, slice(3, 6)), np.einsum('eij,ej->ei', cbg[nodes], resultants[entries, 3:6]))
 
     return struct_forces
@@ -1,5 +1,6 @@
 from sharpy.utils.sharpydir import SharpyDir
 import sharpy.utils.ctypes_utils as ct_utils
+import sharpy.utils.profiling as profiling
 
 import ctypes as ct
 import numpy as np
@@ -138,6 +139,7 @@ class FlightConditions(ct.Structure):
 t_2int = ct.POINTER(ct.c_int)*2
 
 
+@profiling.timed()
 def vlm_solver(ts_info, options):
     run_VLM = UvlmLib.run_VLM
     run_VLM.restype = None
@@ -181,6 +183,7 @@ def vlm_solver(ts_info, options):
     ts_info.remove_ctypes_pointers()
 
 
+@profiling.timed()
 def uvlm_init(ts_info, options):
     init_UVLM = UvlmLib.init_UVLM
     init_UVLM.restype = None
@@ -229,6 +232,7 @@ def uvlm_init(ts_info, options):
     ts_info.remove_ctypes_pointers()
 
 
+@profiling.timed()
 def uvlm_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=None):
     run_UVLM = UvlmLib.run_UVLM
     run_UVLM.restype = None
@@ -292,6 +296,7 @@ def uvlm_solver(i_iter, ts_info, struct_ts_info, options, convect_wake=True, dt=
     # previous_ts_info.remove_ctypes_pointers()
 
 
+@profiling.timed()
 def uvlm_calculate_unsteady_forces(ts_info,
                                    struct_ts_info,
                                    options,
@@ -344,6 +349,7 @@ def uvlm_calculate_unsteady_forces(ts_info,
     ts_info.remove_ctypes_pointers()
 
 
+@profiling.timed()
 def uvlm_calculate_incidence_angle(ts_info,
                                    struct_ts_info):
     calculate_incidence_angle = UvlmLib.UVLM_check_incidence_angle
@@ -367,6 +373,7 @@ def uvlm_calculate_incidence_angle(ts_info,
                               ts_info.postproc_cell['incidence_angle_ct_pointer'])
     ts_info.remove_ctypes_pointers()
 
+@profiling.timed()
 def uvlm_calculate_total_induced_velocity_at_points(ts_info,
                                                    target_triads,
                                                    vortex_radius,
@@ -381,7 +388,9 @@ def uvlm_calculate_total_induced_velocity_at_points(ts_info,
     Args:
         ts_info (AeroTimeStepInfo): Time step information
         target_triads (np.array): Point coordinates, size=(npoints, 3)
-        uind (np.array): Induced velocity
+        vortex_radius (ct.c_double): Distance below which inductions are not computed
+        for_pos (np.array): Position of the A frame of reference, added to the grids
+        ncores (ct.c_uint): Number of cores used by the UVLM library
 
     Returns:
     	uind (np.array): Induced velocity, size=(npoints, 3)
@@ -394,7 +403,7 @@ def uvlm_calculate_total_induced_velocity_at_points(ts_info,
     uvmopts.NumSurfaces = ct.c_uint(ts_info.n_surf)
     uvmopts.ImageMethod = ct.c_bool(False)
     uvmopts.NumCores = ct.c_uint(ncores.value)
-    uvmopts.vortex_radius = ct.c_double(options['vortex_radius'].value)
+    uvmopts.vortex_radius = ct.c_double(vortex_radius.value)
 
     npoints = target_triads.shape[0]
     uind = np.zeros((npoints, 3), dtype=ct.c_double)
@@ -410,14 +419,8 @@ def uvlm_calculate_total_induced_velocity_at_points(ts_info,
     # make a copy of ts info and add for_pos to zeta and zeta_star
     ts_info_copy = ts_info.copy()
     for i_surf in range(ts_info_copy.n_surf):
-        # zeta
-        for iM in range(ts_info_copy.zeta[i_surf].shape[1]):
-            for iN in range(ts_info_copy.zeta[i_surf].shape[2]):
-                ts_info_copy.zeta[i_surf][:, iM, iN] += for_pos[0:3]
-        # zeta_star
-        for iM in range(ts_info_copy.zeta_star[i_surf].shape[1]):
-            for iN in range(ts_info_copy.zeta_star[i_surf].shape[2]):
-                ts_info_copy.zeta_star[i_surf][:, iM, iN] += for_pos[0:3]
+        ts_info_copy.zeta[i_surf] += for_pos[0:3, None, None]
+        ts_info_copy.zeta_star[i_surf] += for_pos[0:3, None, None]
 
     ts_info_copy.generate_ctypes_pointers()
     calculate_uind_at_points(ct.byref(uvmopts),
@@ -38,6 +38,15 @@ class GridBox(generator_interface.BaseGenerator):
     settings_default['moving'] = False
     settings_description['moving'] = 'If ``True``, the box moves with the body frame of reference. It does not rotate with it, though'
 
+    settings_types['sub_box_0'] = 'list(float)'
+    settings_default['sub_box_0'] = []
+    settings_description['sub_box_0'] = 'First corner of a box that clips the grid. Only the grid points within ' \
+                                        'the sub-box are generated. The full grid is used if empty'
+
+    settings_types['sub_box_1'] = 'list(float)'
+    settings_default['sub_box_1'] = []
+    settings_description['sub_box_1'] = 'Second corner of the clipping sub-box'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -69,17 +78,18 @@ class GridBox(generator_interface.BaseGenerator):
         ny = np.abs(int((self.y1-self.y0)/self.dy + 1))
         nz = np.abs(int((self.z1-self.z0)/self.dz + 1))
 
-        xarray = np.linspace(self.x0, self.x1, nx) + for_pos[0]
-        yarray = np.linspace(self.y0, self.y1, ny) + for_pos[1]
-        zarray = np.linspace(self.z0, self.z1, nz) + for_pos[2]
-        grid = []
-        for iz in range(nz):
-            grid.append(np.zeros((3, nx, ny), dtype=ct.c_double))
-            for ix in range(nx):
-                for iy in range(ny):
-                    grid[iz][0, ix, iy] = xarray[ix]
-                    grid[iz][1, ix, iy] = yarray[iy]
-                    grid[iz][2, ix, iy] = zarray[iz]
+        arrays = [np.linspace(self.x0, self.x1, nx),
+                  np.linspace(self.y0, self.y1, ny),
+                  np.linspace(self.z0, self.z1, nz)]
+        if len(self.in_dict['sub_box_0']) and len(self.in_dict['sub_box_1']):
+            for idim in range(3):
+                bounds = np.sort([self.in_dict['sub_box_0'][idim], self.in_dict['sub_box_1'][idim]])
+                arrays[idim] = arrays[idim][(arrays[idim] >= bounds[0]) & (arrays[idim] <= bounds[1])]
+        xarray, yarray, zarray = [arrays[idim] + for_pos[idim] for idim in range(3)]
+        nx, ny, nz = len(xarray), len(yarray), len(zarray)
+
+        xgrid, ygrid = np.meshgrid(xarray, yarray, indexing='ij')
+        grid = [np.array([xgrid, ygrid, z*np.ones_like(xgrid)], dtype=ct.c_double) for z in zarray]
 
 
         vtk_info = tvtk.RectilinearGrid()
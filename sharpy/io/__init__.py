@@ -1,7 +1,8 @@
 """UDP Input/Output
 
 
-This package contains the routines for the SHARPy input and output via UDP.
+This package contains the routines for the SHARPy input and output via UDP (or TCP and Unix domain sockets with the
+asyncio event loop).
 
 The main interface is performed through the :class:`~sharpy.io.network_interface.NetworkLoader`
 """
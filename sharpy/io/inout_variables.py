@@ -1,4 +1,4 @@
-import struct
+import sharpy.io.message_interface as message_interface
 import yaml
 import logging
 import numpy as np
@@ -227,13 +227,23 @@ class SetOfVariables:
         Returns:
             bytes: Encoded message of length ``5 + num_var * 8``.
         """
-        msg = struct.pack('{}5s'.format(self._byte_ordering), b'RREF0')
-        for var_idx in self.out_variables:
-            variable = self.variables[var_idx]
-            logger.debug('Encoding variable {}'.format(variable.dref_name))
-            msg += struct.pack('{}if'.format(self._byte_ordering), variable.variable_index, variable.value)
+        out_variables = [self.variables[var_idx] for var_idx in self.out_variables]
+        return self.output_layout.pack([variable.variable_index for variable in out_variables],
+                                       [variable.value for variable in out_variables])
 
-        return msg
+    @property
+    def output_layout(self):
+        """
+        :class:`~sharpy.io.message_interface.MessageLayout` of the output messages
+        """
+        return message_interface.get_layout(len(self.out_variables), self._byte_ordering)
+
+    @property
+    def input_layout(self):
+        """
+        :class:`~sharpy.io.message_interface.MessageLayout` of the input messages
+        """
+        return message_interface.get_layout(len(self.in_variables), self._byte_ordering)
 
     def get_value(self, data, timestep_index=-1):
         """
@@ -5,23 +5,95 @@ import logging
 #                     level=20)
 logger = logging.getLogger(__name__)
 
+HEADER = b'RREF0'
+
+
+class MessageLayout:
+    """
+    Precompiled layout of a message with a fixed number of variables.
+
+    A message consists of the 5-byte ``RREF0`` header followed by 8 bytes per variable: the variable index as a 4-byte
+    integer and its value as a single precision float. The layout is compiled once into a ``struct.Struct`` such that
+    each message is packed or unpacked with a single call.
+
+    Args:
+        n_variables (int): Number of variables in the message
+        byte_ordering (str): ``<`` for little endian or ``>`` for big endian
+    """
+
+    def __init__(self, n_variables, byte_ordering='<'):
+        self.n_variables = n_variables
+        self.byte_ordering = byte_ordering
+        self._struct = struct.Struct('{}5s'.format(byte_ordering) + 'if' * n_variables)
+
+    @property
+    def size(self):
+        """Message length in bytes"""
+        return self._struct.size
+
+    def pack(self, indices, values):
+        """
+        Encodes the variables in a message
+
+        Args:
+            indices (list(int)): Variable indices
+            values (list(float)): Variable values
+
+        Returns:
+            bytes: Encoded message
+        """
+        fields = [None] * (2 * self.n_variables)
+        fields[::2] = indices
+        fields[1::2] = values
+        return self._struct.pack(HEADER, *fields)
+
+    def pack_into(self, buffer, indices, values, offset=0):
+        """
+        Encodes the variables into a preallocated writable buffer
+        """
+        fields = [None] * (2 * self.n_variables)
+        fields[::2] = indices
+        fields[1::2] = values
+        self._struct.pack_into(buffer, offset, HEADER, *fields)
+
+    def unpack_from(self, buffer, offset=0):
+        """
+        Decodes a message from a buffer without copying it.
+
+        Args:
+            buffer (bytes-like): Buffer containing the message
+            offset (int): Position of the message in the buffer
+
+        Returns:
+            list(tuple): ``(index, value)`` pair of each variable
+        """
+        fields = self._struct.unpack_from(buffer, offset)
+        if fields[0] != HEADER:
+            logger.error('Error, header is not RREF0')
+        return list(zip(fields[1::2], fields[2::2]))
+
+
+_layouts = dict()
+
+
+def get_layout(n_variables, byte_ordering='<'):
+    """
+    Returns the cached :class:`MessageLayout` for the number of variables and byte ordering
+    """
+    try:
+        return _layouts[(n_variables, byte_ordering)]
+    except KeyError:
+        layout = MessageLayout(n_variables, byte_ordering)
+        _layouts[(n_variables, byte_ordering)] = layout
+        return layout
+
 
 def decoder(msg, byte_ordering='<'):
     n_bytes = len(msg)
 
-    header = msg[:5]
-    if header != b'RREF0':
-        logger.error('Error, header is not RREF0')
-
     len_values = int(n_bytes - 5)
     if divmod(len_values, 8)[1] != 0:  # remainder equal 0
         logger.error('Error in decoding message. Length of values field not a multiple of 8')
 
     n_values = int(len_values // 8)
-    values = []
-    for i_val in range(n_values):
-        current_signal = msg[5 + i_val * 8: 5 + i_val * 8 + 8]
-        sig_index = struct.unpack('{}if'.format(byte_ordering), current_signal)
-        values.append(sig_index)
-
-    return values
+    return get_layout(n_values, byte_ordering).unpack_from(msg)
@@ -1,9 +1,14 @@
 import socket
 import selectors
 import logging
+import asyncio
+import os
+import queue
+import time
 import sharpy.io.message_interface as message_interface
 import sharpy.io.inout_variables as inout_variables
 import sharpy.utils.settings as settings
+import sharpy.utils.exceptions as exceptions
 import sharpy.io.logger_utils as logger_utils
 
 sel = selectors.DefaultSelector()
@@ -64,6 +69,13 @@ class NetworkLoader:
     A specific network log is created to detail the ins and outs of the communication protocol. The level of messages
     that are shown can be set in the settings.
 
+    By default, the sockets are polled with ``selectors`` in a separate thread. If ``event_loop`` is set to
+    ``asyncio``, the communication is handled by :class:`~sharpy.io.network_interface.AsyncNetworkLoop` instead, which
+    reacts to each message as soon as it arrives, encodes and decodes messages with precompiled layouts and supports
+    ``tcp`` and ``unix`` (Unix domain socket) stream transports in addition to ``udp``, as chosen in ``transport``.
+    With stream transports SHARPy acts as the server of both the input and output sockets. Per message latency and
+    jitter statistics are written to the network log at the end of the simulation.
+
 
     See Also:
         Endianness: https://docs.python.org/3/library/struct.html#byte-order-size-and-alignment
@@ -118,8 +130,18 @@ class NetworkLoader:
     settings_description['file_log_level'] = 'Minimum logging level in log file.'
     settings_options['file_log_level'] = ['debug', 'info', 'warning', 'error']
 
+    settings_types['event_loop'] = 'str'
+    settings_default['event_loop'] = 'selectors'
+    settings_description['event_loop'] = 'Event loop handling the sockets.'
+    settings_options['event_loop'] = ['selectors', 'asyncio']
+
+    settings_types['transport'] = 'str'
+    settings_default['transport'] = 'udp'
+    settings_description['transport'] = 'Transport protocol. ``tcp`` and ``unix`` require the ``asyncio`` event loop.'
+    settings_options['transport'] = ['udp', 'tcp', 'unix']
+
     settings_table = settings.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description,
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options,
                                        header_line='The ``NetworkLoader`` takes the following settings:')
 
     def __init__(self):
@@ -139,6 +161,10 @@ class NetworkLoader:
         else:
             raise KeyError('Unknown byte ordering {}'.format(self.settings['byte_ordering']))
 
+        if self.settings['transport'] != 'udp' and self.settings['event_loop'] != 'asyncio':
+            # the tcp and unix transports are only available with the asyncio event loop
+            raise exceptions.NotValidSetting('event_loop', self.settings['event_loop'], ['asyncio'])
+
         logger_utils.load_logger_settings(log_name=self.settings['log_name'],
                                           file_level=self.settings['file_log_level'],
                                           console_level=self.settings['console_log_level'])
@@ -179,6 +205,22 @@ class NetworkLoader:
         elif len(to_return) == 1:
             return to_return[0]  # for single network cases (usually output only)
 
+    def get_async_loop(self, set_of_variables):
+        """
+        Returns the asyncio network loop for the given input and output variables.
+
+        Args:
+            set_of_variables (sharpy.io.inout_variables.SetOfVariables): Input and output variables
+
+        Returns:
+            AsyncNetworkLoop: Network loop
+        """
+        return AsyncNetworkLoop(self.settings['transport'],
+                                self.settings['input_network_settings'],
+                                self.settings['output_network_settings'],
+                                set_of_variables.input_layout,
+                                send_output_to_all_clients=self.settings['send_output_to_all_clients'])
+
 
 class Network:
     """
@@ -320,6 +362,10 @@ class OutNetwork(Network):
     settings_default['port'] = 65000
     settings_description['port'] = 'Own port for output network'
 
+    settings_types['socket_path'] = 'str'
+    settings_default['socket_path'] = './sharpy_output.sock'
+    settings_description['socket_path'] = 'Path to the output socket file when using the ``unix`` transport'
+
     settings_types['send_on_demand'] = 'bool'
     settings_default['send_on_demand'] = True
     settings_description['send_on_demand'] = 'Waits for a signal demanding the output data. Else, sends to destination' \
@@ -384,6 +430,10 @@ class InNetwork(Network):
     settings_default['port'] = 65001
     settings_description['port'] = 'Own port for input network'
 
+    settings_types['socket_path'] = 'str'
+    settings_default['socket_path'] = './sharpy_input.sock'
+    settings_description['socket_path'] = 'Path to the input socket file when using the ``unix`` transport'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -412,6 +462,333 @@ class InNetwork(Network):
                 self._recv_buffer = b''  # clean up
 
 
+class LatencyStatistics:
+    """
+    Timing statistics of the messages through a network channel.
+
+    For each message, the interval since the previous one is recorded, from which the mean rate and the jitter
+    (standard deviation of the intervals) are obtained. Optionally, the latency of the message (the time it spent
+    within SHARPy between being produced and sent, or received and consumed) is also recorded.
+
+    Args:
+        name (str): Name of the channel for logging purposes
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+        self.n_messages = 0
+        self._last_time = None
+
+        self._n_intervals = 0
+        self._sum_interval = 0.
+        self._sum_sq_interval = 0.
+        self._max_interval = 0.
+
+        self._n_latencies = 0
+        self._sum_latency = 0.
+        self._max_latency = 0.
+
+    def record(self, latency=None, now=None):
+        """
+        Records a message
+
+        Args:
+            latency (float (optional)): Latency of the message in seconds
+            now (float (optional)): Time of the message as given by ``time.perf_counter()``. Defaults to the current
+                time.
+        """
+        if now is None:
+            now = time.perf_counter()
+        if self._last_time is not None:
+            interval = now - self._last_time
+            self._n_intervals += 1
+            self._sum_interval += interval
+            self._sum_sq_interval += interval ** 2
+            self._max_interval = max(self._max_interval, interval)
+        self._last_time = now
+        self.n_messages += 1
+
+        if latency is not None:
+            self._n_latencies += 1
+            self._sum_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+
+    def summary(self):
+        """
+        Returns:
+            dict: Number of messages, mean and maximum interval between messages, jitter and mean and maximum latency,
+            in seconds.
+        """
+        stats = {'n_messages': self.n_messages}
+        if self._n_intervals > 0:
+            mean_interval = self._sum_interval / self._n_intervals
+            stats['mean_interval'] = mean_interval
+            stats['max_interval'] = self._max_interval
+            stats['jitter'] = max(self._sum_sq_interval / self._n_intervals - mean_interval ** 2, 0.) ** 0.5
+        if self._n_latencies > 0:
+            stats['mean_latency'] = self._sum_latency / self._n_latencies
+            stats['max_latency'] = self._max_latency
+        return stats
+
+    def log(self):
+        logger.info('{} channel statistics: '.format(self.name) +
+                    ', '.join(['{}: {:g}'.format(key, value) for key, value in self.summary().items()]))
+
+
+class OutputChannel(queue.Queue):
+    """
+    Single slot queue through which the time loop hands the output variables to the asyncio network loop.
+
+    The variables are encoded as soon as they are put in the channel, in the time loop thread, such that the network
+    loop only needs to send the resulting message. Putting a message also wakes up the network loop the channel is
+    attached to. The channel holds ``(message, time)`` tuples, where ``time`` is that at which it was put.
+    """
+
+    def __init__(self):
+        super().__init__(maxsize=1)
+        self._loop = None
+        self._ready = None
+
+    def attach(self, loop, ready_event):
+        """
+        Attaches the channel to an asyncio event loop and event that is set when there is a new message
+        """
+        self._loop = loop
+        self._ready = ready_event
+
+    def put(self, item, block=True, timeout=None):
+        super().put((item.encode(), time.perf_counter()), block, timeout)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+
+def put_latest(in_queue, item):
+    """
+    Puts an item in a single slot queue without blocking, replacing any item not yet consumed
+    """
+    while True:
+        try:
+            in_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                in_queue.get_nowait()
+                logger.debug('Input queue full - discarding the oldest input')
+            except queue.Empty:
+                pass
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, on_message):
+        self.on_message = on_message
+
+    def datagram_received(self, data, addr):
+        self.on_message(data, addr)
+
+
+class _StreamProtocol(asyncio.BufferedProtocol):
+    """
+    Receives fixed length messages from a stream into a preallocated buffer, without intermediate copies.
+    """
+
+    def __init__(self, message_length, on_message, connections=None):
+        self.buffer = bytearray(message_length)
+        self._view = memoryview(self.buffer)
+        self._n_read = 0
+        self.on_message = on_message
+        self.connections = connections
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        logger.info('Accepted connection from {}'.format(transport.get_extra_info('peername')))
+        if self.connections is not None:
+            self.connections.append(transport)
+
+    def get_buffer(self, sizehint):
+        return self._view[self._n_read:]
+
+    def buffer_updated(self, nbytes):
+        self._n_read += nbytes
+        if self._n_read == len(self.buffer):
+            self._n_read = 0
+            self.on_message(self.buffer, self.transport)
+
+    def connection_lost(self, exc):
+        logger.info('Connection closed')
+        if self.connections is not None and self.transport in self.connections:
+            self.connections.remove(self.transport)
+
+
+class AsyncNetworkLoop:
+    """
+    Input and output network loop based on ``asyncio``.
+
+    Input messages are decoded as soon as they are received, straight from the receive buffer, and handed to the time
+    loop through a single slot queue that always holds the latest input. Output messages are encoded by the time
+    loop when put in the :class:`OutputChannel` and sent as soon as the network loop is woken up, either to all the
+    destination clients or, if ``send_on_demand``, to those that request them.
+
+    With the ``udp`` transport the input and output sockets are bound to the addresses in the input and output network
+    settings and the output is sent to the ``destination_address`` and ``destination_ports``. With the ``tcp`` and
+    ``unix`` transports, SHARPy listens for connections on both sockets, and the output is sent to all the clients
+    connected to the output socket.
+
+    Args:
+        transport (str): ``udp``, ``tcp`` or ``unix``
+        in_settings (dict): Input network settings. See :class:`InNetwork`.
+        out_settings (dict): Output network settings. See :class:`OutNetwork`.
+        input_layout (sharpy.io.message_interface.MessageLayout): Layout of the input messages
+        send_output_to_all_clients (bool): Add the clients from which the input is received to the destination
+            clients of the ``udp`` transport.
+    """
+
+    def __init__(self, transport, in_settings, out_settings, input_layout, send_output_to_all_clients=False):
+        self.transport = transport
+
+        self.in_settings = in_settings
+        settings.to_custom_types(self.in_settings, InNetwork.settings_types, InNetwork.settings_default,
+                                 no_ctype=True)
+        self.out_settings = out_settings
+        settings.to_custom_types(self.out_settings, OutNetwork.settings_types, OutNetwork.settings_default,
+                                 no_ctype=True)
+
+        self.input_layout = input_layout
+
+        self.send_output_to_all_clients = send_output_to_all_clients
+        self.clients = list(zip(self.out_settings['destination_address'], self.out_settings['destination_ports']))
+
+        self.input_statistics = LatencyStatistics('Input')
+        self.output_statistics = LatencyStatistics('Output')
+
+        self._in_queue = None
+        self._latest_output = None
+        self._out_transport = None  # udp output endpoint
+        self._out_connections = []  # stream output connections
+
+    def run(self, in_queue, out_queue, finish_event, poll_interval=0.05):
+        """
+        Runs the network loop until ``finish_event`` is set.
+
+        Args:
+            in_queue (queue.Queue): Single slot queue where the decoded input variables are put
+            out_queue (OutputChannel): Channel from which the output messages are taken
+            finish_event (threading.Event): Event signalling the end of the simulation
+            poll_interval (float): Interval at which ``finish_event`` is checked, in seconds
+        """
+        asyncio.run(self._main(in_queue, out_queue, finish_event, poll_interval))
+
+    async def _main(self, in_queue, out_queue, finish_event, poll_interval):
+        loop = asyncio.get_running_loop()
+        self._in_queue = in_queue
+        output_ready = asyncio.Event()
+        out_queue.attach(loop, output_ready)
+
+        servers = await self._open(loop)
+        sender = asyncio.ensure_future(self._send_outputs(out_queue, output_ready))
+        try:
+            while not finish_event.is_set():
+                await asyncio.sleep(poll_interval)
+        finally:
+            sender.cancel()
+            for server in servers:
+                server.close()
+            for path in self._socket_paths():
+                if os.path.exists(path):
+                    os.remove(path)
+            self.input_statistics.log()
+            self.output_statistics.log()
+
+    async def _open(self, loop):
+        servers = []
+        if self.transport == 'udp':
+            in_endpoint, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self._on_input),
+                local_addr=(self.in_settings['address'], self.in_settings['port']))
+            self._out_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self._on_request),
+                local_addr=(self.out_settings['address'], self.out_settings['port']))
+            servers += [in_endpoint, self._out_transport]
+        else:
+            request_length = 1  # any byte received on an output connection is a request for data
+            if self.transport == 'tcp':
+                servers.append(await loop.create_server(
+                    lambda: _StreamProtocol(self.input_layout.size, self._on_input),
+                    host=self.in_settings['address'], port=self.in_settings['port']))
+                servers.append(await loop.create_server(
+                    lambda: _StreamProtocol(request_length, self._on_request, connections=self._out_connections),
+                    host=self.out_settings['address'], port=self.out_settings['port']))
+            elif self.transport == 'unix':
+                for path in self._socket_paths():
+                    if os.path.exists(path):
+                        os.remove(path)
+                servers.append(await loop.create_unix_server(
+                    lambda: _StreamProtocol(self.input_layout.size, self._on_input),
+                    path=self.in_settings['socket_path']))
+                servers.append(await loop.create_unix_server(
+                    lambda: _StreamProtocol(request_length, self._on_request, connections=self._out_connections),
+                    path=self.out_settings['socket_path']))
+            else:
+                raise exceptions.NotValidSetting('transport', self.transport,
+                                                 NetworkLoader.settings_options['transport'])
+        logger.info('Opened {} input and output sockets'.format(self.transport))
+        return servers
+
+    def _socket_paths(self):
+        if self.transport == 'unix':
+            return [self.in_settings['socket_path'], self.out_settings['socket_path']]
+        return []
+
+    def _on_input(self, data, sender):
+        if len(data) != self.input_layout.size:
+            logger.error('Received a {}-byte message, expected {} bytes'.format(len(data), self.input_layout.size))
+            return
+        values = self.input_layout.unpack_from(data)
+        self.input_statistics.record()
+        put_latest(self._in_queue, values)
+        if self.transport == 'udp' and self.send_output_to_all_clients and sender not in self.clients:
+            self.clients.append(sender)
+            logger.info('Added new client to list {}'.format(sender))
+        logger.debug('Received input {}'.format(values))
+
+    def _on_request(self, data, sender):
+        logger.debug('Received request for data')
+        if not self.out_settings['send_on_demand']:
+            return
+        if self._latest_output is None:
+            logger.debug('No output available yet')
+            return
+        self._send(self._latest_output, [sender])
+
+    async def _send_outputs(self, out_queue, output_ready):
+        while True:
+            await output_ready.wait()
+            output_ready.clear()
+            try:
+                message, put_time = out_queue.get_nowait()
+            except queue.Empty:
+                continue
+            self._latest_output = message
+            if not self.out_settings['send_on_demand']:
+                self._send(message)
+            self.output_statistics.record(latency=time.perf_counter() - put_time)
+
+    def _send(self, message, destinations=None):
+        if self.transport == 'udp':
+            if destinations is None:
+                destinations = self.clients
+            for destination in destinations:
+                self._out_transport.sendto(message, destination)
+        else:
+            if destinations is None:
+                destinations = self._out_connections
+            for destination in destinations:
+                destination.write(message)
+        logger.debug('Sent {}-byte message to {} clients'.format(len(message), len(destinations)))
+
+
 def get_events(mode):
     if mode == "r":
         events = selectors.EVENT_READ
@@ -6,6 +6,7 @@ import warnings
 import sharpy.utils.settings as settings
 import sharpy.utils.cout_utils as cout
 import sharpy.utils.algebra as algebra
+import sharpy.utils.profiling as profiling
 
 
 @ss_interface.linear_system
@@ -68,6 +69,7 @@ class LinearAeroelastic(ss_interface.BaseElement):
         self.state_variables = None
         self.couplings = dict()
         self.linearisation_vectors = dict()
+        self.coupling_cache = dict()  # products of the UVLM and coupling gains re-used in update()
 
         # Aeroelastic coupling gains
         # transfer
@@ -99,7 +101,8 @@ class LinearAeroelastic(ss_interface.BaseElement):
         self.uvlm = ss_interface.initialise_system('LinearUVLM')
         self.uvlm.initialise(data, custom_settings=self.settings['aero_settings'])
         if self.settings['uvlm_filename'] == '':
-            self.uvlm.assemble(track_body=self.settings['track_body'])
+            with profiling.timer('uvlm'):
+                self.uvlm.assemble(track_body=self.settings['track_body'])
         else:
             self.load_uvlm_from_file = True
 
@@ -152,10 +155,11 @@ class LinearAeroelastic(ss_interface.BaseElement):
         rigid_dof = beam.sys.Kstr.shape[0] - flex_nodes
         total_dof = flex_nodes + rigid_dof
 
-        if uvlm.scaled:
-            beam.assemble(t_ref=uvlm.sys.ScalingFacts['time'])
-        else:
-            beam.assemble()
+        with profiling.timer('beam'):
+            if uvlm.scaled:
+                beam.assemble(t_ref=uvlm.sys.ScalingFacts['time'])
+            else:
+                beam.assemble()
 
         if not self.load_uvlm_from_file:
             # Projecting the UVLM inputs and outputs onto the structural degrees of freedom
@@ -210,7 +214,8 @@ class LinearAeroelastic(ss_interface.BaseElement):
                     self.runrom_rbm(uvlm)
                 else:
                     for k, rom in uvlm.rom.items():
-                        uvlm.ss = rom.run(uvlm.ss)
+                        with profiling.timer('rom/' + k):
+                            uvlm.ss = rom.run(uvlm.ss)
 
         else:
             uvlm.ss = self.load_uvlm(self.settings['uvlm_filename'])
@@ -229,7 +234,8 @@ class LinearAeroelastic(ss_interface.BaseElement):
                 if not self.settings['beam_settings']['modal_projection']:
                     Tas /= uvlm.sys.ScalingFacts['length']
 
-        ss = libss.couple(ss01=uvlm.ss, ss02=beam.ss, K12=Tas, K21=Tsa)
+        self.coupling_cache = dict()
+        ss = libss.couple(ss01=uvlm.ss, ss02=beam.ss, K12=Tas, K21=Tsa, cache=self.coupling_cache)
 
         self.couplings['Tas'] = Tas
         self.couplings['Tsa'] = Tsa
@@ -255,14 +261,21 @@ class LinearAeroelastic(ss_interface.BaseElement):
         self.ss = ss
         return self.ss
 
-    def update(self, u_infty):
+    def update(self, u_infty, rho=None):
         """
-        Updates the aeroelastic scaled system with the new reference velocity.
+        Updates the aeroelastic scaled system with the new reference velocity and, optionally, density.
 
-        Only the beam equations need updating since the only dependency in the forward flight velocity resides there.
+        The normalised UVLM does not depend on the free stream velocity nor on the density. Therefore, only the beam
+        equations are re-assembled with the new reference time and the coupling is recomputed re-using the products of
+        the UVLM matrices and the coupling gains stored at assembly (see :func:`sharpy.linear.src.libss.couple`). The
+        inverse of the beam mass matrix is also kept between updates.
+
+        A change in density is introduced by scaling the aerodynamic forces fed into the beam by the ratio between
+        the new density and the density at the linearisation point. The external inputs to the beam are not affected.
 
         Args:
               u_infty (float): New reference velocity
+              rho (float (optional)): New free stream density. If not given, the density at assembly is retained.
 
         Returns:
             sharpy.linear.src.libss.ss: Updated aeroelastic state-space system
@@ -274,8 +287,25 @@ class LinearAeroelastic(ss_interface.BaseElement):
         self.beam.sys.assemble()
         self.beam.ss = self.beam.sys.SSdisc
 
-        self.ss = libss.couple(ss01=self.uvlm.ss, ss02=self.beam.ss,
-                               K12=self.couplings['Tas'], K21=self.couplings['Tsa'])
+        if rho is None:
+            density_ratio = 1.
+        else:
+            density_ratio = rho / self.uvlm.tsaero0.rho
+
+        if density_ratio == 1.:
+            self.ss = libss.couple(ss01=self.uvlm.ss, ss02=self.beam.ss,
+                                   K12=self.couplings['Tas'], K21=self.couplings['Tsa'],
+                                   cache=self.coupling_cache)
+        else:
+            # scaling the beam inputs is equivalent to scaling Tsa and keeps the cached coupling products valid
+            beam_ss = libss.ss(self.beam.ss.A, density_ratio * self.beam.ss.B,
+                               self.beam.ss.C, density_ratio * self.beam.ss.D, dt=self.beam.ss.dt)
+            self.ss = libss.couple(ss01=self.uvlm.ss, ss02=beam_ss,
+                                   K12=self.couplings['Tas'], K21=self.couplings['Tsa'],
+                                   cache=self.coupling_cache)
+            # restore the external inputs to the beam
+            self.ss.B[:, self.uvlm.ss.inputs:] /= density_ratio
+            self.ss.D[:, self.uvlm.ss.inputs:] /= density_ratio
 
         return self.ss
 
@@ -317,7 +347,8 @@ class LinearAeroelastic(ss_interface.BaseElement):
         ss.addGain(rem_int_modes, where='in')
         ss.addGain(rem_quat_out, where='out')
         for k, rom in uvlm.rom.items():
-            uvlm.ss = rom.run(uvlm.ss)
+            with profiling.timer('rom/' + k):
+                uvlm.ss = rom.run(uvlm.ss)
 
         uvlm.ss.addGain(rem_int_modes.T, where='in')
         uvlm.ss.addGain(rem_quat_out.T, where='out')
@@ -593,10 +624,10 @@ class LinearAeroelastic(ss_interface.BaseElement):
 
             ### str -> aero mapping
             # some nodes may be linked to multiple surfaces...
-            for str2aero_here in aero.struct2aero_mapping[node_glob]:
+            for i_entry in aero.mapping_tables.node_entries(node_glob):
 
                 # detect surface/span-wise coordinate (ss,nn)
-                nn, ss = str2aero_here['i_n'], str2aero_here['i_surf']
+                nn, ss = aero.mapping_tables.i_n[i_entry], aero.mapping_tables.surf[i_entry]
                 # print('%.2d,%.2d'%(nn,ss))
 
                 # surface panelling
@@ -19,7 +19,6 @@ import numpy as np
 import scipy.sparse as sparse
 import itertools
 
-from sharpy.aero.utils.uvlmlib import dvinddzeta_cpp, eval_panel_cpp
 import sharpy.linear.src.libsparse as libsp
 import sharpy.linear.src.lib_dbiot as dbiot
 import sharpy.linear.src.lib_ucdncdzeta as lib_ucdncdzeta
@@ -32,6 +31,9 @@ svec = [0, 1, 2, 3]  # seg. no.
 avec = [0, 1, 2, 3]  # 1st vertex no.
 bvec = [1, 2, 3, 0]  # 2nd vertex no.
 
+# maximum number of (target point, panel) pairs evaluated at once
+max_pairs_batch = 2 ** 13
+
 
 def AICs(Surfs, Surfs_star, target='collocation', Project=True):
     """
@@ -108,6 +110,7 @@ def nc_dqcdzeta_Sin_to_Sout(Surf_in, Surf_out, Der_coll, Der_vert, Surf_in_bound
     assert Der_coll.shape == (K_out, 3 * Kzeta_out), 'Unexpected Der_coll shape'
     if Surf_in_bound:
         assert Der_vert.shape == (K_out, 3 * Kzeta_in), 'Unexpected Der_vert shape'
+        M_bound_in = None
     else:
         # determine size of bound surface of which Surf_in is the wake
         Kzeta_bound_in = Der_vert.shape[1] // 3
@@ -118,41 +121,33 @@ def nc_dqcdzeta_Sin_to_Sout(Surf_in, Surf_out, Der_coll, Der_vert, Surf_in_bound
     Surf_out.maps.map_panels_to_vertices_1D_scalar()
     # Surf_in.maps.map_panels_to_vertices_1D_scalar()
 
-    ##### loop collocation points
-    for cc_out in range(K_out):
-
-        # get (m,n) indices of collocation point
-        mm_out = Surf_out.maps.ind_2d_pan_scal[0][cc_out]
-        nn_out = Surf_out.maps.ind_2d_pan_scal[1][cc_out]
+    # coordinates and normals of the collocation points
+    mm_out, nn_out = Surf_out.maps.ind_2d_pan_scal
+    zetac_out = ZetaColl[:, mm_out, nn_out].T
+    nc_out = Surf_out.normals[:, mm_out, nn_out].T[:, None, :]
 
-        # get coords and normal
-        zetac_here = ZetaColl[:, mm_out, nn_out]  # .copy() # non-contiguous array !
-        nc_here = Surf_out.normals[:, mm_out, nn_out]
+    # normal induced velocity derivative w.r.t. the collocation points
+    dvindnorm_coll = np.zeros((K_out, 3))
 
-        # get derivative of induced velocity w.r.t. zetac
-        if Surf_in_bound:
-            dvind_coll, dvind_vert = dvinddzeta_cpp(zetac_here, Surf_in,
-                                                    is_bound=Surf_in_bound,
-                                                    vortex_radius=Surf_in.vortex_radius)
-        else:
-            dvind_coll, dvind_vert = dvinddzeta_cpp(zetac_here, Surf_in,
-                                                    is_bound=Surf_in_bound,
-                                                    vortex_radius=Surf_in.vortex_radius,
-                                                    M_in_bound=M_bound_in)
+    ##### loop chunks of collocation points
+    for chunk in target_chunks(K_out, K_in):
+        dvind_coll, dvind_vert = dvinddzeta_batch(zetac_out[chunk], Surf_in, Surf_in_bound,
+                                                  M_in_bound=M_bound_in, Proj=nc_out[chunk])
 
         ### Surf_in vertices contribution
-        Der_vert[cc_out, :] += np.dot(nc_here, dvind_vert)
+        Der_vert[chunk, :] += dvind_vert[:, 0, :]
 
         ### Surf_out collocation point contribution
-        # project
-        dvindnorm_coll = np.dot(nc_here, dvind_coll)
+        dvindnorm_coll[chunk, :] = dvind_coll[:, 0, :]
 
-        # loop panel vertices
-        for vv, dm, dn in zip(range(4), dmver, dnver):
-            mm_v, nn_v = mm_out + dm, nn_out + dn
-            ii_v = [np.ravel_multi_index(
-                (cc, mm_v, nn_v), shape_zeta_out) for cc in range(3)]
-            Der_coll[cc_out, ii_v] += wcv_out[vv] * dvindnorm_coll
+    ### allocate collocation point contribution onto the panel vertices
+    mm_v = Surf_out.maps.ind_2d_pan_scal[0][:, None] + np.array(dmver)
+    nn_v = Surf_out.maps.ind_2d_pan_scal[1][:, None] + np.array(dnver)
+    # ii_v[cc_out, vv, cc] is the 1D index of component cc of vertex vv
+    ii_v = np.ravel_multi_index((np.arange(3)[None, None, :], mm_v[:, :, None], nn_v[:, :, None]),
+                                shape_zeta_out)
+    Der_coll[np.arange(K_out)[:, None, None], ii_v] += \
+        wcv_out[None, :, None] * dvindnorm_coll[:, None, :]
 
     return Der_coll, Der_vert
 
@@ -860,92 +855,103 @@ def dvinddzeta(zetac, Surf_in, IsBound, M_in_bound=None):
     - Dercoll: 3 x 3 matrix
     - Dervert: 3 x 3*Kzeta (if Surf_in is a wake, Kzeta is that of the bound)
 
-    Warning:
-    zetac must be contiguously stored!
+    See dvinddzeta_batch to evaluate many target points at once.
     """
 
-    M_in, N_in = Surf_in.maps.M, Surf_in.maps.N
-    Kzeta_in = Surf_in.maps.Kzeta
-    shape_zeta_in = (3, M_in + 1, N_in + 1)
+    Dercoll, Dervert = dvinddzeta_batch(zetac, Surf_in, IsBound, M_in_bound)
+
+    return Dercoll[0], Dervert[0]
+
 
-    # allocate matrices
-    Dercoll = np.zeros((3, 3))
+def target_chunks(n_p, K_in):
+    """
+    Splits n_p target points into slices such that at most max_pairs_batch
+    (target point, panel) pairs of a surface with K_in panels are evaluated at
+    once by dvinddzeta_batch.
+    """
+
+    n_chunk = max(max_pairs_batch // K_in, 1)
+    return [slice(pp, min(pp + n_chunk, n_p)) for pp in range(0, n_p, n_chunk)]
+
+
+def dvinddzeta_batch(zetac, Surf_in, IsBound, M_in_bound=None, Proj=None):
+    """
+    Array version of dvinddzeta for the n_p target points zetac, of shape
+    (n_p,3).
+
+    If given, the derivatives at each target point are premultiplied by the
+    matrices Proj, of shape (n_p,n_r,3) (e.g. the normals at the collocation
+    points, with n_r=1). Otherwise n_r=3 and the derivatives are those of the
+    induced velocity. The output derivatives are:
+    - Dercoll: (n_p,n_r,3) array
+    - Dervert: (n_p,n_r,3*Kzeta) array (if Surf_in is a wake, Kzeta is that of
+    the bound)
+
+    Memory scales as n_p*K_in (see dbiot.eval_panel_batch), hence long lists of
+    target points should be split with target_chunks.
+    """
 
+    zetac = np.atleast_2d(zetac)
+    n_p = zetac.shape[0]
+    if Proj is None:
+        Proj = np.broadcast_to(np.eye(3), (n_p, 3, 3))
+    n_r = Proj.shape[1]
+
+    M_in, N_in = Surf_in.maps.M, Surf_in.maps.N
+    K_in = M_in * N_in
+    if IsBound:
+        M_in_bound = M_in
+    Kzeta_in_bound = (M_in_bound + 1) * (N_in + 1)
+
+    # panel vertices coordinates, shape (K_in,4,3), and (m,n) indices
+    mm_in, nn_in = np.meshgrid(range(M_in), range(N_in), indexing='ij')
+    mm_in, nn_in = mm_in.reshape(-1), nn_in.reshape(-1)
+    mm_ver = mm_in[:, None] + np.array(dmver)
+    nn_ver = nn_in[:, None] + np.array(dnver)
+    zeta_panels_in = Surf_in.zeta[:, mm_ver, nn_ver].transpose(1, 2, 0)
+    gamma_in = Surf_in.gamma[mm_in, nn_in]
+
+    try:
+        vortex_radius = Surf_in.vortex_radius.value
+    except AttributeError:
+        vortex_radius = Surf_in.vortex_radius
+
+    # get local derivatives of all target points and panels at once
+    der_zetac, der_zeta_panel = dbiot.eval_panel_batch(
+        zetac, zeta_panels_in, vortex_radius, gamma_pan=gamma_in)
+
+    ### Mid-segment point contribution
+    Dercoll = np.matmul(Proj, np.sum(der_zetac, axis=1))
+
+    ### Panel vertices contribution
+    # kk_v: (panel, local vertex) pairs, as 4*panel+vertex, contributing to the
+    # vertices jj_v of the bound surface
     if IsBound:
         """ Bound: scan everthing, and include every derivative. The TE is not
         scanned twice"""
-
-        Dervert = np.zeros((3, 3 * Kzeta_in))
-
-        for pp_in in itertools.product(range(0, M_in), range(0, N_in)):
-            mm_in, nn_in = pp_in
-            # zeta_panel_in=Surf_in.get_panel_vertices_coords(mm_in,nn_in)
-            zeta_panel_in = Surf_in.zeta[:, [mm_in + 0, mm_in + 1, mm_in + 1, mm_in + 0],
-                            [nn_in + 0, nn_in + 0, nn_in + 1, nn_in + 1]].T
-            # get local derivatives
-            der_zetac, der_zeta_panel = eval_panel_cpp(
-                zetac, zeta_panel_in, Surf_in.vortex_radius, gamma_pan=Surf_in.gamma[mm_in, nn_in])
-            ### Mid-segment point contribution
-            Dercoll += der_zetac
-            ### Panel vertices contribution
-            for vv_in in range(4):
-                # get vertices m,n indices
-                mm_v, nn_v = mm_in + dmver[vv_in], nn_in + dnver[vv_in]
-                # get vertices 1d index
-                jj_v = [np.ravel_multi_index(
-                    (cc, mm_v, nn_v), shape_zeta_in) for cc in range(3)]
-                Dervert[:, jj_v] += der_zeta_panel[vv_in, :, :]
-
+        kk_v = np.arange(4 * K_in)
+        jj_v = (mm_ver * (N_in + 1) + nn_ver).reshape(-1)
     else:
         """
-        All segments are scanned when computing the contrib. Dercoll. The
-        TE is scanned a second time to include the contrib. due to the TE
-        elements moviment. The Dervert shape is computed using the chordwse
-        paneling of the associated bound surface (M_in_bound).
+        All segments contribute to Dercoll. Only the TE segments contribute to
+        Dervert, as the vertices are those of the associated bound surface. The
+        Dervert shape is computed using the chordwse paneling of the associated
+        bound surface (M_in_bound).
         """
-
-        Kzeta_in_bound = (M_in_bound + 1) * (N_in + 1)
-        Dervert = np.zeros((3, 3 * Kzeta_in_bound))
-
-        ### loop all panels (coll. contrib)
-        for pp_in in itertools.product(range(0, M_in), range(0, N_in)):
-            mm_in, nn_in = pp_in
-            # zeta_panel_in=Surf_in.get_panel_vertices_coords(mm_in,nn_in)
-            zeta_panel_in = Surf_in.zeta[:, [mm_in + 0, mm_in + 1, mm_in + 1, mm_in + 0],
-                            [nn_in + 0, nn_in + 0, nn_in + 1, nn_in + 1]].T
-            # get local derivatives
-            der_zetac = dbiot.eval_panel_cpp_coll(
-                zetac, zeta_panel_in, Surf_in.vortex_radius, gamma_pan=Surf_in.gamma[mm_in, nn_in])
-            # der_zetac_fast=dbiot.eval_panel_fast_coll(
-            # 		zetac,zeta_panel_in,gamma_pan=Surf_in.gamma[mm_in,nn_in])
-            # if np.max(np.abs(der_zetac-der_zetac_fast))>1e-10:
-            # 	embed()
-
-            ### Mid-segment point contribution
-            Dercoll += der_zetac
-
-        ### Re-scan the TE to include vertex contrib.
         # vertex 0 of wake is vertex 1 of bound (local no.)
         # vertex 3 of wake is vertex 2 of bound (local no.)
-        vvec = [0, 3]  # vertices to include
-        dn = [0, 1]  # delta to go from (m,n) panel to (m,n) vertices (on bound)
-
-        shape_zeta_in_bound = (3, M_in_bound + 1, N_in + 1)
-        for nn_in in range(N_in):
-            # zeta_panel_in=Surf_in.get_panel_vertices_coords(0,nn_in)
-            zeta_panel_in = Surf_in.zeta[:, [0, 1, 1, 0],
-                            [nn_in + 0, nn_in + 0, nn_in + 1, nn_in + 1]].T
-            # get local derivatives
-            _, der_zeta_panel = eval_panel_cpp(
-                zetac, zeta_panel_in, Surf_in.vortex_radius, gamma_pan=Surf_in.gamma[0, nn_in])
-
-            for vv in range(2):
-                nn_v = nn_in + dn[vv]
-                jj_v = []
-                for cc in range(3):
-                    jj_v.append(np.ravel_multi_index(
-                        (cc, M_in_bound, nn_v), shape_zeta_in_bound))
-                Dervert[:, jj_v] += der_zeta_panel[vvec[vv], :, :]
+        te_panels = np.arange(N_in)  # (0, nn) panels of the wake
+        kk_v = np.concatenate([4 * te_panels + vv for vv in [0, 3]])
+        jj_v = np.concatenate([M_in_bound * (N_in + 1) + te_panels + dn for dn in [0, 1]])
+
+    # Dervert_pairs[pp, kk, rr, cc]: derivative w.r.t. component cc of the vertex of pair kk
+    Dervert_pairs = np.matmul(Proj[:, None, :, :],
+                              der_zeta_panel.reshape(n_p, 4 * K_in, 3, 3)[:, kk_v, :, :])
+    Scatter = sparse.csr_matrix((np.ones(len(kk_v)), (jj_v, np.arange(len(kk_v)))),
+                                shape=(Kzeta_in_bound, len(kk_v)))
+    Dervert = Scatter.dot(Dervert_pairs.transpose(1, 0, 2, 3).reshape(len(kk_v), -1))
+    Dervert = Dervert.reshape(Kzeta_in_bound, n_p, n_r, 3).transpose(1, 2, 3, 0).reshape(
+        n_p, n_r, 3 * Kzeta_in_bound)
 
     return Dercoll, Dervert
 
@@ -976,132 +982,72 @@ def dfqsdvind_zeta(Surfs, Surfs_star):
 
         Surf_out = Surfs[ss_out]
         M_out, N_out = Surf_out.maps.M, Surf_out.maps.N
-        K_out = Surf_out.maps.K
         Kzeta_out = Surf_out.maps.Kzeta
-        shape_fqs = Surf_out.maps.shape_vert_vect  # (3,M+1,N+1)
         Dercoll = Dercoll_list[ss_out]  # <--link
 
-        ### Loop out (bound) surface panels
-        for pp_out in itertools.product(range(0, M_out), range(0, N_out)):
-            mm_out, nn_out = pp_out
-            # zeta_panel_out=Surf_out.get_panel_vertices_coords(mm_out,nn_out)
-            zeta_panel_out = Surf_out.zeta[:, [mm_out + 0, mm_out + 1, mm_out + 1, mm_out + 0],
-                             [nn_out + 0, nn_out + 0, nn_out + 1, nn_out + 1]].T
+        ### Segments of the out (bound) surface panels, given by the 1D index of
+        # their vertices (jj_a, jj_b) and their circulation
+        mm_out, nn_out = np.meshgrid(range(M_out), range(N_out), indexing='ij')
+        mm_out, nn_out = mm_out.reshape(-1), nn_out.reshape(-1)
+        jj_a = (mm_out[:, None] + np.array(dmver)[avec]) * (N_out + 1) + nn_out[:, None] + np.array(dnver)[avec]
+        jj_b = (mm_out[:, None] + np.array(dmver)[bvec]) * (N_out + 1) + nn_out[:, None] + np.array(dnver)[bvec]
+        gamma_seg = np.repeat(Surf_out.gamma[mm_out, nn_out], len(svec))
 
-            # Loop segments
-            for ll, aa, bb in zip(svec, avec, bvec):
-                zeta_mid = 0.5 * (zeta_panel_out[bb, :] + zeta_panel_out[aa, :])
-                lv = zeta_panel_out[bb, :] - zeta_panel_out[aa, :]
-                Lskew = algebra.skew((-Surf_out.rho * Surf_out.gamma[mm_out, nn_out]) * lv)
-
-                # get vertices m,n indices
-                mm_a, nn_a = mm_out + dmver[aa], nn_out + dnver[aa]
-                mm_b, nn_b = mm_out + dmver[bb], nn_out + dnver[bb]
-                # get vertices 1d index
-                ii_a = [np.ravel_multi_index(
-                    (cc, mm_a, nn_a), shape_fqs) for cc in range(3)]
-                ii_b = [np.ravel_multi_index(
-                    (cc, mm_b, nn_b), shape_fqs) for cc in range(3)]
-                del mm_a, mm_b, nn_a, nn_b
-
-                ### loop input surfaces coordinates
-                for ss_in in range(n_surf):
-                    ### Bound
-                    Surf_in = Surfs[ss_in]
-                    M_in_bound, N_in_bound = Surf_in.maps.M, Surf_in.maps.N
-                    shape_zeta_in_bound = (3, M_in_bound + 1, N_in_bound + 1)
-                    Dervert = Dervert_list[ss_out][ss_in]  # <- link
-                    # deriv wrt induced velocity
-                    dvind_mid, dvind_vert = dvinddzeta_cpp(
-                        zeta_mid, Surf_in, is_bound=True, vortex_radius=Surf_in.vortex_radius)
-                    # allocate coll
-                    Df = np.dot(0.25 * Lskew, dvind_mid)
-                    Dercoll[np.ix_(ii_a, ii_a)] += Df
-                    Dercoll[np.ix_(ii_b, ii_a)] += Df
-                    Dercoll[np.ix_(ii_a, ii_b)] += Df
-                    Dercoll[np.ix_(ii_b, ii_b)] += Df
-                    # allocate vert
-                    Df = np.dot(0.5 * Lskew, dvind_vert)
-                    Dervert[ii_a, :] += Df
-                    Dervert[ii_b, :] += Df
-
-                    ### wake
-                    # deriv wrt induced velocity
-                    dvind_mid, dvind_vert = dvinddzeta_cpp(
-                        zeta_mid, Surfs_star[ss_in],
-                        is_bound=False, vortex_radius=Surf_in.vortex_radius,
-                        M_in_bound=Surf_in.maps.M)
-                    # allocate coll
-                    Df = np.dot(0.25 * Lskew, dvind_mid)
-                    Dercoll[np.ix_(ii_a, ii_a)] += Df
-                    Dercoll[np.ix_(ii_b, ii_a)] += Df
-                    Dercoll[np.ix_(ii_a, ii_b)] += Df
-                    Dercoll[np.ix_(ii_b, ii_b)] += Df
-
-                    Df = np.dot(0.5 * Lskew, dvind_vert)
-                    Dervert[ii_a, :] += Df
-                    Dervert[ii_b, :] += Df
-
-        # Loop output surf. TE
+        ### Segments of the output surf. TE
         # - we use Gammaw_0 over the TE
         # - we run along the positive direction as defined in the first row of
         # wake panels
-        for nn_out in range(N_out):
-
-            # get TE bound vertices m,n indices
-            nn_a = nn_out + 1
-            nn_b = nn_out
-
-            # get segment and mid-point
-            zeta_mid = 0.5 * (Surf_out.zeta[:, M_out, nn_b] + Surf_out.zeta[:, M_out, nn_a])
-            lv = Surf_out.zeta[:, M_out, nn_b] - Surf_out.zeta[:, M_out, nn_a]
-            Lskew = algebra.skew((-Surf_out.rho * Surfs_star[ss_out].gamma[0, nn_out]) * lv)
-
-            # get vertices 1d index on bound
-            ii_a = [np.ravel_multi_index(
-                (cc, M_out, nn_a), shape_fqs) for cc in range(3)]
-            ii_b = [np.ravel_multi_index(
-                (cc, M_out, nn_b), shape_fqs) for cc in range(3)]
+        nn_te = np.arange(N_out)
+        jj_a = np.concatenate((jj_a.reshape(-1), M_out * (N_out + 1) + nn_te + 1))
+        jj_b = np.concatenate((jj_b.reshape(-1), M_out * (N_out + 1) + nn_te))
+        gamma_seg = np.concatenate((gamma_seg, Surfs_star[ss_out].gamma[0, :]))
+        n_seg = len(jj_a)
+
+        # get segments mid-point and 0.5*Lskew
+        zeta_out = Surf_out.zeta.reshape(3, -1)
+        zeta_mid = 0.5 * (zeta_out[:, jj_a] + zeta_out[:, jj_b]).T
+        lv = (zeta_out[:, jj_b] - zeta_out[:, jj_a]).T
+        Lskew_half = 0.5 * dbiot.skew_batch((-Surf_out.rho * gamma_seg)[:, None] * lv)
+
+        # get vertices 1d index, shape (n_seg,3), and allocation matrix of the
+        # segments contribution onto both vertices
+        ii_a = jj_a[:, None] + Kzeta_out * np.arange(3)
+        ii_b = jj_b[:, None] + Kzeta_out * np.arange(3)
+        Alloc = sparse.csr_matrix(
+            (np.ones(6 * n_seg), (np.concatenate((ii_a.reshape(-1), ii_b.reshape(-1))),
+                                  np.tile(np.arange(3 * n_seg), 2))),
+            shape=(3 * Kzeta_out, 3 * n_seg))
+
+        ### loop input surfaces coordinates
+        Df_coll = np.zeros((n_seg, 3, 3))
+        for ss_in in range(n_surf):
+            Surf_in = Surfs[ss_in]
+            Surf_star_in = Surfs_star[ss_in]
+            Kzeta_in = Surf_in.maps.Kzeta
+            Dervert = Dervert_list[ss_out][ss_in]  # <- link
 
-            ### loop input surfaces coordinates
-            for ss_in in range(n_surf):
+            for chunk in target_chunks(n_seg, max(Surf_in.maps.K, Surf_star_in.maps.K)):
                 ### Bound
-                Surf_in = Surfs[ss_in]
-                M_in_bound, N_in_bound = Surf_in.maps.M, Surf_in.maps.N
-                shape_zeta_in_bound = (3, M_in_bound + 1, N_in_bound + 1)
-                Dervert = Dervert_list[ss_out][ss_in]  # <- link
                 # deriv wrt induced velocity
-                dvind_mid, dvind_vert = dvinddzeta_cpp(zeta_mid, Surf_in,
-                                                       is_bound=True,
-                                                       vortex_radius=Surf_in.vortex_radius)
-                # allocate coll
-                Df = np.dot(0.25 * Lskew, dvind_mid)
-                Dercoll[np.ix_(ii_a, ii_a)] += Df
-                Dercoll[np.ix_(ii_b, ii_a)] += Df
-                Dercoll[np.ix_(ii_a, ii_b)] += Df
-                Dercoll[np.ix_(ii_b, ii_b)] += Df
-                # allocate vert
-                Df = np.dot(0.5 * Lskew, dvind_vert)
-                Dervert[ii_a, :] += Df
-                Dervert[ii_b, :] += Df
+                dvind_mid, dvind_vert = dvinddzeta_batch(
+                    zeta_mid[chunk], Surf_in, IsBound=True, Proj=Lskew_half[chunk])
+                Df_coll[chunk] += 0.5 * dvind_mid
+                Df_vert = dvind_vert
 
                 ### wake
                 # deriv wrt induced velocity
-                dvind_mid, dvind_vert = dvinddzeta_cpp(
-                    zeta_mid, Surfs_star[ss_in],
-                    is_bound=False, vortex_radius=Surf_in.vortex_radius,
-                    M_in_bound=Surf_in.maps.M)
-                # allocate coll
-                Df = np.dot(0.25 * Lskew, dvind_mid)
-                Dercoll[np.ix_(ii_a, ii_a)] += Df
-                Dercoll[np.ix_(ii_b, ii_a)] += Df
-                Dercoll[np.ix_(ii_a, ii_b)] += Df
-                Dercoll[np.ix_(ii_b, ii_b)] += Df
+                dvind_mid, dvind_vert = dvinddzeta_batch(
+                    zeta_mid[chunk], Surf_star_in, IsBound=False,
+                    M_in_bound=Surf_in.maps.M, Proj=Lskew_half[chunk])
+                Df_coll[chunk] += 0.5 * dvind_mid
+                Df_vert += dvind_vert
 
                 # allocate vert
-                Df = np.dot(0.5 * Lskew, dvind_vert)
-                Dervert[ii_a, :] += Df
-                Dervert[ii_b, :] += Df
+                Dervert += Alloc[:, 3 * chunk.start:3 * chunk.stop].dot(Df_vert.reshape(-1, 3 * Kzeta_in))
+
+        # allocate coll
+        for ii_row, ii_col in itertools.product((ii_a, ii_b), repeat=2):
+            np.add.at(Dercoll, (ii_row[:, :, None], ii_col[:, None, :]), Df_coll)
 
     return Dercoll_list, Dervert_list
 
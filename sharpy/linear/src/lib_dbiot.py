@@ -12,6 +12,9 @@ Methods:
 - eval_seg_comp and eval_seg_comp_loop: profide ders in format
     [Q_{x,y,z},ZetaPoint_{x,y,z}]
   and use compact analytical formula.
+
+- eval_seg_batch and eval_panel_batch: array versions of the compact formula,
+  evaluating many (target point, segment/panel) pairs at once.
 """
 
 import numpy as np
@@ -486,6 +489,130 @@ def eval_panel_fast_coll(zetaP, ZetaPanel, vortex_radius, gamma_pan=1.0):
     return DerP
 
 
+
+# ------------------------------------------------------------------------------
+#	Batched evaluation
+# ------------------------------------------------------------------------------
+
+
+def skew_batch(rv):
+    """
+    Skew-symmetric matrices of an array of vectors of shape (...,3), such that
+    skew_batch(rv)[...,:,:] = algebra.skew(rv[...,:])
+    """
+
+    Skew = np.zeros(rv.shape + (3,))
+    Skew[..., 0, 1] = -rv[..., 2]
+    Skew[..., 0, 2] = rv[..., 1]
+    Skew[..., 1, 0] = rv[..., 2]
+    Skew[..., 1, 2] = -rv[..., 0]
+    Skew[..., 2, 0] = -rv[..., 1]
+    Skew[..., 2, 1] = rv[..., 0]
+    return Skew
+
+
+def eval_seg_batch(ZetaP, ZetaA, ZetaB, vortex_radius, gamma_seg=1.0):
+    """
+    Array version of eval_seg_comp. The inputs ZetaP, ZetaA and ZetaB have shape
+    (...,3) (or are broadcastable to a common shape) and gamma_seg is a scalar
+    or an array of shape (...). Returns the derivatives DerP, DerA, DerB of
+    shape (...,3,3) in format:
+        [ ..., (x,y,z) of Q, (x,y,z) of Zeta ]
+    """
+
+    vortex_radius_sq = vortex_radius*vortex_radius
+
+    RA = ZetaP - ZetaA
+    RB = ZetaP - ZetaB
+    RAB = ZetaB - ZetaA
+    RA, RB, RAB = np.broadcast_arrays(RA, RB, RAB)
+    Cfact = cfact_biot * np.broadcast_to(gamma_seg, RA.shape[:-1])
+
+    Vcr = np.cross(RA, RB)
+    vcr2 = np.sum(Vcr * Vcr, axis=-1)
+
+    # numerical radius: the derivatives of inactive segments are set to zero
+    active = vcr2 >= vortex_radius_sq * np.sum(RAB * RAB, axis=-1)
+    Cfact = np.where(active, Cfact, 0.)
+    vcr2 = np.where(active, vcr2, 1.)
+
+    ra1 = np.linalg.norm(RA, axis=-1)
+    rb1 = np.linalg.norm(RB, axis=-1)
+    rainv = 1. / np.where(active, ra1, 1.)
+    rbinv = 1. / np.where(active, rb1, 1.)
+    Tv = RA * rainv[..., None] - RB * rbinv[..., None]
+    dotprod = np.sum(RAB * Tv, axis=-1)
+
+    ### cross-product derivatives
+    # Dvcross = off_fact*Vcr*Vcr^T + diag_fact*I
+    vcr2inv = 1. / vcr2
+    diag_fact = Cfact * vcr2inv * dotprod
+    off_fact = -2. * Cfact * vcr2inv * vcr2inv * dotprod
+    Voff = Vcr * off_fact[..., None]
+
+    ### difference terms derivatives
+    # Ddiff = Vsc*RAB^T
+    Vsc = Vcr * (vcr2inv * Cfact)[..., None]
+    dQ_dRAB = Vsc[..., :, None] * Tv[..., None, :]
+
+    ### unit vector derivatives, premultiplied by RAB^T
+    RABrunitA = RAB * rainv[..., None] - RA * (np.sum(RAB * RA, axis=-1) * rainv ** 3)[..., None]
+    RABrunitB = RAB * rbinv[..., None] - RB * (np.sum(RAB * RB, axis=-1) * rbinv ** 3)[..., None]
+
+    ### final assembly
+    # the products Dvcross*skew(w) and Ddiff*Der_runit reduce to outer products:
+    # Dvcross*skew(w) = diag_fact*skew(w) + Voff*(Vcr x w)^T
+    dQ_dRA = diag_fact[..., None, None] * skew_batch(-RB) + \
+             Voff[..., :, None] * np.cross(Vcr, -RB)[..., None, :] + \
+             Vsc[..., :, None] * RABrunitA[..., None, :]
+    dQ_dRB = diag_fact[..., None, None] * skew_batch(RA) + \
+             Voff[..., :, None] * np.cross(Vcr, RA)[..., None, :] - \
+             Vsc[..., :, None] * RABrunitB[..., None, :]
+
+    DerP = dQ_dRA + dQ_dRB  # w.r.t. P
+    DerA = -dQ_dRAB - dQ_dRA  # w.r.t. A
+    DerB = dQ_dRAB - dQ_dRB  # w.r.t. B
+
+    return DerP, DerA, DerB
+
+
+def eval_panel_batch(ZetaP, ZetaPanel, vortex_radius, gamma_pan=1.0):
+    """
+    Array version of eval_panel_fast for n_p target points and n_pan panels:
+        - ZetaP.shape=(n_p,3)
+        - ZetaPanel.shape=(n_pan,4,3)
+        - gamma_pan: scalar or array of shape (n_pan,)
+
+    Returns:
+        - DerP: derivative of induced velocity w.r.t. ZetaP, with:
+            DerP.shape=(n_p,n_pan,3,3) : DerP[ :, :, Uind_{x,y,z}, ZetaC_{x,y,z} ]
+        - DerVertices: derivative of induced velocity wrt panel vertices, with:
+            DerVertices.shape=(n_p,n_pan,4,3,3) :
+            DerVertices[ :, :, vertex number {0,1,2,3},  Uind_{x,y,z}, ZetaC_{x,y,z} ]
+
+    Memory scales as 36*n_p*n_pan, hence large problems should be evaluated
+    in chunks of target points.
+    """
+
+    ZetaP = np.atleast_2d(ZetaP)
+    n_p, n_pan = ZetaP.shape[0], ZetaPanel.shape[0]
+    gamma_pan = np.broadcast_to(gamma_pan, (n_pan,))[None, :]
+
+    DerP = np.zeros((n_p, n_pan, 3, 3))
+    DerVertices = np.zeros((n_p, n_pan, 4, 3, 3))
+
+    for aa, bb in LoopPanel:
+        DerP_seg, DerA, DerB = eval_seg_batch(ZetaP[:, None, :],
+                                              ZetaPanel[None, :, aa, :],
+                                              ZetaPanel[None, :, bb, :],
+                                              vortex_radius, gamma_pan)
+        DerP += DerP_seg
+        DerVertices[:, :, aa, :, :] += DerA
+        DerVertices[:, :, bb, :, :] += DerB
+
+    return DerP, DerVertices
+
+
 if __name__ == '__main__':
 
     import cProfile
@@ -0,0 +1,427 @@
+"""
+Hierarchical, low-rank representation of the steady AIC matrix
+
+The aerodynamic influence coefficient (AIC) matrix of the linear UVLM is dense and its direct solution scales as
+:math:`\\mathcal{O}(K^3)` in time and :math:`\\mathcal{O}(K^2)` in memory, where :math:`K` is the number of bound
+panels. The influence between groups of panels that are far apart, however, is smooth and can be approximated by
+low-rank matrices. This module collects:
+
+* :class:`FoldedAIC`: evaluation of arbitrary sub-blocks of the AIC matrix, with the wake contribution folded onto the
+  trailing edge panels as in :meth:`sharpy.linear.src.linuvlm.Static.assemble`, without forming the full matrix.
+
+* :func:`aca`: adaptive cross approximation of a matrix block from a few of its rows and columns.
+
+* :class:`HierarchicalAIC`: H-matrix representation of the AIC matrix, in which admissible (far-field) blocks are
+  stored in low-rank form. It behaves as a ``scipy.sparse.linalg.LinearOperator`` and is solved with a block-Jacobi
+  preconditioned GMRES.
+
+References:
+
+    Bebendorf, M.. Approximation of boundary element matrices. Numerische Mathematik, 86(4), 565-589. 2000.
+    https://doi.org/10.1007/PL00005410
+
+"""
+
+import numpy as np
+import scipy.linalg as scalg
+import scipy.sparse.linalg as spalg
+
+import sharpy.utils.exceptions as exceptions
+from sharpy.utils.constants import cfact_biot
+
+# vertices of panel (m,n), as in surface.AeroGridGeo.get_panel_vertices_coords
+dmver = np.array([0, 1, 1, 0])
+dnver = np.array([0, 0, 1, 1])
+LoopPanel = [(0, 1), (1, 2), (2, 3), (3, 0)]
+
+
+def panel_vertices(zeta):
+    """
+    Coordinates of the vertices of all panels of a lattice.
+
+    Args:
+        zeta (np.ndarray): Lattice vertices ``(3, M + 1, N + 1)``
+
+    Returns:
+        np.ndarray: Panel vertices ``(M * N, 4, 3)`` with panels ordered as ``gamma.reshape(-1, order='C')``
+    """
+    M, N = zeta.shape[1] - 1, zeta.shape[2] - 1
+    mm, nn = np.meshgrid(np.arange(M), np.arange(N), indexing='ij')
+    mm, nn = mm.reshape(-1), nn.reshape(-1)
+    return zeta[:, mm[:, None] + dmver, nn[:, None] + dnver].transpose(1, 2, 0)
+
+
+def biot_panels(zeta_target, zeta_panels, vortex_radius):
+    """
+    Velocity induced by vortex ring panels of unit circulation over a set of target points.
+
+    This is the array equivalent of :func:`sharpy.linear.src.uvlmutils.biot_panel` for all (target, panel) pairs.
+
+    Args:
+        zeta_target (np.ndarray): Target points ``(n_target, 3)``
+        zeta_panels (np.ndarray): Panel vertices ``(n_panel, 4, 3)``
+        vortex_radius (float): Distance below which inductions are not computed
+
+    Returns:
+        np.ndarray: Induced velocities ``(n_target, n_panel, 3)``
+    """
+    vortex_radius_sq = vortex_radius * vortex_radius
+    R = zeta_target[:, None, None, :] - zeta_panels[None, :, :, :]
+    R_norm = np.linalg.norm(R, axis=-1)
+    R_norm[R_norm == 0.] = np.inf
+
+    uind = np.zeros((zeta_target.shape[0], zeta_panels.shape[0], 3))
+    for aa, bb in LoopPanel:
+        rab = zeta_panels[:, bb, :] - zeta_panels[:, aa, :]
+        vcross = np.cross(R[:, :, aa, :], R[:, :, bb, :])
+        vcross_sq = np.sum(vcross * vcross, axis=-1)
+
+        # numerical radius
+        active = vcross_sq >= vortex_radius_sq * np.sum(rab * rab, axis=-1)
+        vcross_sq[~active] = 1.
+
+        fact = (cfact_biot / vcross_sq) * \
+               (np.einsum('pi,tpi->tp', rab, R[:, :, aa, :]) / R_norm[:, :, aa] -
+                np.einsum('pi,tpi->tp', rab, R[:, :, bb, :]) / R_norm[:, :, bb])
+        fact[~active] = 0.
+        uind += fact[:, :, None] * vcross
+
+    return uind
+
+
+class FoldedAIC():
+    r"""
+    Sub-blocks of the AIC matrix relating the bound circulation to the normal induced velocity at the collocation
+    points.
+
+    The wake circulation is the steady one, i.e. equal to that of the trailing edge panel of the same span-wise
+    strip, such that the influence of each wake strip is added to the column of the associated trailing edge panel.
+    The resulting matrix is the ``Static.AIC`` matrix of :class:`sharpy.linear.src.linuvlm.Static`.
+
+    Args:
+        zeta (list(np.ndarray)): Bound lattices ``[n_surf][3, M + 1, N + 1]``
+        zeta_star (list(np.ndarray)): Wake lattices ``[n_surf][3, M_star + 1, N + 1]``
+        vortex_radius (float): Distance below which inductions are not computed
+
+    Attributes:
+        K (int): Number of bound panels
+        zetac (np.ndarray): Collocation points ``(K, 3)``
+        normals (np.ndarray): Panel normals at the collocation points ``(K, 3)``
+        panels (np.ndarray): Bound panel vertices ``(K, 4, 3)``
+        wake_panels (np.ndarray): Wake panel vertices ``(K_star, 4, 3)``
+        wake_owner (np.ndarray): Index of the trailing edge panel each wake panel is folded onto ``(K_star,)``
+        col_bbox (np.ndarray): Bounding box ``(K, 2, 3)`` of each column, including its wake strip
+    """
+
+    def __init__(self, zeta, zeta_star, vortex_radius):
+
+        self.vortex_radius = vortex_radius
+
+        panels = []
+        wake_panels = []
+        wake_owner = []
+        K0 = 0
+        for ss in range(len(zeta)):
+            M, N = zeta[ss].shape[1] - 1, zeta[ss].shape[2] - 1
+            M_star = zeta_star[ss].shape[1] - 1
+            panels.append(panel_vertices(zeta[ss]))
+            wake_panels.append(panel_vertices(zeta_star[ss]))
+            # wake panel (m, n) is folded onto the trailing edge panel (M - 1, n)
+            wake_owner.append(np.tile(K0 + (M - 1) * N + np.arange(N), M_star))
+            K0 += M * N
+
+        self.panels = np.concatenate(panels)
+        self.wake_panels = np.concatenate(wake_panels)
+        self.wake_owner = np.concatenate(wake_owner)
+        self.K = self.panels.shape[0]
+
+        self.zetac = np.mean(self.panels, axis=1)
+        normals = np.cross(self.panels[:, 2, :] - self.panels[:, 0, :], self.panels[:, 3, :] - self.panels[:, 1, :])
+        self.normals = normals / np.linalg.norm(normals, axis=1)[:, None]
+
+        self.col_bbox = np.stack((np.min(self.panels, axis=1), np.max(self.panels, axis=1)), axis=1)
+        np.minimum.at(self.col_bbox[:, 0, :], self.wake_owner, np.min(self.wake_panels, axis=1))
+        np.maximum.at(self.col_bbox[:, 1, :], self.wake_owner, np.max(self.wake_panels, axis=1))
+
+    @property
+    def shape(self):
+        return self.K, self.K
+
+    def get_block(self, rows, cols):
+        """
+        Evaluates the block ``AIC[np.ix_(rows, cols)]``.
+
+        Args:
+            rows (np.ndarray): Row (collocation point) indices
+            cols (np.ndarray): Column (bound panel) indices
+
+        Returns:
+            np.ndarray: AIC block ``(len(rows), len(cols))``
+        """
+        rows = np.atleast_1d(rows)
+        cols = np.atleast_1d(cols)
+        zetac = self.zetac[rows]
+        normals = self.normals[rows]
+
+        block = np.einsum('ti,tpi->tp', normals, biot_panels(zetac, self.panels[cols], self.vortex_radius))
+
+        # folded wake
+        col_position = -np.ones(self.K, dtype=int)
+        col_position[cols] = np.arange(len(cols))
+        wake_position = col_position[self.wake_owner]
+        in_block = wake_position >= 0
+        if np.any(in_block):
+            wake_block = np.einsum('ti,tpi->tp', normals,
+                                   biot_panels(zetac, self.wake_panels[in_block], self.vortex_radius))
+            np.add.at(block, (slice(None), wake_position[in_block]), wake_block)
+
+        return block
+
+    def todense(self):
+        return self.get_block(np.arange(self.K), np.arange(self.K))
+
+
+def aca(get_row, get_col, n_rows, n_cols, tol=1e-6, max_rank=None):
+    r"""
+    Adaptive cross approximation with partial pivoting.
+
+    Builds the low-rank approximation :math:`\mathbf{A}\approx\mathbf{UV}` of a matrix of which only some rows and
+    columns are evaluated. The iteration stops when the Frobenius norm of the last update is below ``tol`` times that
+    of the approximation.
+
+    Args:
+        get_row (callable): ``get_row(i)`` returns row ``i`` of the matrix
+        get_col (callable): ``get_col(j)`` returns column ``j`` of the matrix
+        n_rows (int): Number of rows
+        n_cols (int): Number of columns
+        tol (float): Relative tolerance
+        max_rank (int): Maximum rank of the approximation. Defaults to ``min(n_rows, n_cols)``.
+
+    Returns:
+        tuple: ``(U, V)`` of shapes ``(n_rows, rank)`` and ``(rank, n_cols)``. ``U`` is ``None`` if the
+        approximation does not converge within ``max_rank`` terms.
+    """
+    if max_rank is None:
+        max_rank = min(n_rows, n_cols)
+
+    U = np.zeros((n_rows, max_rank))
+    V = np.zeros((max_rank, n_cols))
+    free_rows = np.ones(n_rows, dtype=bool)
+    norm_sq = 0.
+
+    i_row = 0
+    rank = 0
+    while rank < max_rank:
+        free_rows[i_row] = False
+        row = get_row(i_row) - U[i_row, :rank].dot(V[:rank, :])
+        j_col = np.argmax(np.abs(row))
+        if row[j_col] == 0.:
+            # row is already represented, try another one
+            if not np.any(free_rows):
+                break
+            i_row = np.argmax(free_rows)
+            continue
+
+        V[rank, :] = row / row[j_col]
+        U[:, rank] = get_col(j_col) - U[:, :rank].dot(V[:rank, j_col])
+
+        u_norm = np.linalg.norm(U[:, rank])
+        v_norm = np.linalg.norm(V[rank, :])
+        norm_sq += 2. * np.sum(U[:, :rank].T.dot(U[:, rank]) * V[:rank, :].dot(V[rank, :])) + \
+                   (u_norm * v_norm) ** 2
+        rank += 1
+
+        if u_norm * v_norm <= tol * np.sqrt(norm_sq):
+            return U[:, :rank], V[:rank, :]
+
+        candidates = np.abs(U[:, rank - 1])
+        candidates[~free_rows] = -1.
+        if not np.any(free_rows):
+            break
+        i_row = np.argmax(candidates)
+
+    if rank < min(n_rows, n_cols):
+        return None, None
+    return U[:, :rank], V[:rank, :]
+
+
+class ClusterNode():
+    """
+    Node of the cluster tree, built by recursive bisection of the collocation points along the direction of largest
+    extent.
+
+    Attributes:
+        indices (np.ndarray): Panel indices in the cluster
+        row_bbox (np.ndarray): Bounding box ``(2, 3)`` of the collocation points
+        col_bbox (np.ndarray): Bounding box ``(2, 3)`` of the panels, including their wake strips
+        children (list(ClusterNode)): Sub-clusters. Empty for leaves.
+    """
+
+    def __init__(self, indices, points, col_bbox, leaf_size):
+        self.indices = indices
+        self.row_bbox = np.stack((np.min(points[indices], axis=0), np.max(points[indices], axis=0)))
+        self.col_bbox = np.stack((np.min(col_bbox[indices, 0, :], axis=0), np.max(col_bbox[indices, 1, :], axis=0)))
+        self.children = []
+
+        if len(indices) > leaf_size:
+            direction = np.argmax(self.row_bbox[1] - self.row_bbox[0])
+            order = np.argsort(points[indices, direction], kind='stable')
+            half = len(indices) // 2
+            self.children = [ClusterNode(indices[order[:half]], points, col_bbox, leaf_size),
+                             ClusterNode(indices[order[half:]], points, col_bbox, leaf_size)]
+
+    @property
+    def is_leaf(self):
+        return len(self.children) == 0
+
+
+def bbox_diameter(bbox):
+    return np.linalg.norm(bbox[1] - bbox[0])
+
+
+def bbox_distance(bbox_a, bbox_b):
+    gap = np.maximum(0., np.maximum(bbox_a[0] - bbox_b[1], bbox_b[0] - bbox_a[1]))
+    return np.linalg.norm(gap)
+
+
+class HierarchicalAIC(spalg.LinearOperator):
+    r"""
+    H-matrix representation of the steady AIC matrix.
+
+    The row and column clusters ``t`` and ``s`` form an admissible (far-field) block if
+
+    .. math:: \min(\mathrm{diam}(t), \mathrm{diam}(s)) \leq \eta\, \mathrm{dist}(t, s)
+
+    in which case the block is approximated with :func:`aca`. Other blocks are subdivided until either cluster is a
+    leaf and are then stored as dense arrays. The wake strips are included in the geometry of the column clusters.
+
+    Args:
+        kernel (FoldedAIC): Generator of the AIC entries
+        tol (float): Relative tolerance of the low-rank approximations and of the iterative solution
+        leaf_size (int): Maximum number of panels in the leaves of the cluster tree
+        eta (float): Admissibility parameter :math:`\eta`
+
+    Attributes:
+        dense_blocks (list(tuple)): ``(rows, cols, block)`` near-field blocks
+        lowrank_blocks (list(tuple)): ``(rows, cols, U, V)`` far-field blocks
+        n_iter (int): Number of GMRES iterations of the last solution
+    """
+
+    def __init__(self, kernel, tol=1e-6, leaf_size=32, eta=1.0):
+        super().__init__(dtype=np.float64, shape=kernel.shape)
+        self.kernel = kernel
+        self.tol = tol
+        self.eta = eta
+
+        self.dense_blocks = []
+        self.lowrank_blocks = []
+        self.tree = ClusterNode(np.arange(kernel.K), kernel.zetac, kernel.col_bbox, leaf_size)
+        self._build(self.tree, self.tree)
+
+        self._precond = None
+        self.n_iter = 0
+
+    def _build(self, t, s):
+        if min(bbox_diameter(t.row_bbox), bbox_diameter(s.col_bbox)) <= \
+                self.eta * bbox_distance(t.row_bbox, s.col_bbox):
+            max_rank = len(t.indices) * len(s.indices) // (len(t.indices) + len(s.indices))
+            if max_rank > 0:
+                U, V = aca(lambda ii: self.kernel.get_block(t.indices[ii], s.indices)[0],
+                           lambda jj: self.kernel.get_block(t.indices, s.indices[jj])[:, 0],
+                           len(t.indices), len(s.indices), tol=self.tol, max_rank=max_rank)
+                if U is not None:
+                    self.lowrank_blocks.append((t.indices, s.indices, U, V))
+                    return
+
+        if t.is_leaf or s.is_leaf:
+            self.dense_blocks.append((t.indices, s.indices, self.kernel.get_block(t.indices, s.indices)))
+        else:
+            for t_child in t.children:
+                for s_child in s.children:
+                    self._build(t_child, s_child)
+
+    @property
+    def nnz(self):
+        """Number of stored entries"""
+        return sum(block.size for _, _, block in self.dense_blocks) + \
+            sum(U.size + V.size for _, _, U, V in self.lowrank_blocks)
+
+    @property
+    def compression(self):
+        """Ratio of stored entries to those of the dense matrix"""
+        return self.nnz / (self.shape[0] * self.shape[1])
+
+    def _matvec(self, x):
+        x = np.asarray(x).reshape(-1)
+        y = np.zeros(self.shape[0], dtype=np.result_type(x, np.float64))
+        for rows, cols, block in self.dense_blocks:
+            y[rows] += block.dot(x[cols])
+        for rows, cols, U, V in self.lowrank_blocks:
+            y[rows] += U.dot(V.dot(x[cols]))
+        return y
+
+    def _rmatvec(self, x):
+        x = np.asarray(x).reshape(-1)
+        y = np.zeros(self.shape[1], dtype=np.result_type(x, np.float64))
+        for rows, cols, block in self.dense_blocks:
+            y[cols] += block.T.dot(x[rows])
+        for rows, cols, U, V in self.lowrank_blocks:
+            y[cols] += V.T.dot(U.T.dot(x[rows]))
+        return y
+
+    def todense(self):
+        return self.matmat(np.eye(self.shape[1]))
+
+    def preconditioner(self):
+        """
+        Block-Jacobi preconditioner built from the LU factors of the dense diagonal blocks of the leaves.
+
+        Returns:
+            scipy.sparse.linalg.LinearOperator: Approximate inverse of the AIC matrix
+        """
+        if self._precond is None:
+            factors = [(rows, scalg.lu_factor(block)) for rows, cols, block in self.dense_blocks
+                       if rows is cols]
+
+            def apply(x):
+                x = np.asarray(x).reshape(-1)
+                y = x.copy()
+                for rows, lu in factors:
+                    y[rows] = scalg.lu_solve(lu, x[rows])
+                return y
+
+            self._precond = spalg.LinearOperator(self.shape, matvec=apply, dtype=np.float64)
+        return self._precond
+
+    def solve(self, b, x0=None, maxiter=None):
+        """
+        Solves ``AIC x = b`` with GMRES, preconditioned with :meth:`preconditioner`.
+
+        Args:
+            b (np.ndarray): Right hand side
+            x0 (np.ndarray): Initial guess
+            maxiter (int): Maximum number of restarts
+
+        Returns:
+            np.ndarray: Solution
+
+        Raises:
+            sharpy.utils.exceptions.NotConvergedSolver: if GMRES does not converge
+        """
+        self.n_iter = 0
+
+        def count(_):
+            self.n_iter += 1
+
+        kwargs = dict(x0=x0, M=self.preconditioner(), atol=0., restart=min(100, self.shape[0]),
+                      maxiter=maxiter, callback=count, callback_type='pr_norm')
+        try:
+            x, info = spalg.gmres(self, b, rtol=self.tol, **kwargs)
+        except TypeError:
+            # scipy < 1.12
+            x, info = spalg.gmres(self, b, tol=self.tol, **kwargs)
+
+        if info != 0:
+            raise exceptions.NotConvergedSolver('GMRES solution of the hierarchical AIC system did not converge '
+                                                '(info = %g)' % info)
+        return x
@@ -16,7 +16,7 @@ Classes:
 	the system matrices are overwritten
 
 Methods for state-space manipulation:
-- couple: feedback coupling. Does not support sparsity
+- couple: feedback coupling. Supports sparsity
 - freqresp: calculate frequency response. Supports sparsity.
 - series: series connection between systems
 - parallel: parallel connection between systems
@@ -40,16 +40,15 @@ Filtering:
 
 Utilities:
 - get_freq_from_eigs: clculate frequency corresponding to eigenvalues
+- block_matrix: assemble dense or sparse block matrices
+- scale_rows_cols: scale rows and columns of dense or sparse matrices
 
 Comments:
 - the module supports sparse matrices hence relies on libsparse.
 
 to do:
 	- remove unnecessary coupling routines
-	- couple function can handle sparse matrices but only outputs dense matrices
-		- verify if typical coupled systems are sparse
-		- update routine
-		- add method to automatically determine whether to use sparse or dense?
+	- add method to automatically determine whether to use sparse or dense?
 """
 
 import copy
@@ -58,6 +57,7 @@ import numpy as np
 import scipy.signal as scsig
 import scipy.linalg as scalg
 import scipy.interpolate as scint
+import scipy.sparse as sparse
 
 # dependency
 import sharpy.linear.src.libsparse as libsp
@@ -521,13 +521,20 @@ def project(ss_here,WT,V):
 
     return ss(Ap,Bp,Cp,ss_here.D,ss_here.dt)
 
-def couple(ss01, ss02, K12, K21, out_sparse=False):
+def couple(ss01, ss02, K12, K21, out_sparse=False, cache=None):
     """
     Couples 2 dlti systems ss01 and ss02 through the gains K12 and K21, where
     K12 transforms the output of ss02 into an input of ss01.
 
     Other inputs:
-    - out_sparse: if True, the output system is stored as sparse (not recommended)
+    - out_sparse: if True, the output system is stored as sparse. The coupling
+    terms are in general dense, hence this is only recommended for weakly coupled
+    systems.
+    - cache: optional dictionary. The products that only depend on ss01 and on
+    the coupling gains are stored in it at the first call and re-used in the
+    following ones. Use it when the same ss01, K12 and K21 are coupled with
+    different ss02 (e.g. a structural model at different reference velocities).
+    The cache must be discarded if ss01 or the gains are modified.
     """
 
     assert np.abs(ss01.dt - ss02.dt) < 1e-10 * ss01.dt, 'Time-steps not matching!'
@@ -539,23 +546,21 @@ def couple(ss01, ss02, K12, K21, out_sparse=False):
     A1, B1, C1, D1 = ss01.get_mats()
     A2, B2, C2, D2 = ss02.get_mats()
 
-    # extract size
-    Nx1, Nu1 = B1.shape
-    Ny1 = C1.shape[0]
-    Nx2, Nu2 = B2.shape
-    Ny2 = C2.shape[0]
-
-    #  terms to invert
-    maxD1 = np.max(np.abs(D1))
-    maxD2 = np.max(np.abs(D2))
-    if maxD1 < 1e-32:
-        pass
-    if maxD2 < 1e-32:
-        pass
+    # products independent of ss02
+    if cache is None:
+        cache = dict()
+    if not cache:
+        cache['K21C1'] = libsp.dot(K21, C1)
+        cache['K21D1'] = libsp.dot(K21, D1)
+        cache['D1K12'] = libsp.dot(D1, K12)
+        cache['K22'] = libsp.dot(K21, cache['D1K12'])
+    K21C1 = cache['K21C1']
+    K21D1 = cache['K21D1']
+    D1K12 = cache['D1K12']
+    K22 = cache['K22']
 
     # compute self-influence gains
     K11 = libsp.dot(K12, libsp.dot(D2, K21))
-    K22 = libsp.dot(K21, libsp.dot(D1, K12))
 
     # left hand side terms
     L1 = libsp.dot(-K11, D1)
@@ -567,32 +572,33 @@ def couple(ss01, ss02, K12, K21, out_sparse=False):
     cpl_12 = libsp.solve(L1, K12)
     cpl_21 = libsp.solve(L2, K21)
 
-    cpl_11 = libsp.dot(cpl_12, libsp.dot(D2, K21))
-    cpl_22 = libsp.dot(cpl_21, libsp.dot(D1, K12))
+    # coupling terms pre-multiplied by the input/feedthrough matrices
+    B1cpl_12 = libsp.dot(B1, cpl_12)
+    D1cpl_12 = libsp.dot(D1, cpl_12)
+    B2cpl_21 = libsp.dot(B2, cpl_21)
+    D2cpl_21 = libsp.dot(D2, cpl_21)
+
+    # self-influence terms, cpl_11 = cpl_12 D2 K21 and cpl_22 = cpl_21 D1 K12, with K21 and K12 left out
+    B1cpl_12D2 = libsp.dot(B1cpl_12, D2)
+    D1cpl_12D2 = libsp.dot(D1cpl_12, D2)
+    B2cpl_21D1K12 = libsp.dot(B2cpl_21, D1K12)
+    D2cpl_21D1K12 = libsp.dot(D2cpl_21, D1K12)
 
     # Build coupled system
+    A = [[A1 + libsp.dot(B1cpl_12D2, K21C1), libsp.dot(B1cpl_12, C2)],
+         [libsp.dot(B2cpl_21, C1), A2 + libsp.dot(B2cpl_21D1K12, C2)]]
+    C = [[C1 + libsp.dot(D1cpl_12D2, K21C1), libsp.dot(D1cpl_12, C2)],
+         [libsp.dot(D2cpl_21, C1), C2 + libsp.dot(D2cpl_21D1K12, C2)]]
+    B = [[B1 + libsp.dot(B1cpl_12D2, K21D1), B1cpl_12D2],
+         [libsp.dot(B2cpl_21, D1), B2 + libsp.dot(B2cpl_21D1K12, D2)]]
+    D = [[D1 + libsp.dot(D1cpl_12D2, K21D1), D1cpl_12D2],
+         [libsp.dot(D2cpl_21, D1), D2 + libsp.dot(D2cpl_21D1K12, D2)]]
+
     if out_sparse:
-        raise NameError('out_sparse=True not supported yet (verify if worth it first).')
+        convert = libsp.csc_matrix
     else:
-        A = np.block([
-            [libsp.dense(A1 + libsp.dot(libsp.dot(B1, cpl_11), C1)), libsp.dense(libsp.dot(libsp.dot(B1, cpl_12), C2))],
-            [libsp.dense(libsp.dot(libsp.dot(B2, cpl_21), C1)),
-             libsp.dense(A2 + libsp.dot(libsp.dot(B2, cpl_22), C2))]])
-
-        C = np.block([
-            [libsp.dense(C1 + libsp.dot(libsp.dot(D1, cpl_11), C1)), libsp.dense(libsp.dot(libsp.dot(D1, cpl_12), C2))],
-            [libsp.dense(libsp.dot(libsp.dot(D2, cpl_21), C1)),
-             libsp.dense(C2 + libsp.dot(libsp.dot(D2, cpl_22), C2))]])
-
-        B = np.block([
-            [libsp.dense(B1 + libsp.dot(libsp.dot(B1, cpl_11), D1)), libsp.dense(libsp.dot(libsp.dot(B1, cpl_12), D2))],
-            [libsp.dense(libsp.dot(libsp.dot(B2, cpl_21), D1)),
-             libsp.dense(B2 + libsp.dot(libsp.dot(B2, cpl_22), D2))]])
-
-        D = np.block([
-            [libsp.dense(D1 + libsp.dot(libsp.dot(D1, cpl_11), D1)), libsp.dense(libsp.dot(libsp.dot(D1, cpl_12), D2))],
-            [libsp.dense(libsp.dot(libsp.dot(D2, cpl_21), D1)),
-             libsp.dense(D2 + libsp.dot(libsp.dot(D2, cpl_22), D2))]])
+        convert = libsp.dense
+    A, B, C, D = [block_matrix([[convert(block) for block in row] for row in M]) for M in (A, B, C, D)]
 
     return ss(A, B, C, D, dt=ss01.dt)
 
@@ -858,8 +864,8 @@ def freqresp(SS, wv, dlti=True):
 def series(SS01, SS02):
     r"""
     Connects two state-space blocks in series. If these are instances of DLTI
-    state-space systems, they need to have the same type and time-step. If the input systems are sparse, they are
-    converted to dense.
+    state-space systems, they need to have the same type and time-step. If any of the input matrices is sparse, the
+    connected system is built in sparse format.
 
     The connection is such that:
 
@@ -872,7 +878,7 @@ def series(SS01, SS02):
         SS02 (libss.ss): State Space 2 instance. Can be DLTI/CLTI, dense or sparse.
 
     Returns
-        libss.ss: Combined state space system in series in dense format.
+        libss.ss: Combined state space system in series.
     """
 
     if type(SS01) is not type(SS02):
@@ -880,23 +886,12 @@ def series(SS01, SS02):
     if SS01.dt != SS02.dt:
         raise NameError('DLTI systems do not have the same time-step!')
 
-    # determine size of total system
-    Nst01, Nst02 = SS01.states, SS02.states
-    Nst = Nst01 + Nst02
-    Nin = SS01.inputs
-    Nout = SS02.outputs
-
-    # Build A matrix
-    A = np.zeros((Nst, Nst))
-
-    A[:Nst01, :Nst01] = libsp.dense(SS01.A)
-    A[Nst01:, Nst01:] = libsp.dense(SS02.A)
-    A[Nst01:, :Nst01] = libsp.dense(libsp.dot(SS02.B, SS01.C))
-
-    # Build the rest
-    B = np.concatenate((libsp.dense(SS01.B), libsp.dense(libsp.dot(SS02.B, SS01.D))), axis=0)
-    C = np.concatenate((libsp.dense(libsp.dot(SS02.D, SS01.C)), libsp.dense(SS02.C)), axis=1)
-    D = libsp.dense(libsp.dot(SS02.D, SS01.D))
+    A = block_matrix([[SS01.A, None],
+                      [libsp.dot(SS02.B, SS01.C), SS02.A]])
+    B = block_matrix([[SS01.B],
+                      [libsp.dot(SS02.B, SS01.D)]])
+    C = block_matrix([[libsp.dot(SS02.D, SS01.C), SS02.C]])
+    D = block_matrix([[libsp.dot(SS02.D, SS01.D)]])
 
     SStot = ss(A, B, C, D, dt=SS01.dt)
 
@@ -910,6 +905,7 @@ def parallel(SS01, SS02):
         u1 --> SS01 --> y
         u2 --> SS02 --> y
 
+    The connected system is sparse if any of the input matrices is sparse.
     """
 
     if type(SS01) is not type(SS02):
@@ -920,29 +916,14 @@ def parallel(SS01, SS02):
     if Nout != SS01.outputs:
         raise NameError('DLTI systems need to have the same number of output!')
 
-    # if type(SS01) is control.statesp.StateSpace:
-    # 	SStot=control.parallel(SS01,SS02)
-    # else:
+    A = block_matrix([[SS01.A, None],
+                      [None, SS02.A]])
+    B = block_matrix([[SS01.B, None],
+                      [None, SS02.B]])
+    C = block_matrix([[SS01.C, SS02.C]])
+    D = block_matrix([[SS01.D, SS02.D]])
 
-    # determine size of total system
-    Nst01, Nst02 = SS01.states, SS02.states
-    Nst = Nst01 + Nst02
-    Nin01, Nin02 = SS01.inputs, SS02.inputs
-    Nin = Nin01 + Nin02
-
-    # Build A,B matrix
-    A = np.zeros((Nst, Nst))
-    A[:Nst01, :Nst01] = SS01.A
-    A[Nst01:, Nst01:] = SS02.A
-    B = np.zeros((Nst, Nin))
-    B[:Nst01, :Nin01] = SS01.B
-    B[Nst01:, Nin01:] = SS02.B
-
-    # Build the rest
-    C = np.block([SS01.C, SS02.C])
-    D = np.block([SS01.D, SS02.D])
-
-    SStot = scsig.dlti(A, B, C, D, dt=SS01.dt)
+    SStot = ss(A, B, C, D, dt=SS01.dt)
 
     return SStot
 
@@ -1040,7 +1021,7 @@ def addGain(SShere, Kmat, where):
        { u_2 -> y_2= Kmat*u_2    =>    u_new=(u_1,u_2) -> SSnew -> y=y_1+y_2
         {y = y_1+y_2
          -
-    Warning: function not tested for Kmat stored in sparse format
+    Both the system matrices and Kmat can be dense or sparse.
     """
 
     assert where in ['in', 'out', 'parallel-down', 'parallel-up'], \
@@ -1048,27 +1029,27 @@ def addGain(SShere, Kmat, where):
 
     if where == 'in':
         A = SShere.A
-        B = SShere.B.dot(Kmat)
+        B = libsp.dot(SShere.B, Kmat)
         C = SShere.C
-        D = SShere.D.dot(Kmat)
+        D = libsp.dot(SShere.D, Kmat)
 
     if where == 'out':
         A = SShere.A
         B = SShere.B
-        C = Kmat.dot(SShere.C)
-        D = Kmat.dot(SShere.D)
+        C = libsp.dot(Kmat, SShere.C)
+        D = libsp.dot(Kmat, SShere.D)
 
     if where == 'parallel-down':
         A = SShere.A
         C = SShere.C
-        B = np.block([SShere.B, np.zeros((SShere.B.shape[0], Kmat.shape[1]))])
-        D = np.block([SShere.D, Kmat])
+        B = block_matrix([[SShere.B, np.zeros((SShere.B.shape[0], Kmat.shape[1]))]])
+        D = block_matrix([[SShere.D, Kmat]])
 
     if where == 'parallel-up':
         A = SShere.A
         C = SShere.C
-        B = np.block([np.zeros((SShere.B.shape[0], Kmat.shape[1])), SShere.B])
-        D = np.block([Kmat, SShere.D])
+        B = block_matrix([[np.zeros((SShere.B.shape[0], Kmat.shape[1])), SShere.B]])
+        D = block_matrix([[Kmat, SShere.D]])
 
     if SShere.dt == None:
         SSnew = ss(A, B, C, D)
@@ -1094,80 +1075,72 @@ def join2(SS1, SS2):
     with :math:`\mathbf{u}=(\mathbf{u}_1,\mathbf{u}_2)^T` and :math:`\mathbf{y}=(\mathbf{y}_1,\mathbf{y}_2)^T`.
 
     The output :math:`\mathbf{SS}_{TOT}` is either a gain matrix or a state-space system according
-    to the input :math:`\mathbf{SS}_1` and :math:`\mathbf{SS}_2`
+    to the input :math:`\mathbf{SS}_1` and :math:`\mathbf{SS}_2`. If any of the inputs is a :class:`ss` instance,
+    the output is also a :class:`ss` instance, which is sparse if any of the input matrices is sparse.
 
     Args:
-        SS1 (scsig.StateSpace or np.ndarray): State space 1 or gain 1
-        SS2 (scsig.StateSpace or np.ndarray): State space 2 or gain 2
+        SS1 (libss.ss or scsig.StateSpace or np.ndarray): State space 1 or gain 1
+        SS2 (libss.ss or scsig.StateSpace or np.ndarray): State space 2 or gain 2
 
     Returns:
-        scsig.StateSpace or np.ndarray: combined state space or gain matrix
+        libss.ss or scsig.StateSpace or np.ndarray: combined state space or gain matrix
 
     """
-    type_dlti = scsig.ltisys.StateSpaceDiscrete
-
-    if isinstance(SS1, np.ndarray) and isinstance(SS2, np.ndarray):
+    type_gain = (np.ndarray, libsp.csc_matrix)
+    type_ss = (ss, scsig.StateSpace)
 
-        Nin01, Nin02 = SS1.shape[1], SS2.shape[1]
-        Nout01, Nout02 = SS1.shape[0], SS2.shape[0]
-        SStot = np.block([[SS1, np.zeros((Nout01, Nin02))],
-                          [np.zeros((Nout02, Nin01)), SS2]])
+    if isinstance(SS1, type_gain) and isinstance(SS2, type_gain):
+        return block_matrix([[SS1, None],
+                             [None, SS2]])
 
-
-    elif isinstance(SS1, np.ndarray) and isinstance(SS2, type_dlti):
+    if isinstance(SS1, type_gain) and isinstance(SS2, type_ss):
 
         Nin01, Nout01 = SS1.shape[1], SS1.shape[0]
-        Nin02, Nout02 = SS2.inputs, SS2.outputs
         Nx02 = SS2.A.shape[0]
 
         A = SS2.A
-        B = np.block([np.zeros((Nx02, Nin01)), SS2.B])
-        C = np.block([[np.zeros((Nout01, Nx02))],
-                      [SS2.C]])
-        D = np.block([[SS1, np.zeros((Nout01, Nin02))],
-                      [np.zeros((Nout02, Nin01)), SS2.D]])
-
-        SStot = scsig.StateSpace(A, B, C, D, dt=SS2.dt)
+        B = block_matrix([[np.zeros((Nx02, Nin01)), SS2.B]])
+        C = block_matrix([[np.zeros((Nout01, Nx02))],
+                          [SS2.C]])
+        D = block_matrix([[SS1, None],
+                          [None, SS2.D]])
+        dt = SS2.dt
 
+    elif isinstance(SS1, type_ss) and isinstance(SS2, type_gain):
 
-    elif isinstance(SS1, type_dlti) and isinstance(SS2, np.ndarray):
-
-        Nin01, Nout01 = SS1.inputs, SS1.outputs
         Nin02, Nout02 = SS2.shape[1], SS2.shape[0]
         Nx01 = SS1.A.shape[0]
 
         A = SS1.A
-        B = np.block([SS1.B, np.zeros((Nx01, Nin02))])
-        C = np.block([[SS1.C],
-                      [np.zeros((Nout02, Nx01))]])
-        D = np.block([[SS1.D, np.zeros((Nout01, Nin02))],
-                      [np.zeros((Nout02, Nin01)), SS2]])
-
-        SStot = scsig.StateSpace(A, B, C, D, dt=SS1.dt)
-
+        B = block_matrix([[SS1.B, np.zeros((Nx01, Nin02))]])
+        C = block_matrix([[SS1.C],
+                          [np.zeros((Nout02, Nx01))]])
+        D = block_matrix([[SS1.D, None],
+                          [None, SS2]])
+        dt = SS1.dt
 
-    elif isinstance(SS1, type_dlti) and isinstance(SS2, type_dlti):
+    elif isinstance(SS1, type_ss) and isinstance(SS2, type_ss):
 
         assert SS1.dt == SS2.dt, 'State-space models must have the same time-step'
 
-        Nin01, Nout01 = SS1.inputs, SS1.outputs
-        Nin02, Nout02 = SS2.inputs, SS2.outputs
-        Nx01, Nx02 = SS1.A.shape[0], SS2.A.shape[0]
-
-        A = np.block([[SS1.A, np.zeros((Nx01, Nx02))],
-                      [np.zeros((Nx02, Nx01)), SS2.A]])
-        B = np.block([[SS1.B, np.zeros((Nx01, Nin02))],
-                      [np.zeros((Nx02, Nin01)), SS2.B]])
-        C = np.block([[SS1.C, np.zeros((Nout01, Nx02))],
-                      [np.zeros((Nout02, Nx01)), SS2.C]])
-        D = np.block([[SS1.D, np.zeros((Nout01, Nin02))],
-                      [np.zeros((Nout02, Nin01)), SS2.D]])
-        SStot = scsig.StateSpace(A, B, C, D, dt=SS1.dt)
-
+        A = block_matrix([[SS1.A, None],
+                          [None, SS2.A]])
+        B = block_matrix([[SS1.B, None],
+                          [None, SS2.B]])
+        C = block_matrix([[SS1.C, None],
+                          [None, SS2.C]])
+        D = block_matrix([[SS1.D, None],
+                          [None, SS2.D]])
+        dt = SS1.dt
 
     else:
         raise NameError('Input types not recognised in any implemented option!')
 
+    if isinstance(SS1, ss) or isinstance(SS2, ss):
+        SStot = ss(A, B, C, D, dt=dt)
+    else:
+        SStot = scsig.StateSpace(A, B, C, D, dt=dt)
+
     return SStot
 
 def join(SS_list,wv=None):
@@ -1183,29 +1156,26 @@ def join(SS_list,wv=None):
 	Model Reduction Methods for Parametric Dynamical Systems. SIAM Review, 57(4),
 	pp.483–531.
 
+	The joined system is sparse if any of the system matrices is sparse.
+
 	Warning:
-	- system matrices must be numpy arrays
 	- the function does not perform any check!
 	'''
 
 	N = len(SS_list)
 	if wv is not None:
 		assert N==len(wv), "'weights input should have'"
-
-	A = scalg.block_diag(*[ getattr(ss,'A') for ss in SS_list ])
-	B = np.block([ [getattr(ss,'B')] for ss in SS_list ])
-
-	if wv is None:
-		C = np.block( [ getattr(ss,'C') for ss in SS_list ] )
 	else:
-		C = np.block( [ ww*getattr(ss,'C') for ww,ss in zip(wv,SS_list) ] )
+		wv = N*[1.]
 
-	D=np.zeros_like(SS_list[0].D)
-	for ii in range(N):
-		if wv is None:
-			D += SS_list[ii].D
-		else:
-			D += wv[ii]*SS_list[ii].D
+	A = block_matrix([ [ SS_list[ii].A if jj==ii else None for jj in range(N) ] for ii in range(N) ])
+	B = block_matrix([ [ss.B] for ss in SS_list ])
+	C = block_matrix([ [ ww*ss.C for ww,ss in zip(wv,SS_list) ] ])
+
+	D = wv[0]*SS_list[0].D
+	for ii in range(1,N):
+		D = D + wv[ii]*SS_list[ii].D
+	D = block_matrix([[D]])
 
 	return ss(A,B,C,D,SS_list[0].dt)
 
@@ -1331,26 +1301,14 @@ def scale_SS(SSin, input_scal=1., output_scal=1., state_scal=1., byref=True):
         print('deep-copying state-space model before scaling')
         SS = copy.deepcopy(SSin)
 
-    # update input related matrices
-    for ii in range(Nin):
-        SS.B[:, ii] = SS.B[:, ii] * input_scal[ii]
-        SS.D[:, ii] = SS.D[:, ii] * input_scal[ii]
-        # SS.B[:,ii]*=input_scal[ii]
-        # SS.D[:,ii]*=input_scal[ii]
-
-    # update output related matrices
-    for ii in range(Nout):
-        SS.C[ii, :] = SS.C[ii, :] / output_scal[ii]
-        SS.D[ii, :] = SS.D[ii, :] / output_scal[ii]
-        # SS.C[ii,:]/=output_scal[ii]
-        # SS.D[ii,:]/=output_scal[ii]
-
-    # update state related matrices
-    for ii in range(Nstates):
-        SS.B[ii, :] = SS.B[ii, :] / state_scal[ii]
-        SS.C[:, ii] = SS.C[:, ii] * state_scal[ii]
-        # SS.B[ii,:]/=state_scal[ii]
-        # SS.C[:,ii]*=state_scal[ii]
+    input_scal = np.array(input_scal, dtype=float)
+    output_scal = np.array(output_scal, dtype=float)
+    state_scal = np.array(state_scal, dtype=float)
+
+    # B -> diag(1/state_scal) B diag(input_scal) etc.
+    SS.B = scale_rows_cols(SS.B, 1. / state_scal, input_scal)
+    SS.C = scale_rows_cols(SS.C, 1. / output_scal, state_scal)
+    SS.D = scale_rows_cols(SS.D, 1. / output_scal, input_scal)
 
     return SS
 
@@ -1560,6 +1518,60 @@ def butter(order, Wn, N=1, btype='lowpass'):
 
 # ----------------------------------------------------------------------- Utils
 
+def block_matrix(blocks):
+    """
+    Assembles a block matrix from a nested list of dense and/or sparse blocks, as per ``numpy.block``. Zero blocks can
+    be given as ``None`` provided that their size can be inferred from the other blocks in the same row and column.
+
+    The output is a ``libsparse.csc_matrix`` if any of the blocks is sparse and a ``np.ndarray`` otherwise, such that
+    sparse systems are not converted to dense when interconnected.
+
+    Args:
+        blocks (list): nested list of blocks.
+
+    Returns:
+        np.ndarray or libsparse.csc_matrix: block matrix
+    """
+
+    n_rows = len(blocks)
+    n_cols = len(blocks[0])
+
+    row_sizes = n_rows * [None]
+    col_sizes = n_cols * [None]
+    use_sparse = False
+    for ii in range(n_rows):
+        for jj in range(n_cols):
+            block = blocks[ii][jj]
+            if block is None:
+                continue
+            if sparse.issparse(block):
+                use_sparse = True
+            shape = np.atleast_2d(block).shape if not sparse.issparse(block) else block.shape
+            row_sizes[ii], col_sizes[jj] = shape
+
+    assert None not in row_sizes and None not in col_sizes, 'Size of zero blocks cannot be determined'
+
+    if use_sparse:
+        full_blocks = [[sparse.csc_matrix((row_sizes[ii], col_sizes[jj])) if blocks[ii][jj] is None
+                        else blocks[ii][jj] for jj in range(n_cols)] for ii in range(n_rows)]
+        return libsp.csc_matrix(sparse.bmat(full_blocks, format='csc'))
+    else:
+        full_blocks = [[np.zeros((row_sizes[ii], col_sizes[jj])) if blocks[ii][jj] is None
+                        else np.asarray(blocks[ii][jj]) for jj in range(n_cols)] for ii in range(n_rows)]
+        return np.block(full_blocks)
+
+
+def scale_rows_cols(M, row_scal, col_scal):
+    """
+    Returns the matrix ``diag(row_scal) M diag(col_scal)`` in the same format (dense or sparse) as ``M``.
+    """
+
+    if sparse.issparse(M):
+        return libsp.csc_matrix(sparse.diags(row_scal).dot(M).dot(sparse.diags(col_scal)))
+    else:
+        return M * np.outer(row_scal, col_scal).reshape(M.shape)
+
+
 def get_freq_from_eigs(eigs, dlti=True):
     """
     Compute natural freq corresponding to eigenvalues, eigs, of a continuous or
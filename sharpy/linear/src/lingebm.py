@@ -152,6 +152,7 @@ class FlexDynamic():
         self.structure = structure
         self.tsstruct0 = tsinfo
         self.Minv = None
+        self._mass_inverse_cache = dict()  # velocity independent inverses of the (modal) mass matrix
 
         self.scaled_reference_matrices = dict()  # keep reference values prior to time scaling
 
@@ -946,7 +947,7 @@ class FlexDynamic():
                         #     self.newmark_damp)
                         Ass, Bss, Css, Dss = newmark_ss(
                             # Phi.T.dot(self.Mstr.dot(Phi)),
-                            np.linalg.inv(np.dot(self.U[:, :Nmodes].T, np.dot(self.Mstr, self.U[:, :Nmodes]))),
+                            self.mass_inverse(Nmodes),
                             # np.eye(Nmodes),
                             Ccut,
                             np.dot(self.U[:, :Nmodes].T, np.dot(self.Kstr, self.U[:, :Nmodes])),
@@ -970,7 +971,7 @@ class FlexDynamic():
 
 
                 else:  # Full system
-                    self.Minv = np.linalg.inv(self.Mstr)
+                    self.Minv = self.mass_inverse()
 
                     Ass, Bss, Css, Dss = newmark_ss(
                         self.Minv, self.Cstr, self.Kstr,
@@ -1247,6 +1248,36 @@ class FlexDynamic():
         self.scaled_reference_matrices['K'] = self.Kstr.copy()
         self.update_matrices_time_scale(time_ref)
 
+    def mass_inverse(self, Nmodes=None):
+        """
+        Inverse of the mass matrix or, if ``Nmodes`` is given, of the mass matrix projected onto the first ``Nmodes``
+        modes.
+
+        The mass matrix does not depend on the time scaling, thus the inverse is computed once and re-used when the
+        system is re-assembled at a different reference velocity (see :func:`update_matrices_time_scale`). The stored
+        value is discarded if the mass matrix or the modes are replaced.
+
+        Args:
+            Nmodes (int (optional)): Number of modes onto which the mass matrix is projected.
+
+        Returns:
+            np.ndarray: Inverse of the (modal) mass matrix
+        """
+        try:
+            Mstr, U, Minv = self._mass_inverse_cache[Nmodes]
+            if Mstr is self.Mstr and (Nmodes is None or U is self.U):
+                return Minv
+        except KeyError:
+            pass
+
+        if Nmodes is None:
+            Minv = np.linalg.inv(self.Mstr)
+        else:
+            Minv = np.linalg.inv(np.dot(self.U[:, :Nmodes].T, np.dot(self.Mstr, self.U[:, :Nmodes])))
+        self._mass_inverse_cache[Nmodes] = (self.Mstr, self.U, Minv)
+
+        return Minv
+
     def update_matrices_time_scale(self, time_ref):
 
         try:
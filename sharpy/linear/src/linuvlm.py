@@ -26,6 +26,7 @@ import scipy.sparse as sparse
 import sharpy.linear.src.interp as interp
 import sharpy.linear.src.multisurfaces as multisurfaces
 import sharpy.linear.src.assembly as ass
+import sharpy.linear.src.libaic as libaic
 import sharpy.linear.src.libss as libss
 
 import sharpy.linear.src.libsparse as libsp
@@ -42,6 +43,18 @@ settings_default_static = dict()
 settings_types_static['vortex_radius'] = 'float'
 settings_default_static['vortex_radius'] = vortex_radius_def
 
+settings_types_static['aic_operator'] = 'str'
+settings_default_static['aic_operator'] = 'dense'
+
+settings_types_static['aic_tolerance'] = 'float'
+settings_default_static['aic_tolerance'] = 1e-6
+
+settings_types_static['aic_leaf_size'] = 'int'
+settings_default_static['aic_leaf_size'] = 32
+
+settings_types_static['aic_admissibility'] = 'float'
+settings_default_static['aic_admissibility'] = 1.0
+
 settings_types_dynamic = dict()
 settings_default_dynamic = dict()
 
@@ -86,9 +99,36 @@ settings_default_dynamic['track_body_number'] = -1
 settings_types_dynamic['vortex_radius'] = 'float'
 settings_default_dynamic['vortex_radius'] = vortex_radius_def
 
+settings_types_dynamic['aic_operator'] = 'str'
+settings_default_dynamic['aic_operator'] = 'dense'
+
+settings_types_dynamic['aic_tolerance'] = 'float'
+settings_default_dynamic['aic_tolerance'] = 1e-6
+
+settings_types_dynamic['aic_leaf_size'] = 'int'
+settings_default_dynamic['aic_leaf_size'] = 32
+
+settings_types_dynamic['aic_admissibility'] = 'float'
+settings_default_dynamic['aic_admissibility'] = 1.0
+
+
+def _setting_value(value):
+    """Returns the value of settings that may have been cast to ``ctypes``"""
+    try:
+        return value.value
+    except AttributeError:
+        return value
+
 
 class Static():
-    """	Static linear solver """
+    """	Static linear solver
+
+    The steady AIC matrix is assembled in dense form unless the setting ``aic_operator`` is ``hierarchical``, in
+    which case the far-field blocks are compressed with low-rank approximations and the bound circulation is solved
+    for iteratively (see :class:`sharpy.linear.src.libaic.HierarchicalAIC`). The settings ``aic_tolerance``,
+    ``aic_leaf_size`` and ``aic_admissibility`` control the accuracy and block partition of the compressed operator.
+    The hierarchical operator is not available for the state-space :class:`Dynamic` formulation.
+    """
 
     def __init__(self, tsdata, custom_settings=None, for_vel=np.zeros((6,))):
 
@@ -105,6 +145,11 @@ class Static():
                                  settings_default_static)
 
         self.vortex_radius = settings_here['vortex_radius']
+        self.aic_settings = {k: settings_here[k] for k in
+                             ['aic_operator', 'aic_tolerance', 'aic_leaf_size', 'aic_admissibility']}
+        if self.aic_settings['aic_operator'] not in ['dense', 'hierarchical']:
+            raise exceptions.NotValidSetting('aic_operator', self.aic_settings['aic_operator'],
+                                             ['dense', 'hierarchical'])
         MS = multisurfaces.MultiAeroGridSurfaces(tsdata,
                                                  self.vortex_radius,
                                                  for_vel=for_vel)
@@ -156,8 +201,9 @@ class Static():
         List_uc_dncdzeta = ass.uc_dncdzeta(MS.Surfs)
         List_nc_dqcdzeta_coll, List_nc_dqcdzeta_vert = \
             ass.nc_dqcdzeta(MS.Surfs, MS.Surfs_star)
-        List_AICs, List_AICs_star = ass.AICs(MS.Surfs, MS.Surfs_star,
-                                             target='collocation', Project=True)
+        if self.aic_settings['aic_operator'] == 'dense':
+            List_AICs, List_AICs_star = ass.AICs(MS.Surfs, MS.Surfs_star,
+                                                 target='collocation', Project=True)
         List_Wnv = []
         for ss in range(MS.n_surf):
             List_Wnv.append(
@@ -180,21 +226,31 @@ class Static():
         self.Ducdu_ext = scalg.block_diag(*List_Wnv)
         del List_Wnv
 
-        ### Condense Gammaw terms
-        for ss_out in range(MS.n_surf):
-            K = MS.KK[ss_out]
-            for ss_in in range(MS.n_surf):
-                N_star = MS.NN_star[ss_in]
-                aic = List_AICs[ss_out][ss_in]  # bound
-                aic_star = List_AICs_star[ss_out][ss_in]  # wake
+        if self.aic_settings['aic_operator'] == 'hierarchical':
+            kernel = libaic.FoldedAIC([Surf.zeta for Surf in MS.Surfs],
+                                      [Surf.zeta for Surf in MS.Surfs_star],
+                                      _setting_value(self.vortex_radius))
+            self.AIC = libaic.HierarchicalAIC(kernel,
+                                              tol=_setting_value(self.aic_settings['aic_tolerance']),
+                                              leaf_size=_setting_value(self.aic_settings['aic_leaf_size']),
+                                              eta=_setting_value(self.aic_settings['aic_admissibility']))
+            cout.cout_wrap('\t\tHierarchical AIC: %.1f%% of dense storage' % (100 * self.AIC.compression), 2)
+        else:
+            ### Condense Gammaw terms
+            for ss_out in range(MS.n_surf):
+                K = MS.KK[ss_out]
+                for ss_in in range(MS.n_surf):
+                    N_star = MS.NN_star[ss_in]
+                    aic = List_AICs[ss_out][ss_in]  # bound
+                    aic_star = List_AICs_star[ss_out][ss_in]  # wake
 
-                # fold aic_star: sum along chord at each span-coordinate
-                aic_star_fold = np.zeros((K, N_star))
-                for jj in range(N_star):
-                    aic_star_fold[:, jj] += np.sum(aic_star[:, jj::N_star], axis=1)
-                aic[:, -N_star:] += aic_star_fold
+                    # fold aic_star: sum along chord at each span-coordinate
+                    aic_star_fold = np.zeros((K, N_star))
+                    for jj in range(N_star):
+                        aic_star_fold[:, jj] += np.sum(aic_star[:, jj::N_star], axis=1)
+                    aic[:, -N_star:] += aic_star_fold
 
-        self.AIC = np.block(List_AICs)
+            self.AIC = np.block(List_AICs)
 
         # ---------------------------------------------------------- output eq.
 
@@ -248,7 +304,10 @@ class Static():
         ### state
         bv = np.dot(self.Ducdu_ext, self.u_ext - self.zeta_dot) + \
              np.dot(self.Ducdzeta, self.zeta)
-        self.gamma = np.linalg.solve(self.AIC, -bv)
+        if self.aic_settings['aic_operator'] == 'hierarchical':
+            self.gamma = self.AIC.solve(-bv)
+        else:
+            self.gamma = np.linalg.solve(self.AIC, -bv)
 
         ### retrieve gamma over wake
         gamma_star = []
@@ -586,7 +645,15 @@ class Dynamic(Static):
             self.settings['use_sparse'] = UseSparse
             self.settings['ScalingDict'] = ScalingDict
 
+        aic_operator = _setting_value(self.settings.get('aic_operator', 'dense'))
+        if aic_operator != 'dense':
+            # the state-space realisation requires the explicit AIC matrix and its inverse
+            raise exceptions.NotValidSetting('aic_operator', aic_operator, ['dense'])
+
         static_dict = {'vortex_radius': self.settings['vortex_radius']}
+        for k in ['aic_operator', 'aic_tolerance', 'aic_leaf_size', 'aic_admissibility']:
+            if k in self.settings:
+                static_dict[k] = self.settings[k]
         super().__init__(tsdata, custom_settings=static_dict, for_vel=for_vel)
 
         self.dt = self.settings['dt']
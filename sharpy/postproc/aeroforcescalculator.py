@@ -86,9 +86,14 @@ class AeroForcesCalculator(BaseSolver):
         self.caller = caller
 
     def run(self, online=False):
-        self.ts = 0
+        if online:
+            time_steps = [len(self.data.aero.timestep_info) - 1]
+            self.ts_max = time_steps[-1] + 1
+        else:
+            time_steps = list(range(self.ts_max))
+        self.ts = time_steps[-1]
 
-        self.calculate_forces()
+        self.calculate_forces(time_steps)
         if self.settings['write_text_file']:
             self.folder = (self.settings['folder'] + '/' +
                            self.data.settings['SHARPy']['case'] + '/' +
@@ -99,35 +104,71 @@ class AeroForcesCalculator(BaseSolver):
             self.folder += self.settings['text_file_name']
             self.file_output()
         if self.settings['screen_output']:
-            self.screen_output()
+            self.screen_output(time_steps)
         cout.cout_wrap('...Finished', 1)
         return self.data
 
-    def calculate_forces(self):
-        for self.ts in range(self.ts_max):
-            rot = algebra.quat2rotation(self.data.structure.timestep_info[self.ts].quat)
-
-            force = self.data.aero.timestep_info[self.ts].forces
-            unsteady_force = self.data.aero.timestep_info[self.ts].dynamic_forces
-            n_surf = len(force)
-            for i_surf in range(n_surf):
-                total_steady_force = np.zeros((3,))
-                total_unsteady_force = np.zeros((3,))
-                _, n_rows, n_cols = force[i_surf].shape
-                for i_m in range(n_rows):
-                    for i_n in range(n_cols):
-                        total_steady_force += force[i_surf][0:3, i_m, i_n]
-                        total_unsteady_force += unsteady_force[i_surf][0:3, i_m, i_n]
-                self.data.aero.timestep_info[self.ts].inertial_steady_forces[i_surf, 0:3] = total_steady_force
-                self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[i_surf, 0:3] = total_unsteady_force
-                self.data.aero.timestep_info[self.ts].body_steady_forces[i_surf, 0:3] = np.dot(rot.T, total_steady_force)
-                self.data.aero.timestep_info[self.ts].body_unsteady_forces[i_surf, 0:3] = np.dot(rot.T, total_unsteady_force)
+    def calculate_forces(self, time_steps):
+        """
+        Calculates the total forces on each surface for the given time steps and stores them in the aerodynamic
+        time step info.
+
+        Args:
+            time_steps (list(int)): Time steps
+
+        Returns:
+            tuple(np.ndarray): Steady and unsteady forces in ``G`` and steady and unsteady forces in ``A``, each of
+            them of size ``[n_steps x n_surf x 3]``
+        """
+        aero_tsteps = [self.data.aero.timestep_info[ts] for ts in time_steps]
+
+        # sum over the panel vertices of each surface
+        inertial_steady = np.array([[force[0:3].sum(axis=(1, 2)) for force in tstep.forces]
+                                    for tstep in aero_tsteps])
+        inertial_unsteady = np.array([[force[0:3].sum(axis=(1, 2)) for force in tstep.dynamic_forces]
+                                      for tstep in aero_tsteps])
+
+        # projection onto A
+        cga = algebra.quat2rotation_vec(np.array([self.data.structure.timestep_info[ts].quat for ts in time_steps]))
+        body_steady = np.einsum('tji,tsj->tsi', cga, inertial_steady)
+        body_unsteady = np.einsum('tji,tsj->tsi', cga, inertial_unsteady)
+
+        for i_step, tstep in enumerate(aero_tsteps):
+            tstep.inertial_steady_forces[:, 0:3] = inertial_steady[i_step]
+            tstep.inertial_unsteady_forces[:, 0:3] = inertial_unsteady[i_step]
+            tstep.body_steady_forces[:, 0:3] = body_steady[i_step]
+            tstep.body_unsteady_forces[:, 0:3] = body_unsteady[i_step]
+
+        return inertial_steady, inertial_unsteady, body_steady, body_unsteady
+
+    def force_matrix(self, time_steps):
+        """
+        Total forces on the aircraft at the given time steps, as stored in the aerodynamic time step info.
+
+        Returns:
+            np.ndarray: ``[n_steps x 13]`` array with the time step number, the steady and unsteady forces in ``G``
+            and the steady and unsteady forces in ``A``
+        """
+        aero_tsteps = [self.data.aero.timestep_info[ts] for ts in time_steps]
+
+        # (1 timestep) + (3+3 inertial steady+unsteady) + (3+3 body steady+unsteady)
+        force_matrix = np.zeros((len(time_steps), 1 + 3 + 3 + 3 + 3))
+        force_matrix[:, 0] = time_steps
+        for i, name in enumerate(['inertial_steady_forces', 'inertial_unsteady_forces',
+                                  'body_steady_forces', 'body_unsteady_forces']):
+            force_matrix[:, 1 + 3*i:4 + 3*i] = np.array([getattr(tstep, name)[:, 0:3] for tstep in aero_tsteps]).sum(1)
+
+        return force_matrix
 
     def calculate_coefficients(self, fx, fy, fz):
         qS = self.settings['q_ref'].value * self.settings['S_ref'].value
         return fx/qS, fy/qS, fz/qS
 
-    def screen_output(self):
+    def screen_output(self, time_steps):
+        force_matrix = self.force_matrix(time_steps)
+        # total forces in G
+        forces_g = force_matrix[:, 1:4] + force_matrix[:, 4:7]
+
         line = ''
         cout.cout_wrap.print_separator()
         # output header
@@ -135,54 +176,22 @@ class AeroForcesCalculator(BaseSolver):
             line = "{0:5s} | {1:10s} | {2:10s} | {3:10s} | {4:10s} | {5:10s} | {6:10s}".format(
                 'tstep', '  fx_g', '  fy_g', '  fz_g', '  Cfx_g', '  Cfy_g', '  Cfz_g')
             cout.cout_wrap(line, 1)
-            for self.ts in range(self.ts_max):
-                fx = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 0], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 0], 0)
-
-                fy = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 1], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 1], 0)
-
-                fz = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 2], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 2], 0)
-
-                Cfx, Cfy, Cfz = self.calculate_coefficients(fx, fy, fz)
-
+            coeffs_g = np.column_stack(self.calculate_coefficients(*forces_g.T))
+            for ts, (fx, fy, fz), (Cfx, Cfy, Cfz) in zip(time_steps, forces_g, coeffs_g):
                 line = "{0:5d} | {1: 8.3e} | {2: 8.3e} | {3: 8.3e} | {4: 8.3e} | {5: 8.3e} | {6: 8.3e}".format(
-                    self.ts, fx, fy, fz, Cfx, Cfy, Cfz)
+                    ts, fx, fy, fz, Cfx, Cfy, Cfz)
                 cout.cout_wrap(line, 1)
         else:
             line = "{0:5s} | {1:10s} | {2:10s} | {3:10s}".format(
                 'tstep', '  fx_g', '  fy_g', '  fz_g')
             cout.cout_wrap(line, 1)
-            for self.ts in range(self.ts_max):
-                fx = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 0], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 0], 0)
-
-                fy = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 1], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 1], 0)
-
-                fz = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 2], 0) + \
-                     np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 2], 0)
-
+            for ts, (fx, fy, fz) in zip(time_steps, forces_g):
                 line = "{0:5d} | {1: 8.3e} | {2: 8.3e} | {3: 8.3e}".format(
-                    self.ts, fx, fy, fz)
+                    ts, fx, fy, fz)
                 cout.cout_wrap(line, 1)
 
     def file_output(self):
-        # assemble forces matrix
-        # (1 timestep) + (3+3 inertial steady+unsteady) + (3+3 body steady+unsteady)
-        force_matrix = np.zeros((self.ts_max, 1 + 3 + 3 + 3 + 3))
-        for self.ts in range(self.ts_max):
-            i = 0
-            force_matrix[self.ts, i] = self.ts
-            i += 1
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].inertial_steady_forces[:, 0:3], 0)
-            i += 3
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].inertial_unsteady_forces[:, 0:3], 0)
-            i += 3
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].body_steady_forces[:, 0:3], 0)
-            i += 3
-            force_matrix[self.ts, i:i+3] = np.sum(self.data.aero.timestep_info[self.ts].body_unsteady_forces[:, 0:3], 0)
+        force_matrix = self.force_matrix(list(range(self.ts_max)))
 
         header = ''
         header += 'tstep, '
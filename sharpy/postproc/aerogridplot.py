@@ -9,6 +9,8 @@ from sharpy.utils.settings import str2bool
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
 import sharpy.aero.utils.uvlmlib as uvlmlib
+import sharpy.utils.xdmfutils as xdmfutils
+import sharpy.utils.parallel_utils as parallel_utils
 from sharpy.utils.constants import vortex_radius_def
 
 
@@ -67,8 +69,22 @@ class AerogridPlot(BaseSolver):
     settings_default['vortex_radius'] = vortex_radius_def
     settings_description['vortex_radius'] = 'Distance below which inductions are not computed'
 
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'vtu'
+    settings_description['output_format'] = 'Output format. ``vtu`` writes a VTK file per surface and time step. ' \
+                                            '``xdmf`` writes all time steps to a single ``HDF5`` file with an ' \
+                                            '``XDMF`` index that can be opened in Paraview'
+
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes among which the time steps are distributed when ' \
+                                            'run offline. Only used with ``vtu`` output'
+
+    settings_options = dict()
+    settings_options['output_format'] = ['vtu', 'xdmf']
+
     table = settings.SettingsTable()
-    __doc__ += table.generate(settings_types, settings_default, settings_description)
+    __doc__ += table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
         self.settings = None
@@ -80,13 +96,16 @@ class AerogridPlot(BaseSolver):
         self.ts_max = 0
         self.caller = None
 
+        self.connectivity = dict()  # panel connectivity for each surface dimensions
+        self.time_series = None
+
     def initialise(self, data, custom_settings=None, caller=None):
         self.data = data
         if custom_settings is None:
             self.settings = data.settings[self.solver_id]
         else:
             self.settings = custom_settings
-        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default, self.settings_options)
         self.ts_max = self.data.ts + 1
         # create folder for containing files if necessary
         if not os.path.exists(self.settings['folder']):
@@ -104,13 +123,25 @@ class AerogridPlot(BaseSolver):
                               self.data.settings['SHARPy']['case'])
         self.caller = caller
 
+        if self.settings['output_format'] == 'xdmf':
+            self.time_series = xdmfutils.XDMFTimeSeries(self.folder +
+                                                        self.settings['name_prefix'] +
+                                                        self.data.settings['SHARPy']['case'])
+
     def run(self, online=False):
         # TODO: Create a dictionary to plot any variable as in beamplot
         if not online:
-            for self.ts in range(self.ts_max):
-                if self.data.structure.timestep_info[self.ts] is not None:
-                    self.plot_body()
-                    self.plot_wake()
+            time_steps = [ts for ts in range(self.ts_max) if self.data.structure.timestep_info[ts] is not None]
+            if self.time_series is None:
+                num_processes = self.settings['num_processes'].value
+            else:
+                # all steps are written to the same file
+                num_processes = 1
+            incidence_angles = parallel_utils.map_time_steps(self.plot_step, time_steps, num_processes)
+            if self.settings['include_incidence_angle']:
+                for ts, incidence_angle in zip(time_steps, incidence_angles):
+                    self.data.aero.timestep_info[ts].postproc_cell['incidence_angle'] = incidence_angle
+            self.shutdown()
             cout.cout_wrap('...Finished', 1)
         else:
             aero_tsteps = len(self.data.aero.timestep_info) - 1
@@ -120,6 +151,55 @@ class AerogridPlot(BaseSolver):
             self.plot_wake()
         return self.data
 
+    def plot_step(self, ts):
+        """
+        Plots the body and the wake at time step ``ts``
+
+        Returns:
+            list(np.ndarray): Incidence angle of the panels of each surface if ``include_incidence_angle``
+        """
+        self.ts = ts
+        self.plot_body()
+        self.plot_wake()
+        if self.settings['include_incidence_angle']:
+            return self.data.aero.timestep_info[ts].postproc_cell['incidence_angle']
+
+    def shutdown(self):
+        """
+        Writes the index of the time series file
+        """
+        if self.time_series is not None:
+            self.time_series.write()
+
+    def get_connectivity(self, dims):
+        """
+        Quad connectivity of a lattice of ``dims[0] x dims[1]`` panels, numbered spanwise first as the points.
+        Computed once for each surface dimensions.
+        """
+        dims = tuple(dims)
+        try:
+            return self.connectivity[dims]
+        except KeyError:
+            pass
+
+        i_m, i_n = np.meshgrid(np.arange(dims[0]), np.arange(dims[1]), indexing='ij')
+        node = (i_n * (dims[0] + 1) + i_m).ravel(order='F')
+        conn = np.column_stack((node, node + 1, node + dims[0] + 2, node + dims[0] + 1))
+        self.connectivity[dims] = conn
+
+        return conn
+
+    def grid_coordinates(self, zeta, for_pos):
+        """
+        Coordinates of the grid vertices, numbered with the chordwise index running fastest.
+        """
+        coords = zeta.reshape((3, -1), order='F').T.copy()
+        if self.settings['include_rbm']:
+            coords += for_pos[0:3]
+        if self.settings['include_forward_motion']:
+            coords[:, 0] -= self.settings['dt'].value*self.ts*self.settings['u_inf'].value
+        return coords
+
     def plot_body(self):
 
         aero_tstep = self.data.aero.timestep_info[self.ts]
@@ -144,82 +224,66 @@ class AerogridPlot(BaseSolver):
             point_data_dim = (dims[0]+1)*(dims[1]+1)  # + (dims_star[0]+1)*(dims_star[1]+1)
             panel_data_dim = (dims[0])*(dims[1])  # + (dims_star[0])*(dims_star[1])
 
-            coords = np.zeros((point_data_dim, 3))
-            conn = []
-            panel_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_surf_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_gamma = np.zeros((panel_data_dim,))
-            panel_gamma_dot = np.zeros((panel_data_dim,))
-            normal = np.zeros((panel_data_dim, 3))
-            point_struct_id = np.zeros((point_data_dim,), dtype=int)
-            point_cf = np.zeros((point_data_dim, 3))
+            # coordinates of corners
+            coords = self.grid_coordinates(aero_tstep.zeta[i_surf], struct_tstep.for_pos)
+            conn = self.get_connectivity(dims)
+
+            # point data
+            point_struct_id = np.repeat(self.data.aero.mapping_tables.aero2struct[i_surf][:dims[1] + 1], dims[0] + 1)
+            point_cf = self.point_vector(aero_tstep.forces[i_surf], point_data_dim)
             point_unsteady_cf = np.zeros((point_data_dim, 3))
             zeta_dot = np.zeros((point_data_dim, 3))
             u_inf = np.zeros((point_data_dim, 3))
-            if self.settings['include_velocities']:
-                vel = np.zeros((point_data_dim, 3))
-            counter = -1
-
-            # coordinates of corners
-            for i_n in range(dims[1]+1):
-                for i_m in range(dims[0]+1):
-                    counter += 1
-                    coords[counter, :] = aero_tstep.zeta[i_surf][:, i_m, i_n]
-                    if self.settings['include_rbm']:
-                        coords[counter, :] += struct_tstep.for_pos[0:3]
-                    if self.settings['include_forward_motion']:
-                        coords[counter, 0] -= self.settings['dt'].value*self.ts*self.settings['u_inf'].value
-
+            try:
+                point_unsteady_cf = self.point_vector(aero_tstep.dynamic_forces[i_surf], point_data_dim)
+            except AttributeError:
+                pass
+            try:
+                zeta_dot = self.point_vector(aero_tstep.zeta_dot[i_surf], point_data_dim)
+            except AttributeError:
+                pass
+            try:
+                u_inf = self.point_vector(aero_tstep.u_ext[i_surf], point_data_dim)
+            except AttributeError:
+                pass
+
+            # cell data
+            normal = aero_tstep.normals[i_surf].reshape((3, -1), order='F').T
+            panel_id = np.arange(panel_data_dim)
+            panel_surf_id = i_surf*np.ones((panel_data_dim,), dtype=int)
+            panel_gamma = aero_tstep.gamma[i_surf].ravel(order='F')
+            panel_gamma_dot = aero_tstep.gamma_dot[i_surf].ravel(order='F')
             if self.settings['include_incidence_angle']:
-                incidence_angle = np.zeros_like(panel_gamma)
-
-            counter = -1
-            node_counter = -1
-            for i_n in range(dims[1] + 1):
-                global_counter = self.data.aero.aero2struct_mapping[i_surf][i_n]
-                for i_m in range(dims[0] + 1):
-                    node_counter += 1
-                    # point data
-                    point_struct_id[node_counter] = global_counter
-                    point_cf[node_counter, :] = aero_tstep.forces[i_surf][0:3, i_m, i_n]
-                    try:
-                        point_unsteady_cf[node_counter, :] = aero_tstep.dynamic_forces[i_surf][0:3, i_m, i_n]
-                    except AttributeError:
-                        pass
-                    try:
-                        zeta_dot[node_counter, :] = aero_tstep.zeta_dot[i_surf][0:3, i_m, i_n]
-                    except AttributeError:
-                        pass
-                    try:
-                        u_inf[node_counter, :] = aero_tstep.u_ext[i_surf][0:3, i_m, i_n]
-                    except AttributeError:
-                        pass
-                    if i_n < dims[1] and i_m < dims[0]:
-                        counter += 1
-                    else:
-                        continue
-
-                    conn.append([node_counter + 0,
-                                 node_counter + 1,
-                                 node_counter + dims[0]+2,
-                                 node_counter + dims[0]+1])
-                    # cell data
-                    normal[counter, :] = aero_tstep.normals[i_surf][:, i_m, i_n]
-                    panel_id[counter] = counter
-                    panel_surf_id[counter] = i_surf
-                    panel_gamma[counter] = aero_tstep.gamma[i_surf][i_m, i_n]
-                    panel_gamma_dot[counter] = aero_tstep.gamma_dot[i_surf][i_m, i_n]
-
-                    if self.settings['include_incidence_angle']:
-                        incidence_angle[counter] = \
-                            aero_tstep.postproc_cell['incidence_angle'][i_surf][i_m, i_n]
+                incidence_angle = aero_tstep.postproc_cell['incidence_angle'][i_surf].ravel(order='F')
 
             if self.settings['include_velocities']:
                 vel = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(aero_tstep,
                                                                               coords,
                                                                               self.settings['vortex_radius'],
                                                                               struct_tstep.for_pos,
-                                                                              self.settings['numcores'])
+                                                                              self.settings['num_cores'])
+
+            if self.time_series is not None:
+                cell_data = [('panel_n_id', panel_id),
+                             ('panel_surface_id', panel_surf_id),
+                             ('panel_gamma', panel_gamma),
+                             ('panel_gamma_dot', panel_gamma_dot)]
+                if self.settings['include_incidence_angle']:
+                    cell_data.append(('incidence_angle', incidence_angle))
+                cell_data.append(('panel_normal', normal))
+                point_data = [('n_id', np.arange(0, coords.shape[0])),
+                              ('point_struct_id', point_struct_id),
+                              ('point_steady_force', point_cf),
+                              ('point_unsteady_force', point_unsteady_cf),
+                              ('zeta_dot', zeta_dot),
+                              ('u_inf', u_inf)]
+                if self.settings['include_velocities']:
+                    point_data.append(('velocity', vel))
+                self.time_series.add_step('body_%02u' % i_surf, self.ts, coords, conn, 'quad',
+                                          point_data=point_data,
+                                          cell_data=cell_data,
+                                          topology_key='body_%02u' % i_surf)
+                continue
 
             ug = tvtk.UnstructuredGrid(points=coords)
             ug.set_cells(tvtk.Quad().cell_type, conn)
@@ -253,6 +317,15 @@ class AerogridPlot(BaseSolver):
                 ug.point_data.get_array(6).name = 'velocity'
             write_data(ug, filename)
 
+    @staticmethod
+    def point_vector(var, point_data_dim):
+        """
+        Rearranges the first three components of a grid variable of shape ``(n, M + 1, N + 1)`` as point data
+        """
+        if var is None:
+            raise AttributeError
+        return var[0:3, :, :].reshape((3, point_data_dim), order='F').T
+
     def plot_wake(self):
         for i_surf in range(self.data.aero.timestep_info[self.ts].n_surf):
             filename = (self.wake_filename +
@@ -263,45 +336,25 @@ class AerogridPlot(BaseSolver):
             dims_star = self.data.aero.timestep_info[self.ts].dimensions_star[i_surf, :].copy()
             dims_star[0] -= self.settings['minus_m_star']
 
-            point_data_dim = (dims_star[0]+1)*(dims_star[1]+1)
             panel_data_dim = (dims_star[0])*(dims_star[1])
 
-            coords = np.zeros((point_data_dim, 3))
-            conn = []
-            panel_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_surf_id = np.zeros((panel_data_dim,), dtype=int)
-            panel_gamma = np.zeros((panel_data_dim,))
-            counter = -1
-            # rotation_mat = self.data.structure.timestep_info[self.ts].cga().T
             # coordinates of corners
-            for i_n in range(dims_star[1]+1):
-                for i_m in range(dims_star[0]+1):
-                    counter += 1
-                    coords[counter, :] = self.data.aero.timestep_info[self.ts].zeta_star[i_surf][:, i_m, i_n]
-                    if self.settings['include_rbm']:
-                        coords[counter, :] += self.data.structure.timestep_info[self.ts].for_pos[0:3]
-                    if self.settings['include_forward_motion']:
-                        coords[counter, 0] -= self.settings['dt'].value*self.ts*self.settings['u_inf'].value
-
-            counter = -1
-            node_counter = -1
-            # wake
-            for i_n in range(dims_star[1]+1):
-                for i_m in range(dims_star[0]+1):
-                    node_counter += 1
-                    # cell data
-                    if i_n < dims_star[1] and i_m < dims_star[0]:
-                        counter += 1
-                    else:
-                        continue
-
-                    conn.append([node_counter + 0,
-                                 node_counter + 1,
-                                 node_counter + dims_star[0]+2,
-                                 node_counter + dims_star[0]+1])
-                    panel_id[counter] = counter
-                    panel_surf_id[counter] = i_surf
-                    panel_gamma[counter] = self.data.aero.timestep_info[self.ts].gamma_star[i_surf][i_m, i_n]
+            coords = self.grid_coordinates(
+                self.data.aero.timestep_info[self.ts].zeta_star[i_surf][:, :dims_star[0] + 1, :dims_star[1] + 1],
+                self.data.structure.timestep_info[self.ts].for_pos)
+            conn = self.get_connectivity(dims_star)
+
+            panel_id = np.arange(panel_data_dim)
+            panel_surf_id = i_surf*np.ones((panel_data_dim,), dtype=int)
+            panel_gamma = self.data.aero.timestep_info[self.ts].gamma_star[i_surf][:dims_star[0], :dims_star[1]].ravel(order='F')
+
+            if self.time_series is not None:
+                self.time_series.add_step('wake_%02u' % i_surf, self.ts, coords, conn, 'quad',
+                                          point_data=[('n_id', np.arange(0, coords.shape[0]))],
+                                          cell_data=[('panel_n_id', panel_id),
+                                                     ('panel_surface_id', panel_surf_id),
+                                                     ('panel_gamma', panel_gamma)])
+                continue
 
             ug = tvtk.UnstructuredGrid(points=coords)
             ug.set_cells(tvtk.Quad().cell_type, conn)
@@ -7,6 +7,8 @@ import sharpy.utils.cout_utils as cout
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
+import sharpy.utils.xdmfutils as xdmfutils
+import sharpy.utils.parallel_utils as parallel_utils
 
 
 @solver
@@ -49,8 +51,22 @@ class BeamPlot(BaseSolver):
     settings_default['output_rbm'] = True
     settings_description['output_rbm'] = 'Write ``csv`` file with rigid body motion data'
 
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'vtu'
+    settings_description['output_format'] = 'Output format. ``vtu`` writes a VTK file per time step. ``xdmf`` ' \
+                                            'writes all time steps to a single ``HDF5`` file with an ``XDMF`` index ' \
+                                            'that can be opened in Paraview'
+
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes among which the time steps are distributed when ' \
+                                            'run offline. Only used with ``vtu`` output'
+
+    settings_options = dict()
+    settings_options['output_format'] = ['vtu', 'xdmf']
+
     settings_table = settings.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
 
@@ -61,13 +77,16 @@ class BeamPlot(BaseSolver):
         self.filename = ''
         self.caller = None
 
+        self.conn = None
+        self.time_series = None
+
     def initialise(self, data, custom_settings=None, caller=None):
         self.data = data
         if custom_settings is None:
             self.settings = data.settings[self.solver_id]
         else:
             self.settings = custom_settings
-        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default, self.settings_options)
         # create folder for containing files if necessary
         if not os.path.exists(self.settings['folder']):
             os.makedirs(self.settings['folder'])
@@ -84,13 +103,24 @@ class BeamPlot(BaseSolver):
                          self.data.settings['SHARPy']['case'])
         self.caller = caller
 
+        if self.settings['output_format'] == 'xdmf':
+            self.time_series = xdmfutils.XDMFTimeSeries(self.filename)
+
     def run(self, online=False):
         self.plot(online)
         if not online:
             self.write()
+            self.shutdown()
             cout.cout_wrap('...Finished', 1)
         return self.data
 
+    def shutdown(self):
+        """
+        Writes the index of the time series file
+        """
+        if self.time_series is not None:
+            self.time_series.write()
+
     def write(self):
         if self.settings['output_rbm']:
             filename = self.filename + '_rbm_acc.csv'
@@ -104,39 +134,31 @@ class BeamPlot(BaseSolver):
 
     def plot(self, online):
         if not online:
-            for it in range(len(self.data.structure.timestep_info)):
-                if self.data.structure.timestep_info[it] is not None:
-                    self.write_beam(it)
-                    if self.settings['include_FoR']:
-                        self.write_for(it)
+            time_steps = [it for it in range(len(self.data.structure.timestep_info))
+                          if self.data.structure.timestep_info[it] is not None]
+            if self.time_series is None:
+                num_processes = self.settings['num_processes'].value
+            else:
+                # all steps are written to the same file
+                num_processes = 1
+            parallel_utils.map_time_steps(self.plot_step, time_steps, num_processes)
         else:
             it = len(self.data.structure.timestep_info) - 1
             self.write_beam(it)
             if self.settings['include_FoR']:
                 self.write_for(it)
 
+    def plot_step(self, it):
+        self.write_beam(it)
+        if self.settings['include_FoR']:
+            self.write_for(it)
+
     def write_beam(self, it):
         it_filename = (self.filename +
                        '%06u' % it)
         num_nodes = self.data.structure.num_node
         num_elem = self.data.structure.num_elem
 
-        coords = np.zeros((num_nodes, 3))
-        conn = np.zeros((num_elem, 3), dtype=int)
-        node_id = np.zeros((num_nodes,), dtype=int)
-        elem_id = np.zeros((num_elem,), dtype=int)
-        coords_a_cell = np.zeros((num_elem, 3), dtype=int)
-        local_x = np.zeros((num_nodes, 3))
-        local_y = np.zeros((num_nodes, 3))
-        local_z = np.zeros((num_nodes, 3))
-        coords_a = np.zeros((num_nodes, 3))
-
-        app_forces = np.zeros((num_nodes, 3))
-        app_moment = np.zeros((num_nodes, 3))
-
-        forces_constraints_nodes = np.zeros((num_nodes, 3))
-        moments_constraints_nodes = np.zeros((num_nodes, 3))
-
         if self.data.structure.timestep_info[it].in_global_AFoR:
             tstep = self.data.structure.timestep_info[it]
         else:
@@ -207,50 +229,76 @@ class BeamPlot(BaseSolver):
             else:
                 raise AttributeError('Only scalar and 3-vector types supported in beamplot')
 
-        for i_node in range(num_nodes):
-            i_elem = self.data.structure.node_master_elem[i_node, 0]
-            i_local_node = self.data.structure.node_master_elem[i_node, 1]
-            node_id[i_node] = i_node
-
-            v1 = np.array([1., 0, 0])
-            v2 = np.array([0., 1, 0])
-            v3 = np.array([0., 0, 1])
-            cab = algebra.crv2rotation(
-                tstep.psi[i_elem, i_local_node, :])
-            local_x[i_node, :] = np.dot(aero2inertial, np.dot(cab, v1))
-            local_y[i_node, :] = np.dot(aero2inertial, np.dot(cab, v2))
-            local_z[i_node, :] = np.dot(aero2inertial, np.dot(cab, v3))
-
-            if i_local_node == 2:
-                coords_a_cell[i_elem, :] = tstep.pos[i_node, :]
-            coords_a[i_node, :] = tstep.pos[i_node, :]
-
-            # applied forces
-            cab = algebra.crv2rotation(tstep.psi[i_elem, i_local_node, :])
-            app_forces[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  tstep.steady_applied_forces[i_node, 0:3]+
-                                                  tstep.unsteady_applied_forces[i_node, 0:3]))
-            app_moment[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  tstep.steady_applied_forces[i_node, 3:6]+
-                                                  tstep.unsteady_applied_forces[i_node, 3:6]))
-            forces_constraints_nodes[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  tstep.forces_constraints_nodes[i_node, 0:3]))
-            moments_constraints_nodes[i_node, :] = np.dot(aero2inertial,
-                                           np.dot(cab,
-                                                  tstep.forces_constraints_nodes[i_node, 3:6]))
-
-            if with_gravity:
-                gravity_forces_g[i_node, 0:3] = np.dot(aero2inertial,
-                                                     gravity_forces[i_node, 0:3])
-                gravity_forces_g[i_node, 3:6] = np.dot(aero2inertial,
-                                                     gravity_forces[i_node, 3:6])
-
-        for i_elem in range(num_elem):
-            conn[i_elem, :] = self.data.structure.elements[i_elem].reordered_global_connectivities
-            elem_id[i_elem] = i_elem
+        node_id = np.arange(num_nodes)
+        elem_id = np.arange(num_elem)
+        i_elem = self.data.structure.node_master_elem[:, 0]
+        i_local_node = self.data.structure.node_master_elem[:, 1]
+
+        # local frame of each node projected in G
+        cab = algebra.crv2rotation_vec(tstep.psi[i_elem, i_local_node, :])
+        cgb = np.einsum('ij,njk->nik', aero2inertial, cab)
+        local_x = cgb[:, :, 0]
+        local_y = cgb[:, :, 1]
+        local_z = cgb[:, :, 2]
+
+        coords_a = tstep.pos.copy()
+        coords_a_cell = np.zeros((num_elem, 3))
+        mid_nodes = i_local_node == 2
+        coords_a_cell[i_elem[mid_nodes], :] = tstep.pos[mid_nodes, :]
+
+        # applied forces
+        applied_forces = tstep.steady_applied_forces + tstep.unsteady_applied_forces
+        app_forces = np.einsum('nij,nj->ni', cgb, applied_forces[:, 0:3])
+        app_moment = np.einsum('nij,nj->ni', cgb, applied_forces[:, 3:6])
+        forces_constraints_nodes = np.einsum('nij,nj->ni', cgb, tstep.forces_constraints_nodes[:, 0:3])
+        moments_constraints_nodes = np.einsum('nij,nj->ni', cgb, tstep.forces_constraints_nodes[:, 3:6])
+
+        if with_gravity:
+            gravity_forces_g[:, 0:3] = gravity_forces[:, 0:3].dot(aero2inertial.T)
+            gravity_forces_g[:, 3:6] = gravity_forces[:, 3:6].dot(aero2inertial.T)
+
+        if self.conn is None:
+            self.conn = np.array([elem.reordered_global_connectivities for elem in self.data.structure.elements],
+                                 dtype=int)
+        conn = self.conn
+
+        if self.time_series is not None:
+            cell_data = [('elem_id', elem_id)]
+            if with_postproc_cell:
+                for k in postproc_cell_vector:
+                    cell_data.append((k + '_cell', tstep.postproc_cell[k]))
+                for k in postproc_cell_6vector:
+                    for i in range(0, 2):
+                        cell_data.append((k + '_' + str(i) + '_cell', tstep.postproc_cell[k][:, 3*i:3*(i+1)]))
+            cell_data.append(('coords_a_elem', coords_a_cell))
+
+            point_data = [('node_id', node_id),
+                          ('local_x', local_x),
+                          ('local_y', local_y),
+                          ('local_z', local_z),
+                          ('coords_a', coords_a)]
+            if self.settings['include_applied_forces']:
+                point_data.append(('app_forces', app_forces))
+                point_data.append(('forces_constraints_nodes', forces_constraints_nodes))
+                if with_gravity:
+                    point_data.append(('gravity_forces', gravity_forces_g[:, 0:3]))
+            if self.settings['include_applied_moments']:
+                point_data.append(('app_moments', app_moment))
+                point_data.append(('moments_constraints_nodes', moments_constraints_nodes))
+                if with_gravity:
+                    point_data.append(('gravity_moments', gravity_forces_g[:, 3:6]))
+            if with_postproc_node:
+                for k in postproc_node_vector:
+                    point_data.append((k + '_point', tstep.postproc_node[k]))
+                for k in postproc_node_6vector:
+                    for i in range(0, 2):
+                        point_data.append((k + '_' + str(i) + '_point', tstep.postproc_node[k][:, 3*i:3*(i+1)]))
+
+            self.time_series.add_step('beam', it, coords, conn, 'line',
+                                      point_data=point_data,
+                                      cell_data=cell_data,
+                                      topology_key='beam')
+            return
 
         ug = tvtk.UnstructuredGrid(points=coords)
         ug.set_cells(tvtk.Line().cell_type, conn)
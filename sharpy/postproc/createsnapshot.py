@@ -1,75 +1,86 @@
 import os
 import pickle
+import concurrent.futures
 
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
+import sharpy.utils.snapshot as snapshot
+
 
-"""CreateSnapshot Solver documentation.
-
-CreateSnapshot stores all the necessary data to restart a simulation
-when the execution has been halted.
-
-The *.snapshot.<ts> file contains the current version of the self.data structure.
-The data structure is packaged with pickle (https://docs.python.org/3/library/pickle.html), and
-it is totally seamless to extract it. The current usage of this is to call this as an inline post processor.
-For example, the DynamicCoupled settings would look like:
-    {
-    'postprocessors': ['BeamLoads', '...', 'CreateSnapshot'],
-    'postprocessors_settings': {'BeamLoads': {},
-                                'CreateSnapshot': {}}
-    }
-
-It has been tested with DynamicCoupled when no settings are modified.
-
-In order to restart the simulation, one has to do:
-{
-    sharpy <path to the solver.txt> -r <path to the snapshot>
-}
-It is important to note that the flow setting has to be modified so that
-the previously run solvers are not re-run. For example, a standard simulation would have a flow such that:
-{
-flow = [
-        'BeamLoader',
-        'AerogridLoader',
-        'StaticCoupled',
-        'BeamLoads',
-        'AerogridPlot',
-        'BeamPlot',
-        'DynamicCoupled',
-        ]
-}
-Before restarting the solution, we need to comment everything up to DynamicCoupled (not included).
-DynamicCoupled will restart at the last stored timestep.
-
-Todo:
-    * No tests have been conducted about modifying the settings (for example number of time steps, or
-    relaxation factors...)
-    * No other solvers have been tested yet.
-"""
 @solver
 class CreateSnapshot(BaseSolver):
+    """
+    CreateSnapshot stores the data needed to restart a simulation when the execution has been halted.
+
+    It is meant to be run as an online postprocessor, for example with the ``DynamicCoupled`` settings::
+
+        {'postprocessors': ['BeamLoads', '...', 'CreateSnapshot'],
+         'postprocessors_settings': {'BeamLoads': {},
+                                     'CreateSnapshot': {}}}
+
+    By default (``format = 'h5'``) the snapshots are compact HDF5 files that contain only the last ``n_steps``
+    aerodynamic and structural time steps, the state of the controllers and runtime generators, and a hash of the
+    settings. See :mod:`sharpy.utils.snapshot`. They are written in a background thread while the simulation carries
+    on. The loaders rebuild the rest of the model when restarting, so the flow needs to keep ``BeamLoader`` and
+    ``AerogridLoader`` and remove the other solvers that were run before the one that created the snapshot::
+
+        flow = ['BeamLoader', 'AerogridLoader', 'DynamicCoupled']
+
+    With ``format = 'pickle'`` the whole ``data`` structure is pickled instead, as in previous versions, and the flow
+    needs to include only the solvers from ``DynamicCoupled`` on.
+
+    In both cases the simulation is restarted with::
+
+        sharpy <path to the .sharpy file> -r <path to the snapshot>
+
+    and ``DynamicCoupled`` carries on from the last stored time step.
+    """
     solver_id = 'CreateSnapshot'
+    solver_classification = 'post-processor'
 
-    def __init__(self):
-        self.settings_types = dict()
-        self.settings_default = dict()
+    settings_types = dict()
+    settings_default = dict()
+    settings_description = dict()
+    settings_options = dict()
+
+    settings_types['frequency'] = 'int'
+    settings_default['frequency'] = 5
+    settings_description['frequency'] = 'Number of time steps between snapshots'
+
+    settings_types['keep'] = 'int'
+    settings_default['keep'] = 2
+    settings_description['keep'] = 'Number of snapshots kept in the folder. ``0`` keeps all of them'
 
-        self.settings_types['frequency'] = 'int'
-        self.settings_default['frequency'] = 5
+    settings_types['format'] = 'str'
+    settings_default['format'] = 'h5'
+    settings_description['format'] = 'Snapshot format: compact ``h5`` restart files or ``pickle`` of the whole data'
+    settings_options['format'] = ['h5', 'pickle']
 
-        self.settings_types['keep'] = 'int'
-        self.settings_default['keep'] = 2
+    settings_types['n_steps'] = 'int'
+    settings_default['n_steps'] = 3
+    settings_description['n_steps'] = 'Number of most recent time steps stored in the ``h5`` snapshots'
 
-        self.settings_types['compression'] = 'str'
-        self.settings_default['compression'] = ''
-        # TODO not yet implemented
+    settings_types['compression'] = 'str'
+    settings_default['compression'] = ''
+    settings_description['compression'] = 'HDF5 compression filter of the ``h5`` snapshots'
+    settings_options['compression'] = ['gzip', 'lzf']
 
-        self.settings_types['folder'] = 'str'
-        self.settings_default['folder'] = './snapshots/'
+    settings_types['asynchronous'] = 'bool'
+    settings_default['asynchronous'] = True
+    settings_description['asynchronous'] = 'Write the ``h5`` snapshots in a background thread'
 
-        self.settings_types['symlink'] = 'bool'
-        self.settings_default['symlink'] = True
+    settings_types['folder'] = 'str'
+    settings_default['folder'] = './snapshots/'
+    settings_description['folder'] = 'Output folder'
 
+    settings_types['symlink'] = 'bool'
+    settings_default['symlink'] = True
+    settings_description['symlink'] = 'Keep a link named after the case pointing to the latest snapshot'
+
+    settings_table = settings.SettingsTable()
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
+
+    def __init__(self):
         self.settings = None
         self.data = None
         self.ts = None
@@ -77,13 +88,17 @@ class CreateSnapshot(BaseSolver):
         self.filename = None
         self.caller = None
 
+        self.executor = None
+        self.pending_write = None
+
     def initialise(self, data, custom_settings=None, caller=None):
         self.data = data
         if custom_settings is None:
             self.settings = data.settings[self.solver_id]
         else:
             self.settings = custom_settings
-        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default,
+                                 options=self.settings_options)
 
         # create folder for containing files if necessary
         if not os.path.exists(self.settings['folder']):
@@ -93,47 +108,102 @@ class CreateSnapshot(BaseSolver):
         self.filename = (self.settings['folder'] + '/' +
                          self.data.settings['SHARPy']['case'] +
                          '.snapshot')
+        if self.settings['format'] == 'h5':
+            self.filename += '.h5'
         self.caller = caller
 
+        if self.settings['format'] == 'h5' and self.settings['asynchronous']:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
     def snap_name(self, ts=None):
         if ts is None:
             ts = self.ts
+        if self.settings['format'] == 'h5':
+            return "%s.%06d.h5" % (self.filename[:-3], ts)
         return "%s.%06d" % (self.filename, ts)
 
     def run(self, online=True):
         self.ts = self.data.ts
         if self.ts % self.settings['frequency'].value == 0:
-            # clean older files
-            if self.settings['keep'].value:
-                self.delete_previous_snapshots()
-
-            # create file
             file = self.snap_name()
-            with open(file, 'wb') as f:
-                pickle.dump(self.data, f, protocol=pickle.HIGHEST_PROTOCOL)
-
-            # update symlink
-            if self.settings['symlink']:
-                try:
-                    os.unlink(self.filename)
-                except FileNotFoundError:
-                    pass
-                os.symlink(os.path.abspath(file), self.filename)
+            if self.settings['format'] == 'pickle':
+                self.delete_previous_snapshots()
+                with open(file, 'wb') as f:
+                    pickle.dump(self.data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                self.update_symlink(file)
+            else:
+                contents = snapshot.collect(self.data, self.settings['n_steps'].value, self.solver_state())
+                if self.executor is None:
+                    self.write_snapshot(file, contents)
+                else:
+                    # at most one snapshot is held in memory waiting to be written
+                    self.wait()
+                    self.pending_write = self.executor.submit(self.write_snapshot, file, contents)
 
         return self.data
 
+    def write_snapshot(self, file, contents):
+        self.delete_previous_snapshots()
+        compression = self.settings['compression'] if self.settings['compression'] else None
+        snapshot.write_state(file, contents, compression)
+        self.update_symlink(file)
+
+    def solver_state(self):
+        """
+        Returns:
+            dict: Controllers and runtime generators of the calling solver, to be stored in the snapshot
+        """
+        state = dict()
+        for controller_id, controller in getattr(self.caller, 'controllers', dict()).items():
+            state['controllers/' + controller_id] = controller
+        for generator_id, generator in getattr(self.caller, 'runtime_generators', dict()).items():
+            state['runtime_generators/' + generator_id] = generator
+        return state
+
+    def update_symlink(self, file):
+        if self.settings['symlink']:
+            try:
+                os.unlink(self.filename)
+            except FileNotFoundError:
+                pass
+            os.symlink(os.path.abspath(file), self.filename)
+
+    def wait(self):
+        """
+        Waits for the snapshot being written in the background, if any
+        """
+        if self.pending_write is not None:
+            self.pending_write.result()
+            self.pending_write = None
+
+    def shutdown(self):
+        """
+        Finishes writing the last snapshot
+        """
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
     def delete_previous_snapshots(self):
+        if not self.settings['keep'].value:
+            return
         n_keep = self.settings['keep'].value - 1
 
         # get list of files in directory
         files = [f for f in os.listdir(self.settings['folder'])
-                 if os.path.isfile(os.path.join(self.settings['folder'], f))]
+                 if os.path.isfile(os.path.join(self.settings['folder'], f)) and
+                 not os.path.islink(os.path.join(self.settings['folder'], f))]
 
         # arrange by name
         files.sort()
 
-        # make sure the symlink is kept (so out of the list)
-        files = [a for a in files if '.snapshot.' in a]
+        # snapshots of this case and format only, and not being written
+        prefix = os.path.basename(self.data.settings['SHARPy']['case'] + '.snapshot.')
+        is_h5 = self.settings['format'] == 'h5'
+        files = [a for a in files if a.startswith(prefix) and a.endswith('.h5') == is_h5 and not a.endswith('.tmp')]
 
         if len(files) <= n_keep:
             return
@@ -1,31 +1,54 @@
 import os
 
 import numpy as np
-from tvtk.api import tvtk, write_data
 
-import sharpy.utils.algebra as algebra
 import sharpy.utils.cout_utils as cout
-from sharpy.utils.settings import str2bool
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
-from sharpy.utils.datastructures import init_matrix_structure, standalone_ctypes_pointer
-import sharpy.aero.utils.uvlmlib as uvlmlib
 
 
 @solver
 class LiftDistribution(BaseSolver):
+    """
+    Calculates the sectional aerodynamic forces along the span.
+
+    The steady and unsteady forces on the vertices of each spanwise section of the lifting surfaces are added up and
+    projected onto the ``A`` frame of reference, then assigned to the structural node each section is attached to.
+    The result is stored in ``postproc_node['lift_distribution']`` of the structural time step info (and can
+    therefore be visualised with ``BeamPlot``) and can be written to a text file with a row per time step and node
+    containing ``ts, i_node, fx_a, fy_a, fz_a``.
+    """
     solver_id = 'LiftDistribution'
+    solver_classification = 'post-processor'
 
-    def __init__(self):
-        self.settings_types = dict()
-        self.settings_default = dict()
+    settings_types = dict()
+    settings_default = dict()
+    settings_description = dict()
+
+    settings_types['print_info'] = 'bool'
+    settings_default['print_info'] = True
+    settings_description['print_info'] = 'Print info to screen'
+
+    settings_types['normalise'] = 'bool'
+    settings_default['normalise'] = True
+    settings_description['normalise'] = 'Divide the sectional forces by the root chord of the first surface'
 
-        self.settings_types['print_info'] = 'bool'
-        self.settings_default['print_info'] = True
+    settings_types['folder'] = 'str'
+    settings_default['folder'] = './output'
+    settings_description['folder'] = 'Output folder location'
 
-        self.settings_types['normalise'] = 'bool'
-        self.settings_default['normalise'] = True
+    settings_types['write_text_file'] = 'bool'
+    settings_default['write_text_file'] = False
+    settings_description['write_text_file'] = 'Write ``txt`` file with the sectional forces of all the time steps'
 
+    settings_types['text_file_name'] = 'str'
+    settings_default['text_file_name'] = 'liftdistribution.txt'
+    settings_description['text_file_name'] = 'Text file name'
+
+    settings_table = settings.SettingsTable()
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+
+    def __init__(self):
         self.settings = None
         self.data = None
 
@@ -45,39 +68,66 @@ class LiftDistribution(BaseSolver):
 
     def run(self, online=False):
         if not online:
-            for self.ts in range(self.ts_max):
-                self.lift_distribution()
+            time_steps = [ts for ts in range(self.ts_max) if self.data.structure.timestep_info[ts] is not None]
+            sectional_forces = self.lift_distribution(time_steps)
+            if self.settings['write_text_file']:
+                self.file_output(time_steps, sectional_forces)
             cout.cout_wrap('...Finished', 1)
         else:
             self.ts = len(self.data.structure.timestep_info) - 1
-            self.lift_distribution()
+            self.lift_distribution([self.ts])
         return self.data
 
-    def lift_distribution(self):
-        # add entry to dictionary for postproc
-        if self.data.structure.timestep_info[self.data.ts].in_global_AFoR:
-            tstep = self.data.structure.timestep_info[self.data.ts]
-        else:
-            tstep = self.data.structure.timestep_info[self.data.ts].copy()
-            tstep.whole_structure_to_global_AFoR(self.data.structure)
-        tstep.postproc_cell['lift_distribution'] = init_matrix_structure(dimensions=tstep.dimensions,
-                                                                           with_dim_dimension=False)
-
-        norm = 1.0
-
-        for i_surf in range(tstep.n_surf):
-            n_dim, n_m, n_n = tstep.zeta[i_surf].shape
-
-            forces = tstep.forces[i_surf] + tstep.unsteady_forces[i_surf]
-            abs_forces = np.zeros((n_m, n_n))
-            chord = np.zeros((n_n,))
-            for i_n in range(n_n):
-                chord[i_n] = np.abs(tstep[i_surf].zeta[:, -1, i_n] - tstep[i_surf].zeta[:, 0, i_n])
-                if not i_surf and not i_n:
-                    if self.settings['normalise']:
-                        norm = chord[0]
-
-                for i_m in range(n_m):
-                    abs_forces[i_n, i_m] = np.abs(forces[:, i_m, i_n])
-
-                tstep.postproc_cell['lift_distribution'][i_surf][i_n, i_m] = np.sum(abs_forces[i_n, :], axis = 2)/norm
+    def lift_distribution(self, time_steps):
+        """
+        Calculates the sectional forces at the given time steps and stores them in the structural time step info.
+
+        Args:
+            time_steps (list(int)): Time steps
+
+        Returns:
+            np.ndarray: Sectional forces in ``A`` at each structural node ``[n_steps x num_node x 3]``
+        """
+        aero_tsteps = [self.data.aero.timestep_info[ts] for ts in time_steps]
+        struct_tsteps = [self.data.structure.timestep_info[ts] for ts in time_steps]
+
+        cga = np.array([tstep.cga() for tstep in struct_tsteps])
+
+        norm = np.ones((len(time_steps),))
+        if self.settings['normalise']:
+            root_le_te = np.array([tstep.zeta[0][:, -1, 0] - tstep.zeta[0][:, 0, 0] for tstep in aero_tsteps])
+            norm = np.linalg.norm(root_le_te, axis=1)
+
+        sectional_forces = np.zeros((len(time_steps), self.data.structure.num_node, 3))
+        for i_surf in range(aero_tsteps[0].n_surf):
+            # sum over the chordwise vertices [n_steps x (N + 1) x 3]
+            forces_g = np.array([(tstep.forces[i_surf][0:3] + tstep.dynamic_forces[i_surf][0:3]).sum(axis=1).T
+                                 for tstep in aero_tsteps])
+            forces_a = np.einsum('tji,tnj->tni', cga, forces_g)/norm[:, None, None]
+
+            struct_nodes = np.array(self.data.aero.aero2struct_mapping[i_surf][:forces_a.shape[1]], dtype=int)
+            np.add.at(sectional_forces, (slice(None), struct_nodes), forces_a)
+
+        for i_step, tstep in enumerate(struct_tsteps):
+            tstep.postproc_node['lift_distribution'] = sectional_forces[i_step]
+
+        if self.settings['print_info']:
+            cout.cout_wrap('Total sectional force in A at time step %u: ' % time_steps[-1] +
+                           str(sectional_forces[-1].sum(axis=0)*norm[-1]), 1)
+
+        return sectional_forces
+
+    def file_output(self, time_steps, sectional_forces):
+        folder = self.settings['folder'] + '/' + self.data.settings['SHARPy']['case'] + '/forces/'
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        n_steps, num_node, _ = sectional_forces.shape
+        output = np.column_stack((np.repeat(time_steps, num_node),
+                                  np.tile(np.arange(num_node), n_steps),
+                                  sectional_forces.reshape((-1, 3))))
+        np.savetxt(folder + self.settings['text_file_name'],
+                   output,
+                   fmt='%i, %i' + ', %10e'*3,
+                   header='tstep, i_node, fx_a, fy_a, fz_a',
+                   comments='#')
@@ -5,6 +5,7 @@ from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.generator_interface as gen_interface
 import sharpy.utils.settings as settings
 import sharpy.aero.utils.uvlmlib as uvlmlib
+import sharpy.utils.parallel_utils as parallel_utils
 import ctypes as ct
 from sharpy.utils.constants import vortex_radius_def
 
@@ -55,6 +56,12 @@ class PlotFlowField(BaseSolver):
     settings_default['stride'] = 1
     settings_description['stride'] = 'Number of time steps between plots.'
 
+    settings_types['max_points_per_call'] = 'int'
+    settings_default['max_points_per_call'] = 100000
+    settings_description['max_points_per_call'] = 'Maximum number of grid points whose induced velocity is computed ' \
+                                                  'in a single call to the UVLM library, to bound memory usage. ' \
+                                                  'All points at once if ``0``.'
+
     settings_types['num_cores'] = 'int'
     settings_default['num_cores'] = 1
     settings_description['num_cores'] = 'Number of cores to use.'
@@ -63,6 +70,11 @@ class PlotFlowField(BaseSolver):
     settings_default['vortex_radius'] = vortex_radius_def
     settings_description['vortex_radius'] = 'Distance below which inductions are not computed.'
 
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes among which the time steps are distributed when ' \
+                                            'run offline.'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
@@ -117,25 +129,22 @@ class PlotFlowField(BaseSolver):
         array_counter = 0
         u_ind = np.zeros((nx, ny, nz, 3), dtype=float)
         if self.settings['include_induced']:
-            target_triads = np.zeros((nx*ny*nz, 3))
-            ipoint = -1
-            for iz in range(nz):
-                for ix in range(nx):
-                    for iy in range(ny):
-                        ipoint += 1
-                        target_triads[ipoint, :] = grid[iz][:, ix, iy].astype(dtype=ct.c_double, order='F', copy=True)
-
-            u_ind_points = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(self.data.aero.timestep_info[ts],
-                                                                                                      target_triads,
-                                                                                                      self.settings['vortex_radius'],
-                                                                                                      self.data.structure.timestep_info[ts].for_pos[0:3],
-                                                                                                      self.settings['num_cores'])
-            ipoint = -1
-            for iz in range(nz):
-                for ix in range(nx):
-                    for iy in range(ny):
-                        ipoint += 1
-                        u_ind[ix, iy, iz, :] = u_ind_points[ipoint, :]
+            # points ordered by z, x and y
+            target_triads = np.concatenate([grid_z.reshape((3, -1)).T for grid_z in grid]).astype(dtype=ct.c_double)
+
+            u_ind_points = np.zeros_like(target_triads)
+            chunk_size = self.settings['max_points_per_call'].value
+            if chunk_size <= 0:
+                chunk_size = target_triads.shape[0]
+            for i_start in range(0, target_triads.shape[0], chunk_size):
+                chunk = slice(i_start, i_start + chunk_size)
+                u_ind_points[chunk, :] = uvlmlib.uvlm_calculate_total_induced_velocity_at_points(
+                    self.data.aero.timestep_info[ts],
+                    np.ascontiguousarray(target_triads[chunk, :]),
+                    self.settings['vortex_radius'],
+                    self.data.structure.timestep_info[ts].for_pos[0:3],
+                    self.settings['num_cores'])
+            u_ind = u_ind_points.reshape((nz, nx, ny, 3)).transpose((1, 2, 0, 3))
 
             # Write the data
             vtk_info.point_data.add_array(u_ind.reshape((-1, u_ind.shape[-1]), order='F')) # Reshape the array except from the last dimension
@@ -157,10 +166,7 @@ class PlotFlowField(BaseSolver):
                                               'dt': self.settings['dt'].value,
                                               'for_pos': 0*self.data.structure.timestep_info[ts].for_pos},
                                              u_ext)
-            for iz in range(nz):
-                for ix in range(nx):
-                    for iy in range(ny):
-                        u_ext_out[ix, iy, iz, :] += u_ext[iz][:, ix, iy]
+            u_ext_out += np.array(u_ext).transpose((2, 3, 0, 1))
 
             # Write the data
             vtk_info.point_data.add_array(u_ext_out.reshape((-1, u_ext_out.shape[-1]), order='F')) # Reshape the array except from the last dimension
@@ -185,7 +191,7 @@ class PlotFlowField(BaseSolver):
             if divmod(self.data.ts, self.settings['stride'].value)[1] == 0:
                 self.output_velocity_field(len(self.data.structure.timestep_info) - 1)
         else:
-            for ts in range(0, len(self.data.structure.timestep_info)):
-                if not self.data.structure.timestep_info[ts] is None:
-                    self.output_velocity_field(ts)
+            time_steps = [ts for ts in range(0, len(self.data.structure.timestep_info), self.settings['stride'].value)
+                          if not self.data.structure.timestep_info[ts] is None]
+            parallel_utils.map_time_steps(self.output_velocity_field, time_steps, self.settings['num_processes'].value)
         return self.data
@@ -4,6 +4,7 @@ from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
 from sharpy.utils.datastructures import init_matrix_structure, standalone_ctypes_pointer
 import sharpy.aero.utils.uvlmlib as uvlmlib
+import sharpy.utils.parallel_utils as parallel_utils
 
 
 @solver
@@ -43,6 +44,11 @@ class StallCheck(BaseSolver):
     settings_default['output_degrees'] = False
     settings_description['output_degrees'] = 'Output incidence angles in degrees vs radians'
 
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes among which the time steps are distributed when ' \
+                                            'run offline'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
 
@@ -67,14 +73,30 @@ class StallCheck(BaseSolver):
 
     def run(self, online=False):
         if not online:
-            for self.ts in range(self.ts_max):
-                self.check_stall()
+            incidence_angles = parallel_utils.map_time_steps(self.check_stall_step, range(self.ts_max),
+                                                             self.settings['num_processes'].value)
+            for ts, incidence_angle in enumerate(incidence_angles):
+                tstep = self.data.aero.timestep_info[ts]
+                tstep.postproc_cell['incidence_angle'] = incidence_angle
+                tstep.postproc_cell['incidence_angle_ct_list'], tstep.postproc_cell['incidence_angle_ct_pointer'] = \
+                    standalone_ctypes_pointer(incidence_angle)
             cout.cout_wrap('...Finished', 1)
         else:
             self.ts = len(self.data.structure.timestep_info) - 1
             self.check_stall()
         return self.data
 
+    def check_stall_step(self, ts):
+        """
+        Checks the stall at time step ``ts``
+
+        Returns:
+            list(np.ndarray): Incidence angle of the panels of each surface
+        """
+        self.ts = ts
+        self.check_stall()
+        return self.data.aero.timestep_info[ts].postproc_cell['incidence_angle']
+
     def check_stall(self):
         # add entry to dictionary for postproc
         tstep = self.data.aero.timestep_info[self.ts]
@@ -98,14 +120,15 @@ class StallCheck(BaseSolver):
         for i_surf in range(tstep.n_surf):
             added_panels.append([])
 
+        mapping_tables = self.data.aero.mapping_tables
         for i_elem in range(self.data.structure.num_elem):
             for i_local_node in range(self.data.structure.num_node_elem):
                 airfoil_id = self.data.aero.aero_dict['airfoil_distribution'][i_elem, i_local_node]
                 if self.settings['airfoil_stall_angles']:
                     i_global_node = self.data.structure.connectivities[i_elem, i_local_node]
-                    for i_dict in self.data.aero.struct2aero_mapping[i_global_node]:
-                        i_surf = i_dict['i_surf']
-                        i_n = i_dict['i_n']
+                    for i_entry in mapping_tables.node_entries(i_global_node):
+                        i_surf = mapping_tables.surf[i_entry]
+                        i_n = mapping_tables.i_n[i_entry]
 
                         if i_n in added_panels[i_surf]:
                             continue
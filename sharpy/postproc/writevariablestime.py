@@ -1,4 +1,5 @@
 import os
+import h5py
 import numpy as np
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
@@ -13,6 +14,10 @@ class WriteVariablesTime(BaseSolver):
 
     It is a postprocessor that outputs the value of variables with time onto a text file.
 
+    The values are accumulated in memory and appended to the output files every ``buffer_size`` time steps and when the
+    solver calling the postprocessor finishes. Alternatively, all variables can be stored in a single HDF5 file
+    (``output_format = 'h5'``) that can be converted to the text files with :func:`export_dat`.
+
     Attributes:
         settings_types (dict): Acceptable data types of the input data
         settings_default (dict): Default values for input data should the user not provide them
@@ -96,13 +101,26 @@ class WriteVariablesTime(BaseSolver):
     settings_default['vel_field_points'] = np.array([0., 0., 0.])
     settings_description['vel_field_points'] = 'List of coordinates of the control points as x1, y1, z1, x2, y2, z2 ...'
 
+    settings_types['buffer_size'] = 'int'
+    settings_default['buffer_size'] = 100
+    settings_description['buffer_size'] = 'Number of time steps kept in memory before they are written to the output ' \
+                                          'files. Set to 1 to write every time step'
+
+    settings_types['output_format'] = 'str'
+    settings_default['output_format'] = 'dat'
+    settings_description['output_format'] = 'Output format. ``dat`` writes a text file per variable and ``h5`` writes ' \
+                                            'all variables to ``WriteVariablesTime.h5``'
+    settings_options = dict()
+    settings_options['output_format'] = ['dat', 'h5']
+
     settings_table = settings.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
         self.settings = None
         self.data = None
         self.dir = 'output/'
+        self.buffer = None
 
         self.n_velocity_field_points = None
         self.velocity_field_points = None
@@ -115,7 +133,7 @@ class WriteVariablesTime(BaseSolver):
             self.settings = data.settings[self.solver_id]
         else:
             self.settings = custom_settings
-        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default, self.settings_options)
 
         self.dir = self.settings['folder'] + '/' + self.data.settings['SHARPy']['case'] + '/WriteVariablesTime/'
         if not os.path.isdir(self.dir):
@@ -136,6 +154,13 @@ class WriteVariablesTime(BaseSolver):
                 for ipoint in range(self.n_vel_field_points):
                     self.vel_field_points[0][:, ipoint, 0] = self.settings['vel_field_points'][ipoint*3:(ipoint + 1)*3]
 
+        self.buffer = OutputBuffer(self.dir,
+                                   self.settings['delimiter'],
+                                   self.settings['buffer_size'].value,
+                                   self.settings['output_format'])
+        if self.settings['cleanup_old_solution']:
+            self.buffer.remove_h5()
+
         # Initialise files with headers and clean them if required
         for ivariable in range(len(self.settings['FoR_variables'])):
             for ifor in range(len(self.settings['FoR_number'])):
@@ -182,10 +207,8 @@ class WriteVariablesTime(BaseSolver):
                 if self.settings['cleanup_old_solution']:
                     if os.path.isfile(filename):
                         os.remove(filename)
-                if not os.path.isfile(filename):
-                    fid = open(filename, 'w')
-                    fid.write(("#t[s]%suext_x[m/s]%suext_y[m/s]%suext_z[m/s]\n" % ((self.settings['delimiter'],)*3)))
-                    fid.close()
+                self.buffer.set_header(filename,
+                                       "#t[s]%suext_x[m/s]%suext_y[m/s]%suext_z[m/s]" % ((self.settings['delimiter'],)*3))
 
         # Initialise velocity generator
         self.caller = caller
@@ -205,9 +228,16 @@ class WriteVariablesTime(BaseSolver):
             for it in range(len(self.data.structure.timestep_info)):
                 if self.data.structure.timestep_info[it] is not None:
                     self.data = self.write(it)
+            self.buffer.flush()
 
         return self.data
 
+    def shutdown(self):
+        """
+        Writes the values remaining in memory to the output files
+        """
+        self.buffer.flush()
+
     def write(self, it):
 
         # FoR variables
@@ -228,17 +258,16 @@ class WriteVariablesTime(BaseSolver):
             for ifor in range(len(self.settings['FoR_number'])):
                 filename = self.dir + "FoR_" + '%02d' % self.settings['FoR_number'][ifor] + "_" + self.settings['FoR_variables'][ivariable] + ".dat"
 
-                with open(filename, 'a') as fid:
-                    var = np.atleast_2d(getattr(tstep, self.settings['FoR_variables'][ivariable]))
-                    rows, cols = var.shape
-                    if ((cols == 1) and (rows == 1)):
-                        self.write_value_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-                    elif ((cols > 1) and (rows == 1)):
-                        self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
-                    elif ((cols == 1) and (rows >= 1)):
-                        self.write_value_to_file(fid, self.data.ts, var[ifor], self.settings['delimiter'])
-                    else:
-                        self.write_nparray_to_file(fid, self.data.ts, var[ifor,:], self.settings['delimiter'])
+                var = np.atleast_2d(getattr(tstep, self.settings['FoR_variables'][ivariable]))
+                rows, cols = var.shape
+                if ((cols == 1) and (rows == 1)):
+                    self.buffer.append(filename, self.data.ts, var, scalar=True)
+                elif ((cols > 1) and (rows == 1)):
+                    self.buffer.append(filename, self.data.ts, var)
+                elif ((cols == 1) and (rows >= 1)):
+                    self.buffer.append(filename, self.data.ts, var[ifor], scalar=True)
+                else:
+                    self.buffer.append(filename, self.data.ts, var[ifor,:])
 
         # Structure variables at nodes
         for ivariable in range(len(self.settings['structure_variables'])):
@@ -249,19 +278,17 @@ class WriteVariablesTime(BaseSolver):
             if num_indices == 1:
                 # Beam global variables (i.e. not node dependant)
                 filename = self.dir + "struct_" + self.settings['structure_variables'][ivariable] + ".dat"
-                with open(filename, 'a') as fid:
-                    self.write_nparray_to_file(fid, self.data.ts, var, self.settings['delimiter'])
+                self.buffer.append(filename, self.data.ts, var)
 
             else:  # These variables have nodal values (i.e the number of indices is either 2 or 3)
                 for inode in range(len(self.settings['structure_nodes'])):
                     node = self.settings['structure_nodes'][inode]
                     filename = self.dir + "struct_" + self.settings['structure_variables'][ivariable] + "_node" + str(node) + ".dat"
-                    with open(filename, 'a') as fid:
-                        if num_indices == 2:
-                            self.write_nparray_to_file(fid, self.data.ts, var[node,:], self.settings['delimiter'])
-                        elif num_indices == 3:
-                            ielem, inode_in_elem = self.data.structure.node_master_elem[node]
-                            self.write_nparray_to_file(fid, self.data.ts, var[ielem,inode_in_elem,:], self.settings['delimiter'])
+                    if num_indices == 2:
+                        self.buffer.append(filename, self.data.ts, var[node,:])
+                    elif num_indices == 3:
+                        ielem, inode_in_elem = self.data.structure.node_master_elem[node]
+                        self.buffer.append(filename, self.data.ts, var[ielem,inode_in_elem,:])
 
 
         # Aerodynamic variables at panels
@@ -275,9 +302,8 @@ class WriteVariablesTime(BaseSolver):
 
                 filename = self.dir + "aero_" + self.settings['aero_panels_variables'][ivariable] + "_panel" + "_isurf" + str(i_surf) + "_im"+ str(i_m) + "_in"+ str(i_n) + ".dat"
 
-                with open(filename, 'a') as fid:
-                    var = getattr(self.data.aero.timestep_info[it], self.settings['aero_panels_variables'][ivariable])
-                    self.write_value_to_file(fid, self.data.ts, var.gamma[i_surf][i_m,i_n], self.settings['delimiter'])
+                var = getattr(self.data.aero.timestep_info[it], self.settings['aero_panels_variables'][ivariable])
+                self.buffer.append(filename, self.data.ts, var.gamma[i_surf][i_m,i_n], scalar=True)
 
 
         # Aerodynamic variables at nodes
@@ -291,9 +317,8 @@ class WriteVariablesTime(BaseSolver):
 
                 filename = self.dir + "aero_" + self.settings['aero_nodes_variables'][ivariable] + "_node" + "_isurf" + str(i_surf) + "_im"+ str(i_m) + "_in"+ str(i_n) + ".dat"
 
-                with open(filename, 'a') as fid:
-                    var = getattr(self.data.aero.timestep_info[it], self.settings['aero_nodes_variables'][ivariable])
-                    self.write_nparray_to_file(fid, self.data.ts, var[i_surf][:,i_m,i_n], self.settings['delimiter'])
+                var = getattr(self.data.aero.timestep_info[it], self.settings['aero_nodes_variables'][ivariable])
+                self.buffer.append(filename, self.data.ts, var[i_surf][:,i_m,i_n])
 
         # Velocity field variables at points
         for ivariable in range(len(self.settings['vel_field_variables'])):
@@ -307,8 +332,9 @@ class WriteVariablesTime(BaseSolver):
                                     uext)
                 for ipoint in range(self.n_vel_field_points):
                     filename = self.dir + "vel_field_" + self.settings['vel_field_variables'][ivariable] + "_point" + str(ipoint) + ".dat"
-                    with open(filename, 'a') as fid:
-                        self.write_nparray_to_file(fid, self.data.ts, uext[0][:,ipoint,0], self.settings['delimiter'])
+                    self.buffer.append(filename, self.data.ts, uext[0][:,ipoint,0])
+
+        self.buffer.step()
 
         return self.data
 
@@ -328,3 +354,158 @@ class WriteVariablesTime(BaseSolver):
     def write_value_to_file(self, fid, ts, value, delimiter):
 
         fid.write("%d%s%e\n" % (ts,delimiter,value))
+
+
+class OutputBuffer(object):
+    """
+    Keeps the rows written by :class:`WriteVariablesTime` in memory and appends them to the output in blocks.
+
+    Each output channel (one per ``.dat`` file) stores its rows, consisting of the time step number followed by the
+    values, in a preallocated array of ``buffer_size`` rows. All channels are flushed together every ``buffer_size``
+    calls to :meth:`step` and when :meth:`flush` is called.
+
+    Args:
+        folder (str): Output directory
+        delimiter (str): Delimiter of the text files
+        buffer_size (int): Number of time steps kept in memory
+        output_format (str): ``dat`` for one text file per channel or ``h5`` for a single HDF5 file
+    """
+
+    h5_name = 'WriteVariablesTime.h5'
+
+    def __init__(self, folder, delimiter, buffer_size=1, output_format='dat'):
+        self.folder = folder
+        self.delimiter = delimiter
+        self.buffer_size = max(buffer_size, 1)
+        self.output_format = output_format
+
+        self.channels = dict()
+        self.headers = dict()
+        self.n_steps = 0
+
+    @property
+    def h5_filename(self):
+        return self.folder + self.h5_name
+
+    def remove_h5(self):
+        if os.path.isfile(self.h5_filename):
+            os.remove(self.h5_filename)
+
+    def set_header(self, filename, header):
+        """
+        Sets the first line of the channel. In ``dat`` format it is written straight away if the file does not exist.
+        """
+        self.headers[filename] = header
+        if self.output_format == 'dat' and not os.path.isfile(filename):
+            with open(filename, 'w') as fid:
+                fid.write(header + '\n')
+
+    def append(self, filename, ts, values, scalar=False):
+        """
+        Adds a row to the channel ``filename``.
+
+        Args:
+            filename (str): Name of the ``.dat`` file of the channel
+            ts (int): Time step number
+            values (np.ndarray or float): Values to write
+            scalar (bool): Format of a row with a single value as per ``write_value_to_file`` (no trailing delimiter)
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        try:
+            channel = self.channels[filename]
+        except KeyError:
+            channel = {'rows': np.zeros((self.buffer_size, 1 + values.size)),
+                       'count': 0,
+                       'scalar': scalar,
+                       'fmt': row_format(values.size, self.delimiter, scalar)}
+            self.channels[filename] = channel
+
+        if channel['count'] == channel['rows'].shape[0]:
+            # more rows than time steps, i.e. several writes in the same step
+            channel['rows'] = np.concatenate((channel['rows'], np.zeros_like(channel['rows'])))
+        channel['rows'][channel['count'], 0] = ts
+        channel['rows'][channel['count'], 1:] = values
+        channel['count'] += 1
+
+    def step(self):
+        """
+        Marks the end of a time step and flushes the channels if the buffer is full
+        """
+        self.n_steps += 1
+        if self.n_steps >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all the rows in memory to the output and empties the buffer
+        """
+        if self.output_format == 'h5':
+            self.flush_h5()
+        else:
+            for filename, channel in self.channels.items():
+                if channel['count'] == 0:
+                    continue
+                with open(filename, 'a') as fid:
+                    np.savetxt(fid, channel['rows'][:channel['count']], fmt=channel['fmt'])
+                channel['count'] = 0
+        self.n_steps = 0
+
+    def flush_h5(self):
+        with h5py.File(self.h5_filename, 'a') as h5file:
+            for filename, channel in self.channels.items():
+                if channel['count'] == 0:
+                    continue
+                name = os.path.splitext(os.path.basename(filename))[0]
+                rows = channel['rows'][:channel['count']]
+                try:
+                    dataset = h5file[name]
+                except KeyError:
+                    dataset = h5file.create_dataset(name, shape=(0, rows.shape[1]), maxshape=(None, rows.shape[1]),
+                                                    chunks=(self.buffer_size, rows.shape[1]), dtype=float)
+                    dataset.attrs['scalar'] = channel['scalar']
+                    dataset.attrs['header'] = self.headers.get(filename, '')
+                n_rows = dataset.shape[0]
+                dataset.resize(n_rows + rows.shape[0], axis=0)
+                dataset[n_rows:, :] = rows
+                channel['count'] = 0
+
+
+def row_format(n_values, delimiter, scalar=False):
+    """
+    Format string of a row of the ``WriteVariablesTime`` text files: the time step number followed by the values.
+    """
+    if scalar and n_values == 1:
+        return '%d' + delimiter + '%e'
+    return '%d' + delimiter + ('%e' + delimiter) * n_values
+
+
+def export_dat(h5_filename, folder=None, delimiter=' '):
+    """
+    Exports the channels stored by :class:`WriteVariablesTime` in HDF5 format to the usual ``.dat`` text files.
+
+    Args:
+        h5_filename (str): Path to ``WriteVariablesTime.h5``
+        folder (str (optional)): Destination folder. Defaults to the folder of the HDF5 file
+        delimiter (str): Delimiter of the text files
+
+    Returns:
+        list(str): Names of the files written
+    """
+    if folder is None:
+        folder = os.path.dirname(os.path.abspath(h5_filename))
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    written_files = []
+    with h5py.File(h5_filename, 'r') as h5file:
+        for name, dataset in h5file.items():
+            filename = os.path.join(folder, name + '.dat')
+            rows = dataset[()]
+            header = dataset.attrs.get('header', '')
+            with open(filename, 'w') as fid:
+                if header:
+                    fid.write(header + '\n')
+                np.savetxt(fid, rows, fmt=row_format(rows.shape[1] - 1, delimiter, dataset.attrs['scalar']))
+            written_files.append(filename)
+
+    return written_files
@@ -5,6 +5,7 @@ import sharpy.utils.cout_utils as cout
 from sharpy.utils.solver_interface import solver, dict_of_solvers
 import sharpy.utils.settings as settings
 import sharpy.utils.exceptions as exceptions
+import sharpy.utils.snapshot as snapshot
 
 
 @solver
@@ -66,6 +67,18 @@ class PreSharpy(object):
     settings_description['save_settings'] = 'Save a copy of the settings to a ``.sharpy`` file in the output ' \
                                             'directory specified in ``log_folder``.'
 
+    settings_types['profiling'] = 'bool'
+    settings_default['profiling'] = False
+    settings_description['profiling'] = 'Time the phases of the solvers and count the FSI iterations and calls to ' \
+                                        'the compiled libraries. The records are written to ' \
+                                        '``<log_folder>/<case>.profiling.json`` and ``.csv``. ' \
+                                        'See :mod:`sharpy.utils.profiling`'
+
+    settings_types['profiling_memory'] = 'bool'
+    settings_default['profiling_memory'] = False
+    settings_description['profiling_memory'] = 'Record as well the memory allocated in each of the profiled phases. ' \
+                                               'Slows down the simulation'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description,
                                        header_line='The following are the settings that the PreSharpy class takes:')
@@ -77,6 +90,8 @@ class PreSharpy(object):
             self._settings = False
 
         self.ts = 0
+        # state of the solvers read from a restart snapshot
+        self.restart_state = dict()
 
         self.settings_types['log_file'] = 'str'
         self.settings_default['log_file'] = 'log'
@@ -94,6 +109,7 @@ class PreSharpy(object):
 
             self.case_route = in_settings['SHARPy']['route'] + '/'
             self.case_name = in_settings['SHARPy']['case']
+            self.settings_hash = snapshot.settings_hash(self.settings)
             for solver_name in in_settings['SHARPy']['flow']:
                 try:
                     dict_of_solvers[solver_name]
@@ -118,6 +134,7 @@ class PreSharpy(object):
 
         self.case_route = self.settings['SHARPy']['route'] + '/'
         self.case_name = self.settings['SHARPy']['case']
+        self.settings_hash = snapshot.settings_hash(self.settings)
 
     def save_settings(self):
         """
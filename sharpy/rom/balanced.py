@@ -10,6 +10,8 @@ The main class is :class:`.Balanced` and the other available classes:
 
 * :class:`.FrequencyLimited`
 
+* :class:`.LowRank`
+
 correspond to the reduction algorithm.
 
 """
@@ -20,6 +22,7 @@ import sharpy.utils.cout_utils as cout
 import sharpy.utils.rom_interface as rom_interface
 import sharpy.rom.utils.librom as librom
 import sharpy.linear.src.libss as libss
+import sharpy.linear.src.libsparse as libsp
 import time
 
 dict_of_balancing_roms = dict()
@@ -290,13 +293,84 @@ class Iterative(BaseBalancedRom):
                                                        tolSVD=self.settings['tolSVD'])
 
         Ar = Tinv.dot(A.dot(T))
-        Br = Tinv.dot(B)
+        Br = libsp.dot(Tinv, B)
         Cr = C.dot(T)
 
         ssrom = libss.ss(Ar, Br, Cr, D, dt=ss.dt)
         return ssrom
 
 
+@bal_rom
+class LowRank(BaseBalancedRom):
+    __doc__ = librom.balreal_lowrank.__doc__
+    _bal_rom_id = 'LowRank'
+
+    settings_types = dict()
+    settings_default = dict()
+    settings_description = dict()
+
+    settings_types['poles'] = 'list(float)'
+    settings_default['poles'] = []
+    settings_description['poles'] = 'Poles of the rational Krylov subspaces of the Lyapunov solution. Use ``inf`` ' \
+                                    'for polynomial Krylov steps. If empty, ``[inf, 1]`` for discrete time and ' \
+                                    '``[0]`` for continuous time systems'
+
+    settings_types['lyapunov_tol'] = 'float'
+    settings_default['lyapunov_tol'] = 1e-8
+    settings_description['lyapunov_tol'] = 'Relative tolerance in the residual of the Lyapunov equations'
+
+    settings_types['max_iter'] = 'int'
+    settings_default['max_iter'] = 100
+    settings_description['max_iter'] = 'Maximum number of Krylov blocks of each Gramian factor'
+
+    settings_types['tolSVD'] = 'float'
+    settings_default['tolSVD'] = 1e-6
+    settings_description['tolSVD'] = 'Hankel singular values threshold, relative to the largest one'
+
+    settings_types['rom_size'] = 'int'
+    settings_default['rom_size'] = 0
+    settings_description['rom_size'] = 'Number of states of the ROM. If ``0``, given by ``tolSVD``'
+
+    settings_table = settings.SettingsTable()
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+
+    def __init__(self):
+        self.settings = dict()
+
+    def initialise(self, in_settings=None):
+        if in_settings is not None:
+            self.settings = in_settings
+
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default,
+                                 no_ctype=True)
+
+    def run(self, ss):
+        if self.print_info:
+            cout.cout_wrap('Reducing system using low-rank balancing...')
+        t0 = time.time()
+        A, B, C, D = ss.get_mats()
+        dtsystem = ss.dt is not None
+
+        poles = list(self.settings['poles']) if len(self.settings['poles']) else None
+        rom_size = self.settings['rom_size'] if self.settings['rom_size'] else None
+        s, T, Tinv = librom.balreal_lowrank(A, B, C,
+                                            dlti=dtsystem,
+                                            poles=poles,
+                                            tol=self.settings['lyapunov_tol'],
+                                            max_iter=self.settings['max_iter'],
+                                            tolSVD=self.settings['tolSVD'],
+                                            rom_size=rom_size)
+
+        Ar = Tinv.dot(libsp.dot(A, T))
+        Br = libsp.dot(Tinv, B)
+        Cr = libsp.dot(C, T)
+
+        if self.print_info:
+            cout.cout_wrap('\t...completed balancing in %.2fs. ROM of %d states' % (time.time() - t0, T.shape[1]), 1)
+
+        return libss.ss(Ar, Br, Cr, D, dt=ss.dt)
+
+
 @rom_interface.rom
 class Balanced(rom_interface.BaseRom):
     """Balancing ROM methods
@@ -311,6 +385,8 @@ class Balanced(rom_interface.BaseRom):
 
         * Frequency limited balancing :class:`.FrequencyLimited`
 
+        * Low-rank balancing of large sparse systems :class:`.LowRank`
+
     """
     rom_id = 'Balanced'
 
@@ -326,7 +402,7 @@ class Balanced(rom_interface.BaseRom):
     settings_types['algorithm'] = 'str'
     settings_default['algorithm'] = ''
     settings_description['algorithm'] = 'Balanced realisation method'
-    settings_options['algorithm'] = ['Direct', 'Iterative', 'FrequencyLimited']
+    settings_options['algorithm'] = ['Direct', 'Iterative', 'FrequencyLimited', 'LowRank']
 
     settings_types['algorithm_settings'] = 'dict'
     settings_default['algorithm_settings'] = dict()
@@ -9,6 +9,7 @@ import sharpy.utils.cout_utils as cout
 import sharpy.utils.rom_interface as rom_interface
 import sharpy.utils.h5utils as h5
 import sharpy.rom.utils.krylovutils as krylovutils
+import sharpy.utils.parallel_utils as parallel_utils
 import warnings as warn
 
 
@@ -87,6 +88,12 @@ class Krylov(rom_interface.BaseRom):
     settings_default['restart_arnoldi'] = False
     settings_description['restart_arnoldi'] = 'Restart Arnoldi iteration with r-=1 if ROM is unstable'
 
+    settings_types['num_processes'] = 'int'
+    settings_default['num_processes'] = 1
+    settings_description['num_processes'] = 'Number of processes building the Krylov spaces of the different ' \
+                                            'interpolation points in parallel, in the ``dual_rational_arnoldi`` and ' \
+                                            '``mimo_rational_arnoldi`` algorithms'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
@@ -211,7 +218,7 @@ class Krylov(rom_interface.BaseRom):
         if self.frequency.dtype == complex:
             cout.cout_wrap(self.nfreq * '\t\tsigma = %4f + %4fj [rad/s]\n' %tuple(self.frequency.view(float)), 1)
         else:
-            cout.cout_wrap(self.nfreq * '\t\tsigma = %4f [rad/s]\n' % self.frequency, 1)
+            cout.cout_wrap(self.nfreq * '\t\tsigma = %4f [rad/s]\n' % tuple(self.frequency), 1)
         cout.cout_wrap('\tKrylov order:')
         cout.cout_wrap('\t\tr = %d' % self.r, 1)
 
@@ -535,39 +542,39 @@ class Krylov(rom_interface.BaseRom):
         V = np.zeros((nx, rom_dim), dtype=complex)
         W = np.zeros((nx, rom_dim), dtype=complex)
 
-        we = 0
-        dict_of_luas = dict()
-        for i in range(len(fc)):
-            sigma = fc[i]
+        # each interpolation point is factorised once for both sides, and the points are dealt with in parallel
+        points = list(dict.fromkeys(list(fc) + list(fo)))
+
+        def point_spaces(i_point):
+            sigma = points[i_point]
             if sigma == np.inf:
                 approx_type = 'partial_realisation'
                 lu_A = A
             else:
                 approx_type = 'Pade'
-                try:
-                    lu_A = dict_of_luas[sigma]
-                except KeyError:
-                    lu_A = krylovutils.lu_factor(sigma, A)
-                    dict_of_luas[sigma] = lu_A
-            V[:, we:we+rc[i]] = krylovutils.construct_krylov(rc[i], lu_A, B.dot(right_tangent[:, i:i+1]), approx_type, 'b')
+                lu_A = krylovutils.lu_factor(sigma, A)
+            v_blocks = {i: krylovutils.construct_krylov(rc[i], lu_A, B.dot(right_tangent[:, i:i+1]), approx_type, 'b')
+                        for i in range(len(fc)) if fc[i] == sigma}
+            w_blocks = {i: krylovutils.construct_krylov(ro[i], lu_A, C.T.dot(left_tangent[:, i:i+1]), approx_type, 'c')
+                        for i in range(len(fo)) if fo[i] == sigma}
+            return v_blocks, w_blocks
+
+        v_blocks = dict()
+        w_blocks = dict()
+        for v_point, w_point in parallel_utils.map_time_steps(point_spaces, range(len(points)),
+                                                              num_processes=self.settings['num_processes'].value,
+                                                              chunks_per_process=1):
+            v_blocks.update(v_point)
+            w_blocks.update(w_point)
 
+        we = 0
+        for i in range(len(fc)):
+            V[:, we:we+rc[i]] = v_blocks[i]
             we += rc[i]
 
         we = 0
         for i in range(len(fo)):
-            sigma = fo[i]
-            if sigma == np.inf:
-                approx_type = 'partial_realisation'
-                lu_A = A
-            else:
-                approx_type = 'Pade'
-                try:
-                    lu_A = dict_of_luas[sigma]
-                except KeyError:
-                    lu_A = krylovutils.lu_factor(sigma, A)
-                    dict_of_luas[sigma] = lu_A
-            W[:, we:we+ro[i]] = krylovutils.construct_krylov(ro[i], lu_A, C.T.dot(left_tangent[:, i:i+1]), approx_type, 'c')
-
+            W[:, we:we+ro[i]] = w_blocks[i]
             we += ro[i]
 
         T = W.T.dot(V)
@@ -581,8 +588,6 @@ class Krylov(rom_interface.BaseRom):
         Br = W.T.dot(self.ss.B)
         Cr = self.ss.C.dot(V.dot(Tinv))
 
-        del dict_of_luas
-
         self.cpu_summary['algorithm'] = time.time() - t0
 
         return Ar, Br, Cr
@@ -636,28 +641,26 @@ class Krylov(rom_interface.BaseRom):
             r_c = r
             r_o = r
 
+        build_controllability = self.settings['single_side'] == 'controllability' or self.settings['single_side'] == ''
+        build_observability = self.settings['single_side'] == 'observability' or self.settings['single_side'] == ''
+        if build_controllability:
+            cout.cout_wrap('\tConstructing controllability space', 1)
+        if build_observability:
+            cout.cout_wrap('\tConstructing observability space', 1)
+        v_spaces, w_spaces = krylovutils.build_multipoint_krylov_spaces(
+            frequency, self.ss.A,
+            b=self.ss.B if build_controllability else None,
+            c=self.ss.C if build_observability else None,
+            r_c=r_c, r_o=r_o,
+            num_processes=self.settings['num_processes'].value)
+
+        # single orthogonalisation of the spaces of all the interpolation points
         V = None
         W = None
-
-        for i in range(self.nfreq):
-
-            if self.settings['single_side'] == 'controllability' or self.settings['single_side'] == '':
-                cout.cout_wrap('\tConstructing controllability space', 1)
-                if i == 0:
-                    V = krylovutils.build_krylov_space(frequency[i], r_c, side='b', a=self.ss.A, b=self.ss.B)
-                else:
-                    Vi = krylovutils.build_krylov_space(frequency[i], r_c, side='b', a=self.ss.A, b=self.ss.B)
-                    V = np.hstack((V, Vi))
-                    V = krylovutils.mgs_ortho(V)
-
-            if self.settings['single_side'] == 'observability' or self.settings['single_side'] == '':
-                cout.cout_wrap('\tConstructing observability space', 1)
-                if i == 0:
-                    W = krylovutils.build_krylov_space(frequency[i], r_o, side='c', a=self.ss.A, b=self.ss.C.T)
-                else:
-                    Wi = krylovutils.build_krylov_space(frequency[i], r_o, side='c', a=self.ss.A, b=self.ss.C.T)
-                    W = np.hstack((W, Wi))
-                    W = krylovutils.mgs_ortho(W)
+        if build_controllability:
+            V = v_spaces[0] if self.nfreq == 1 else krylovutils.mgs_ortho(np.hstack(v_spaces))
+        if build_observability:
+            W = w_spaces[0] if self.nfreq == 1 else krylovutils.mgs_ortho(np.hstack(w_spaces))
 
         if self.settings['single_side'] == 'controllability' or self.settings['single_side'] == 'observability':
             if self.settings['single_side'] == 'observability':
@@ -4,6 +4,7 @@ import numpy as np
 import scipy.linalg as sclalg
 import sharpy.linear.src.libsparse as libsp
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.parallel_utils as parallel_utils
 
 
 def block_arnoldi_krylov(r, F, G, approx_type='Pade', side='controllability'):
@@ -345,14 +346,29 @@ def construct_mimo_krylov(r, lu_A_input, B, approx_type='Pade', side='controllab
     return V[:, :t]
 
 
-def build_krylov_space(frequency, r, side, a, b):
+def build_krylov_space(frequency, r, side, a, b, lu_a=None):
+    r"""
+    Krylov space about a single interpolation point.
+
+    Args:
+        frequency (complex): Interpolation point
+        r (int): Krylov space order
+        side (str): ``b`` for the controllability or ``c`` for the observability space
+        a (np.ndarray or csc_matrix): Dynamics matrix
+        b (np.ndarray): Input matrix, or transposed output matrix for the observability space
+        lu_a (tuple or SuperLU): LU factorisation of :math:`\sigma\mathbf{I} - \mathbf{A}`, if already
+            available. Computed otherwise
 
+    Returns:
+        np.ndarray: Orthonormal basis of the Krylov space
+    """
     if frequency == np.inf or frequency.real == np.inf:
         approx_type = 'partial_realisation'
         lu_a = a
     else:
         approx_type = 'Pade'
-        lu_a = lu_factor(frequency, a)
+        if lu_a is None:
+            lu_a = lu_factor(frequency, a)
 
     try:
         nu = b.shape[1]
@@ -369,6 +385,49 @@ def build_krylov_space(frequency, r, side, a, b):
     return v
 
 
+def build_multipoint_krylov_spaces(frequency, a, b=None, c=None, r_c=1, r_o=1, num_processes=1):
+    r"""
+    Controllability and observability Krylov spaces about each of the interpolation points.
+
+    A single LU factorisation of :math:`\sigma_i\mathbf{I} - \mathbf{A}` is computed for each interpolation point
+    and used for both spaces. The interpolation points are distributed among ``num_processes`` forked processes (see
+    :mod:`sharpy.utils.parallel_utils`), each of them dealing with one interpolation point at a time, such that the
+    factorisations are carried out concurrently and the system matrices are shared by the processes without copies.
+
+    The spaces of different interpolation points are not orthogonalised against each other.
+
+    Args:
+        frequency (np.ndarray): Interpolation points
+        a (np.ndarray or csc_matrix): Dynamics matrix
+        b (np.ndarray): Input matrix. The controllability spaces are not built if ``None``
+        c (np.ndarray): Output matrix. The observability spaces are not built if ``None``
+        r_c (int): Order of the controllability spaces
+        r_o (int): Order of the observability spaces
+        num_processes (int): Number of processes
+
+    Returns:
+        tuple: Lists of the controllability and observability spaces about each interpolation point (``None`` if not
+        built)
+    """
+    def point_spaces(i_point):
+        sigma = frequency[i_point]
+        lu_a = None
+        if not (sigma == np.inf or sigma.real == np.inf):
+            lu_a = lu_factor(sigma, a)
+
+        v = None
+        w = None
+        if b is not None:
+            v = build_krylov_space(sigma, r_c, 'b', a, b, lu_a=lu_a)
+        if c is not None:
+            w = build_krylov_space(sigma, r_o, 'c', a, c.T, lu_a=lu_a)
+        return v, w
+
+    spaces = parallel_utils.map_time_steps(point_spaces, range(len(frequency)), num_processes=num_processes,
+                                           chunks_per_process=1)
+    return [v for v, _ in spaces], [w for _, w in spaces]
+
+
 def evec(j):
     """j-th unit vector (in row format)
 
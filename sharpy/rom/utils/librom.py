@@ -6,6 +6,8 @@ S. Maraniello, 14 Feb 2018
 import warnings
 import numpy as np
 import scipy.linalg as scalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 
 # from IPython import embed
 import sharpy.linear.src.libsparse as libsp
@@ -688,6 +690,222 @@ def low_rank_smith(A, Q, tol=1e-10, Square=True, tolSVD=1e-12, tolAbs=False,
 
 ### utilities for balfreq
 
+def _shifted_lu(A, sigma):
+    """
+    LU factorisation of :math:`\\mathbf{A} - \\sigma\\mathbf{I}`, sparse if ``A`` is sparse
+    """
+    n = A.shape[0]
+    if sp.issparse(A):
+        return spla.splu(sp.csc_matrix(A - sigma * sp.identity(n, format='csc')))
+    else:
+        return scalg.lu_factor(A - sigma * np.eye(n))
+
+
+def _shifted_solve(lu, b, trans=False):
+    if isinstance(lu, spla.SuperLU):
+        return lu.solve(b, trans='T' if trans else 'N')
+    else:
+        return scalg.lu_solve(lu, b, trans=int(trans))
+
+
+def _orthonormal_block(w, V, tol=1e-12):
+    """
+    Orthogonalises the columns of ``w`` against the orthonormal columns of ``V`` (twice, for numerical stability) and
+    returns an orthonormal basis of the remainder, discarding the directions already contained in ``V``.
+    """
+    for _ in range(2):
+        if V is not None:
+            w = w - V.dot(V.T.dot(w))
+    q, r = scalg.qr(w, mode='economic')
+    diag = np.abs(np.diag(r))
+    if diag.size == 0:
+        return q[:, :0]
+    return q[:, diag > tol * max(diag.max(), 1.)]
+
+
+def _projected_lyapunov_residual(A, Z, Q, dlti):
+    """
+    Frobenius norm of the residual of the Lyapunov (or Stein) equation for ``X = Z Z.T``, computed in factored form
+    with a thin QR decomposition, without assembling any ``n x n`` matrix.
+    """
+    AZ = A.dot(Z)
+    if dlti:
+        # A X A.T - X + Q Q.T
+        factors = np.hstack((AZ, Z, Q))
+        k = Z.shape[1]
+        signs = np.concatenate((np.ones(k), -np.ones(k), np.ones(Q.shape[1])))
+        r = scalg.qr(factors, mode='economic')[1]
+        return np.linalg.norm((r * signs).dot(r.T))
+    else:
+        # A X + X A.T + Q Q.T
+        factors = np.hstack((AZ, Z, Q))
+        k = Z.shape[1]
+        r = scalg.qr(factors, mode='economic')[1]
+        core = np.zeros((factors.shape[1], factors.shape[1]))
+        core[:k, k:2 * k] = np.eye(k)
+        core[k:2 * k, :k] = np.eye(k)
+        core[2 * k:, 2 * k:] = np.eye(Q.shape[1])
+        return np.linalg.norm(r.dot(core).dot(r.T))
+
+
+def low_rank_lyapunov(A, Q, dlti=True, poles=None, tol=1e-8, max_iter=100, transpose=False, lu_factors=None,
+                      Print=False):
+    r"""
+    Low-rank solution of large sparse Lyapunov equations by rational Krylov subspace projection.
+
+    Solves the Stein equation (``dlti=True``)
+
+    .. math:: \mathbf{AXA}^\top - \mathbf{X} + \mathbf{QQ}^\top = \mathbf{0}
+
+    or the continuous Lyapunov equation
+
+    .. math:: \mathbf{AX} + \mathbf{XA}^\top + \mathbf{QQ}^\top = \mathbf{0}
+
+    with ``A`` replaced by its transpose if ``transpose=True`` (i.e. for the observability Gramian with
+    ``Q = C.T``). The solution is returned in factored form :math:`\mathbf{X}\approx\mathbf{ZZ}^\top`.
+
+    An orthonormal basis :math:`\mathbf{V}` of the block rational Krylov subspace of ``A`` and ``Q`` is built,
+    cycling through the given ``poles``: a pole at infinity multiplies the last block by ``A`` and a finite pole
+    :math:`\sigma` solves :math:`(\mathbf{A} - \sigma\mathbf{I})\mathbf{w} = \mathbf{v}` with a sparse LU
+    factorisation computed once per pole. After each block the equation is projected onto :math:`\mathbf{V}` and the
+    small dense equation solved, until the relative residual is below ``tol``.
+
+    Only ``A`` products and solves with the factorised shifted matrices are performed, such that ``A`` is never
+    densified and the memory required is that of the sparse factors plus :math:`\mathcal{O}(nk)` for a basis of
+    :math:`k` columns.
+
+    Args:
+        A (np.ndarray or scipy.sparse matrix): State matrix
+        Q (np.ndarray): Factor of the constant term, ``B`` or ``C.T``
+        dlti (bool): Discrete time system (Stein equation)
+        poles (list(float)): Poles of the rational Krylov subspace. ``np.inf`` corresponds to a polynomial Krylov
+            step. Defaults to ``[np.inf, 1.]`` for discrete time systems, where the pole at 1 captures the slow
+            dynamics, and ``[0.]`` (extended Krylov) for continuous time systems
+        tol (float): Tolerance in the residual relative to :math:`||\mathbf{QQ}^\top||_F`
+        max_iter (int): Maximum number of blocks
+        transpose (bool): Solve the equation for ``A.T``
+        lu_factors (dict): Factorisations of the shifted matrices by pole, reused and updated, such that the same
+            factors serve for the controllability and observability Gramians
+        Print (bool): Print the convergence history
+
+    Returns:
+        np.ndarray: Low-rank factor ``Z``
+    """
+    if poles is None:
+        poles = [np.inf, 1.] if dlti else [0.]
+    if lu_factors is None:
+        lu_factors = dict()
+    A_op = A.T if transpose else A
+
+    Q = np.asarray(Q, dtype=float)
+    if Q.ndim == 1:
+        Q = Q.reshape((-1, 1))
+    norm_q = np.linalg.norm(Q.T.dot(Q))
+
+    V = _orthonormal_block(Q, None)
+    block = V
+    AV = A_op.dot(V)
+    Z = None
+    if Print:
+        print('Iter\tRank\tRes')
+    for kk in range(max_iter):
+        # projected equation
+        Ar = V.T.dot(AV)
+        Qr = V.T.dot(Q)
+        if dlti:
+            Xr = scalg.solve_discrete_lyapunov(Ar, Qr.dot(Qr.T))
+        else:
+            Xr = scalg.solve_continuous_lyapunov(Ar, -Qr.dot(Qr.T))
+        # factor of the positive semi-definite projected solution
+        eigs, vecs = np.linalg.eigh(0.5 * (Xr + Xr.T))
+        positive = eigs > eigs.max() * 1e-14
+        Z = V.dot(vecs[:, positive] * np.sqrt(eigs[positive]))
+
+        residual = _projected_lyapunov_residual(A_op, Z, Q, dlti) / norm_q
+        if Print:
+            print('%.3d\t%.5d\t%.3e' % (kk, V.shape[1], residual))
+        if residual < tol:
+            break
+
+        # next block
+        pole = poles[kk % len(poles)]
+        if pole == np.inf:
+            w = A_op.dot(block)
+        else:
+            try:
+                lu = lu_factors[pole]
+            except KeyError:
+                lu = _shifted_lu(A, pole)
+                lu_factors[pole] = lu
+            w = _shifted_solve(lu, block, trans=transpose)
+        block = _orthonormal_block(w, V)
+        if block.shape[1] == 0:
+            # invariant subspace found
+            break
+        V = np.hstack((V, block))
+        AV = np.hstack((AV, A_op.dot(block)))
+    else:
+        warnings.warn('Low-rank Lyapunov solution did not converge to the tolerance %.1e after %d iterations. '
+                      'Relative residual: %.3e' % (tol, max_iter, residual))
+
+    return Z
+
+
+def balreal_lowrank(A, B, C, dlti=True, poles=None, tol=1e-8, max_iter=100, tolSVD=1e-6, rom_size=None,
+                    Print=False):
+    r"""
+    Balanced realisation of large sparse systems from low-rank factors of the Gramians.
+
+    The controllability and observability Gramians are approximated by :math:`\mathbf{Z}_c\mathbf{Z}_c^\top` and
+    :math:`\mathbf{Z}_o\mathbf{Z}_o^\top` with :func:`low_rank_lyapunov`, reusing the sparse factorisations of the
+    shifted state matrix for both. The square root method then gives the balancing transformations from the SVD of
+    the small matrix
+
+    .. math:: \mathbf{Z}_o^\top\mathbf{Z}_c = \mathbf{U\Sigma V}^\top
+
+    as :math:`\mathbf{T} = \mathbf{Z}_c\mathbf{V}\mathbf{\Sigma}^{-1/2}` and
+    :math:`\mathbf{T}^{-1} = \mathbf{\Sigma}^{-1/2}\mathbf{U}^\top\mathbf{Z}_o^\top`, truncated to the Hankel singular
+    values above ``tolSVD`` (relative to the largest) or to ``rom_size`` states. Neither the Gramians nor the full
+    transformations are ever formed, such that the memory remains linear in the number of states.
+
+    The reduced system is :math:`(\mathbf{T}^{-1}\mathbf{AT}, \mathbf{T}^{-1}\mathbf{B}, \mathbf{CT})`.
+
+    Args:
+        A (np.ndarray or scipy.sparse matrix): State matrix
+        B (np.ndarray): Input matrix
+        C (np.ndarray): Output matrix
+        dlti (bool): Discrete time system
+        poles (list(float)): Poles of the rational Krylov subspaces. See :func:`low_rank_lyapunov`
+        tol (float): Relative tolerance of the Lyapunov equations residual
+        max_iter (int): Maximum number of Krylov blocks for each Gramian
+        tolSVD (float): Relative threshold of the Hankel singular values kept
+        rom_size (int): Number of states kept. Overrides ``tolSVD`` if given
+        Print (bool): Print the convergence history
+
+    Returns:
+        tuple: Hankel singular values, ``T`` and ``Tinv``
+    """
+    lu_factors = dict()
+    Zc = low_rank_lyapunov(A, libsp.dense(B), dlti=dlti, poles=poles, tol=tol, max_iter=max_iter,
+                           lu_factors=lu_factors, Print=Print)
+    Zo = low_rank_lyapunov(A, libsp.dense(C).T, dlti=dlti, poles=poles, tol=tol, max_iter=max_iter,
+                           transpose=True, lu_factors=lu_factors, Print=Print)
+    del lu_factors
+
+    U, s, Vh = scalg.svd(Zo.T.dot(Zc), full_matrices=False)
+    if rom_size is None:
+        rom_size = np.sum(s > tolSVD * s[0])
+    rom_size = min(rom_size, len(s))
+    U = U[:, :rom_size]
+    Vh = Vh[:rom_size, :]
+
+    sinv = s[:rom_size] ** (-0.5)
+    T = Zc.dot(Vh.T * sinv)
+    Tinv = (U * sinv).T.dot(Zo.T)
+
+    return s, T, Tinv
+
+
 def get_trapz_weights(k0, kend, Nk, knyq=False):
     """
     Returns uniform frequency grid (kv of length Nk) and weights (wv) for
@@ -28,14 +28,14 @@ def main(args=None, sharpy_input_dict=None):
     import argparse
 
     import sharpy.utils.input_arg as input_arg
-    import sharpy.utils.solver_interface as solver_interface
+    import sharpy.utils.profiling as profiling
+    import sharpy.utils.snapshot as snapshot
     from sharpy.presharpy.presharpy import PreSharpy
     from sharpy.utils.cout_utils import start_writer, finish_writer
     import logging
     import os
 
-    import h5py
-    import sharpy.utils.h5utils as h5utils
+    import sharpy.structure.utils.dynamicinput as dynamicinput
 
     # Loading solvers and postprocessors
     import sharpy.solvers
@@ -82,9 +82,14 @@ def main(args=None, sharpy_input_dict=None):
         if args.input_filename == '':
             parser.error('input_filename is a required argument of SHARPy.')
         settings = input_arg.read_settings(args)
+        restart_snapshot = None
         if args.restart is None:
             # run preSHARPy
             data = PreSharpy(settings)
+        elif snapshot.is_snapshot(args.restart):
+            # compact snapshot, applied once the loaders have built the model
+            data = PreSharpy(settings)
+            restart_snapshot = args.restart
         else:
             try:
                 with open(args.restart, 'rb') as restart_file:
@@ -101,16 +106,24 @@ def main(args=None, sharpy_input_dict=None):
             data.structure.dynamic_input = []
             dyn_file_name = data.case_route + '/' + data.case_name + '.dyn.h5'
             if os.path.isfile(dyn_file_name):
-                fid = h5py.File(dyn_file_name, 'r')
-                data.structure.dyn_dict = h5utils.load_h5_in_dict(fid)
+                data.structure.dyn_dict = dynamicinput.DynFile(dyn_file_name)
             # for it in range(self.num_steps):
             #     data.structure.dynamic_input.append(dict())
 
-        # Loop for the solvers specified in *.sharpy['SHARPy']['flow']
-        for solver_name in settings['SHARPy']['flow']:
-            solver = solver_interface.initialise_solver(solver_name)
-            solver.initialise(data)
-            data = solver.run()
+        if data.settings['SHARPy']['profiling']:
+            profiling.enable(trace_memory=data.settings['SHARPy']['profiling_memory'])
+
+        try:
+            # Loop for the solvers specified in *.sharpy['SHARPy']['flow']
+            data = run_flow(data, settings['SHARPy']['flow'], restart_snapshot)
+        finally:
+            # the records up to the failure are also written if a solver raises
+            if profiling.is_enabled():
+                profiling_file = os.path.abspath(os.path.join(data.settings['SHARPy']['log_folder'],
+                                                              data.settings['SHARPy']['case'] + '.profiling'))
+                profiling.write(profiling_file)
+                profiling.disable()
+                cout.cout_wrap('Profiling records written to {}.json'.format(profiling_file), 2)
 
         cpu_time = time.process_time() - t
         wall_time = time.perf_counter() - t0_wall
@@ -137,3 +150,32 @@ def main(args=None, sharpy_input_dict=None):
         raise e
 
     return data
+
+
+def run_flow(data, flow, restart_snapshot=None):
+    """
+    Runs the given solvers in order
+
+    Args:
+        data (sharpy.presharpy.presharpy.PreSharpy): Case data, with the settings of the solvers
+        flow (list(str)): Solvers to run
+        restart_snapshot (str): Compact snapshot applied after the loaders in ``flow``
+
+    Returns:
+        sharpy.presharpy.presharpy.PreSharpy: Case data after running the solvers
+    """
+    import sharpy.utils.profiling as profiling
+    import sharpy.utils.snapshot as snapshot
+    import sharpy.utils.solver_interface as solver_interface
+
+    for solver_name in flow:
+        with profiling.timer(solver_name):
+            solver = solver_interface.initialise_solver(solver_name)
+            if restart_snapshot is not None and getattr(solver, 'solver_classification', '') != 'loader':
+                data = snapshot.restore(data, restart_snapshot)
+                restart_snapshot = None
+            with profiling.timer('initialise'):
+                solver.initialise(data)
+            data = solver.run()
+
+    return data
@@ -3,6 +3,7 @@ import numpy as np
 
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.structure.models.beam as beam
+import sharpy.structure.utils.dynamicinput as dynamicinput
 import sharpy.utils.settings as settings
 import sharpy.utils.h5utils as h5utils
 import os
@@ -102,11 +103,10 @@ class BeamLoader(BaseSolver):
             # TODO implement fem file validation
             # self.validate_fem_file()
         if self.settings['unsteady']:
-            with h5.File(self.dyn_file_name, 'r') as dyn_file_handle:
-                # store files in dictionary
-                self.dyn_data_dict = h5utils.load_h5_in_dict(dyn_file_handle)
-                # TODO implement dyn file validation
-                # self.validate_dyn_file()
+            # memory-mapped, the time steps are read when used
+            self.dyn_data_dict = dynamicinput.DynFile(self.dyn_file_name)
+            # TODO implement dyn file validation
+            # self.validate_dyn_file()
 
         # Multibody information
         self.mb_file_name = self.data.case_route + '/' + self.data.case_name + '.mb.h5'
@@ -19,6 +19,9 @@ import sharpy.utils.exceptions as exc
 import sharpy.utils.correct_forces as cf
 import sharpy.io.network_interface as network_interface
 import sharpy.utils.generator_interface as gen_interface
+import sharpy.utils.realtime as realtime
+import sharpy.utils.profiling as profiling
+import sharpy.utils.accelerators as accelerators
 
 
 @solver
@@ -114,6 +117,31 @@ class DynamicCoupled(BaseSolver):
     settings_description['dynamic_relaxation'] = 'Controls if relaxation factor is modified during the FSI iteration ' \
                                                  'process'
 
+    settings_types['fsi_accelerator'] = 'str'
+    settings_default['fsi_accelerator'] = ''
+    settings_description['fsi_accelerator'] = 'Accelerator of the FSI sub-iterations acting on the forces applied to ' \
+                                              'the structure, replacing the relaxation. ``relaxation_factor`` is ' \
+                                              'used where the accelerator has no history yet. See ' \
+                                              ':mod:`sharpy.utils.accelerators`'
+    settings_options['fsi_accelerator'] = ['aitken', 'iqn_ils']
+
+    settings_types['iqn_reuse_steps'] = 'int'
+    settings_default['iqn_reuse_steps'] = 4
+    settings_description['iqn_reuse_steps'] = 'Number of previous time steps whose secant information is reused by ' \
+                                              'the ``iqn_ils`` accelerator'
+
+    settings_types['iqn_filter_tolerance'] = 'float'
+    settings_default['iqn_filter_tolerance'] = 1e-8
+    settings_description['iqn_filter_tolerance'] = 'Relative tolerance below which nearly linearly dependent secant ' \
+                                                   'columns are discarded by the ``iqn_ils`` accelerator'
+
+    settings_types['predictor_order'] = 'int'
+    settings_default['predictor_order'] = 0
+    settings_description['predictor_order'] = 'Order of the polynomial extrapolation of the structural state and ' \
+                                              'forces of the previous time steps used in the first FSI ' \
+                                              'sub-iteration. ``0`` starts from the previous time step'
+    settings_options['predictor_order'] = [0, 1, 2]
+
     settings_types['postprocessors'] = 'list(str)'
     settings_default['postprocessors'] = list()
     settings_description['postprocessors'] = 'List of the postprocessors to run at the end of every time step'
@@ -175,6 +203,31 @@ class DynamicCoupled(BaseSolver):
                                                  'The dictionary values are dictionaries with the settings ' \
                                                  'needed by each generator.'
 
+    settings_types['real_time'] = 'bool'
+    settings_default['real_time'] = False
+    settings_description['real_time'] = 'Pace the time steps to the wall-clock time and monitor their deadlines. ' \
+                                        'See :class:`~sharpy.utils.realtime.RealTimePacer`'
+
+    settings_types['real_time_factor'] = 'float'
+    settings_default['real_time_factor'] = 1.
+    settings_description['real_time_factor'] = 'Wall-clock time per unit of simulated time in real-time mode. ' \
+                                               'Values above ``1`` run slower than real time'
+
+    settings_types['real_time_margin'] = 'float'
+    settings_default['real_time_margin'] = 0.2
+    settings_description['real_time_margin'] = 'Fraction of the wall-clock time step below which the optional ' \
+                                               'work of the step is skipped in real-time mode'
+
+    settings_types['real_time_skip_optional'] = 'bool'
+    settings_default['real_time_skip_optional'] = True
+    settings_description['real_time_skip_optional'] = 'Skip further FSI iterations (past ``minimum_steps``) and ' \
+                                                      'postprocessors when a time step is close to its deadline'
+
+    settings_types['real_time_required_postprocessors'] = 'list(str)'
+    settings_default['real_time_required_postprocessors'] = list()
+    settings_description['real_time_required_postprocessors'] = 'Postprocessors that are never skipped in ' \
+                                                                'real-time mode'
+
     settings_table = settings.SettingsTable()
     __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
@@ -216,6 +269,14 @@ class DynamicCoupled(BaseSolver):
         self.runtime_generators = dict()
         self.with_runtime_generators = False
 
+        # wall-clock pacing
+        self.pacer = None
+
+        # FSI sub-iterations
+        self.accelerator = None
+        self.n_fsi_iterations = 0
+        self.n_fsi_steps = 0
+
     def get_g(self):
         """
         Getter for ``g``, the gravity value
@@ -300,6 +361,7 @@ class DynamicCoupled(BaseSolver):
             self.controllers[controller_id].initialise(
                     self.settings['controller_settings'][controller_id],
                     controller_id)
+        self.restore_solver_state('controllers', self.controllers)
 
         # print information header
         if self.print_info:
@@ -328,6 +390,38 @@ class DynamicCoupled(BaseSolver):
                 gen = gen_interface.generator_from_string(id)
                 self.runtime_generators[id] = gen()
                 self.runtime_generators[id].initialise(param, data=self.data)
+        self.restore_solver_state('runtime_generators', self.runtime_generators)
+
+        # FSI accelerator
+        self.accelerator = None
+        if self.settings['fsi_accelerator'] == 'aitken':
+            self.accelerator = accelerators.AitkenRelaxation(self.settings['relaxation_factor'].value)
+        elif self.settings['fsi_accelerator'] == 'iqn_ils':
+            self.accelerator = accelerators.IQNILS(self.settings['relaxation_factor'].value,
+                                                   reuse=self.settings['iqn_reuse_steps'].value,
+                                                   filter_tolerance=self.settings['iqn_filter_tolerance'].value)
+
+        # real-time mode
+        self.pacer = None
+        if self.settings['real_time']:
+            self.pacer = realtime.RealTimePacer(self.dt.value*self.settings['real_time_factor'].value,
+                                                margin=self.settings['real_time_margin'].value)
+
+    def restore_solver_state(self, kind, solvers):
+        """
+        Replaces the controllers or runtime generators by those stored in the restart snapshot, if any, such that they
+        carry on with their internal state. See :class:`~sharpy.postproc.createsnapshot.CreateSnapshot`.
+
+        Args:
+            kind (str): ``controllers`` or ``runtime_generators``
+            solvers (dict): Initialised controllers or runtime generators
+        """
+        restart_state = getattr(self.data, 'restart_state', dict())
+        for solver_id in solvers:
+            try:
+                solvers[solver_id] = restart_state.pop(kind + '/' + solver_id)
+            except KeyError:
+                pass
 
     def cleanup_timestep_info(self):
         if max(len(self.data.aero.timestep_info), len(self.data.structure.timestep_info)) > 1:
@@ -400,36 +494,52 @@ class DynamicCoupled(BaseSolver):
         included.
         """
 
-        if self.network_loader is not None:
-            self.set_of_variables = self.network_loader.get_inout_variables()
+        try:
+            if self.network_loader is not None:
+                self.set_of_variables = self.network_loader.get_inout_variables()
 
-            incoming_queue = queue.Queue(maxsize=1)
-            outgoing_queue = queue.Queue(maxsize=1)
+                incoming_queue = queue.Queue(maxsize=1)
+                if self.network_loader.settings['event_loop'] == 'asyncio':
+                    outgoing_queue = network_interface.OutputChannel()
+                    network_loop = self.network_loader.get_async_loop(self.set_of_variables).run
+                else:
+                    outgoing_queue = queue.Queue(maxsize=1)
+                    network_loop = self.network_loop
 
-            finish_event = threading.Event()
-            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-                netloop = executor.submit(self.network_loop, incoming_queue, outgoing_queue, finish_event)
-                timeloop = executor.submit(self.time_loop, incoming_queue, outgoing_queue, finish_event)
+                finish_event = threading.Event()
+                with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                    netloop = executor.submit(network_loop, incoming_queue, outgoing_queue, finish_event)
+                    timeloop = executor.submit(profiling.attached(self.time_loop),
+                                               incoming_queue, outgoing_queue, finish_event)
 
-                # TODO: improve exception handling to get exceptions when they happen from each thread
-                for t1 in [netloop, timeloop]:
+                    # the network loop only finishes once the time loop has, also if it fails
                     try:
-                        t1.result()
-                    except Exception as e:
-                        print(e)
-                        raise Exception
-
-        else:
-            self.time_loop()
-
-        if self.print_info:
-            cout.cout_wrap('...Finished', 1)
-
-        for postproc in self.postprocessors:
-            try:
-                self.postprocessors[postproc].shutdown()
-            except AttributeError:
-                pass
+                        timeloop.result()
+                    finally:
+                        finish_event.set()
+                        netloop.result()
+
+            else:
+                self.time_loop()
+
+            if self.pacer is not None:
+                self.logger.info('Real-time statistics: {}'.format(self.pacer.summary()))
+                if self.print_info:
+                    stats = self.pacer.summary()
+                    cout.cout_wrap('Real time: {:d} of {:d} time steps overran their deadline, '
+                                   'maximum overrun {:.3g} s, mean step time {:.3g} s of {:.3g} s'.format(
+                                    stats['n_overruns'], stats['n_steps'], stats['max_overrun'],
+                                    stats['mean_compute_time'], stats['period']), 1)
+            if self.print_info:
+                if self.n_fsi_steps:
+                    cout.cout_wrap('Mean number of FSI sub-iterations per time step: {:.2f}'.format(
+                        self.n_fsi_iterations/self.n_fsi_steps), 1)
+                cout.cout_wrap('...Finished', 1)
+        finally:
+            # postprocessors that keep output in memory need to write it also if the simulation fails
+            for postproc in self.postprocessors.values():
+                if hasattr(postproc, 'shutdown'):
+                    postproc.shutdown()
 
         return self.data
 
@@ -475,10 +585,16 @@ class DynamicCoupled(BaseSolver):
             # get input from the other thread
             if in_queue:
                 self.logger.info('Time Loop - Waiting for input')
-                values = in_queue.get()  # should be list of tuples
+                with profiling.timer('network_input'):
+                    values = in_queue.get()  # should be list of tuples
                 self.logger.debug('Time loop - received {}'.format(values))
                 self.set_of_variables.update_timestep(self.data, values)
 
+            # the deadline of the step is counted from the arrival of the input
+            if self.pacer is not None:
+                self.pacer.start_step(input_driven=bool(in_queue))
+            skip_optional = self.pacer is not None and self.settings['real_time_skip_optional'].value
+
             structural_kstep = self.data.structure.timestep_info[-1].copy()
             aero_kstep = self.data.aero.timestep_info[-1].copy()
             self.logger.debug('Time step {}'.format(self.data.ts))
@@ -488,7 +604,8 @@ class DynamicCoupled(BaseSolver):
                 state = {'structural': structural_kstep,
                          'aero': aero_kstep}
                 for k, v in self.controllers.items():
-                    state = v.control(self.data, state)
+                    with profiling.timer('controllers/' + k):
+                        state = v.control(self.data, state)
                     # this takes care of the changes in options for the solver
                     structural_kstep, aero_kstep = self.process_controller_output(
                         state)
@@ -500,7 +617,8 @@ class DynamicCoupled(BaseSolver):
                 params['struct_tstep'] = structural_kstep
                 params['aero_tstep'] = aero_kstep
                 for id, runtime_generator in self.runtime_generators.items():
-                    runtime_generator.generate(params)
+                    with profiling.timer('runtime_generators/' + id):
+                        runtime_generator.generate(params)
 
             self.time_aero = 0.0
             self.time_struc = 0.0
@@ -510,6 +628,11 @@ class DynamicCoupled(BaseSolver):
             controlled_structural_kstep = structural_kstep.copy()
             controlled_aero_kstep = aero_kstep.copy()
 
+            if self.settings['predictor_order'].value:
+                self.predict_structural_step(structural_kstep)
+            if self.accelerator is not None:
+                self.accelerator.reset()
+
             k = 0
             for k in range(self.settings['fsi_substeps'].value + 1):
                 if (k == self.settings['fsi_substeps'].value and
@@ -540,10 +663,11 @@ class DynamicCoupled(BaseSolver):
 
                 # run the solver
                 ini_time_aero = time.perf_counter()
-                self.data = self.aero_solver.run(aero_kstep,
-                                                 structural_kstep,
-                                                 convect_wake=True,
-                                                 unsteady_contribution=unsteady_contribution)
+                with profiling.timer('aero'):
+                    self.data = self.aero_solver.run(aero_kstep,
+                                                     structural_kstep,
+                                                     convect_wake=True,
+                                                     unsteady_contribution=unsteady_contribution)
                 self.time_aero += time.perf_counter() - ini_time_aero
 
                 previous_kstep = structural_kstep.copy()
@@ -552,16 +676,23 @@ class DynamicCoupled(BaseSolver):
                 # move the aerodynamic surface according the the structural one
                 self.aero_solver.update_custom_grid(structural_kstep,
                                                     aero_kstep)
-                self.map_forces(aero_kstep,
-                                structural_kstep,
-                                force_coeff)
+                with profiling.timer('map_forces'):
+                    self.map_forces(aero_kstep,
+                                    structural_kstep,
+                                    force_coeff)
 
                 # relaxation
                 relax_factor = self.relaxation_factor(k)
-                relax(self.data.structure,
-                      structural_kstep,
-                      previous_kstep,
-                      relax_factor)
+                if self.accelerator is not None:
+                    forces = self.accelerator.update(np.stack((structural_kstep.steady_applied_forces,
+                                                               structural_kstep.unsteady_applied_forces)))
+                    structural_kstep.steady_applied_forces[:] = forces[0]
+                    structural_kstep.unsteady_applied_forces[:] = forces[1]
+                else:
+                    relax(self.data.structure,
+                          structural_kstep,
+                          previous_kstep,
+                          relax_factor)
 
                 # check if nan anywhere.
                 # if yes, raise exception
@@ -572,34 +703,41 @@ class DynamicCoupled(BaseSolver):
 
                 copy_structural_kstep = structural_kstep.copy()
                 ini_time_struc = time.perf_counter()
-                for i_substep in range(
-                        self.settings['structural_substeps'].value + 1):
-                    # run structural solver
-                    coeff = ((i_substep + 1)/
-                             (self.settings['structural_substeps'].value + 1))
-
-                    structural_kstep = self.interpolate_timesteps(
-                        step0=self.data.structure.timestep_info[-1],
-                        step1=copy_structural_kstep,
-                        out_step=structural_kstep,
-                        coeff=coeff)
-
-                    self.data = self.structural_solver.run(
-                        structural_step=structural_kstep,
-                        dt=self.substep_dt)
+                with profiling.timer('structure'):
+                    for i_substep in range(
+                            self.settings['structural_substeps'].value + 1):
+                        # run structural solver
+                        coeff = ((i_substep + 1)/
+                                 (self.settings['structural_substeps'].value + 1))
+
+                        structural_kstep = self.interpolate_timesteps(
+                            step0=self.data.structure.timestep_info[-1],
+                            step1=copy_structural_kstep,
+                            out_step=structural_kstep,
+                            coeff=coeff)
+
+                        self.data = self.structural_solver.run(
+                            structural_step=structural_kstep,
+                            dt=self.substep_dt)
 
                 self.time_struc += time.perf_counter() - ini_time_struc
 
                 # check convergence
                 if self.convergence(k,
                                     structural_kstep,
-                                    previous_kstep) or self.settings['aero_solver'].lower() == 'noaero':
+                                    previous_kstep) or self.settings['aero_solver'].lower() == 'noaero' or \
+                        (skip_optional and k + 1 >= self.settings['minimum_steps'].value and
+                         self.pacer.skip('fsi_iterations')):
                     # move the aerodynamic surface according to the structural one
                     self.aero_solver.update_custom_grid(
                         structural_kstep,
                         aero_kstep)
                     break
 
+            profiling.count('fsi_iterations', k + 1)
+            self.n_fsi_iterations += k + 1
+            self.n_fsi_steps += 1
+
             # move the aerodynamic surface according the the structural one
             self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
 
@@ -609,6 +747,7 @@ class DynamicCoupled(BaseSolver):
             self.data.structure.timestep_info[-1] = structural_kstep.copy()
 
             final_time = time.perf_counter()
+            profiling.record('time_step', final_time - initial_time)
 
             if self.print_info:
                 print_res = 0 if self.res_dqdt == 0. else np.log10(self.res_dqdt)
@@ -625,8 +764,12 @@ class DynamicCoupled(BaseSolver):
             self.structural_solver.extract_resultants()
             # run postprocessors
             if self.with_postprocessors:
+                skip_postprocessors = skip_optional and self.pacer.skip('postprocessors')
                 for postproc in self.postprocessors:
-                    self.data = self.postprocessors[postproc].run(online=True)
+                    if skip_postprocessors and postproc not in self.settings['real_time_required_postprocessors']:
+                        continue
+                    with profiling.timer('postprocessors/' + postproc):
+                        self.data = self.postprocessors[postproc].run(online=True)
 
             # network only
             # put result back in queue
@@ -639,6 +782,12 @@ class DynamicCoupled(BaseSolver):
                     self.logger.debug('Data output Queue is full - clearing output')
                 out_queue.put(self.set_of_variables)
 
+            if self.pacer is not None:
+                overrun = self.pacer.finish_step()
+                if overrun > 0:
+                    self.logger.warning('Time step {} overran its real-time deadline by {:.3g} s'.format(
+                        self.data.ts, overrun))
+
         if finish_event:
             finish_event.set()
             self.logger.info('Time loop - Complete')
@@ -700,7 +849,7 @@ class DynamicCoupled(BaseSolver):
         # aero forces to structural forces
         struct_forces = mapping.aero2struct_force_mapping(
             aero_kstep.forces,
-            self.data.aero.struct2aero_mapping,
+            self.data.aero.mapping_tables,
             aero_kstep.zeta,
             structural_kstep.pos,
             structural_kstep.psi,
@@ -710,7 +859,7 @@ class DynamicCoupled(BaseSolver):
             self.data.aero.aero_dict)
         dynamic_struct_forces = unsteady_forces_coeff*mapping.aero2struct_force_mapping(
             aero_kstep.dynamic_forces,
-            self.data.aero.struct2aero_mapping,
+            self.data.aero.mapping_tables,
             aero_kstep.zeta,
             structural_kstep.pos,
             structural_kstep.psi,
@@ -744,6 +893,33 @@ class DynamicCoupled(BaseSolver):
                 astype(dtype=ct.c_double, order='F', copy=True))
             structural_kstep.unsteady_applied_forces = dynamic_struct_forces
 
+    def predict_structural_step(self, structural_kstep):
+        """
+        Replaces the structural state of the first FSI sub-iteration with a polynomial extrapolation of the previous
+        time steps of order ``predictor_order``. See :func:`sharpy.utils.accelerators.extrapolate`.
+
+        The extrapolation is applied as an increment to ``structural_kstep`` such that any change introduced by the
+        controllers and runtime generators is kept. Both the variables that define the aerodynamic grid and its
+        velocities and the structural state vectors ``q`` and ``dqdt`` are predicted, such that the structural solver
+        also starts from the extrapolated state.
+        """
+        history = []
+        for tstep in reversed(self.data.structure.timestep_info[-(self.settings['predictor_order'].value + 1):]):
+            if tstep is None:
+                break
+            history.append(tstep)
+        if len(history) < 2:
+            return
+
+        for name in ('pos', 'pos_dot', 'psi', 'psi_dot', 'for_pos', 'for_vel', 'quat', 'q', 'dqdt'):
+            values = [getattr(tstep, name) for tstep in history]
+            getattr(structural_kstep, name)[:] += accelerators.extrapolate(values,
+                                                                           len(values) - 1) - values[0]
+        structural_kstep.quat[:] = algebra.unit_vector(structural_kstep.quat)
+        if np.linalg.norm(structural_kstep.dqdt[-4:]):
+            # free flight: the last four entries of dqdt hold the orientation quaternion
+            structural_kstep.dqdt[-4:] = algebra.unit_vector(structural_kstep.dqdt[-4:])
+
     def relaxation_factor(self, k):
         initial = self.settings['relaxation_factor'].value
         if not self.settings['dynamic_relaxation'].value:
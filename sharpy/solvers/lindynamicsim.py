@@ -1,3 +1,4 @@
+import functools
 import numpy as np
 import os
 import h5py as h5
@@ -6,7 +7,7 @@ import sharpy.utils.settings as settings
 import sharpy.linear.src.libss as libss
 import scipy.linalg as sclalg
 import sharpy.utils.h5utils as h5utils
-from sharpy.utils.datastructures import LinearTimeStepInfo
+from sharpy.utils.datastructures import LinearTimeStepInfo, TimeStepCache, LazyTimeStepInfo
 import sharpy.utils.cout_utils as cout
 import time
 import warnings
@@ -59,6 +60,16 @@ class LinDynamicSim(BaseSolver):
     settings_types['dt'] = 'float'
     settings_description['dt'] = 'Time increment for the solution of systems without a specified dt'
 
+    settings_types['lazy_timestep_info'] = 'bool'
+    settings_default['lazy_timestep_info'] = False
+    settings_description['lazy_timestep_info'] = 'Only store the linear state, input and output vectors and generate ' \
+                                                 'the aerodynamic and structural time steps when they are accessed'
+
+    settings_types['timestep_info_cache_size'] = 'int'
+    settings_default['timestep_info_cache_size'] = 10
+    settings_description['timestep_info_cache_size'] = 'Number of generated aerodynamic and structural time steps ' \
+                                                       'kept in memory when ``lazy_timestep_info`` is on'
+
     settings_types['postprocessors'] = 'list(str)'
     settings_default['postprocessors'] = list()
 
@@ -173,30 +184,45 @@ class LinDynamicSim(BaseSolver):
                 cout.cout_wrap('Time domain written', 2)
             cout.cout_wrap('Success', 1)
 
-        # Pack state variables into linear timestep info
-        cout.cout_wrap('Plotting results...')
-        for n in range(len(t_out)-1):
-            tstep = LinearTimeStepInfo()
-            tstep.x = x_out[n, :]
-            tstep.y = y_out[n, :]
-            tstep.t = t_out[n]
-            tstep.u = u[n, :]
-            self.data.linear.timestep_info.append(tstep)
-            # TODO: option to save to h5
-
-            # Pack variables into respective aero or structural time step infos (with the + f0 from lin)
-            # Need to obtain information from the variables in a similar fashion as done with the database
-            # for the beam case
-
-            aero_tstep, struct_tstep = state_to_timestep(self.data, tstep.x, tstep.u, tstep.y)
-
-            self.data.aero.timestep_info.append(aero_tstep)
-            self.data.structure.timestep_info.append(struct_tstep)
-
-            # run postprocessors
-            if self.with_postprocessors:
-                for postproc in self.postprocessors:
-                    self.data = self.postprocessors[postproc].run(online=True)
+        try:
+            # Pack state variables into linear timestep info
+            cout.cout_wrap('Plotting results...')
+            if self.settings['lazy_timestep_info'].value:
+                aero_tstep_ref = self.data.aero.timestep_info[-1]
+                tstep_cache = TimeStepCache(functools.partial(state_history_to_timestep, self.data, x_out, u, y_out,
+                                                              aero_tstep_ref),
+                                            max_size=self.settings['timestep_info_cache_size'].value)
+            for n in range(len(t_out)-1):
+                tstep = LinearTimeStepInfo()
+                tstep.x = x_out[n, :]
+                tstep.y = y_out[n, :]
+                tstep.t = t_out[n]
+                tstep.u = u[n, :]
+                self.data.linear.timestep_info.append(tstep)
+                # TODO: option to save to h5
+
+                # Pack variables into respective aero or structural time step infos (with the + f0 from lin)
+                # Need to obtain information from the variables in a similar fashion as done with the database
+                # for the beam case
+
+                if self.settings['lazy_timestep_info'].value:
+                    aero_tstep = LazyTimeStepInfo(tstep_cache, n, position=0)
+                    struct_tstep = LazyTimeStepInfo(tstep_cache, n, position=1)
+                else:
+                    aero_tstep, struct_tstep = state_to_timestep(self.data, tstep.x, tstep.u, tstep.y)
+
+                self.data.aero.timestep_info.append(aero_tstep)
+                self.data.structure.timestep_info.append(struct_tstep)
+
+                # run postprocessors
+                if self.with_postprocessors:
+                    for postproc in self.postprocessors:
+                        self.data = self.postprocessors[postproc].run(online=True)
+        finally:
+            # postprocessors that keep output in memory need to write it also if the simulation fails
+            for postproc in self.postprocessors.values():
+                if hasattr(postproc, 'shutdown'):
+                    postproc.shutdown()
 
         return self.data
 
@@ -214,7 +240,16 @@ class LinDynamicSim(BaseSolver):
             pass
 
 
-def state_to_timestep(data, x, u=None, y=None):
+def state_history_to_timestep(data, x_out, u, y_out, aero_tstep_ref, n):
+    """
+    Aerodynamic and structural time steps of the time step ``n`` of the linear state, input and output histories.
+
+    Picklable builder of the time steps generated on demand.
+    """
+    return state_to_timestep(data, x_out[n, :], u[n, :], y_out[n, :], aero_tstep_ref=aero_tstep_ref)
+
+
+def state_to_timestep(data, x, u=None, y=None, aero_tstep_ref=None):
     """
     Warnings:
         Under development
@@ -226,6 +261,8 @@ def state_to_timestep(data, x, u=None, y=None):
         x:
         u:
         y:
+        aero_tstep_ref (AeroTimeStepInfo): Aerodynamic time step from which the attributes not given by the linear
+          system are copied. Defaults to the last time step in ``data.aero.timestep_info``.
 
     Returns:
 
@@ -278,7 +315,9 @@ def state_to_timestep(data, x, u=None, y=None):
         aero_tstep=data.linear.tsaero0,
         track_body=True)
 
-    current_aero_tstep = data.aero.timestep_info[-1].copy()
+    if aero_tstep_ref is None:
+        aero_tstep_ref = data.aero.timestep_info[-1]
+    current_aero_tstep = aero_tstep_ref.copy()
     current_aero_tstep.forces = [forces[i_surf] + data.linear.tsaero0.forces[i_surf] for i_surf in
                                  range(len(gamma))]
     current_aero_tstep.gamma = [gamma[i_surf] + data.linear.tsaero0.gamma[i_surf] for i_surf in
@@ -8,6 +8,7 @@ import sharpy.linear.utils.ss_interface as ss_interface
 import sharpy.utils.settings as settings
 import sharpy.utils.h5utils as h5
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 
 
 @solver
@@ -139,7 +140,8 @@ class LinearAssembler(BaseSolver):
 
     def run(self):
 
-        self.data.linear.ss = self.data.linear.linear_system.assemble()
+        with profiling.timer('assemble'):
+            self.data.linear.ss = self.data.linear.linear_system.assemble()
 
         # modify inout coordinates
         if self.settings['inout_coordinates'] == 'nodes':
@@ -8,6 +8,7 @@ import sharpy.structure.utils.xbeamlib as xbeamlib
 import sharpy.utils.multibody as mb
 import sharpy.structure.utils.lagrangeconstraints as lagrangeconstraints
 import sharpy.utils.exceptions as exc
+import sharpy.utils.profiling as profiling
 
 
 _BaseStructural = solver_from_string('_BaseStructural')
@@ -317,15 +318,17 @@ class NonLinearDynamicMultibody(_BaseStructural):
                         (iteration, res, LM_res))
                 raise exc.NotConvergedSolver(error)
 
+            profiling.count('newton_iterations')
             # Update positions and velocities
             mb.state2disp_and_accel(q, dqdt, dqddt, MB_beam, MB_tstep)
-            MB_Asys, MB_Q = self.assembly_MB_eq_system(MB_beam,
-                                                       MB_tstep,
-                                                       self.data.ts,
-                                                       dt,
-                                                       Lambda,
-                                                       Lambda_dot,
-                                                       MBdict)
+            with profiling.timer('assembly'):
+                MB_Asys, MB_Q = self.assembly_MB_eq_system(MB_beam,
+                                                           MB_tstep,
+                                                           self.data.ts,
+                                                           dt,
+                                                           Lambda,
+                                                           Lambda_dot,
+                                                           MBdict)
 
             # Compute the correction
             # ADC next line not necessary
@@ -334,7 +337,8 @@ class NonLinearDynamicMultibody(_BaseStructural):
             # invT = np.matrix(T).I
             # MB_Q_balanced = np.dot(invT, MB_Q).T
 
-            Dq = np.linalg.solve(MB_Asys, -MB_Q)
+            with profiling.timer('linear_solve'):
+                Dq = np.linalg.solve(MB_Asys, -MB_Q)
             # least squares solver
             # Dq = np.linalg.lstsq(np.dot(MB_Asys_balanced, invT), -MB_Q_balanced, rcond=None)[0]
 
@@ -130,47 +130,53 @@ class PrescribedUvlm(BaseSolver):
     def run(self):
         structural_kstep = self.data.structure.ini_info.copy()
 
-        # dynamic simulations start at tstep == 1, 0 is reserved for the initial state
-        for self.data.ts in range(1, self.settings['n_time_steps'].value + 1):
-            aero_kstep = self.data.aero.timestep_info[-1].copy()
-            structural_kstep = self.data.structure.timestep_info[-1].copy()
-            ts = len(self.data.structure.timestep_info) - 1
-            if ts > 0:
-                self.data.structure.timestep_info[ts].for_vel[:] = self.data.structure.dynamic_input[ts - 1]['for_vel']
-                self.data.structure.timestep_info[ts].for_acc[:] = self.data.structure.dynamic_input[ts - 1]['for_acc']
-
-
-            # # # generate new grid (already rotated)
-            # self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
-            #
-            # # run the solver
-            # self.data = self.aero_solver.run(aero_kstep,
-            #                                  structural_kstep,
-            #                                  self.data.aero.timestep_info[-1],
-            #                                  convect_wake=True)
-            #
-            # self.residual_table.print_line([self.data.ts,
-            #                                 self.data.ts*self.dt.value])
-
-            self.data.structure.next_step()
-            self.data.structure.integrate_position(self.data.ts, self.settings['dt'].value)
-
-            self.aero_solver.add_step()
-            self.data.aero.timestep_info[-1] = aero_kstep.copy()
-            self.aero_solver.update_custom_grid(self.data.structure.timestep_info[-1],
-                                                self.data.aero.timestep_info[-1])
-            # run the solver
-            self.data = self.aero_solver.run(self.data.aero.timestep_info[-1],
-                                             self.data.structure.timestep_info[-1],
-                                             self.data.aero.timestep_info[-2],
-                                             convect_wake=True)
-            self.residual_table.print_line([self.data.ts,
-                                            self.data.ts*self.dt.value])
-
-            # run postprocessors
-            if self.with_postprocessors:
-                for postproc in self.postprocessors:
-                    self.data = self.postprocessors[postproc].run(online=True)
+        try:
+            # dynamic simulations start at tstep == 1, 0 is reserved for the initial state
+            for self.data.ts in range(1, self.settings['n_time_steps'].value + 1):
+                aero_kstep = self.data.aero.timestep_info[-1].copy()
+                structural_kstep = self.data.structure.timestep_info[-1].copy()
+                ts = len(self.data.structure.timestep_info) - 1
+                if ts > 0:
+                    self.data.structure.timestep_info[ts].for_vel[:] = self.data.structure.dynamic_input[ts - 1]['for_vel']
+                    self.data.structure.timestep_info[ts].for_acc[:] = self.data.structure.dynamic_input[ts - 1]['for_acc']
+
+
+                # # # generate new grid (already rotated)
+                # self.aero_solver.update_custom_grid(structural_kstep, aero_kstep)
+                #
+                # # run the solver
+                # self.data = self.aero_solver.run(aero_kstep,
+                #                                  structural_kstep,
+                #                                  self.data.aero.timestep_info[-1],
+                #                                  convect_wake=True)
+                #
+                # self.residual_table.print_line([self.data.ts,
+                #                                 self.data.ts*self.dt.value])
+
+                self.data.structure.next_step()
+                self.data.structure.integrate_position(self.data.ts, self.settings['dt'].value)
+
+                self.aero_solver.add_step()
+                self.data.aero.timestep_info[-1] = aero_kstep.copy()
+                self.aero_solver.update_custom_grid(self.data.structure.timestep_info[-1],
+                                                    self.data.aero.timestep_info[-1])
+                # run the solver
+                self.data = self.aero_solver.run(self.data.aero.timestep_info[-1],
+                                                 self.data.structure.timestep_info[-1],
+                                                 self.data.aero.timestep_info[-2],
+                                                 convect_wake=True)
+                self.residual_table.print_line([self.data.ts,
+                                                self.data.ts*self.dt.value])
+
+                # run postprocessors
+                if self.with_postprocessors:
+                    for postproc in self.postprocessors:
+                        self.data = self.postprocessors[postproc].run(online=True)
+        finally:
+            # postprocessors that keep output in memory need to write it also if the simulation fails
+            for postproc in self.postprocessors.values():
+                if hasattr(postproc, 'shutdown'):
+                    postproc.shutdown()
 
         return self.data
 
@@ -9,12 +9,21 @@ from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
 import sharpy.utils.correct_forces as cf
+import sharpy.utils.exceptions as exc
+import sharpy.utils.profiling as profiling
+import sharpy.utils.accelerators as accelerators
 
 @solver
 class StaticCoupled(BaseSolver):
     """
     This class is the main FSI driver for static simulations.
     It requires a ``structural_solver`` and a ``aero_solver`` to be defined.
+
+    When the solver is run repeatedly on the same model, for instance by the trim solvers or in parametric sweeps,
+    ``warm_start`` makes each run start from the converged deformed shape and circulation of the previous one instead
+    of the undeformed structure, and without load steps if the change in orientation, control surface deflections and
+    applied forces is below ``warm_start_max_perturbation``. If the warm started solution does not converge, it is
+    repeated from the undeformed structure with the ``n_load_steps`` ramp.
     """
     solver_id = 'StaticCoupled'
     solver_classification = 'Coupled'
@@ -60,6 +69,36 @@ class StaticCoupled(BaseSolver):
     settings_default['relaxation_factor'] = 0.
     settings_description['relaxation_factor'] = 'Relaxation parameter in the FSI iteration. 0 is no relaxation and -> 1 is very relaxed'
 
+    settings_types['convergence_accelerator'] = 'str'
+    settings_default['convergence_accelerator'] = ''
+    settings_description['convergence_accelerator'] = 'Accelerator of the FSI iterations acting on the aerodynamic ' \
+                                                      'forces mapped onto the structure, replacing the constant ' \
+                                                      '``relaxation_factor``: dynamic Aitken relaxation or ' \
+                                                      'interface quasi-Newton. See :mod:`sharpy.utils.accelerators`'
+    settings_options['convergence_accelerator'] = ['aitken', 'iqn_ils']
+
+    settings_types['accelerator_relaxation_factor'] = 'float'
+    settings_default['accelerator_relaxation_factor'] = 0.5
+    settings_description['accelerator_relaxation_factor'] = 'Relaxation of the first accelerated iteration of each ' \
+                                                            'load step. 0 is no relaxation and -> 1 is very relaxed'
+
+    settings_types['iqn_reuse_steps'] = 'int'
+    settings_default['iqn_reuse_steps'] = 1
+    settings_description['iqn_reuse_steps'] = 'Number of previous load steps whose secant information is reused by ' \
+                                              'the ``iqn_ils`` accelerator'
+
+    settings_types['warm_start'] = 'bool'
+    settings_default['warm_start'] = False
+    settings_description['warm_start'] = 'Start each run after the first one from the converged state of the ' \
+                                         'previous run'
+
+    settings_types['warm_start_max_perturbation'] = 'float'
+    settings_default['warm_start_max_perturbation'] = 0.05
+    settings_description['warm_start_max_perturbation'] = 'Largest change with respect to the previous run for ' \
+                                                          'which the warm start is used: rotation of the body and ' \
+                                                          'change of the control surface deflections in radians, ' \
+                                                          'and relative change of the applied forces'
+
     settings_types['correct_forces_method'] = 'str'
     settings_default['correct_forces_method'] = '' # 'efficiency'
     settings_description['correct_forces_method'] = 'Function used to correct aerodynamic forces. Check :py:mod:`sharpy.utils.correct_forces`'
@@ -82,6 +121,12 @@ class StaticCoupled(BaseSolver):
         self.correct_forces = False
         self.correct_forces_function = None
 
+        self.accelerator = None
+        self.n_iterations = []
+
+        # converged state of the previous run for warm starting
+        self.warm_state = None
+
     def initialise(self, data, input_dict=None):
         self.data = data
         if input_dict is None:
@@ -113,6 +158,13 @@ class StaticCoupled(BaseSolver):
             self.correct_forces = True
             self.correct_forces_function = cf.dict_of_corrections[self.settings['correct_forces_method']]
 
+        self.accelerator = None
+        if self.settings['convergence_accelerator'] == 'aitken':
+            self.accelerator = accelerators.AitkenRelaxation(self.settings['accelerator_relaxation_factor'].value)
+        elif self.settings['convergence_accelerator'] == 'iqn_ils':
+            self.accelerator = accelerators.IQNILS(self.settings['accelerator_relaxation_factor'].value,
+                                                   reuse=self.settings['iqn_reuse_steps'].value)
+
     def increase_ts(self):
         self.data.ts += 1
         self.structural_solver.next_step()
@@ -132,13 +184,46 @@ class StaticCoupled(BaseSolver):
         self.data.ts = 0
 
     def run(self):
-        for i_step in range(self.settings['n_load_steps'].value + 1):
-            if (i_step == self.settings['n_load_steps'].value and
-                    self.settings['n_load_steps'].value > 0):
+        if self.settings['warm_start'] and self.warm_start_perturbation() < \
+                self.settings['warm_start_max_perturbation'].value:
+            cold_structural_step = self.data.structure.timestep_info[self.data.ts].copy()
+            cold_aero_step = self.data.aero.timestep_info[self.data.ts].copy()
+            self.apply_warm_start()
+            try:
+                converged = self.solve(n_load_steps=0)
+            except (exc.NotConvergedSolver, exc.NotConvergedStructuralSolver):
+                converged = False
+            if converged:
+                self.store_warm_state()
+                return self.data
+
+            cout.cout_wrap('StaticCoupled: warm started solution did not converge, '
+                           'restarting from the undeformed structure', 3)
+            self.data.ts = 0
+            self.data.structure.timestep_info = [cold_structural_step]
+            self.data.aero.timestep_info = [cold_aero_step]
+            self.aero_solver.update_step()
+
+        if self.solve(self.settings['n_load_steps'].value):
+            self.store_warm_state()
+        return self.data
+
+    def solve(self, n_load_steps):
+        """
+        Coupled solution with the given number of load steps.
+
+        Returns:
+            bool: ``True`` if the last load step converged
+        """
+        self.n_iterations = []
+        converged = False
+        for i_step in range(n_load_steps + 1):
+            if (i_step == n_load_steps and
+                    n_load_steps > 0):
                 break
             # load step coefficient
-            if not self.settings['n_load_steps'].value == 0:
-                load_step_multiplier = (i_step + 1.0)/self.settings['n_load_steps'].value
+            if not n_load_steps == 0:
+                load_step_multiplier = (i_step + 1.0)/n_load_steps
             else:
                 load_step_multiplier = 1.0
 
@@ -146,21 +231,28 @@ class StaticCoupled(BaseSolver):
             if i_step > 0:
                 self.increase_ts()
 
+            if self.accelerator is not None:
+                self.accelerator.reset()
+
+            converged = False
             for i_iter in range(self.settings['max_iter'].value):
+                profiling.count('fsi_iterations')
                 # run aero
-                self.data = self.aero_solver.run()
+                with profiling.timer('aero'):
+                    self.data = self.aero_solver.run()
 
                 # map force
-                struct_forces = mapping.aero2struct_force_mapping(
-                    self.data.aero.timestep_info[self.data.ts].forces,
-                    self.data.aero.struct2aero_mapping,
-                    self.data.aero.timestep_info[self.data.ts].zeta,
-                    self.data.structure.timestep_info[self.data.ts].pos,
-                    self.data.structure.timestep_info[self.data.ts].psi,
-                    self.data.structure.node_master_elem,
-                    self.data.structure.connectivities,
-                    self.data.structure.timestep_info[self.data.ts].cag(),
-                    self.data.aero.aero_dict)
+                with profiling.timer('map_forces'):
+                    struct_forces = mapping.aero2struct_force_mapping(
+                        self.data.aero.timestep_info[self.data.ts].forces,
+                        self.data.aero.mapping_tables,
+                        self.data.aero.timestep_info[self.data.ts].zeta,
+                        self.data.structure.timestep_info[self.data.ts].pos,
+                        self.data.structure.timestep_info[self.data.ts].psi,
+                        self.data.structure.node_master_elem,
+                        self.data.structure.connectivities,
+                        self.data.structure.timestep_info[self.data.ts].cag(),
+                        self.data.aero.aero_dict)
 
                 if self.correct_forces:
                     struct_forces = self.correct_forces_function(self.data,
@@ -169,7 +261,9 @@ class StaticCoupled(BaseSolver):
                                         struct_forces,
                                         rho=self.aero_solver.settings['rho'].value)
 
-                if not self.settings['relaxation_factor'].value == 0.:
+                if self.accelerator is not None:
+                    struct_forces = self.accelerator.update(struct_forces)
+                elif not self.settings['relaxation_factor'].value == 0.:
                     if i_iter == 0:
                         self.previous_force = struct_forces.copy()
 
@@ -184,23 +278,101 @@ class StaticCoupled(BaseSolver):
                 temp1 = load_step_multiplier*(struct_forces + self.data.structure.ini_info.steady_applied_forces)
                 self.data.structure.timestep_info[self.data.ts].steady_applied_forces[:] = temp1
                 # run beam
-                self.data = self.structural_solver.run()
+                with profiling.timer('structure'):
+                    self.data = self.structural_solver.run()
                 self.structural_solver.settings['gravity'] = ct.c_double(old_g)
                 (self.data.structure.timestep_info[self.data.ts].total_forces[0:3],
                  self.data.structure.timestep_info[self.data.ts].total_forces[3:6]) = (
                         self.extract_resultants(self.data.structure.timestep_info[self.data.ts]))
 
                 # update grid
-                self.aero_solver.update_step()
+                with profiling.timer('update_grid'):
+                    self.aero_solver.update_step()
+
+                if np.isnan(self.data.structure.timestep_info[self.data.ts].pos).any():
+                    raise exc.NotConvergedSolver('NaN found in the structural displacements')
 
                 # convergence
                 if self.convergence(i_iter, i_step):
+                    converged = True
                     # create q and dqdt vectors
                     self.structural_solver.update(self.data.structure.timestep_info[self.data.ts])
                     self.cleanup_timestep_info()
                     break
+            self.n_iterations.append(i_iter + 1)
 
-        return self.data
+        if self.print_info:
+            cout.cout_wrap('StaticCoupled FSI iterations per load step: ' +
+                           ', '.join(str(n_iter) for n_iter in self.n_iterations), 1)
+
+        return converged
+
+    def store_warm_state(self):
+        """
+        Keeps the converged state and the inputs of the run to warm start the next one
+        """
+        if not self.settings['warm_start']:
+            return
+        try:
+            deflection = np.array(self.data.aero.aero_dict['control_surface_deflection'], dtype=float)
+        except KeyError:
+            deflection = np.zeros((0, ))
+        self.warm_state = {'structure': self.data.structure.timestep_info[self.data.ts].copy(),
+                           'aero': self.data.aero.timestep_info[self.data.ts].copy(),
+                           'applied_forces': self.data.structure.ini_info.steady_applied_forces.copy(),
+                           'control_surface_deflection': deflection}
+
+    def warm_start_perturbation(self):
+        """
+        Change of the inputs with respect to the previous run: the largest of the rotation of the body and change of
+        control surface deflections (in radians) and the relative change of the applied forces.
+
+        Returns:
+            float: Perturbation, infinite if there is no previous converged state
+        """
+        if self.warm_state is None:
+            return np.inf
+
+        quat = self.data.structure.timestep_info[self.data.ts].quat
+        warm_quat = self.warm_state['structure'].quat
+        rotation = 2.*np.arccos(min(np.abs(np.dot(quat, warm_quat)), 1.))
+
+        try:
+            deflection = np.array(self.data.aero.aero_dict['control_surface_deflection'], dtype=float)
+        except KeyError:
+            deflection = np.zeros((0, ))
+        if deflection.shape != self.warm_state['control_surface_deflection'].shape:
+            return np.inf
+        deflection_change = np.max(np.abs(deflection - self.warm_state['control_surface_deflection']),
+                                   initial=0.)
+
+        forces = self.data.structure.ini_info.steady_applied_forces
+        force_change = np.linalg.norm(forces - self.warm_state['applied_forces'])
+        if force_change > 0.:
+            force_change /= max(np.linalg.norm(self.warm_state['applied_forces']), np.linalg.norm(forces))
+
+        return max(rotation, deflection_change, force_change)
+
+    def apply_warm_start(self):
+        """
+        Replaces the structural deformations and the circulation of the current step with those of the previous
+        converged run. The orientation and applied forces set for this run are kept.
+        """
+        tstep = self.data.structure.timestep_info[self.data.ts]
+        warm_tstep = self.warm_state['structure']
+        tstep.pos[:] = warm_tstep.pos
+        tstep.psi[:] = warm_tstep.psi
+
+        aero_tstep = self.data.aero.timestep_info[self.data.ts]
+        warm_aero_tstep = self.warm_state['aero']
+        for i_surf in range(aero_tstep.n_surf):
+            if aero_tstep.gamma[i_surf].shape == warm_aero_tstep.gamma[i_surf].shape:
+                aero_tstep.gamma[i_surf][:] = warm_aero_tstep.gamma[i_surf]
+            if aero_tstep.gamma_star[i_surf].shape == warm_aero_tstep.gamma_star[i_surf].shape:
+                aero_tstep.gamma_star[i_surf][:] = warm_aero_tstep.gamma_star[i_surf]
+
+        # move the aerodynamic grid with the deformed structure
+        self.aero_solver.update_step()
 
     def convergence(self, i_iter, i_step):
         if i_iter == self.settings['max_iter'].value - 1:
@@ -128,7 +128,7 @@ class StaticCoupledRBM(BaseSolver):
 
         # Include the rbm
          # print("ts", self.data.ts)
-        self.data.structure.timestep_info[-1].for_vel = self.data.structure.dynamic_input[0]['for_vel']
+        self.data.structure.timestep_info[-1].for_vel = self.data.structure.dynamic_input[0]['for_vel'].copy()
 
         for i_step in range(self.settings['n_load_steps'].value + 1):
             if (i_step == self.settings['n_load_steps'].value and
@@ -154,7 +154,7 @@ class StaticCoupledRBM(BaseSolver):
                 # map force
                 struct_forces = mapping.aero2struct_force_mapping(
                     self.data.aero.timestep_info[self.data.ts].forces,
-                    self.data.aero.struct2aero_mapping,
+                    self.data.aero.mapping_tables,
                     self.data.aero.timestep_info[self.data.ts].zeta,
                     self.data.structure.timestep_info[self.data.ts].pos,
                     self.data.structure.timestep_info[self.data.ts].psi,
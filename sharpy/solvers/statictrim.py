@@ -4,6 +4,8 @@ import sharpy.utils.cout_utils as cout
 import sharpy.utils.solver_interface as solver_interface
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
+import sharpy.utils.broyden as broyden
+import sharpy.utils.parallel_utils as parallel_utils
 import os
 
 
@@ -18,6 +20,16 @@ class StaticTrim(BaseSolver):
     equilibrium. The output angles are shown in degrees.
 
     The results from the trimming iteration can be saved to a text file by using the `save_info` option.
+
+    Two trim algorithms are available through ``trim_method``:
+
+        * ``secant``: each of the three inputs is updated with the secant of its corresponding output, neglecting the
+          coupling between them.
+
+        * ``broyden``: Newton iterations on the three equations with a full Jacobian, initially computed by finite
+          differences (using ``initial_angle_eps`` and ``initial_thrust_eps``, in parallel if
+          ``jacobian_processes > 1``) and then corrected with Broyden updates, such that each iteration requires a
+          single coupled solution. See :mod:`sharpy.utils.broyden`.
     """
     solver_id = 'StaticTrim'
     solver_classification = 'Flight Dynamics'
@@ -25,6 +37,7 @@ class StaticTrim(BaseSolver):
     settings_types = dict()
     settings_default = dict()
     settings_description = dict()
+    settings_options = dict()
 
     settings_types['print_info'] = 'bool'
     settings_default['print_info'] = True
@@ -82,6 +95,16 @@ class StaticTrim(BaseSolver):
     settings_default['initial_thrust_eps'] = 2.
     settings_description['initial_thrust_eps'] = 'Initial thrust setting change'
 
+    settings_types['trim_method'] = 'str'
+    settings_default['trim_method'] = 'secant'
+    settings_description['trim_method'] = 'Trim algorithm'
+    settings_options['trim_method'] = ['secant', 'broyden']
+
+    settings_types['jacobian_processes'] = 'int'
+    settings_default['jacobian_processes'] = 1
+    settings_description['jacobian_processes'] = 'Number of processes evaluating the finite difference Jacobian of ' \
+                                                 'the ``broyden`` method in parallel'
+
     settings_types['relaxation_factor'] = 'float'
     settings_default['relaxation_factor'] = 0.2
     settings_description['relaxation_factor'] = 'Relaxation factor'
@@ -95,7 +118,7 @@ class StaticTrim(BaseSolver):
     settings_description['folder'] = 'Output location for trim results'
 
     settings_table = settings.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
         self.data = None
@@ -120,7 +143,8 @@ class StaticTrim(BaseSolver):
     def initialise(self, data):
         self.data = data
         self.settings = data.settings[self.solver_id]
-        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default,
+                                 options=self.settings_options)
 
         self.solver = solver_interface.initialise_solver(self.settings['solver'])
         self.solver.initialise(self.data, self.settings['solver_settings'])
@@ -148,7 +172,10 @@ class StaticTrim(BaseSolver):
         except AttributeError:
             modal_exists = False
 
-        self.trim_algorithm()
+        if self.settings['trim_method'] == 'broyden':
+            self.broyden_trim_algorithm()
+        else:
+            self.trim_algorithm()
 
         if modal_exists:
             self.data.structure.timestep_info[-1].modal = modal
@@ -315,6 +342,46 @@ class StaticTrim(BaseSolver):
                 self.table.close_file()
                 return
 
+    def broyden_trim_algorithm(self):
+        """
+        Trim with Newton-Broyden iterations on the vertical force, pitching moment and horizontal force.
+
+        The inputs are the same as in :meth:`trim_algorithm`: angle of attack, angle of attack plus control surface
+        deflection and thrust.
+
+        Returns:
+            np.array: array of trim values for angle of attack, control surface deflection and thrust.
+        """
+        self.i_iter = 0
+
+        def residual(x):
+            output = self.evaluate(*x)
+            self.i_iter += 1
+            return output
+
+        trim_solver = broyden.BroydenSolver(residual,
+                                            tolerance=np.array([self.settings['fz_tolerance'].value,
+                                                                self.settings['m_tolerance'].value,
+                                                                self.settings['fx_tolerance'].value]),
+                                            steps=np.array([self.settings['initial_angle_eps'].value,
+                                                            self.settings['initial_angle_eps'].value,
+                                                            self.settings['initial_thrust_eps'].value]),
+                                            max_iter=self.settings['max_iter'].value,
+                                            num_processes=self.settings['jacobian_processes'].value)
+        # the parent's buffered output would otherwise be repeated by the forked processes
+        self.table.file.flush()
+        x0 = np.array([self.settings['initial_alpha'].value,
+                       self.settings['initial_deflection'].value + self.settings['initial_alpha'].value,
+                       self.settings['initial_thrust'].value])
+        x, _ = trim_solver.solve(x0)
+
+        self.trimmed_values = list(x)
+        self.table.close_file()
+        if self.settings['print_info']:
+            cout.cout_wrap('Trim found in {:d} coupled solutions ({:d} finite difference Jacobians)'.format(
+                trim_solver.n_evaluations, trim_solver.n_jacobians), 1)
+        return self.trimmed_values
+
     def evaluate(self, alpha, deflection_gamma, thrust):
         if not np.isfinite(alpha):
             import pdb; pdb.set_trace()
@@ -347,6 +414,10 @@ class StaticTrim(BaseSolver):
         # cout.cout_wrap('fy = ' + str(forces[1]) + ' my = ' + str(moments[1]), 2)
         # cout.cout_wrap('fz = ' + str(forces[2]) + ' mz = ' + str(moments[2]), 2)
 
+        if parallel_utils.is_worker():
+            # finite difference evaluations in forked processes
+            return forcez, moment, forcex
+
         self.table.print_line([self.i_iter,
                                alpha*180/np.pi,
                                (deflection_gamma - alpha)*180/np.pi,
@@ -9,6 +9,7 @@ import sharpy.utils.settings as settings
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.generator_interface as gen_interface
 import sharpy.utils.cout_utils as cout
+import sharpy.utils.profiling as profiling
 from sharpy.utils.constants import vortex_radius_def
 
 
@@ -204,25 +205,26 @@ class StepUvlm(BaseSolver):
             return self.data
 
         # generate uext
-        self.velocity_generator.generate({'zeta': aero_tstep.zeta,
-                                          'override': True,
-                                          't': t,
-                                          'ts': self.data.ts,
-                                          'dt': dt,
-                                          'for_pos': structure_tstep.for_pos,
-                                          'is_wake': False},
-                                         aero_tstep.u_ext)
-        if ((self.settings['convection_scheme'].value > 1 and convect_wake) or 
-           (not self.settings['cfl1'])):
-            # generate uext_star
-            self.velocity_generator.generate({'zeta': aero_tstep.zeta_star,
+        with profiling.timer('velocity_generator'):
+            self.velocity_generator.generate({'zeta': aero_tstep.zeta,
                                               'override': True,
+                                              't': t,
                                               'ts': self.data.ts,
                                               'dt': dt,
-                                              't': t,
                                               'for_pos': structure_tstep.for_pos,
-                                              'is_wake': True},
-                                             aero_tstep.u_ext_star)
+                                              'is_wake': False},
+                                             aero_tstep.u_ext)
+            if ((self.settings['convection_scheme'].value > 1 and convect_wake) or
+               (not self.settings['cfl1'])):
+                # generate uext_star
+                self.velocity_generator.generate({'zeta': aero_tstep.zeta_star,
+                                                  'override': True,
+                                                  'ts': self.data.ts,
+                                                  'dt': dt,
+                                                  't': t,
+                                                  'for_pos': structure_tstep.for_pos,
+                                                  'is_wake': True},
+                                                 aero_tstep.u_ext_star)
 
         uvlmlib.uvlm_solver(self.data.ts,
                             aero_tstep,
@@ -233,9 +235,10 @@ class StepUvlm(BaseSolver):
 
         if unsteady_contribution and not self.settings['quasi_steady']:
             # calculate unsteady (added mass) forces:
-            self.data.aero.compute_gamma_dot(dt,
-                                             aero_tstep,
-                                             self.data.aero.timestep_info[-3:])
+            with profiling.timer('gamma_dot'):
+                self.data.aero.compute_gamma_dot(dt,
+                                                 aero_tstep,
+                                                 self.data.aero.timestep_info[-3:])
             if self.settings['gamma_dot_filtering'] is None:
                 self.filter_gamma_dot(aero_tstep,
                                       self.data.aero.timestep_info,
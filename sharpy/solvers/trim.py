@@ -9,6 +9,7 @@ import sharpy.utils.solver_interface as solver_interface
 from sharpy.utils.solver_interface import solver, BaseSolver
 import sharpy.utils.settings as settings
 import sharpy.utils.algebra as algebra
+import sharpy.utils.broyden as broyden
 
 
 @solver
@@ -18,6 +19,11 @@ class Trim(BaseSolver):
     than the ``StaticTrim`` (only longitudinal) solver.
 
     We advise to start with ``StaticTrim`` even if you configuration is not totally symmetric.
+
+    With ``trim_method = 'broyden'`` the six resultant forces and moments are driven to zero with Newton-Broyden
+    iterations instead of minimising their weighted norm with the Nelder-Mead method, which reduces the number of
+    coupled solutions from hundreds to a few tens. The initial Jacobian is computed by finite differences, optionally
+    in parallel. See :mod:`sharpy.utils.broyden`.
     """
     solver_id = 'Trim'
     solver_classification = 'Flight dynamics'
@@ -25,6 +31,7 @@ class Trim(BaseSolver):
     settings_types = dict()
     settings_default = dict()
     settings_description = dict()
+    settings_options = dict()
 
     settings_types['print_info'] = 'bool'
     settings_default['print_info'] = True
@@ -46,6 +53,30 @@ class Trim(BaseSolver):
     settings_default['tolerance'] = 1e-4
     settings_description['tolerance'] = 'Threshold for convergence of trim'
 
+    settings_types['trim_method'] = 'str'
+    settings_default['trim_method'] = 'nelder-mead'
+    settings_description['trim_method'] = 'Trim algorithm'
+    settings_options['trim_method'] = ['nelder-mead', 'broyden']
+
+    settings_types['residual_tolerance'] = 'float'
+    settings_default['residual_tolerance'] = 1e-2
+    settings_description['residual_tolerance'] = 'Tolerance in the resultant forces and moments of the ``broyden`` ' \
+                                                 'method. ``tolerance`` is then the tolerance in the step of the ' \
+                                                 'trim variables'
+
+    settings_types['initial_angle_eps'] = 'float'
+    settings_default['initial_angle_eps'] = 0.05
+    settings_description['initial_angle_eps'] = 'Finite difference step of the angles in the ``broyden`` method'
+
+    settings_types['initial_thrust_eps'] = 'float'
+    settings_default['initial_thrust_eps'] = 2.
+    settings_description['initial_thrust_eps'] = 'Finite difference step of the thrust in the ``broyden`` method'
+
+    settings_types['jacobian_processes'] = 'int'
+    settings_default['jacobian_processes'] = 1
+    settings_description['jacobian_processes'] = 'Number of processes evaluating the finite difference Jacobian of ' \
+                                                 'the ``broyden`` method in parallel'
+
     settings_types['initial_alpha'] = 'float'
     settings_default['initial_alpha'] = 0.
     settings_description['initial_alpha'] = 'Initial angle of attack'
@@ -87,7 +118,7 @@ class Trim(BaseSolver):
     settings_description['refine_solution'] = 'If ``True`` and the optimiser routine allows for it, the optimiser will try to improve the solution with hybrid methods'
 
     settings_table = settings.SettingsTable()
-    __doc__ += settings_table.generate(settings_types, settings_default, settings_description)
+    __doc__ += settings_table.generate(settings_types, settings_default, settings_description, settings_options)
 
     def __init__(self):
         self.data = None
@@ -102,7 +133,8 @@ class Trim(BaseSolver):
     def initialise(self, data):
         self.data = data
         self.settings = data.settings[self.solver_id]
-        settings.to_custom_types(self.settings, self.settings_types, self.settings_default)
+        settings.to_custom_types(self.settings, self.settings_types, self.settings_default,
+                                 options=self.settings_options)
 
         self.solver = solver_interface.initialise_solver(self.settings['solver'])
         self.solver.initialise(self.data, self.settings['solver_settings'])
@@ -226,7 +258,8 @@ class Trim(BaseSolver):
         return self.data
 
     def trim_algorithm(self):
-        # create bounds
+        if self.settings['trim_method'] == 'broyden':
+            return self.broyden_solve(solver_wrapper)
 
         # call optimiser
         self.optimise(solver_wrapper,
@@ -240,6 +273,32 @@ class Trim(BaseSolver):
         # self.optimise(self.solver_wrapper, )
         pass
 
+    def broyden_solve(self, func):
+        """
+        Solves for zero resultant forces and moments with Newton-Broyden iterations, in the least-squares sense if
+        the number of trim variables is not six.
+        """
+        steps = np.full((self.x_info['n_variables'], ), self.settings['initial_angle_eps'].value)
+        thrust_indices = list(self.x_info['i_thrust'])
+        if 'i_base_thrust' in self.x_info:
+            thrust_indices.append(self.x_info['i_base_thrust'])
+        steps[thrust_indices] = self.settings['initial_thrust_eps'].value
+
+        trim_solver = broyden.BroydenSolver(lambda x: func(x, self.x_info, self, -1),
+                                            tolerance=self.settings['residual_tolerance'].value,
+                                            steps=steps,
+                                            max_iter=self.settings['max_iter'].value,
+                                            num_processes=self.settings['jacobian_processes'].value,
+                                            step_tolerance=self.settings['tolerance'].value)
+        x, totals = trim_solver.solve(self.initial_state)
+
+        cout.cout_wrap('Solution = ')
+        cout.cout_wrap(x)
+        cout.cout_wrap('Resultants = ' + str(totals))
+        cout.cout_wrap('Trim found in {:d} coupled solutions ({:d} finite difference Jacobians)'.format(
+            trim_solver.n_evaluations, trim_solver.n_jacobians), 1)
+        return x
+
     def optimise(self, func, tolerance, print_info, method, refine):
         args = (self.x_info, self, -2)
 
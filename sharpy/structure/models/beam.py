@@ -4,6 +4,7 @@ import copy
 
 from sharpy.structure.basestructure import BaseStructure
 import sharpy.structure.models.beamstructures as beamstructures
+import sharpy.structure.utils.dynamicinput as dynamicinput
 import sharpy.utils.algebra as algebra
 from sharpy.utils.datastructures import StructTimeStepInfo
 import sharpy.utils.multibody as mb
@@ -204,52 +205,16 @@ class Beam(BaseStructure):
             self.ini_info.psi[elem.ielem, :, :] = elem.psi_ini
 
     def add_unsteady_information(self, dyn_dict, num_steps):
-        # data storage for time dependant input
-        for it in range(num_steps):
-            self.dynamic_input.append(dict())
-
-        try:
-            for it in range(num_steps):
-                self.dynamic_input[it]['dynamic_forces'] = dyn_dict['dynamic_forces'][it, :, :]
-        except KeyError:
-            for it in range(num_steps):
-                self.dynamic_input[it]['dynamic_forces'] = np.zeros((self.num_node, 6), dtype=ct.c_double, order='F')
-
-        try:
-            for it in range(num_steps):
-                self.dynamic_input[it]['for_pos'] = dyn_dict['for_pos'][it, :]
-        except KeyError:
-            for it in range(num_steps):
-                self.dynamic_input[it]['for_pos'] = np.zeros((6, ), dtype=ct.c_double, order='F')
-
-        try:
-            for it in range(num_steps):
-                self.dynamic_input[it]['for_vel'] = dyn_dict['for_vel'][it, :]
-        except KeyError:
-            for it in range(num_steps):
-                self.dynamic_input[it]['for_vel'] = np.zeros((6, ), dtype=ct.c_double, order='F')
+        """
+        Time dependent input of the structure, served on demand by
+        :class:`~sharpy.structure.utils.dynamicinput.DynamicInput`.
 
-        try:
-            for it in range(num_steps):
-                self.dynamic_input[it]['for_acc'] = dyn_dict['for_acc'][it, :]
-        except KeyError:
-            for it in range(num_steps):
-                self.dynamic_input[it]['for_acc'] = np.zeros((6, ), dtype=ct.c_double, order='F')
-
-        # try:
-        #     for it in range(num_steps):
-        #         self.dynamic_input[it]['trayectories'] = dyn_dict['trayectories'][it, :, :]
-        # except KeyError:
-        #     for it in range(num_steps):
-        #         self.dynamic_input[it]['trayectories'] = None
-
-# TODO ADC: necessary? I don't think so
-        # try:
-            # for it in range(num_steps):
-                # self.dynamic_input[it]['enforce_trajectory'] = dyn_dict['enforce_trayectory'][it, :, :]
-        # except KeyError:
-            # for it in range(num_steps):
-                # self.dynamic_input[it]['enforce_trajectory'] = np.zeros((self.num_node, 3), dtype=bool)
+        Args:
+            dyn_dict (dict): Contents of the ``.dyn.h5`` file
+            num_steps (int): Number of time steps of the simulation
+        """
+        num_steps = max(num_steps, len(self.dynamic_input))
+        self.dynamic_input = dynamicinput.DynamicInput(dyn_dict, num_steps, self.num_node)
 
     def generate_dof_arrays(self):
         self.vdof = np.zeros((self.num_node,), dtype=ct.c_int, order='F') - 1
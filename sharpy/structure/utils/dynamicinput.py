@@ -0,0 +1,147 @@
+"""Time Dependent Structural Input
+
+The time histories in the ``.dyn.h5`` file (applied ``dynamic_forces`` and prescribed ``for_pos``, ``for_vel`` and
+``for_acc``) are served one time step at a time instead of being loaded and copied into a dictionary per time step.
+
+:class:`DynFile` maps the datasets of the file into memory without reading them, and :class:`DynamicInput` returns
+the input of a given time step as slices of those datasets, or as shared zero arrays for the variables that are not
+in the file. The arrays returned are read-only and should be copied into the time step information before being
+modified.
+"""
+import collections.abc
+import ctypes as ct
+
+import h5py as h5
+import numpy as np
+
+import sharpy.utils.h5utils as h5utils
+
+
+class DynFile(collections.abc.Mapping):
+    """
+    Read-only dictionary-like access to the datasets of a ``.dyn.h5`` file.
+
+    Contiguous uncompressed datasets are memory-mapped, such that only the time steps that are used are read from
+    disk. Chunked or compressed datasets are read from the open HDF5 file when sliced, and groups are loaded as
+    dictionaries as in :func:`sharpy.utils.h5utils.load_h5_in_dict`.
+
+    The file is opened again when unpickled, such that the snapshots do not store its contents.
+
+    Args:
+        file_name (str): Path to the ``.dyn.h5`` file
+    """
+
+    def __init__(self, file_name):
+        h5utils.check_file_exists(file_name)
+        self.file_name = file_name
+        self.handle = None
+        self.datasets = dict()
+        self.open()
+
+    def open(self):
+        self.handle = h5.File(self.file_name, 'r')
+        self.datasets = dict()
+        needs_handle = False
+        for name, item in self.handle.items():
+            if isinstance(item, h5.Group):
+                self.datasets[name] = h5utils.load_h5_in_dict(self.handle, '/' + name + '/')
+                continue
+            offset = item.id.get_offset()
+            if offset is None or item.chunks is not None or item.shape == ():
+                # not mappable (or a scalar), read from the file on access
+                self.datasets[name] = item
+                needs_handle = True
+            else:
+                self.datasets[name] = np.memmap(self.file_name, dtype=item.dtype, mode='r',
+                                                offset=offset, shape=item.shape, order='C')
+
+        if not needs_handle:
+            self.close()
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def __getitem__(self, name):
+        value = self.datasets[name]
+        if isinstance(value, h5.Dataset) and value.shape == ():
+            return value[()]
+        return value
+
+    def __iter__(self):
+        return iter(self.datasets)
+
+    def __len__(self):
+        return len(self.datasets)
+
+    def __getstate__(self):
+        return {'file_name': self.file_name}
+
+    def __setstate__(self, state):
+        self.file_name = state['file_name']
+        self.handle = None
+        self.datasets = dict()
+        self.open()
+
+
+class DynamicInput(collections.abc.Sequence):
+    """
+    Time dependent input of the structure, indexed by time step like the list of dictionaries it replaces::
+
+        beam.dynamic_input[it]['dynamic_forces']
+
+    Nothing is allocated per time step: the dictionaries are built when requested and hold slices of the arrays
+    in ``dyn_dict`` (which may be a :class:`DynFile`) or, for the variables that are not given, the same read-only
+    zero array for every time step.
+
+    Args:
+        dyn_dict (dict): Arrays of the ``.dyn.h5`` file, with the time step as the first index
+        num_steps (int): Number of time steps
+        num_node (int): Number of structural nodes
+
+    Raises:
+        IndexError: if any of the arrays has fewer than ``num_steps`` time steps
+    """
+    shapes = {'dynamic_forces': lambda num_node: (num_node, 6),
+              'for_pos': lambda num_node: (6,),
+              'for_vel': lambda num_node: (6,),
+              'for_acc': lambda num_node: (6,)}
+
+    def __init__(self, dyn_dict, num_steps, num_node):
+        self.num_steps = num_steps
+        self.sources = dict()
+        self.zeros = dict()
+        if dyn_dict is None:
+            dyn_dict = dict()
+
+        for name, shape in self.shapes.items():
+            try:
+                source = dyn_dict[name]
+            except KeyError:
+                zeros = np.zeros(shape(num_node), dtype=ct.c_double, order='F')
+                zeros.setflags(write=False)
+                self.zeros[name] = zeros
+                continue
+            if source.shape[0] < num_steps:
+                raise IndexError('The dynamic input {:s} has {:d} time steps and {:d} are required'.format(
+                    name, source.shape[0], num_steps))
+            self.sources[name] = source
+
+    def __len__(self):
+        return self.num_steps
+
+    def __getitem__(self, it):
+        if isinstance(it, slice):
+            return [self[i] for i in range(*it.indices(self.num_steps))]
+        if it < 0:
+            it += self.num_steps
+        if not 0 <= it < self.num_steps:
+            raise IndexError('Time step {} out of range of the dynamic input with {:d} steps'.format(
+                it, self.num_steps))
+
+        step_input = dict()
+        for name, source in self.sources.items():
+            step_input[name] = source[it]
+        step_input.update(self.zeros)
+        return step_input
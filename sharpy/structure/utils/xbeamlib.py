@@ -5,6 +5,7 @@ import scipy.integrate
 
 import sharpy.utils.algebra as algebra
 import sharpy.utils.ctypes_utils as ct_utils
+import sharpy.utils.profiling as profiling
 from sharpy.utils.sharpydir import SharpyDir
 # from sharpy.utils.datastructures import StructTimeStepInfo
 import sharpy.utils.cout_utils as cout
@@ -69,6 +70,7 @@ intP = ct.POINTER(ct.c_int)
 charP = ct.POINTER(ct.c_char_p)
 
 
+@profiling.timed()
 def cbeam3_solv_nlnstatic(beam, settings, ts):
     """@brief Python wrapper for f_cbeam3_solv_nlnstatic
      Alfonso del Carre
@@ -130,6 +132,7 @@ def cbeam3_solv_nlnstatic(beam, settings, ts):
                             )
 
 
+@profiling.timed()
 def cbeam3_loads(beam, ts):
     """@brief Python wrapper for f_cbeam3_loads
      Alfonso del Carre
@@ -160,6 +163,7 @@ def cbeam3_loads(beam, ts):
     return strain, loads
 
 
+@profiling.timed()
 def cbeam3_solv_nlndyn(beam, settings):
     f_cbeam3_solv_nlndyn = xbeamlib.cbeam3_solv_nlndyn_python
     f_cbeam3_solv_nlndyn.restype = None
@@ -252,6 +256,7 @@ def cbeam3_solv_nlndyn(beam, settings):
         beam.timestep_info[i].psi_dot[:] = psi_dot_def_history[i, :]
 
 
+@profiling.timed()
 def cbeam3_step_nlndyn(beam, settings, ts, tstep=None, dt=None):
     f_cbeam3_solv_nlndyn_step = xbeamlib.cbeam3_solv_nlndyn_step_python
     f_cbeam3_solv_nlndyn_step.restype = None
@@ -336,6 +341,7 @@ f_xbeam_solv_couplednlndyn = xbeamlib.xbeam_solv_couplednlndyn_python
 f_xbeam_solv_couplednlndyn.restype = None
 
 
+@profiling.timed()
 def xbeam_solv_couplednlndyn(beam, settings):
     n_elem = ct.c_int(beam.num_elem)
     n_nodes = ct.c_int(beam.num_node)
@@ -454,6 +460,7 @@ def xbeam_solv_couplednlndyn(beam, settings):
         beam.integrate_position(it + 1, dt.value)
 
 
+@profiling.timed()
 def xbeam_step_couplednlndyn(beam, settings, ts, tstep=None, dt=None):
     # library load
     f_xbeam_solv_nlndyn_step_python = xbeamlib.xbeam_solv_nlndyn_step_python
@@ -538,6 +545,7 @@ def xbeam_step_couplednlndyn(beam, settings, ts, tstep=None, dt=None):
                                     tstep.dqddt.ctypes.data_as(doubleP))
 
 
+@profiling.timed()
 def xbeam_init_couplednlndyn(beam, settings, ts, dt=None):
     # library load
     f_xbeam_solv_nlndyn_init_python = xbeamlib.xbeam_solv_nlndyn_init_python
@@ -747,6 +755,7 @@ def cbeam3_solv_accel2state(beam, tstep):
         dummy_q.ctypes.data_as(doubleP),
         tstep.dqddt.ctypes.data_as(doubleP))
 
+@profiling.timed()
 def cbeam3_solv_modal(beam, settings, ts, FullMglobal, FullCglobal, FullKglobal):
     """
     cbeam3_solv_modal
@@ -841,6 +850,7 @@ def cbeam3_solv_modal(beam, settings, ts, FullMglobal, FullCglobal, FullKglobal)
                         FullKglobal.ctypes.data_as(doubleP))
 
 
+@profiling.timed()
 def cbeam3_asbly_dynamic(beam, tstep, settings):
     """
     cbeam3_asbly_dynamic
@@ -945,6 +955,7 @@ def cbeam3_asbly_dynamic(beam, tstep, settings):
 
     return Mglobal, Cglobal, Kglobal, Qglobal
 
+@profiling.timed()
 def xbeam3_asbly_dynamic(beam, tstep, settings):
     """
     xbeam3_asbly_dynamic
@@ -1050,6 +1061,7 @@ def xbeam3_asbly_dynamic(beam, tstep, settings):
 
     return Mtotal, Ctotal, Ktotal, Qtotal
 
+@profiling.timed()
 def cbeam3_correct_gravity_forces(beam, tstep, settings):
     """
     cbeam3_correct_gravity_forces
@@ -1095,6 +1107,7 @@ def cbeam3_correct_gravity_forces(beam, tstep, settings):
                             beam.fortran['fdof'].ctypes.data_as(intP),
                             tstep.gravity_forces.ctypes.data_as(doubleP))
 
+@profiling.timed()
 def cbeam3_asbly_static(beam, tstep, settings, iLoadStep):
     """
     cbeam3_asbly_static
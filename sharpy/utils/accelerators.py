@@ -0,0 +1,222 @@
+r"""
+Coupling Convergence Accelerators
+
+Accelerators of the fixed point iterations between the aerodynamic and structural solvers. They act on an interface
+vector :math:`\mathbf{x}`, for instance the aerodynamic forces mapped onto the structure. At every iteration, the
+coupled solvers evaluate :math:`\tilde{\mathbf{x}}_k = \mathcal{G}(\mathbf{x}_k)` and the accelerator returns the
+input of the next iteration :math:`\mathbf{x}_{k+1}` from the history of inputs and outputs. The residual is
+:math:`\mathbf{r}_k = \tilde{\mathbf{x}}_k - \mathbf{x}_k`.
+
+The first call to :meth:`update` after :meth:`reset` (i.e. in every new load or time step) returns its argument
+unchanged.
+
+The ``relaxation_factor`` follows the convention of the coupled solvers: ``0`` is no relaxation and values approaching
+``1`` are very relaxed.
+"""
+import collections
+
+import numpy as np
+
+
+class AitkenRelaxation(object):
+    r"""
+    Dynamic relaxation with Aitken's :math:`\Delta^2` method.
+
+    .. math:: \mathbf{x}_{k+1} = \mathbf{x}_k + \omega_k \mathbf{r}_k, \quad
+        \omega_k = -\omega_{k-1}\frac{\mathbf{r}_{k-1}^\top(\mathbf{r}_k - \mathbf{r}_{k-1})}
+        {||\mathbf{r}_k - \mathbf{r}_{k-1}||^2}
+
+    with :math:`\omega_0 = 1 - ` ``relaxation_factor``.
+
+    Args:
+        relaxation_factor (float): Relaxation of the first iteration of every step
+    """
+
+    def __init__(self, relaxation_factor=0.5):
+        self.initial_omega = 1. - relaxation_factor
+        self.omega = self.initial_omega
+        self.x = None
+        self.residual = None
+
+    def reset(self):
+        """
+        Starts a new step
+        """
+        self.omega = self.initial_omega
+        self.x = None
+        self.residual = None
+
+    def update(self, x_tilde):
+        """
+        Args:
+            x_tilde (np.ndarray): Output of the coupled solvers for the current input
+
+        Returns:
+            np.ndarray: Input of the next iteration
+        """
+        shape = x_tilde.shape
+        x_tilde = x_tilde.flatten()
+        if self.x is None:
+            self.x = x_tilde
+            return self.x.reshape(shape)
+
+        residual = x_tilde - self.x
+        if self.residual is not None:
+            delta_residual = residual - self.residual
+            norm2 = delta_residual.dot(delta_residual)
+            if norm2 > 0.:
+                self.omega = -self.omega*self.residual.dot(delta_residual)/norm2
+        self.residual = residual
+
+        self.x = self.x + self.omega*residual
+        return self.x.reshape(shape)
+
+
+class IQNILS(object):
+    r"""
+    Interface quasi-Newton with an approximation of the inverse Jacobian from a least-squares model (IQN-ILS).
+
+    The differences between consecutive residuals and outputs are stored as the columns of :math:`\mathbf{V}_k` and
+    :math:`\mathbf{W}_k`, and the next input is
+
+    .. math:: \mathbf{x}_{k+1} = \tilde{\mathbf{x}}_k + \mathbf{W}_k\mathbf{c}_k, \quad
+        \mathbf{c}_k = \arg\min ||\mathbf{V}_k\mathbf{c} + \mathbf{r}_k||
+
+    The columns of the last ``reuse`` steps are kept and used as well, such that from the second step on the
+    accelerator starts off with an approximation of the Jacobian. Columns that are close to linearly dependent are
+    filtered out with a QR decomposition. When there are no columns yet, a constant relaxation is applied.
+
+    References:
+        Degroote, J., Bathe, K.J. and Vierendeels, J., 2009. Performance of a new partitioned procedure versus a
+        monolithic procedure in fluid-structure interaction. Computers & Structures, 87(11-12), pp.793-801.
+
+    Args:
+        relaxation_factor (float): Relaxation when there are no columns in the model
+        reuse (int): Number of previous steps whose columns are reused
+        filter_tolerance (float): Columns whose diagonal element of the QR decomposition is below this fraction of
+            the largest one are discarded
+    """
+
+    def __init__(self, relaxation_factor=0.5, reuse=0, filter_tolerance=1e-10):
+        self.omega = 1. - relaxation_factor
+        self.filter_tolerance = filter_tolerance
+        self.previous_steps = collections.deque(maxlen=max(reuse, 0))
+
+        self.v_columns = []
+        self.w_columns = []
+        self.x = None
+        self.x_tilde = None
+        self.residual = None
+
+    def reset(self):
+        """
+        Starts a new step. The columns of the current step are kept for reuse.
+        """
+        if self.v_columns and self.previous_steps.maxlen:
+            self.previous_steps.appendleft((self.v_columns, self.w_columns))
+        self.v_columns = []
+        self.w_columns = []
+        self.x = None
+        self.x_tilde = None
+        self.residual = None
+
+    def clear(self):
+        """
+        Starts a new step discarding the columns of the previous steps as well
+        """
+        self.previous_steps.clear()
+        self.v_columns = []
+        self.reset()
+
+    @property
+    def n_columns(self):
+        return len(self.v_columns) + sum(len(v) for v, _ in self.previous_steps)
+
+    def update(self, x_tilde):
+        """
+        Args:
+            x_tilde (np.ndarray): Output of the coupled solvers for the current input
+
+        Returns:
+            np.ndarray: Input of the next iteration
+        """
+        shape = x_tilde.shape
+        x_tilde = x_tilde.flatten()
+        if self.x is None:
+            self.x = x_tilde
+            self.x_tilde = x_tilde
+            return self.x.reshape(shape)
+
+        residual = x_tilde - self.x
+        if self.residual is not None:
+            # newest first
+            self.v_columns.insert(0, residual - self.residual)
+            self.w_columns.insert(0, x_tilde - self.x_tilde)
+        self.residual = residual
+        self.x_tilde = x_tilde
+
+        v_columns = self.v_columns + [column for v, _ in self.previous_steps for column in v]
+        w_columns = self.w_columns + [column for _, w in self.previous_steps for column in w]
+        if not v_columns:
+            self.x = self.x + self.omega*residual
+            return self.x.reshape(shape)
+
+        v_matrix = np.column_stack(v_columns)
+        w_matrix = np.column_stack(w_columns)
+        q_matrix, r_matrix, kept = self.filter(v_matrix)
+        if r_matrix[0, 0] == 0.:
+            # the residual has not changed
+            self.x = self.x + self.omega*residual
+            return self.x.reshape(shape)
+        coefficients = np.linalg.solve(r_matrix, -q_matrix.T.dot(residual))
+
+        self.x = x_tilde + w_matrix[:, kept].dot(coefficients)
+        return self.x.reshape(shape)
+
+    def filter(self, v_matrix):
+        """
+        QR decomposition of the columns of ``V``, removing the oldest column that is close to linearly dependent on
+        the newer ones until none is left.
+
+        Returns:
+            tuple: ``Q``, ``R`` and indices of the columns kept
+        """
+        kept = np.arange(v_matrix.shape[1])
+        while True:
+            q_matrix, r_matrix = np.linalg.qr(v_matrix[:, kept])
+            diagonal = np.abs(np.diag(r_matrix))
+            dependent = np.where(diagonal < self.filter_tolerance*max(diagonal.max(), np.finfo(float).tiny))[0]
+            if not dependent.size or len(kept) == 1:
+                return q_matrix, r_matrix, kept
+            kept = np.delete(kept, dependent[-1])
+
+
+def extrapolate(history, order=1):
+    r"""
+    Polynomial extrapolation of the next value of a series sampled at a constant step, used to predict the initial
+    guess of a new step from the previous ones.
+
+    .. math:: \mathbf{x}_{n+1} \approx \mathbf{x}_n \quad (0), \qquad
+        2\mathbf{x}_n - \mathbf{x}_{n-1} \quad (1), \qquad
+        3\mathbf{x}_n - 3\mathbf{x}_{n-1} + \mathbf{x}_{n-2} \quad (2)
+
+    The order is reduced if there are not enough values in ``history``.
+
+    Args:
+        history (list(np.ndarray)): Previous values, newest first
+        order (int): Order of the extrapolating polynomial (``0``, ``1`` or ``2``)
+
+    Returns:
+        np.ndarray: Extrapolated value
+    """
+    coefficients = {0: (1.,),
+                    1: (2., -1.),
+                    2: (3., -3., 1.)}
+    if order not in coefficients:
+        raise ValueError('Extrapolation of order {} not supported. Use 0, 1 or 2'.format(order))
+    weights = coefficients[min(order, len(history) - 1)]
+    return sum(weight*value for weight, value in zip(weights, history))
+
+
+dict_of_accelerators = {'aitken': AitkenRelaxation,
+                        'iqn_ils': IQNILS}
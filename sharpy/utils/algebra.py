@@ -640,13 +640,8 @@ def triad2crv_vec(v1, v2, v3):
 
 
 def crv2triad_vec(crv_vec):
-    n_nodes, _ = crv_vec.shape
-    v1 = np.zeros((n_nodes, 3))
-    v2 = np.zeros((n_nodes, 3))
-    v3 = np.zeros((n_nodes, 3))
-    for inode in range(n_nodes):
-        v1[inode, :], v2[inode, :], v3[inode, :] = crv2triad(crv_vec[inode, :])
-    return v1, v2, v3
+    rot = crv2rotation_vec(crv_vec)
+    return rot[:, :, 0].copy(), rot[:, :, 1].copy(), rot[:, :, 2].copy()
 
 
 def quat2rotation(q1):
@@ -1950,3 +1945,205 @@ def get_transformation_matrix(transformation):
         return cgb
     else:
         raise NameError('Unknown transformation.')
+
+
+#######
+# Batched operations
+#
+# Array-native versions of the functions above acting on stacks of vectors, ``[N x 3]`` CRVs or ``[N x 4]``
+# quaternions, and returning stacks of ``[N x 3 x 3]`` matrices. They are equivalent to calling the single vector
+# functions on every row, including the series expansions used for small rotations.
+
+def skew_vec(vectors):
+    r"""
+    Stack of skew symmetric matrices :math:`\tilde{\boldsymbol{v}}_i` of each of the vectors. See :func:`skew`.
+
+    Args:
+        vectors (np.ndarray): ``[N x 3]`` vectors
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` skew symmetric matrices
+    """
+    vectors = np.atleast_2d(vectors)
+    if not vectors.shape[-1] == 3:
+        raise ValueError('The input vectors are not 3D')
+
+    matrices = np.zeros((vectors.shape[0], 3, 3))
+    matrices[:, 1, 2] = -vectors[:, 0]
+    matrices[:, 2, 0] = -vectors[:, 1]
+    matrices[:, 0, 1] = -vectors[:, 2]
+    matrices[:, 2, 1] = vectors[:, 0]
+    matrices[:, 0, 2] = vectors[:, 1]
+    matrices[:, 1, 0] = vectors[:, 2]
+    return matrices
+
+
+def cross3_vec(v, w):
+    """
+    Cross products of the rows of two ``[N x 3]`` arrays. See :func:`cross3`.
+    """
+    v = np.atleast_2d(v)
+    w = np.atleast_2d(w)
+
+    res = np.zeros(np.broadcast(v, w).shape)
+    res[:, 0] = v[:, 1]*w[:, 2] - v[:, 2]*w[:, 1]
+    res[:, 1] = -v[:, 0]*w[:, 2] + v[:, 2]*w[:, 0]
+    res[:, 2] = v[:, 0]*w[:, 1] - v[:, 1]*w[:, 0]
+    return res
+
+
+def crv2rotation_vec(psi):
+    r"""
+    Rotation matrices of a stack of Cartesian rotation vectors. See :func:`crv2rotation`.
+
+    Args:
+        psi (np.ndarray): ``[N x 3]`` Cartesian rotation vectors
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` rotation matrices
+    """
+    psi = np.atleast_2d(psi)
+    norm_psi = np.linalg.norm(psi, axis=1)
+    small = norm_psi < 1e-15
+
+    # coefficients default to the series expansion for small rotations
+    skew_psi = skew_vec(psi)
+    k1 = np.ones_like(norm_psi)
+    k2 = 0.5*np.ones_like(norm_psi)
+
+    large = ~small
+    k1[large] = np.sin(norm_psi[large])/norm_psi[large]
+    k2[large] = (1.0 - np.cos(norm_psi[large]))/norm_psi[large]**2
+
+    return (np.eye(3) + k1[:, None, None]*skew_psi +
+            k2[:, None, None]*np.einsum('nij,njk->nik', skew_psi, skew_psi))
+
+
+def crv2tan_vec(psi):
+    r"""
+    Tangential operators of a stack of Cartesian rotation vectors. See :func:`crv2tan`.
+
+    Args:
+        psi (np.ndarray): ``[N x 3]`` Cartesian rotation vectors
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` tangential operators
+    """
+    psi = np.atleast_2d(psi)
+    norm_psi = np.linalg.norm(psi, axis=1)
+    psi_skew = skew_vec(psi)
+
+    eps = 1e-8
+    k1 = -0.5*np.ones_like(norm_psi)
+    k2 = 1.0/6.0*np.ones_like(norm_psi)
+
+    large = norm_psi >= eps
+    norm_sq = norm_psi[large]*norm_psi[large]
+    k1[large] = (np.cos(norm_psi[large]) - 1.0)/norm_sq
+    k2[large] = (1.0 - np.sin(norm_psi[large])/norm_psi[large])/norm_sq
+
+    return (np.eye(3) + k1[:, None, None]*psi_skew +
+            k2[:, None, None]*np.einsum('nij,njk->nik', psi_skew, psi_skew))
+
+
+def quat2rotation_vec(quat):
+    r"""
+    Rotation matrices :math:`C^{AB}` of a stack of quaternions. See :func:`quat2rotation`.
+
+    Args:
+        quat (np.ndarray): ``[N x 4]`` quaternions
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` rotation matrices
+    """
+    q = np.atleast_2d(quat).astype(float)
+    q = q/np.linalg.norm(q, axis=1)[:, None]
+    q0, q1, q2, q3 = q.T
+
+    rot_mat = np.zeros((q.shape[0], 3, 3))
+
+    rot_mat[:, 0, 0] = q0**2 + q1**2 - q2**2 - q3**2
+    rot_mat[:, 1, 1] = q0**2 - q1**2 + q2**2 - q3**2
+    rot_mat[:, 2, 2] = q0**2 - q1**2 - q2**2 + q3**2
+
+    rot_mat[:, 1, 0] = 2.*(q1*q2 + q0*q3)
+    rot_mat[:, 0, 1] = 2.*(q1*q2 - q0*q3)
+
+    rot_mat[:, 2, 0] = 2.*(q1*q3 - q0*q2)
+    rot_mat[:, 0, 2] = 2.*(q1*q3 + q0*q2)
+
+    rot_mat[:, 2, 1] = 2.*(q2*q3 + q0*q1)
+    rot_mat[:, 1, 2] = 2.*(q2*q3 - q0*q1)
+
+    return rot_mat
+
+
+def rotation3d_vec(angles, axis):
+    r"""
+    Rotation matrices about one of the coordinate axes for a set of angles. See :func:`rotation3d_x`,
+    :func:`rotation3d_y` and :func:`rotation3d_z`.
+
+    Args:
+        angles (np.ndarray): ``[N]`` angles of rotation in radians
+        axis (str): ``x``, ``y`` or ``z``
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` rotation matrices
+    """
+    angles = np.atleast_1d(angles)
+    c = np.cos(angles)
+    s = np.sin(angles)
+
+    # indices of the rotation plane with the positive sense of rotation
+    i, j = {'x': (1, 2), 'y': (2, 0), 'z': (0, 1)}[axis]
+    k = 3 - i - j
+
+    mat = np.zeros((angles.shape[0], 3, 3))
+    mat[:, k, k] = 1.0
+    mat[:, i, i] = c
+    mat[:, j, j] = c
+    mat[:, i, j] = -s
+    mat[:, j, i] = s
+    return mat
+
+
+def der_Ccrv_by_v_vec(fv0, v):
+    """
+    Stack of the derivatives of ``dot(C(fv0), v)`` w.r.t. the CRV components for each row of ``fv0`` and ``v``.
+    See :func:`der_Ccrv_by_v`.
+
+    Args:
+        fv0 (np.ndarray): ``[N x 3]`` Cartesian rotation vectors
+        v (np.ndarray): ``[N x 3]`` constant vectors, or a single vector used for all rotations
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` derivatives
+    """
+    fv0 = np.atleast_2d(fv0)
+    v = np.broadcast_to(v, fv0.shape)
+
+    Cab0 = crv2rotation_vec(fv0)
+    T0 = crv2tan_vec(fv0)
+
+    return -np.einsum('nij,njk,nkl->nil', Cab0, skew_vec(v), T0)
+
+
+def der_CcrvT_by_v_vec(fv0, v):
+    """
+    Stack of the derivatives of ``dot(C(fv0).T, v)`` w.r.t. the CRV components for each row of ``fv0`` and ``v``.
+    See :func:`der_CcrvT_by_v`.
+
+    Args:
+        fv0 (np.ndarray): ``[N x 3]`` Cartesian rotation vectors
+        v (np.ndarray): ``[N x 3]`` constant vectors, or a single vector used for all rotations
+
+    Returns:
+        np.ndarray: ``[N x 3 x 3]`` derivatives
+    """
+    fv0 = np.atleast_2d(fv0)
+    v = np.broadcast_to(v, fv0.shape)
+
+    Cba0v = np.einsum('nji,nj->ni', crv2rotation_vec(fv0), v)
+    T0 = crv2tan_vec(fv0)
+
+    return np.einsum('nij,njk->nik', skew_vec(Cba0v), T0)
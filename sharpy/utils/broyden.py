@@ -0,0 +1,145 @@
+r"""Newton-Broyden Root Finding
+
+Solution of small systems of nonlinear equations :math:`\mathbf{f}(\mathbf{x}) = \mathbf{0}` whose evaluation is
+expensive, such as the resultant forces and moments of a coupled static solution as a function of the trim variables.
+
+The initial Jacobian is either given or computed by forward finite differences, with the perturbations of each
+variable evaluated in parallel by forked processes (see :mod:`sharpy.utils.parallel_utils`). The Newton steps
+
+.. math:: \mathbf{J}_k\Delta\mathbf{x}_k = -\mathbf{f}_k
+
+are then taken in the least-squares sense, such that the number of equations and unknowns need not be the same, and
+the Jacobian is corrected with Broyden's rank one update after each step
+
+.. math:: \mathbf{J}_{k+1} = \mathbf{J}_k + \frac{(\Delta\mathbf{f}_k - \mathbf{J}_k\Delta\mathbf{x}_k)
+    \Delta\mathbf{x}_k^\top}{\Delta\mathbf{x}_k^\top\Delta\mathbf{x}_k}
+
+which requires a single evaluation per iteration. If a step increases the scaled residual, the Jacobian is computed
+again by finite differences at the new point.
+"""
+import numpy as np
+
+import sharpy.utils.exceptions as exc
+import sharpy.utils.parallel_utils as parallel_utils
+
+
+def finite_difference_jacobian(function, x, f, steps, num_processes=1):
+    """
+    Forward finite difference approximation of the Jacobian of ``function`` at ``x``.
+
+    Args:
+        function (callable): Function of the vector of unknowns returning the vector of residuals
+        x (np.ndarray): Point of evaluation
+        f (np.ndarray): Value of ``function(x)``
+        steps (np.ndarray): Perturbation of each of the unknowns
+        num_processes (int): Number of processes evaluating the perturbations in parallel. Each process
+            evaluates the function for one perturbation at a time
+
+    Returns:
+        np.ndarray: Jacobian of size ``len(f) x len(x)``
+    """
+    x = np.asarray(x, dtype=float)
+    steps = np.broadcast_to(np.asarray(steps, dtype=float), x.shape)
+
+    def perturbed(i_var):
+        x_perturbed = x.copy()
+        x_perturbed[i_var] += steps[i_var]
+        return np.asarray(function(x_perturbed), dtype=float)
+
+    values = parallel_utils.map_time_steps(perturbed, range(len(x)), num_processes=num_processes,
+                                           chunks_per_process=1)
+    return np.column_stack([(value - f)/steps[i_var] for i_var, value in enumerate(values)])
+
+
+class BroydenSolver(object):
+    """
+    Newton iterations with Broyden updates of the Jacobian.
+
+    Args:
+        function (callable): Function of the vector of unknowns returning the vector of residuals
+        tolerance (float or np.ndarray): Absolute tolerance of each residual
+        steps (float or np.ndarray): Finite difference perturbation of each unknown
+        max_iter (int): Maximum number of Newton iterations
+        num_processes (int): Number of processes for the finite difference Jacobian
+        step_tolerance (float): The iterations also stop when the norm of the Newton step falls below this value, for
+            overdetermined systems with no exact solution. ``0`` disables it
+        callback (callable): Called as ``callback(x, f)`` after each evaluation in the calling process
+
+    Attributes:
+        jacobian (np.ndarray): Current approximation of the Jacobian. It may be given before calling :meth:`solve`,
+            for instance from a linearised model or a previous solution, and then no finite differences are computed
+            unless the iterations diverge
+        n_evaluations (int): Number of evaluations of ``function`` in the last solution
+        n_jacobians (int): Number of finite difference Jacobians in the last solution
+    """
+
+    def __init__(self, function, tolerance, steps, max_iter=20, num_processes=1, step_tolerance=0.,
+                 callback=None):
+        self.function = function
+        self.tolerance = tolerance
+        self.steps = steps
+        self.max_iter = max_iter
+        self.num_processes = num_processes
+        self.step_tolerance = step_tolerance
+        self.callback = callback
+
+        self.jacobian = None
+        self.n_evaluations = 0
+        self.n_jacobians = 0
+
+    def evaluate(self, x):
+        f = np.asarray(self.function(x), dtype=float)
+        self.n_evaluations += 1
+        if self.callback is not None:
+            self.callback(x, f)
+        return f
+
+    def update_jacobian(self, x, f):
+        self.jacobian = finite_difference_jacobian(self.function, x, f, self.steps, self.num_processes)
+        self.n_evaluations += len(x)
+        self.n_jacobians += 1
+
+    def converged(self, f):
+        return np.all(np.abs(f) < self.tolerance)
+
+    def scaled_norm(self, f):
+        return np.linalg.norm(f/self.tolerance)
+
+    def solve(self, x0):
+        """
+        Args:
+            x0 (np.ndarray): Initial guess
+
+        Returns:
+            tuple: Solution and residuals at the solution
+
+        Raises:
+            sharpy.utils.exceptions.NotConvergedSolver: if the residuals are not below the tolerance after
+                ``max_iter`` iterations
+        """
+        self.n_evaluations = 0
+        self.n_jacobians = 0
+
+        x = np.array(x0, dtype=float)
+        f = self.evaluate(x)
+        if self.converged(f):
+            return x, f
+
+        if self.jacobian is None:
+            self.update_jacobian(x, f)
+
+        for i_iter in range(self.max_iter):
+            dx = -np.linalg.lstsq(self.jacobian, f, rcond=None)[0]
+            x_new = x + dx
+            f_new = self.evaluate(x_new)
+            if self.converged(f_new) or np.linalg.norm(dx) < self.step_tolerance:
+                return x_new, f_new
+
+            if self.scaled_norm(f_new) > self.scaled_norm(f):
+                self.update_jacobian(x_new, f_new)
+            else:
+                self.jacobian += np.outer(f_new - f - self.jacobian.dot(dx), dx)/dx.dot(dx)
+            x, f = x_new, f_new
+
+        raise exc.NotConvergedSolver('Newton-Broyden iterations did not converge in {:d} iterations. '
+                                     'Residual: {}'.format(self.max_iter, f))
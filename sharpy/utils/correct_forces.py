@@ -122,8 +122,9 @@ def polars(data, aero_kstep, structural_kstep, struct_forces, **kwargs):
 
             ielem, inode_in_elem = beam.node_master_elem[inode]
             iairfoil = aero_dict['airfoil_distribution'][ielem, inode_in_elem]
-            isurf = aerogrid.struct2aero_mapping[inode][0]['i_surf']
-            i_n = aerogrid.struct2aero_mapping[inode][0]['i_n']
+            i_entry = aerogrid.mapping_tables.node_ptr[inode]
+            isurf = aerogrid.mapping_tables.surf[i_entry]
+            i_n = aerogrid.mapping_tables.i_n[i_entry]
             N = aerogrid.aero_dimensions[isurf, 1]
             polar = aerogrid.polars[iairfoil]
             cab = algebra.crv2rotation(structural_kstep.psi[ielem, inode_in_elem, :])
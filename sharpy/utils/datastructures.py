@@ -3,6 +3,7 @@
 These classes are responsible for storing the aerodynamic and structural time step information and relevant variables.
 
 """
+import collections
 import copy
 import ctypes as ct
 import numpy as np
@@ -919,6 +920,117 @@ class LinearTimeStepInfo(object):
         copied.t = self.t.copy()
 
 
+class TimeStepCache(object):
+    """
+    Least recently used cache of time step objects that are generated on demand.
+
+    The ``builder`` is a callable that, given the index of a time step, returns the time step object (or a tuple of
+    objects, for instance the aerodynamic and structural time steps that are obtained from the same linear state).
+    At most ``max_size`` results are kept in memory, the least recently used being discarded first.
+
+    Args:
+        builder (callable): Function ``builder(index)`` that generates the time step(s) for ``index``.
+        max_size (int): Maximum number of time steps kept in memory.
+    """
+    def __init__(self, builder, max_size=10):
+        self.builder = builder
+        self.max_size = max(int(max_size), 1)
+        self._cache = collections.OrderedDict()
+
+    def get(self, index):
+        try:
+            self._cache.move_to_end(index)
+        except KeyError:
+            self._cache[index] = self.builder(index)
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return self._cache[index]
+
+    def clear(self):
+        self._cache.clear()
+
+    def __getstate__(self):
+        # the generated time steps are not stored
+        return {'builder': self.builder, 'max_size': self.max_size}
+
+    def __setstate__(self, state):
+        self.builder = state['builder']
+        self.max_size = state['max_size']
+        self._cache = collections.OrderedDict()
+
+
+class LazyTimeStepInfo(object):
+    """
+    Placeholder for a time step that is only generated when one of its attributes is accessed.
+
+    It can be appended to ``data.aero.timestep_info`` or ``data.structure.timestep_info`` instead of the full time
+    step object. Reading an attribute materialises the time step through a shared :class:`TimeStepCache`, such that
+    only the time steps that are actually used are held in memory.
+
+    Assigning an attribute materialises the time step and keeps it attached to this placeholder from then on, so that
+    the change is not lost when the cache discards the entry. The ``postproc_cell`` and ``postproc_node`` dictionaries
+    are kept by the placeholder as well, such that the entries the postprocessors add to them are not lost either.
+    Other in-place modifications of arrays of a time step that has not been pinned may be lost once it leaves the
+    cache.
+
+    Args:
+        cache (TimeStepCache): Cache that generates the time steps.
+        index (int): Index of the time step in the cache.
+        position (int or None): Position of this time step in the tuple returned by the cache builder, if the builder
+          returns several objects per index.
+    """
+    _own_attributes = ('_lazy_cache', '_lazy_index', '_lazy_position', '_lazy_pinned', '_lazy_postproc')
+    _postproc_attributes = ('postproc_cell', 'postproc_node')
+
+    def __init__(self, cache, index, position=None, pinned=None, postproc=None):
+        object.__setattr__(self, '_lazy_cache', cache)
+        object.__setattr__(self, '_lazy_index', index)
+        object.__setattr__(self, '_lazy_position', position)
+        object.__setattr__(self, '_lazy_pinned', pinned)
+        object.__setattr__(self, '_lazy_postproc', dict() if postproc is None else postproc)
+
+    def materialise(self):
+        """
+        Returns:
+            The time step object this placeholder stands for.
+        """
+        if self._lazy_pinned is not None:
+            return self._lazy_pinned
+        tstep = self._lazy_cache.get(self._lazy_index)
+        if self._lazy_position is not None:
+            tstep = tstep[self._lazy_position]
+
+        # postprocessing dictionaries of this time step, kept when the cache discards it
+        for name in self._postproc_attributes:
+            try:
+                postproc = self._lazy_postproc[name]
+            except KeyError:
+                if hasattr(tstep, name):
+                    self._lazy_postproc[name] = getattr(tstep, name)
+            else:
+                setattr(tstep, name, postproc)
+        return tstep
+
+    def __reduce__(self):
+        # the class attribute is that of the time step, hence the explicit reconstruction of the placeholder
+        return LazyTimeStepInfo, (self._lazy_cache, self._lazy_index, self._lazy_position, self._lazy_pinned,
+                                  self._lazy_postproc)
+
+    @property
+    def __class__(self):
+        return self.materialise().__class__
+
+    def __getattr__(self, name):
+        if name in LazyTimeStepInfo._own_attributes:
+            raise AttributeError(name)
+        return getattr(self.materialise(), name)
+
+    def __setattr__(self, name, value):
+        tstep = self.materialise()
+        object.__setattr__(self, '_lazy_pinned', tstep)
+        setattr(tstep, name, value)
+
+
 class Linear(object):
     """
     This is the class responsible for the transfer of information between linear systems
@@ -250,6 +250,10 @@ def add_as_grp(obj, grpParent,
         - if compress_float is True, numpy arrays will be saved in single precisions.
     """
 
+    ### time steps generated on demand are saved as the underlying object
+    if hasattr(obj, 'materialise'):
+        obj = obj.materialise()
+
     ### determine if dict, list, tuple or class
     if isinstance(obj, list):
         ObjType = 'list'
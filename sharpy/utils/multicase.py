@@ -0,0 +1,133 @@
+"""Multiple Case Execution
+
+Runs several variations of the same case (for instance different gusts, controller gains or manoeuvres of the same
+aircraft) loading the model only once.
+
+The solvers at the start of the ``flow`` whose settings are the same for all the cases (typically ``BeamLoader``,
+``AerogridLoader`` and ``StaticCoupled`` or ``StaticTrim``) are run once. The processes running each case are then
+forked from the one holding the resulting data, such that the model and static solution are shared copy-on-write
+instead of being rebuilt and stored by every case. Each of them runs the rest of the ``flow`` with its own settings
+and writes its results through the usual postprocessors. Example::
+
+    import sharpy.utils.multicase as multicase
+
+    cases = [{'SHARPy': {'case': 'gust_{:g}'.format(gust_length)},
+              'DynamicCoupled': {'aero_solver_settings': {'velocity_field_input': {'gust_length': gust_length}}}}
+             for gust_length in [5., 10., 20.]]
+    multicase.run_cases('aircraft.sharpy', cases, num_processes=3)
+
+The cases are run one after the other in the calling process if a single process is requested or forking is not
+supported by the platform, from a copy of the common data each.
+"""
+import copy
+import math
+
+import sharpy.utils.cout_utils as cout
+import sharpy.utils.parallel_utils as parallel_utils
+
+
+def merge_settings(settings, overrides):
+    """
+    Copy of ``settings`` with the values in ``overrides`` replaced, recursively for nested dictionaries.
+
+    Args:
+        settings (dict): Settings of all the solvers, as in the ``.sharpy`` file
+        overrides (dict): Settings to replace, with the same structure
+
+    Returns:
+        dict: Settings of the case
+    """
+    merged = copy.deepcopy(dict(settings))
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key, None), dict):
+            merged[key] = merge_settings(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def common_flow(settings, case_settings):
+    """
+    Solvers at the start of the flow that are the same, and have the same settings, in every case.
+
+    Args:
+        settings (dict): Base settings
+        case_settings (list(dict)): Settings of each case
+
+    Returns:
+        list(str): Common solvers
+    """
+    flow = list(settings['SHARPy']['flow'])
+    for i_solver, solver_name in enumerate(flow):
+        for case in case_settings:
+            case_flow = list(case['SHARPy']['flow'])
+            if (i_solver >= len(case_flow) or case_flow[i_solver] != solver_name or
+                    case.get(solver_name, None) != settings.get(solver_name, None)):
+                return flow[:i_solver]
+    return flow
+
+
+def run_cases(settings, cases, num_processes=1, collect=None):
+    """
+    Runs the variations of a case given by ``cases``.
+
+    Args:
+        settings (str or dict): ``.sharpy`` file or settings dictionary of the base case
+        cases (list(dict)): Settings to override in each case, with the same structure as ``settings``. Unless
+            given, the case name of each case is the base case name followed by the index of the case
+        num_processes (int): Number of cases run at once
+        collect (callable): Function of the data at the end of each case, whose (picklable) result is returned
+
+    Returns:
+        list: Results of ``collect`` for each case, ``None`` if not given
+    """
+    import sharpy.sharpy_main as sharpy_main
+    import sharpy.utils.input_arg as input_arg
+    from sharpy.presharpy.presharpy import PreSharpy
+
+    # Loading solvers and postprocessors
+    import sharpy.solvers
+    import sharpy.postproc
+    import sharpy.generators
+    import sharpy.controllers
+
+    if isinstance(settings, str):
+        settings = input_arg.parse_settings(settings)
+    if hasattr(settings, 'dict'):
+        # ConfigObj
+        settings = settings.dict()
+    settings = merge_settings(settings, dict())
+
+    case_settings = []
+    for i_case, overrides in enumerate(cases):
+        case = merge_settings(settings, overrides)
+        if 'case' not in overrides.get('SHARPy', dict()):
+            case['SHARPy']['case'] = '{:s}_{:03d}'.format(settings['SHARPy']['case'], i_case)
+        case_settings.append(case)
+
+    flow = common_flow(settings, case_settings)
+
+    cout.start_writer()
+    try:
+        data = PreSharpy(copy.deepcopy(settings))
+        cout.cout_wrap('Running the solvers common to the {:d} cases: {}'.format(len(cases), flow))
+        data = sharpy_main.run_flow(data, flow)
+
+        def run_case(i_case):
+            # the forked workers own their copy of the common data
+            case_data = data if parallel_utils.is_worker() else copy.deepcopy(data)
+            case_data.update_settings(case_settings[i_case])
+            case_flow = list(case_settings[i_case]['SHARPy']['flow'])[len(flow):]
+            case_data = sharpy_main.run_flow(case_data, case_flow)
+            if collect is None:
+                return None
+            return collect(case_data)
+
+        # one case per process, forked from the common data
+        num_processes = max(min(num_processes, len(cases)), 1)
+        results = parallel_utils.map_time_steps(run_case, range(len(cases)), num_processes=num_processes,
+                                                chunks_per_process=math.ceil(len(cases)/num_processes),
+                                                max_tasks_per_process=1)
+    finally:
+        cout.finish_writer()
+    return results
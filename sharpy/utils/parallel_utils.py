@@ -0,0 +1,97 @@
+"""Parallel Execution Utilities
+
+Evaluation of independent time steps of a stored time history in a pool of processes. The worker processes are forked
+from the current one and therefore have access to the whole of the case data without it being pickled. Only the
+results returned for each time step are sent back, and they are collated in time step order.
+"""
+import multiprocessing as mpr
+
+import numpy as np
+
+# function being evaluated by the forked workers. It is inherited by the workers at fork time and therefore need not
+# be pickled, which allows bound methods of solvers holding the case data to be used
+_step_function = None
+
+# set in the worker processes
+_worker = False
+
+
+def fork_available():
+    """
+    Returns ``True`` if worker processes can be started by forking the current one
+    """
+    return 'fork' in mpr.get_all_start_methods()
+
+
+def is_worker():
+    """
+    Returns ``True`` in the worker processes of :func:`map_time_steps`, e.g. to avoid writing to the files or screen
+    output of the calling process
+    """
+    return _worker
+
+
+def _initialise_worker():
+    global _worker
+    _worker = True
+
+
+def _run_chunk(time_steps):
+    return [_step_function(ts) for ts in time_steps]
+
+
+def chunks(time_steps, n_chunks):
+    """
+    Splits the time steps into ``n_chunks`` contiguous chunks of similar size
+
+    Args:
+        time_steps (list(int)): Time steps
+        n_chunks (int): Number of chunks
+
+    Returns:
+        list(list(int)): Contiguous chunks of time steps. Empty chunks are discarded.
+    """
+    return [list(chunk) for chunk in np.array_split(np.array(time_steps, dtype=int), n_chunks) if len(chunk) > 0]
+
+
+def map_time_steps(function, time_steps, num_processes=1, chunks_per_process=4, max_tasks_per_process=None):
+    """
+    Evaluates ``function(ts)`` for each of the given time steps and returns the results in the same order.
+
+    If ``num_processes > 1`` the time steps are split in contiguous chunks that are evaluated in a pool of forked
+    processes. Side effects of ``function`` in the worker processes (such as modifying the case data) are not seen by
+    the calling process, hence anything needed afterwards should be returned by ``function`` (and be picklable).
+    Files written by each time step are unaffected.
+
+    The time steps are evaluated serially in the calling process when only one process is requested, when there is a
+    single time step or when forking is not supported by the platform.
+
+    Args:
+        function (callable): Function of the time step number
+        time_steps (iterable(int)): Time steps to evaluate
+        num_processes (int): Number of worker processes
+        chunks_per_process (int): Number of chunks in which the time steps are split for each process, to balance the
+            load between processes
+        max_tasks_per_process (int): Number of chunks a worker process evaluates before it is replaced by a new one
+            forked from the calling process. With ``1``, every chunk starts from the state of the calling process
+            regardless of the side effects of the previous chunks. ``None`` keeps the workers for all the chunks
+
+    Returns:
+        list: Results of ``function`` for each time step
+    """
+    global _step_function
+
+    time_steps = list(time_steps)
+    num_processes = min(num_processes, len(time_steps))
+    if num_processes <= 1 or not fork_available():
+        return [function(ts) for ts in time_steps]
+
+    _step_function = function
+    try:
+        with mpr.get_context('fork').Pool(num_processes, initializer=_initialise_worker,
+                                          maxtasksperchild=max_tasks_per_process) as pool:
+            results = pool.map(_run_chunk, chunks(time_steps, num_processes * chunks_per_process))
+    finally:
+        _step_function = None
+
+    return [result for chunk_results in results for result in chunk_results]
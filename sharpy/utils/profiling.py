@@ -0,0 +1,264 @@
+"""Profiling Utilities
+
+Lightweight instrumentation of the solvers: hierarchical wall-clock timers, event counters and call counts of the
+compiled libraries. The instrumentation is disabled by default, in which case the timers and counters return straight
+away. It is enabled with the ``profiling`` setting of the ``SHARPy`` header, and the records are written at the end of
+the run to ``<log_folder>/<case>.profiling.json`` and ``.csv``.
+
+Timers are nested by name, such that timing ``'aero'`` inside ``'time_step'`` inside ``'DynamicCoupled'`` is recorded
+as ``DynamicCoupled/time_step/aero``. The nesting is kept per thread.
+
+Examples:
+
+    >>> import sharpy.utils.profiling as profiling
+    >>> profiling.enable()
+    >>> with profiling.timer('DynamicCoupled'):
+    ...     with profiling.timer('aero'):
+    ...         pass
+    ...     profiling.count('fsi_iterations', 3)
+    >>> sorted(profiling.records())
+    ['DynamicCoupled', 'DynamicCoupled/aero', 'DynamicCoupled/fsi_iterations']
+
+"""
+import contextlib
+import csv
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+_enabled = False
+_trace_memory = False
+_lock = threading.Lock()
+_records = dict()
+_local = threading.local()
+
+
+class Record(object):
+    """
+    Statistics of a timer or counter
+
+    Attributes:
+        calls (int): Number of times the timer was entered or the counter increased
+        total (float): Total wall-clock time in seconds or total count
+        max (float): Maximum time of a single call or maximum single increment
+        allocated (int): Net memory allocated inside the timer, in bytes. Only recorded when tracing memory
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.
+        self.max = 0.
+        self.allocated = 0
+
+    def add(self, value, allocated=0):
+        self.calls += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.allocated += allocated
+
+    def as_dict(self):
+        return {'calls': self.calls,
+                'total': self.total,
+                'mean': self.total/max(self.calls, 1),
+                'max': self.max,
+                'allocated': self.allocated}
+
+
+def enable(trace_memory=False):
+    """
+    Enables the instrumentation and clears any previous record.
+
+    Args:
+        trace_memory (bool): Record the net memory allocated inside each timer using :mod:`tracemalloc`. Slows down
+            the run noticeably.
+    """
+    global _enabled, _trace_memory
+    reset()
+    _enabled = True
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _trace_memory
+    _enabled = False
+    if _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _records.clear()
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def current_path():
+    """
+    Returns:
+        str: Full name of the innermost running timer of the calling thread
+    """
+    return '/'.join(_stack())
+
+
+def _full_name(name):
+    stack = _stack()
+    if stack:
+        return '/'.join(stack) + '/' + name
+    return name
+
+
+def _add(full_name, value, allocated=0):
+    with _lock:
+        try:
+            record = _records[full_name]
+        except KeyError:
+            record = Record()
+            _records[full_name] = record
+        record.add(value, allocated)
+
+
+class Timer(object):
+    """
+    Context manager timing the enclosed block under ``name``, nested in the timers running in the same thread.
+    Instantiated with :func:`timer`.
+    """
+
+    __slots__ = ('name', 'active', 't0', 'mem0')
+
+    def __init__(self, name):
+        self.name = name
+        self.active = False
+
+    def __enter__(self):
+        if _enabled:
+            self.active = True
+            _stack().append(self.name)
+            if _trace_memory:
+                self.mem0 = tracemalloc.get_traced_memory()[0]
+            self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.active:
+            elapsed = time.perf_counter() - self.t0
+            allocated = tracemalloc.get_traced_memory()[0] - self.mem0 if _trace_memory else 0
+            stack = _stack()
+            full_name = '/'.join(stack)
+            stack.pop()
+            _add(full_name, elapsed, allocated)
+            self.active = False
+        return False
+
+
+def timer(name):
+    """
+    Returns a context manager timing the enclosed block under ``name``
+    """
+    return Timer(name)
+
+
+@contextlib.contextmanager
+def attach(path):
+    """
+    Context manager nesting the timers of the calling thread under ``path``, usually the :func:`current_path` of the
+    thread that started it.
+    """
+    path = path.split('/') if path else []
+    stack = _stack()
+    stack.extend(path)
+    try:
+        yield
+    finally:
+        del stack[len(stack) - len(path):]
+
+
+def count(name, value=1):
+    """
+    Increases the counter ``name``, nested in the timers running in the calling thread, by ``value``.
+    """
+    record(name, value)
+
+
+def record(name, value):
+    """
+    Records ``value``, for instance a time measured elsewhere, under ``name`` nested in the timers running in the
+    calling thread.
+    """
+    if _enabled:
+        _add(_full_name(name), value)
+
+
+def attached(function):
+    """
+    Returns a function that runs ``function`` with its timers nested in the timers currently running. Used to keep the
+    hierarchy of the timers in functions run in a different thread.
+    """
+    path = current_path()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with attach(path):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def timed(name=None):
+    """
+    Decorator timing every call to a function. Used to count and time the calls to the compiled libraries.
+
+    Args:
+        name (str): Timer name. Defaults to ``<module>.<function>``
+    """
+    def decorator(function):
+        timer_name = name
+        if timer_name is None:
+            timer_name = function.__module__.split('.')[-1] + '.' + function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with Timer(timer_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def records():
+    """
+    Returns:
+        dict: Statistics of every timer and counter, keyed by full name. See :meth:`Record.as_dict`
+    """
+    with _lock:
+        return {full_name: record.as_dict() for full_name, record in _records.items()}
+
+
+def write(filename):
+    """
+    Writes the records to ``<filename>.json`` and ``<filename>.csv``
+    """
+    output = records()
+    with open(filename + '.json', 'w') as outfile:
+        json.dump(output, outfile, indent=2, sort_keys=True)
+
+    with open(filename + '.csv', 'w', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['name', 'calls', 'total', 'mean', 'max', 'allocated'])
+        for full_name in sorted(output):
+            record = output[full_name]
+            writer.writerow([full_name] + [record[key] for key in ('calls', 'total', 'mean', 'max', 'allocated')])
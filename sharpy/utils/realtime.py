@@ -0,0 +1,133 @@
+"""Real-Time Utilities
+
+Wall-clock pacing of time marching simulations, for instance when coupled to pilot-in-the-loop or hardware-in-the-loop
+simulators.
+"""
+import time
+
+
+class RealTimePacer(object):
+    """
+    Paces a time marching loop to a fixed wall-clock period per time step and monitors the step deadlines.
+
+    The deadline of each step is one ``period`` after the start of the step. When a step finishes early, the pacer
+    sleeps until its deadline. When a step overruns its deadline, the overrun is recorded and the next step starts
+    straight away with its deadline counted from then, such that the loop does not try to catch up with a burst of
+    short steps.
+
+    During a step, :meth:`near_deadline` tells whether the time left is below a fraction ``margin`` of the period, in
+    which case optional work can be skipped.
+
+    Args:
+        period (float): Wall-clock time per step in seconds
+        margin (float): Fraction of the period below which the step is considered to be close to its deadline
+        clock (callable): Monotonic clock returning seconds
+        sleep (callable): Sleep function taking seconds
+
+    Attributes:
+        n_steps (int): Number of finished steps
+        n_overruns (int): Number of steps that exceeded their deadline
+        max_compute_time (float): Maximum compute time of a step, in seconds
+        skipped (dict): Number of times each optional task has been skipped
+    """
+
+    def __init__(self, period, margin=0.2, clock=time.perf_counter, sleep=time.sleep):
+        if period <= 0:
+            raise ValueError('The real-time period must be positive, got {}'.format(period))
+        self.period = period
+        self.margin = margin
+        self.clock = clock
+        self.sleep = sleep
+
+        self.step_start_time = None
+        self.deadline = None
+        self._overran = False
+
+        self.n_steps = 0
+        self.n_overruns = 0
+        self.total_compute_time = 0.
+        self.max_compute_time = 0.
+        self.max_overrun = 0.
+        self.skipped = dict()
+
+    def start_step(self, input_driven=False):
+        """
+        Marks the start of a step. The deadline is one period after the previous deadline, or after now if the
+        previous step overran it.
+
+        Args:
+            input_driven (bool): The step starts on the arrival of an external input (e.g. from the network), in
+                which case the deadline is always one period after now, since the time spent waiting for the input is
+                not available to the step
+        """
+        now = self.clock()
+        if self.deadline is None or self._overran or input_driven:
+            self.deadline = now + self.period
+        else:
+            self.deadline += self.period
+        self.step_start_time = now
+
+    def time_left(self):
+        """
+        Returns:
+            float: Time left until the deadline of the current step, in seconds
+        """
+        return self.deadline - self.clock()
+
+    def near_deadline(self):
+        """
+        Returns:
+            bool: ``True`` if the time left in the current step is below the margin
+        """
+        return self.time_left() < self.margin*self.period
+
+    def skip(self, task):
+        """
+        Returns ``True`` if the optional ``task`` should be skipped because the step is close to its deadline, and
+        keeps count of the skipped tasks.
+
+        Args:
+            task (str): Name of the task
+        """
+        if self.near_deadline():
+            self.skipped[task] = self.skipped.get(task, 0) + 1
+            return True
+        return False
+
+    def finish_step(self):
+        """
+        Marks the end of a step and waits until its deadline.
+
+        Returns:
+            float: Overrun of the deadline in seconds, ``0`` if it was met
+        """
+        now = self.clock()
+        compute_time = now - self.step_start_time
+        self.n_steps += 1
+        self.total_compute_time += compute_time
+        self.max_compute_time = max(self.max_compute_time, compute_time)
+
+        overrun = now - self.deadline
+        self._overran = overrun > 0
+        if self._overran:
+            self.n_overruns += 1
+            self.max_overrun = max(self.max_overrun, overrun)
+            return overrun
+
+        self.sleep(-overrun)
+        return 0.
+
+    def summary(self):
+        """
+        Returns:
+            dict: Real-time statistics
+        """
+        stats = {'n_steps': self.n_steps,
+                 'n_overruns': self.n_overruns,
+                 'max_overrun': self.max_overrun,
+                 'max_compute_time': self.max_compute_time,
+                 'mean_compute_time': self.total_compute_time/max(self.n_steps, 1),
+                 'period': self.period}
+        for task, n_skipped in self.skipped.items():
+            stats['skipped_' + task] = n_skipped
+        return stats
@@ -0,0 +1,318 @@
+"""Restart Snapshot Utilities
+
+Compact restart snapshots in HDF5 format.
+
+Instead of the whole ``PreSharpy`` data object, a snapshot stores only what is needed to resume a time marching
+simulation: the arrays of the last few aerodynamic and structural time steps (including the wake), the pickled state of
+the controllers and runtime generators, and a hash of the settings of the original run. The rest of the model is built
+again from the case input files by the loaders when restarting.
+
+A snapshot is written in two stages: :func:`collect` copies the required arrays out of the data structure, which is
+fast and can be done inside the time loop, and :func:`write_state` writes them to disk, which can therefore be done in
+a background thread while the simulation carries on.
+
+To restart, the flow of the ``.sharpy`` file keeps the loaders (``BeamLoader``, ``AerogridLoader``) and the solvers
+from the one that created the snapshot on, and the snapshot is given with the ``-r`` argument::
+
+    sharpy <case>.sharpy -r snapshots/<case>.snapshot.h5
+
+The snapshot is applied with :func:`restore` once the loaders have run.
+"""
+import ctypes as ct
+import hashlib
+import io
+import json
+import os
+import pickle
+
+import h5py as h5
+import numpy as np
+
+import sharpy.utils.cout_utils as cout
+
+SNAPSHOT_VERSION = 2
+
+
+def settings_hash(settings):
+    """
+    Hash of the solver settings, used to warn of changes when restarting. The ``SHARPy`` header is not included since
+    its flow is expected to change on restart.
+
+    Args:
+        settings (dict): Settings of the case
+
+    Returns:
+        str: Hexadecimal digest
+    """
+    def serialisable(value):
+        if isinstance(value, (ct.c_bool, ct.c_double, ct.c_int)):
+            return value.value
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        return str(value)
+
+    sections = {k: v for k, v in settings.items() if k != 'SHARPy'}
+    encoded = json.dumps(sections, sort_keys=True, default=serialisable)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def is_snapshot(filename):
+    """
+    Returns:
+        bool: ``True`` if ``filename`` is an HDF5 restart snapshot, as opposed to a pickled data object
+    """
+    if not h5.is_hdf5(filename):
+        return False
+    with h5.File(filename, 'r') as handle:
+        return 'snapshot_version' in handle.attrs
+
+
+class _Pickled(bytes):
+    """Pickled attribute of a time step that is neither an array nor a scalar, e.g. the multibody ``mb_dict``"""
+    pass
+
+
+def _tstep_arrays(tstep):
+    """
+    Copies the arrays and scalars that define the state of a time step.
+
+    Lists of arrays (one per surface in the aerodynamic time steps) are kept as lists. Any other attribute (such as
+    the dictionaries of the multibody settings) is pickled. Ctypes pointers and postprocessing outputs are not
+    included.
+
+    Raises:
+        TypeError: if an attribute of the time step cannot be pickled
+    """
+    if hasattr(tstep, 'materialise'):
+        tstep = tstep.materialise()
+
+    arrays = dict()
+    for name, value in tstep.__dict__.items():
+        if name.startswith('ct_') or name.startswith('postproc_'):
+            continue
+        if isinstance(value, np.ndarray):
+            arrays[name] = value.copy()
+        elif isinstance(value, list) and value and all(isinstance(item, np.ndarray) for item in value):
+            arrays[name] = [item.copy() for item in value]
+        elif isinstance(value, (bool, int, float, np.number)):
+            arrays[name] = value
+        else:
+            try:
+                arrays[name] = _Pickled(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            except Exception as error:
+                raise TypeError('Snapshot: the time step attribute {} cannot be stored ({})'.format(name, error))
+    return arrays
+
+
+class _StatePickler(pickle.Pickler):
+    """
+    Pickles the state of the solvers, with references to the simulation data stored by name, such that the data is not
+    included in the snapshot and the solvers point to the restarted data when unpickled.
+    """
+
+    def __init__(self, file, data):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.references = {id(data): 'data'}
+        for name in ('structure', 'aero'):
+            if getattr(data, name, None) is not None:
+                self.references[id(getattr(data, name))] = name
+
+    def persistent_id(self, obj):
+        return self.references.get(id(obj), None)
+
+
+class _StateUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, data):
+        super().__init__(file)
+        self.data = data
+
+    def persistent_load(self, pid):
+        if pid == 'data':
+            return self.data
+        return getattr(self.data, pid)
+
+
+def _stored_steps(timestep_info, n_steps):
+    return [ts for ts in range(len(timestep_info)) if timestep_info[ts] is not None][-n_steps:]
+
+
+def collect(data, n_steps=3, state=None):
+    """
+    Copies the state needed to resume the simulation from ``data``.
+
+    Args:
+        data (PreSharpy): Simulation data
+        n_steps (int): Number of most recent time steps to store. At least three are needed to resume with the
+            unsteady aerodynamic forces
+        state (dict): Additional objects to store pickled, e.g. controllers, keyed by name
+
+    Returns:
+        dict: Snapshot contents, to be written with :func:`write_state`
+    """
+    contents = {'ts': data.ts,
+                'case': data.settings['SHARPy']['case'],
+                'settings_hash': getattr(data, 'settings_hash', ''),
+                'structure': dict(),
+                'aero': dict(),
+                'state': dict()}
+
+    for ts in _stored_steps(data.structure.timestep_info, n_steps):
+        contents['structure'][ts] = _tstep_arrays(data.structure.timestep_info[ts])
+
+    try:
+        for ts in _stored_steps(data.aero.timestep_info, n_steps):
+            contents['aero'][ts] = _tstep_arrays(data.aero.timestep_info[ts])
+    except AttributeError:
+        # structural only simulations
+        pass
+
+    if state is not None:
+        for name, obj in state.items():
+            try:
+                buffer = io.BytesIO()
+                _StatePickler(buffer, data).dump(obj)
+                contents['state'][name] = buffer.getvalue()
+            except Exception as error:
+                cout.cout_wrap('Snapshot: the state of {} could not be stored ({})'.format(name, error), 3)
+
+    return contents
+
+
+def write_state(filename, contents, compression=None):
+    """
+    Writes the snapshot contents returned by :func:`collect` to an HDF5 file.
+
+    The file is written under a temporary name and then renamed, such that an interrupted write never leaves a
+    corrupted snapshot behind.
+
+    Args:
+        filename (str): Snapshot file
+        contents (dict): Snapshot contents
+        compression (str): HDF5 compression filter for the arrays (``gzip`` or ``lzf``), or ``None``
+    """
+    options = dict()
+    if compression:
+        options['compression'] = compression
+        options['shuffle'] = True
+
+    def add_array(group, name, value):
+        if np.ndim(value) == 0:
+            group.attrs[name] = value
+        elif compression and np.size(value) > 1:
+            group.create_dataset(name, data=value, **options)
+        else:
+            group.create_dataset(name, data=value)
+
+    temp_filename = filename + '.tmp'
+    with h5.File(temp_filename, 'w') as handle:
+        handle.attrs['snapshot_version'] = SNAPSHOT_VERSION
+        handle.attrs['ts'] = contents['ts']
+        handle.attrs['case'] = contents['case']
+        handle.attrs['settings_hash'] = contents['settings_hash']
+
+        for kind in ('structure', 'aero'):
+            kind_group = handle.create_group(kind)
+            for ts, arrays in contents[kind].items():
+                tstep_group = kind_group.create_group('%06d' % ts)
+                for name, value in arrays.items():
+                    if isinstance(value, _Pickled):
+                        tstep_group.create_dataset(name, data=np.void(bytes(value)))
+                        tstep_group[name].attrs['pickled'] = True
+                    elif isinstance(value, list):
+                        list_group = tstep_group.create_group(name)
+                        list_group.attrs['length'] = len(value)
+                        for i_item, item in enumerate(value):
+                            add_array(list_group, str(i_item), item)
+                    else:
+                        add_array(tstep_group, name, value)
+
+        state_group = handle.create_group('state')
+        for name, pickled in contents['state'].items():
+            state_group.create_dataset(name, data=np.void(pickled))
+
+    os.replace(temp_filename, filename)
+
+
+def write(filename, data, n_steps=3, state=None, compression=None):
+    """
+    Writes a restart snapshot of ``data``. See :func:`collect` and :func:`write_state`.
+    """
+    write_state(filename, collect(data, n_steps, state), compression)
+
+
+def _read_tstep(group):
+    arrays = dict(group.attrs)
+    for name, item in group.items():
+        if isinstance(item, h5.Group):
+            arrays[name] = [item[str(i_item)][()] for i_item in range(item.attrs['length'])]
+        elif item.attrs.get('pickled', False):
+            arrays[name] = pickle.loads(item[()].tobytes())
+        else:
+            arrays[name] = item[()]
+    return arrays
+
+
+def _restore_timestep_info(template, stored, ts):
+    timestep_info = [None]*(ts + 1)
+    for i_step, arrays in stored.items():
+        tstep = template.copy()
+        for name, value in arrays.items():
+            if isinstance(value, np.bool_):
+                value = bool(value)
+            elif isinstance(getattr(tstep, name, None), np.ndarray) and np.isfortran(getattr(tstep, name)):
+                # the compiled libraries expect Fortran ordered arrays in the structural time steps
+                value = np.asfortranarray(value)
+            setattr(tstep, name, value)
+        timestep_info[i_step] = tstep
+    return timestep_info
+
+
+def restore(data, filename):
+    """
+    Applies a restart snapshot to ``data``.
+
+    ``data`` needs to contain the structural (and, if present in the snapshot, aerodynamic) model generated by the
+    loaders. The stored time steps replace the time step history, in which the time steps that were not stored are set
+    to ``None``. The unpickled additional state is stored in ``data.restart_state`` for the solvers to pick up.
+
+    Args:
+        data (PreSharpy): Simulation data after running the loaders
+        filename (str): Snapshot file
+
+    Returns:
+        PreSharpy: ``data`` at the time step of the snapshot
+    """
+    with h5.File(filename, 'r') as handle:
+        version = handle.attrs['snapshot_version']
+        if version > SNAPSHOT_VERSION:
+            raise ValueError('Snapshot version {} not supported by this version of SHARPy'.format(version))
+        ts = int(handle.attrs['ts'])
+        stored_hash = handle.attrs['settings_hash']
+        structure = {int(ts_name): _read_tstep(group) for ts_name, group in handle['structure'].items()}
+        aero = {int(ts_name): _read_tstep(group) for ts_name, group in handle['aero'].items()}
+        pickled_state = dict()
+
+        def read_state(name, item):
+            if isinstance(item, h5.Dataset):
+                pickled_state[name] = item[()].tobytes()
+        handle['state'].visititems(read_state)
+
+    try:
+        structure_template = data.structure.ini_info
+    except AttributeError:
+        raise AttributeError('The structure has not been loaded. Restarting from a snapshot requires the loaders '
+                             '(BeamLoader, AerogridLoader) to be included in the flow')
+
+    if stored_hash and stored_hash != getattr(data, 'settings_hash', stored_hash):
+        cout.cout_wrap('Restart: the settings differ from those of the run that created the snapshot', 3)
+
+    data.structure.timestep_info = _restore_timestep_info(structure_template, structure, ts)
+    if aero:
+        data.aero.timestep_info = _restore_timestep_info(data.aero.timestep_info[0], aero, ts)
+    data.ts = ts
+    data.restart_state = {name: _StateUnpickler(io.BytesIO(pickled), data).load()
+                          for name, pickled in pickled_state.items()}
+
+    cout.cout_wrap('Restarting at time step {:d} from {}'.format(ts, filename), 1)
+    return data
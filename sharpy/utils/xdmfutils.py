@@ -0,0 +1,149 @@
+"""XDMF Time Series Utilities
+
+Writes the time history of unstructured grids into a single HDF5 file with an XDMF index that can be opened in
+Paraview as a time series, instead of one VTK file per grid and time step.
+"""
+import os
+import collections
+
+import h5py as h5
+import numpy as np
+
+
+class XDMFTimeSeries(object):
+    """
+    Time series of unstructured grids stored in ``<filename>.h5`` and indexed by ``<filename>.xdmf``.
+
+    Each call to :meth:`add_step` stores the points and the point and cell data of one grid at one time step.
+    Connectivities that do not change in time are stored once under a user given key and referenced by all the steps.
+    The XDMF index is written by :meth:`write`.
+
+    Args:
+        filename (str): Path to the output files without extension
+        overwrite (bool): Remove existing files with the same name
+    """
+
+    cell_types = {'quad': ('Quadrilateral', 4),
+                  'line': ('Polyline', None)}
+
+    def __init__(self, filename, overwrite=True):
+        self.h5_filename = filename + '.h5'
+        self.xdmf_filename = filename + '.xdmf'
+
+        self.grids = collections.OrderedDict()
+        self.topologies = dict()
+
+        if overwrite:
+            for f in [self.h5_filename, self.xdmf_filename]:
+                if os.path.isfile(f):
+                    os.remove(f)
+
+    def add_step(self, name, ts, points, cells, cell_type, point_data=None, cell_data=None, topology_key=None,
+                 time=None):
+        """
+        Stores a grid at a time step.
+
+        Args:
+            name (str): Name of the grid (e.g. ``body_00``)
+            ts (int): Time step number
+            points (np.ndarray): Coordinates of the points ``(n_points, 3)``
+            cells (np.ndarray): Connectivities ``(n_cells, n_nodes_per_cell)``
+            cell_type (str): ``quad`` or ``line``
+            point_data (list(tuple)): ``(name, array)`` pairs of point data
+            cell_data (list(tuple)): ``(name, array)`` pairs of cell data
+            topology_key (str (optional)): Key under which the connectivities are stored once and re-used. If
+                ``None``, the connectivities are stored for every step.
+            time (float (optional)): Time value. Defaults to ``ts``
+        """
+        if point_data is None:
+            point_data = []
+        if cell_data is None:
+            cell_data = []
+        if time is None:
+            time = ts
+
+        step_path = '/%s/%06u' % (name, ts)
+        with h5.File(self.h5_filename, 'a') as h5file:
+            if step_path in h5file:
+                del h5file[step_path]
+            group = h5file.create_group(step_path)
+            group.create_dataset('points', data=np.asarray(points, dtype=float))
+
+            if topology_key is None:
+                topology_path = step_path + '/cells'
+                group.create_dataset('cells', data=np.asarray(cells, dtype=int))
+            else:
+                topology_path = '/topology/' + topology_key
+                if topology_key not in self.topologies:
+                    if topology_path in h5file:
+                        del h5file[topology_path]
+                    h5file.create_dataset(topology_path, data=np.asarray(cells, dtype=int))
+                    self.topologies[topology_key] = topology_path
+
+            attributes = []
+            for center, data in (('Node', point_data), ('Cell', cell_data)):
+                for data_name, array in data:
+                    array = np.asarray(array)
+                    group.create_dataset(data_name, data=array)
+                    attributes.append((data_name, center, array.shape, array.dtype.kind))
+
+        self.grids.setdefault(name, []).append({'path': step_path,
+                                                'time': time,
+                                                'n_points': points.shape[0],
+                                                'cells_shape': np.shape(cells),
+                                                'cells_path': topology_path,
+                                                'cell_type': cell_type,
+                                                'attributes': attributes})
+
+    def write(self):
+        """
+        Writes the XDMF index of all the stored steps
+        """
+        h5_name = os.path.basename(self.h5_filename)
+        lines = ['<?xml version="1.0" ?>',
+                 '<Xdmf Version="3.0">',
+                 '  <Domain>']
+        for name, steps in self.grids.items():
+            lines.append('    <Grid Name="%s" GridType="Collection" CollectionType="Temporal">' % name)
+            for step in steps:
+                topology_type, _ = self.cell_types[step['cell_type']]
+                n_cells, n_nodes = step['cells_shape']
+                lines.append('      <Grid Name="%s" GridType="Uniform">' % step['path'].strip('/').replace('/', '_'))
+                lines.append('        <Time Value="%g"/>' % step['time'])
+                lines.append('        <Topology TopologyType="%s" NumberOfElements="%u" NodesPerElement="%u">'
+                             % (topology_type, n_cells, n_nodes))
+                lines.append(data_item(h5_name, step['cells_path'], (n_cells, n_nodes), 'i'))
+                lines.append('        </Topology>')
+                lines.append('        <Geometry GeometryType="XYZ">')
+                lines.append(data_item(h5_name, step['path'] + '/points', (step['n_points'], 3), 'f'))
+                lines.append('        </Geometry>')
+                for data_name, center, shape, kind in step['attributes']:
+                    lines.append('        <Attribute Name="%s" AttributeType="%s" Center="%s">'
+                                 % (data_name, attribute_type(shape), center))
+                    lines.append(data_item(h5_name, step['path'] + '/' + data_name, shape, kind))
+                    lines.append('        </Attribute>')
+                lines.append('      </Grid>')
+            lines.append('    </Grid>')
+        lines += ['  </Domain>',
+                  '</Xdmf>']
+
+        with open(self.xdmf_filename, 'w') as fid:
+            fid.write('\n'.join(lines) + '\n')
+
+
+def attribute_type(shape):
+    if len(shape) == 1:
+        return 'Scalar'
+    elif shape[1] == 3:
+        return 'Vector'
+    else:
+        return 'Matrix'
+
+
+def data_item(h5_name, path, shape, kind):
+    if kind in 'iu':
+        number_type = 'NumberType="Int" Precision="8"'
+    else:
+        number_type = 'NumberType="Float" Precision="8"'
+    return ('          <DataItem Dimensions="%s" %s Format="HDF">%s:%s</DataItem>'
+            % (' '.join(str(dim) for dim in shape), number_type, h5_name, path))
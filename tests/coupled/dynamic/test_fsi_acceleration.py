@@ -0,0 +1,95 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+import cases.templates.flying_wings as wings
+import sharpy.sharpy_main
+
+
+class TestFSIAcceleration(unittest.TestCase):
+    """
+    The structural predictor and the FSI accelerators reach the same solution as the plain relaxed FSI loop
+    """
+
+    route = os.path.dirname(os.path.realpath(__file__)) + '/cases/'
+
+    def run_case(self, case_name, fsi_settings):
+        ws = wings.Goland(M=4,
+                          N=4,
+                          Mstar_fact=10,
+                          u_inf=50,
+                          alpha=1.,
+                          rho=1.225,
+                          sweep=0,
+                          physical_time=0.05,
+                          n_surfaces=2,
+                          route=self.route,
+                          case_name=case_name)
+        ws.gust_intensity = 0.05
+        ws.sigma = 1
+        ws.dt_factor = 1
+
+        ws.clean_test_files()
+        ws.update_derived_params()
+        ws.update_aero_prop()
+        ws.update_fem_prop()
+        ws.set_default_config_dict()
+
+        ws.generate_aero_file()
+        ws.generate_fem_file()
+
+        ws.config['SHARPy']['flow'] = ['BeamLoader', 'AerogridLoader',
+                                       'StaticCoupled',
+                                       'DynamicCoupled']
+        ws.config['SHARPy']['write_screen'] = 'off'
+
+        ws.config['AerogridLoader']['wake_shape_generator'] = 'StraightWake'
+        ws.config['AerogridLoader']['wake_shape_generator_input'] = {'u_inf': ws.u_inf,
+                                                                     'u_inf_direction': np.array([1., 0., 0.]),
+                                                                     'dt': ws.dt}
+
+        ws.config['DynamicCoupled']['fsi_tolerance'] = 1e-8
+        ws.config['DynamicCoupled']['postprocessors'] = []
+        ws.config['DynamicCoupled']['postprocessors_settings'] = dict()
+        ws.config['DynamicCoupled']['aero_solver_settings']['velocity_field_generator'] = 'GustVelocityField'
+        ws.config['DynamicCoupled']['aero_solver_settings']['velocity_field_input'] = {
+            'u_inf': ws.u_inf,
+            'u_inf_direction': [1., 0, 0],
+            'gust_shape': '1-cos',
+            'gust_parameters': {'gust_length': 10 * ws.dt * ws.u_inf,
+                                'gust_intensity': ws.gust_intensity * ws.u_inf},
+            'offset': 0.,
+            'relative_motion': 'on'}
+        ws.config['DynamicCoupled'].update(fsi_settings)
+        ws.config.write()
+
+        data = sharpy.sharpy_main.main(['', ws.route + ws.case_name + '.sharpy'])
+        return data.structure.timestep_info[-1]
+
+    def test_converged_solution(self):
+        baseline = self.run_case('goland_fsi_baseline', dict())
+        tip_deflection = np.max(np.abs(baseline.pos[:, 2]))
+        self.assertGreater(tip_deflection, 0.)
+
+        variants = {'predictor': {'predictor_order': 2},
+                    'aitken': {'fsi_accelerator': 'aitken'},
+                    'iqn_ils': {'fsi_accelerator': 'iqn_ils'},
+                    'iqn_ils_predictor': {'fsi_accelerator': 'iqn_ils',
+                                          'predictor_order': 2}}
+        for name, fsi_settings in variants.items():
+            with self.subTest(variant=name):
+                tstep = self.run_case('goland_fsi_' + name, fsi_settings)
+                np.testing.assert_allclose(tstep.pos, baseline.pos, rtol=0, atol=1e-4 * tip_deflection)
+                np.testing.assert_allclose(tstep.psi, baseline.psi, rtol=0, atol=1e-4)
+                np.testing.assert_allclose(tstep.q, baseline.q, rtol=0, atol=1e-4 * np.max(np.abs(baseline.q)))
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.path.isdir(cls.route):
+            shutil.rmtree(cls.route)
+
+
+if __name__ == '__main__':
+    unittest.main()
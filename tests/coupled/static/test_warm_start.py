@@ -0,0 +1,161 @@
+import copy
+import types
+import unittest
+
+import numpy as np
+
+import sharpy.utils.algebra as algebra
+import sharpy.utils.exceptions as exc
+import sharpy.utils.settings as settings
+from sharpy.solvers.staticcoupled import StaticCoupled
+
+
+class StructuralStep(object):
+    # minimal stand-in of the structural time step information
+
+    def __init__(self, num_node):
+        self.pos = np.zeros((num_node, 3))
+        self.psi = np.zeros((num_node - 1, 3, 3))
+        self.quat = np.array([1., 0., 0., 0.])
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+class AeroStep(object):
+    # minimal stand-in of the aerodynamic time step information
+
+    def __init__(self):
+        self.n_surf = 2
+        self.gamma = [np.zeros((3, 4)) for _ in range(self.n_surf)]
+        self.gamma_star = [np.zeros((10, 4)) for _ in range(self.n_surf)]
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(4)
+        self.num_node = 5
+        self.solver = StaticCoupled()
+        self.solver.settings = {'structural_solver': 'NonLinearStatic',
+                                'structural_solver_settings': dict(),
+                                'aero_solver': 'StaticUvlm',
+                                'aero_solver_settings': dict(),
+                                'warm_start': True,
+                                'warm_start_max_perturbation': 0.05,
+                                'n_load_steps': 3}
+        settings.to_custom_types(self.solver.settings,
+                                 StaticCoupled.settings_types,
+                                 StaticCoupled.settings_default,
+                                 options=StaticCoupled.settings_options)
+        self.solver.aero_solver = types.SimpleNamespace(update_step=lambda: None)
+        structure = types.SimpleNamespace(timestep_info=[StructuralStep(self.num_node)],
+                                          ini_info=types.SimpleNamespace(
+                                              steady_applied_forces=np.random.rand(self.num_node, 6)))
+        aero = types.SimpleNamespace(timestep_info=[AeroStep()],
+                                     aero_dict={'control_surface_deflection': np.array([0.1])})
+        self.solver.data = types.SimpleNamespace(ts=0, structure=structure, aero=aero)
+
+        # the coupled solution is replaced by a deformation of the current step
+        self.solve_calls = []
+        self.converge = []
+        self.solver.solve = self.solve
+
+    def solve(self, n_load_steps):
+        self.solve_calls.append((n_load_steps,
+                                 self.solver.data.structure.timestep_info[0].pos.copy(),
+                                 [gamma.copy() for gamma in self.solver.data.aero.timestep_info[0].gamma]))
+        converged = self.converge.pop(0)
+        if isinstance(converged, Exception):
+            raise converged
+        tstep = self.solver.data.structure.timestep_info[0]
+        tstep.pos[:] = np.random.rand(*tstep.pos.shape)
+        tstep.psi[:] = np.random.rand(*tstep.psi.shape)
+        for gamma in self.solver.data.aero.timestep_info[0].gamma:
+            gamma[:] = np.random.rand(*gamma.shape)
+        return converged
+
+    def new_run(self):
+        # the model is reset to the undeformed structure before each run
+        self.solver.data.structure.timestep_info = [StructuralStep(self.num_node)]
+        self.solver.data.aero.timestep_info = [AeroStep()]
+
+    def test_perturbation(self):
+        self.assertEqual(self.solver.warm_start_perturbation(), np.inf)
+        self.solver.store_warm_state()
+        self.assertEqual(self.solver.warm_start_perturbation(), 0.)
+
+        self.solver.data.structure.timestep_info[0].quat[:] = algebra.euler2quat(np.array([0., 0.02, 0.]))
+        self.assertAlmostEqual(self.solver.warm_start_perturbation(), 0.02)
+
+        self.solver.data.aero.aero_dict['control_surface_deflection'] = np.array([0.15])
+        self.assertAlmostEqual(self.solver.warm_start_perturbation(), 0.05)
+
+        forces = self.solver.data.structure.ini_info.steady_applied_forces
+        self.solver.data.structure.ini_info.steady_applied_forces = 1.5*forces
+        self.assertAlmostEqual(self.solver.warm_start_perturbation(), 1./3.)
+
+        self.solver.data.aero.aero_dict['control_surface_deflection'] = np.array([0.1, 0.])
+        self.assertEqual(self.solver.warm_start_perturbation(), np.inf)
+
+    def test_warm_start(self):
+        self.converge = [True, True]
+        self.solver.run()
+        self.assertEqual(self.solve_calls[-1][0], 3)
+        warm_pos = self.solver.data.structure.timestep_info[0].pos.copy()
+        warm_gamma = [gamma.copy() for gamma in self.solver.data.aero.timestep_info[0].gamma]
+
+        self.new_run()
+        self.solver.run()
+        n_load_steps, pos, gamma = self.solve_calls[-1]
+        self.assertEqual(n_load_steps, 0)
+        np.testing.assert_array_equal(pos, warm_pos)
+        for i_surf in range(2):
+            np.testing.assert_array_equal(gamma[i_surf], warm_gamma[i_surf])
+        self.assertEqual(len(self.solve_calls), 2)
+
+    def test_large_perturbation(self):
+        self.converge = [True, True]
+        self.solver.run()
+
+        self.new_run()
+        self.solver.data.structure.timestep_info[0].quat[:] = algebra.euler2quat(np.array([0., 0.1, 0.]))
+        self.solver.run()
+        n_load_steps, pos, _ = self.solve_calls[-1]
+        self.assertEqual(n_load_steps, 3)
+        np.testing.assert_array_equal(pos, 0.)
+
+    def test_cold_fallback(self):
+        for warm_result in (False, exc.NotConvergedSolver('diverged')):
+            with self.subTest(warm_result=warm_result):
+                self.solve_calls = []
+                self.converge = [True, warm_result, True]
+                self.new_run()
+                self.solver.warm_state = None
+                self.solver.run()
+
+                self.new_run()
+                self.solver.run()
+                self.assertEqual([call[0] for call in self.solve_calls], [3, 0, 3])
+                # the cold solution starts from the undeformed structure
+                np.testing.assert_array_equal(self.solve_calls[-1][1], 0.)
+                np.testing.assert_array_equal(self.solver.warm_state['structure'].pos,
+                                              self.solver.data.structure.timestep_info[0].pos)
+
+    def test_not_converged(self):
+        self.converge = [True, False, False]
+        self.solver.run()
+        warm_pos = self.solver.warm_state['structure'].pos.copy()
+
+        # neither the warm started nor the cold solution converge: the last converged state is kept
+        self.new_run()
+        self.solver.run()
+        self.assertEqual([call[0] for call in self.solve_calls], [3, 0, 3])
+        np.testing.assert_array_equal(self.solver.warm_state['structure'].pos, warm_pos)
+
+
+if __name__ == '__main__':
+    unittest.main()
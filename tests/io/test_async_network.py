@@ -0,0 +1,162 @@
+import os
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+import sharpy.io.message_interface as message_interface
+import sharpy.io.network_interface as network_interface
+import sharpy.utils.exceptions as exceptions
+
+
+class Outputs:
+    """Stand-in for the set of output variables"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def encode(self):
+        return message_interface.get_layout(len(self.values)).pack(list(range(len(self.values))), self.values)
+
+
+def free_port(kind=socket.SOCK_DGRAM):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def connect(family, address, timeout=2.):
+    # retries until the network loop is listening
+    t0 = time.time()
+    while True:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+            sock.settimeout(timeout)
+            return sock
+        except (ConnectionRefusedError, FileNotFoundError):
+            sock.close()
+            if time.time() - t0 > timeout:
+                raise
+            time.sleep(0.02)
+
+
+class TestAsyncNetworkLoop(unittest.TestCase):
+    """
+    Exchanges input and output messages with the asyncio network loop through the different transports
+    """
+
+    def setUp(self):
+        self.input_layout = message_interface.get_layout(2)
+        self.in_queue = queue.Queue(maxsize=1)
+        self.out_queue = network_interface.OutputChannel()
+        self.finish_event = threading.Event()
+        self.folder = tempfile.mkdtemp()
+
+    def start(self, network_loop):
+        self.thread = threading.Thread(target=network_loop.run,
+                                       args=(self.in_queue, self.out_queue, self.finish_event))
+        self.thread.start()
+
+    def stop(self):
+        self.finish_event.set()
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+
+    def test_message_layout(self):
+        layout = message_interface.get_layout(3, '>')
+        msg = layout.pack([0, 1, 2], [1.5, 2.5, -3.])
+        self.assertEqual(len(msg), 5 + 3 * 8)
+        self.assertEqual(message_interface.decoder(msg, byte_ordering='>'), [(0, 1.5), (1, 2.5), (2, -3.)])
+
+    def test_udp(self):
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.bind(('127.0.0.1', 0))
+        client.settimeout(2.)
+        in_port, out_port = free_port(), free_port()
+        network_loop = network_interface.AsyncNetworkLoop(
+            'udp',
+            {'address': '127.0.0.1', 'port': in_port},
+            {'address': '127.0.0.1', 'port': out_port, 'send_on_demand': False,
+             'destination_address': ['127.0.0.1'], 'destination_ports': [client.getsockname()[1]]},
+            self.input_layout)
+        self.start(network_loop)
+        try:
+            # input
+            values = None
+            for _ in range(100):
+                client.sendto(self.input_layout.pack([0, 1], [0.25, -1.]), ('127.0.0.1', in_port))
+                try:
+                    values = self.in_queue.get(timeout=0.05)
+                    break
+                except queue.Empty:
+                    pass
+            self.assertEqual(values, [(0, 0.25), (1, -1.)])
+
+            # output
+            self.out_queue.put(Outputs([3., 4., 5.]))
+            msg, _ = client.recvfrom(1024)
+            self.assertEqual(message_interface.decoder(msg), [(0, 3.), (1, 4.), (2, 5.)])
+        finally:
+            client.close()
+            self.stop()
+        self.assertEqual(network_loop.output_statistics.summary()['n_messages'], 1)
+        self.assertIn('mean_latency', network_loop.output_statistics.summary())
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets not supported')
+    def test_unix_on_demand(self):
+        in_path = os.path.join(self.folder, 'in.sock')
+        out_path = os.path.join(self.folder, 'out.sock')
+        network_loop = network_interface.AsyncNetworkLoop('unix',
+                                                          {'socket_path': in_path},
+                                                          {'socket_path': out_path, 'send_on_demand': True},
+                                                          self.input_layout)
+        self.start(network_loop)
+        try:
+            input_client = connect(socket.AF_UNIX, in_path)
+            output_client = connect(socket.AF_UNIX, out_path)
+
+            # a message split in two writes is put together
+            msg = self.input_layout.pack([0, 1], [2., 4.])
+            input_client.sendall(msg[:7])
+            time.sleep(0.05)
+            input_client.sendall(msg[7:])
+            self.assertEqual(self.in_queue.get(timeout=2.), [(0, 2.), (1, 4.)])
+
+            self.out_queue.put(Outputs([1., 2.]))
+            time.sleep(0.05)
+            output_client.sendall(b'?')
+            reply = output_client.recv(1024)
+            self.assertEqual(message_interface.decoder(reply), [(0, 1.), (1, 2.)])
+
+            input_client.close()
+            output_client.close()
+        finally:
+            self.stop()
+        self.assertFalse(os.path.exists(in_path))
+
+    def test_latest_input_kept(self):
+        network_interface.put_latest(self.in_queue, 1)
+        network_interface.put_latest(self.in_queue, 2)
+        self.assertEqual(self.in_queue.get_nowait(), 2)
+
+    def test_not_valid_settings(self):
+        with self.assertRaises(exceptions.NotValidSetting):
+            network_interface.NetworkLoader().initialise({'variables_filename': 'variables.yaml',
+                                                          'transport': 'tcp',
+                                                          'event_loop': 'selectors'})
+
+        network_loop = network_interface.AsyncNetworkLoop('serial', {'port': free_port()}, {'port': free_port()},
+                                                          self.input_layout)
+        with self.assertRaises(exceptions.NotValidSetting):
+            network_loop.run(self.in_queue, self.out_queue, self.finish_event)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
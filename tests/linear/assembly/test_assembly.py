@@ -5,6 +5,7 @@ S. Maraniello, 29 May 2018
 
 import os
 import copy
+import time
 import warnings
 import unittest
 import itertools
@@ -13,9 +14,11 @@ import scipy.linalg as scalg
 
 import sharpy.utils.h5utils as h5utils
 import sharpy.linear.src.assembly as assembly
+import sharpy.linear.src.gridmapping as gridmapping
 import sharpy.linear.src.multisurfaces as multisurfaces
 import sharpy.linear.src.surface as surface
 import sharpy.utils.algebra as algebra
+from sharpy.aero.utils.uvlmlib import dvinddzeta_cpp
 
 
 np.set_printoptions(linewidth=200, precision=3)
@@ -875,6 +878,62 @@ class Test_assembly(unittest.TestCase):
             # #plt.show()
             # plt.close()
 
+    def test_dvinddzeta_batch(self):
+        """
+        Micro-benchmark of the batched derivatives of the induced velocity at
+        the collocation points of a wing against the compiled kernel, called
+        once per collocation point.
+        """
+
+        np.random.seed(2)
+        M, N, M_star = 8, 40, 40
+        x, y = np.linspace(0., 1., M + 1), np.linspace(0., 10., N + 1)
+        xx, yy = np.meshgrid(x, y, indexing='ij')
+        zeta = np.stack((xx, yy, 0.05 * xx ** 2)) + 1e-3 * np.random.rand(3, M + 1, N + 1)
+        x_star = np.linspace(1., 21., M_star + 1)
+        xx, yy = np.meshgrid(x_star, y, indexing='ij')
+        zeta_star = np.stack((xx, yy, 0.05 * np.ones_like(xx)))
+        zeta_star[:, 0, :] = zeta[:, -1, :]
+
+        Surf = surface.AeroGridSurface(gridmapping.AeroGridMap(M, N), zeta=zeta, gamma=np.random.rand(M, N),
+                                       vortex_radius=vortex_radius)
+        Surf.generate_areas()
+        Surf.generate_normals()
+        Surf.aM, Surf.aN = 0.5, 0.5
+        Surf.generate_collocations()
+        Surf_star = surface.AeroGridSurface(gridmapping.AeroGridMap(M_star, N), zeta=zeta_star,
+                                            gamma=np.random.rand(M_star, N), vortex_radius=vortex_radius)
+
+        zetac = Surf.zetac.reshape(3, -1).T
+        nc = Surf.normals.reshape(3, -1).T[:, None, :]
+
+        for Surf_in, IsBound in ((Surf, True), (Surf_star, False)):
+            t0 = time.time()
+            Dercoll_ref = np.zeros((Surf.maps.K, 3))
+            Dervert_ref = np.zeros((Surf.maps.K, 3 * Surf.maps.Kzeta))
+            for pp in range(Surf.maps.K):
+                dcoll, dvert = dvinddzeta_cpp(zetac[pp].copy(), Surf_in, is_bound=IsBound,
+                                              vortex_radius=vortex_radius, M_in_bound=M)
+                Dercoll_ref[pp] = nc[pp, 0].dot(dcoll)
+                Dervert_ref[pp] = nc[pp, 0].dot(dvert)
+            time_loop = time.time() - t0
+
+            t0 = time.time()
+            Dercoll = np.zeros((Surf.maps.K, 3))
+            Dervert = np.zeros((Surf.maps.K, 3 * Surf.maps.Kzeta))
+            for chunk in assembly.target_chunks(Surf.maps.K, Surf_in.maps.K):
+                dcoll, dvert = assembly.dvinddzeta_batch(zetac[chunk], Surf_in, IsBound, M_in_bound=M,
+                                                         Proj=nc[chunk])
+                Dercoll[chunk] = dcoll[:, 0, :]
+                Dervert[chunk] = dvert[:, 0, :]
+            time_batch = time.time() - t0
+
+            print('dvinddzeta at %d collocation points from %s (%d panels): '
+                  'compiled kernel per point %.3f s, batched %.3f s'
+                  % (Surf.maps.K, 'bound' if IsBound else 'wake', Surf_in.maps.K, time_loop, time_batch))
+            np.testing.assert_allclose(Dercoll, Dercoll_ref, rtol=1e-8, atol=1e-10 * np.max(np.abs(Dercoll_ref)))
+            np.testing.assert_allclose(Dervert, Dervert_ref, rtol=1e-8, atol=1e-10 * np.max(np.abs(Dervert_ref)))
+
     def test_dfqsdvind_zeta(self):
         """
         For each output surface, there induced velocity is computed, all other
@@ -0,0 +1,104 @@
+"""
+Test state-space manipulation methods in libss
+"""
+
+import numpy as np
+import unittest
+
+import sharpy.linear.src.libss as libss
+import sharpy.linear.src.libsparse as libsp
+
+
+class TestCouple(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(10)
+        self.ss01 = libss.random_ss(30, 5, 6, dt=0.1)
+        self.ss02 = libss.random_ss(8, 6, 5, dt=0.1)
+        self.ss01.D *= 0.3
+        self.ss02.D *= 0.3
+        self.K12 = 0.3 * np.random.rand(5, 5)
+        self.K21 = 0.3 * np.random.rand(6, 6)
+
+    def test_cached_coupling(self):
+        cache = dict()
+        libss.couple(self.ss01, self.ss02, self.K12, self.K21, cache=cache)
+
+        ss02_new = libss.random_ss(8, 6, 5, dt=0.1)
+        ss02_new.D *= 0.3
+        ss_cached = libss.couple(self.ss01, ss02_new, self.K12, self.K21, cache=cache)
+        ss_ref = libss.couple(self.ss01, ss02_new, self.K12, self.K21)
+
+        for mat_cached, mat_ref in zip(ss_cached.get_mats(), ss_ref.get_mats()):
+            np.testing.assert_allclose(mat_cached, mat_ref, atol=1e-12)
+
+    def test_coupling_loop(self):
+        # the coupled system must reproduce the closed loop response of the two systems
+        ss = libss.couple(self.ss01, self.ss02, self.K12, self.K21)
+
+        x1 = np.random.rand(self.ss01.states)
+        x2 = np.random.rand(self.ss02.states)
+        u1 = np.random.rand(self.ss01.inputs)
+        u2 = np.random.rand(self.ss02.inputs)
+
+        y = ss.C.dot(np.concatenate((x1, x2))) + ss.D.dot(np.concatenate((u1, u2)))
+        y1, y2 = y[:self.ss01.outputs], y[self.ss01.outputs:]
+
+        np.testing.assert_allclose(y1, self.ss01.C.dot(x1) + self.ss01.D.dot(u1 + self.K12.dot(y2)), atol=1e-12)
+        np.testing.assert_allclose(y2, self.ss02.C.dot(x2) + self.ss02.D.dot(u2 + self.K21.dot(y1)), atol=1e-12)
+
+
+class TestSparseInterconnection(unittest.TestCase):
+    """
+    Sparse systems are interconnected without conversion to dense and give the same results as the dense systems
+    """
+
+    def setUp(self):
+        np.random.seed(20)
+        self.ss_dense = [libss.random_ss(12, 3, 3, dt=0.1), libss.random_ss(7, 3, 3, dt=0.1)]
+        self.ss_sparse = [libss.ss(*[libsp.csc_matrix(M) for M in ss.get_mats()], dt=ss.dt)
+                          for ss in self.ss_dense]
+
+    def compare(self, ss_sparse, ss_dense):
+        self.assertIsInstance(ss_sparse, libss.ss)
+        for mat_sparse, mat_dense in zip(ss_sparse.get_mats(), ss_dense.get_mats()):
+            self.assertIsInstance(mat_sparse, libsp.csc_matrix)
+            np.testing.assert_allclose(mat_sparse.toarray(), mat_dense, atol=1e-12)
+
+    def test_series(self):
+        self.compare(libss.series(*self.ss_sparse), libss.series(*self.ss_dense))
+
+    def test_parallel(self):
+        self.compare(libss.parallel(*self.ss_sparse), libss.parallel(*self.ss_dense))
+
+    def test_join(self):
+        self.compare(libss.join2(*self.ss_sparse), libss.join2(*self.ss_dense))
+        self.compare(libss.join(self.ss_sparse, [0.3, 0.7]), libss.join(self.ss_dense, [0.3, 0.7]))
+
+        gain = np.random.rand(2, 4)
+        self.compare(libss.join2(self.ss_sparse[0], gain), libss.join2(self.ss_dense[0], gain))
+
+    def test_couple(self):
+        K12 = 0.1 * np.random.rand(3, 3)
+        K21 = 0.1 * np.random.rand(3, 3)
+        self.compare(libss.couple(*self.ss_sparse, K12, K21, out_sparse=True),
+                     libss.couple(*self.ss_dense, K12, K21))
+
+    def test_add_gain(self):
+        gain = libsp.csc_matrix(np.random.rand(3, 5))
+        for where in ['in', 'parallel-down', 'parallel-up']:
+            self.compare(libss.addGain(self.ss_sparse[0], gain, where),
+                         libss.addGain(self.ss_dense[0], gain.toarray(), where))
+        gain = libsp.csc_matrix(np.random.rand(4, 3))
+        self.compare(libss.addGain(self.ss_sparse[0], gain, 'out'),
+                     libss.addGain(self.ss_dense[0], gain.toarray(), 'out'))
+
+    def test_scale(self):
+        input_scal = np.random.rand(3)
+        state_scal = np.random.rand(12)
+        self.compare(libss.scale_SS(self.ss_sparse[0], input_scal, 2., state_scal),
+                     libss.scale_SS(self.ss_dense[0], input_scal, 2., state_scal))
+
+
+if __name__ == '__main__':
+    unittest.main()
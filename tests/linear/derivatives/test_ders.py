@@ -280,3 +280,32 @@ class Test_ders(unittest.TestCase):
                 'Error of derivative w.r.t. zetaP not decreasing monothonically'
             assert ErVer_max[ss + 1] < ErVer_max[ss], \
                 'Error of derivative w.r.t. ZetaPanel not decreasing monothonically'
+
+    def test_dbiot_panel_batch(self):
+
+        if self.print_info:
+            print('\n-------------------------------- Testing dbiot.eval_panel_batch')
+
+        np.random.seed(1)
+        n_p, n_pan = 6, 5
+        ZetaP = 5. * np.random.rand(n_p, 3)
+        ZetaPanel = np.array([self.zeta0, self.zeta1, self.zeta2, self.zeta3])[None, :, :] + \
+                    np.random.rand(n_pan, 4, 3)
+        ZetaP[-1] = 0.4 * ZetaPanel[0, 1] + 0.6 * ZetaPanel[0, 2]  # target on segment
+        Gamma = np.random.rand(n_pan)
+
+        DerP, DerVer = dbiot.eval_panel_batch(ZetaP, ZetaPanel, vortex_radius, Gamma)
+        self.assertEqual(DerP.shape, (n_p, n_pan, 3, 3))
+        self.assertEqual(DerVer.shape, (n_p, n_pan, 4, 3, 3))
+
+        er_max = 0.
+        for pp in range(n_p):
+            for ii in range(n_pan):
+                DerP_ref, DerVer_ref = dbiot.eval_panel_fast(ZetaP[pp], ZetaPanel[ii],
+                                                             vortex_radius, Gamma[ii])
+                er_max = max(er_max,
+                             np.max(np.abs(DerP[pp, ii] - DerP_ref)),
+                             np.max(np.abs(DerVer[pp, ii] - DerVer_ref)))
+        if self.print_info:
+            print('Max error vs. eval_panel_fast: %.2e' % er_max)
+        assert er_max < 1e-13, 'eval_panel_batch not matching with eval_panel_fast'
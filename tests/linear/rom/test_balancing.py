@@ -4,6 +4,7 @@ import sharpy.linear.src.libss as libss
 import sharpy.rom.utils.librom as librom
 import numpy as np
 import sharpy.linear.src.libsparse as libsp
+import sharpy.rom.balanced as balanced
 import scipy.linalg as scalg
 
 
@@ -73,3 +74,80 @@ class TestBalancing(unittest.TestCase):
         Yb2 = ssb2.freqresp(kv)
         er_max = np.max(np.abs(Yb2 - Y))
         assert er_max / np.max(np.abs(Y)) < 1e-10, 'Error too large'
+
+    def test_balreal_lowrank(self):
+        np.random.seed(3)
+        Nx, Nu, Ny = 30, 3, 2
+        ss = libss.random_ss(Nx, Nu, Ny, dt=0.1, stable=True)
+
+        hsv_direct = librom.balreal_direct_py(ss.A, ss.B, ss.C, DLTI=True)[0]
+        hsv_direct = np.sort(np.diag(hsv_direct) if hsv_direct.ndim == 2 else hsv_direct)[::-1]
+
+        hsv, T, Ti = librom.balreal_lowrank(libsp.csc_matrix(ss.A), ss.B, ss.C, dlti=True, tol=1e-12,
+                                            tolSVD=1e-8)
+        n_rom = T.shape[1]
+        np.testing.assert_allclose(hsv[:n_rom], hsv_direct[:n_rom], rtol=1e-6)
+
+        # the reduced system is balanced: both Gramians are equal to the Hankel singular values
+        Ar = Ti.dot(ss.A.dot(T))
+        Br = Ti.dot(ss.B)
+        Cr = ss.C.dot(T)
+        Wc = scalg.solve_discrete_lyapunov(Ar, Br.dot(Br.T))
+        Wo = scalg.solve_discrete_lyapunov(Ar.T, Cr.T.dot(Cr))
+        np.testing.assert_allclose(Wc, Wo, atol=1e-6 * hsv[0])
+        np.testing.assert_allclose(np.diag(Wc), hsv[:n_rom], rtol=1e-4)
+
+    def test_lowrank_rom_sparse(self):
+        np.random.seed(5)
+        Nx, Nu, Ny = 40, 3, 2
+        ss = libss.random_ss(Nx, Nu, Ny, dt=0.1, stable=True)
+
+        ss_sparse = libss.ss(libsp.csc_matrix(ss.A), libsp.csc_matrix(ss.B), libsp.csc_matrix(ss.C), ss.D, dt=ss.dt)
+        rom = balanced.LowRank()
+        rom.initialise({'lyapunov_tol': 1e-12, 'tolSVD': 1e-10})
+        ssrom = rom.run(ss_sparse)
+
+        self.assertIsInstance(ssrom.B, np.ndarray)
+        self.assertEqual(ssrom.B.shape, (ssrom.states, Nu))
+        # same impulse response
+        for k in range(10):
+            markov = ss.C.dot(np.linalg.matrix_power(ss.A, k).dot(ss.B))
+            markov_rom = libsp.dense(ssrom.C).dot(np.linalg.matrix_power(libsp.dense(ssrom.A), k).dot(ssrom.B))
+            np.testing.assert_allclose(markov_rom, markov, atol=1e-6 * np.max(np.abs(markov)))
+
+    @staticmethod
+    def lowrank_peak_memory(Nx):
+        import scipy.sparse as sp
+        import tracemalloc
+
+        np.random.seed(4)
+        off_diagonal = 0.05 * np.random.rand(Nx - 1)
+        A = sp.diags([0.9 * np.linspace(0.2, 1, Nx) ** 0.2, off_diagonal, -off_diagonal], [0, 1, -1], format='csc')
+        B = np.random.rand(Nx, 2)
+        C = np.random.rand(2, Nx)
+
+        tracemalloc.start()
+        hsv, T, Ti = librom.balreal_lowrank(A, B, C, dlti=True, tol=1e-8)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, T, Ti
+
+    def test_balreal_lowrank_sparse(self):
+        Nx = 20000
+        peak, T, Ti = self.lowrank_peak_memory(Nx)
+
+        self.assertEqual(T.shape[0], Nx)
+        self.assertEqual(Ti.shape[1], Nx)
+        # memory of the order of a few hundred vectors of the size of the system, whereas a dense Gramian alone
+        # would require 3.2 GB
+        self.assertLess(peak, 1000 * Nx * 8)
+
+    def test_balreal_lowrank_memory_scaling(self):
+        # peak memory of the low-rank balancing grows linearly with the number of states
+        sizes = [5000, 10000, 20000, 40000]
+        peaks = [self.lowrank_peak_memory(Nx)[0] for Nx in sizes]
+        for Nx, peak in zip(sizes, peaks):
+            print('\tLow-rank balancing of %6d states: peak memory %7.1f MB' % (Nx, peak / 1024 ** 2))
+
+        bytes_per_state = [peak / Nx for Nx, peak in zip(sizes, peaks)]
+        self.assertLess(max(bytes_per_state), 1.5 * min(bytes_per_state))
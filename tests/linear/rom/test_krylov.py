@@ -83,5 +83,44 @@ class TestKrylov(unittest.TestCase):
         import shutil
         shutil.rmtree(self.test_dir + '/figs/')
 
+
+class TestMultipointKrylov(unittest.TestCase):
+    """
+    Multipoint reduction of a random MIMO system, building the spaces of the interpolation points in parallel
+    """
+
+    def setUp(self):
+        cout.cout_wrap.initialise(False, False)
+        np.random.seed(0)
+        n = 200
+        A = np.random.randn(n, n) / np.sqrt(n) - 2 * np.eye(n)
+        B = np.random.randn(n, 2)
+        C = np.random.randn(2, n)
+        self.ss = libss.ss(A, B, C, np.zeros((2, 2)))
+        self.frequency = np.array([0.5, 2., 5.])
+
+    @staticmethod
+    def transfer_function(ss, s):
+        return ss.C.dot(np.linalg.solve(s * np.eye(ss.states) - ss.A, ss.B))
+
+    def reduce(self, num_processes):
+        rom = krylov.Krylov()
+        rom.initialise({'algorithm': 'mimo_rational_arnoldi',
+                        'r': 3,
+                        'frequency': self.frequency,
+                        'num_processes': num_processes,
+                        'print_info': False})
+        return rom.run(self.ss)
+
+    def test_mimo_rational_arnoldi(self):
+        ssrom = self.reduce(1)
+        for sigma in self.frequency:
+            np.testing.assert_allclose(self.transfer_function(ssrom, sigma),
+                                       self.transfer_function(self.ss, sigma), atol=1e-10)
+
+        ssrom_parallel = self.reduce(3)
+        np.testing.assert_array_equal(ssrom_parallel.A, ssrom.A)
+
+
 if __name__ == '__main__':
     unittest.main()
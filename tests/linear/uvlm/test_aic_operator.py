@@ -0,0 +1,100 @@
+"""Hierarchical AIC operator tests
+
+Compares the low-rank representation of the steady AIC matrix against its dense counterpart for a two-surface
+wing with a planar wake.
+"""
+
+import unittest
+import numpy as np
+import sharpy.linear.src.assembly as assembly
+import sharpy.linear.src.gridmapping as gridmapping
+import sharpy.linear.src.libaic as libaic
+import sharpy.linear.src.surface as surface
+
+
+def lattice(M, N, M_star, y0, span, chord=1., wake_length=20.):
+    x = np.linspace(0., chord, M + 1)
+    y = np.linspace(y0, y0 + span, N + 1)
+    xx, yy = np.meshgrid(x, y, indexing='ij')
+    zeta = np.stack((xx, yy, 0.02 * xx ** 2))
+
+    x_star = np.linspace(chord, chord + wake_length, M_star + 1)
+    xx, yy = np.meshgrid(x_star, y, indexing='ij')
+    zeta_star = np.stack((xx, yy, 0.02 * chord ** 2 * np.ones_like(xx)))
+
+    return zeta, zeta_star
+
+
+def dense_aic(zetas, zeta_stars, vortex_radius):
+    # steady AIC matrix assembled as in sharpy.linear.src.linuvlm.Static, as reference
+    Surfs, Surfs_star = [], []
+    for zeta, zeta_star in zip(zetas, zeta_stars):
+        M, N = zeta.shape[1] - 1, zeta.shape[2] - 1
+        Surf = surface.AeroGridSurface(gridmapping.AeroGridMap(M, N), zeta=zeta, gamma=np.zeros((M, N)),
+                                       vortex_radius=vortex_radius)
+        Surf.generate_areas()
+        Surf.generate_normals()
+        Surf.aM, Surf.aN = 0.5, 0.5
+        Surf.generate_collocations()
+        Surfs.append(Surf)
+
+        M_star = zeta_star.shape[1] - 1
+        Surfs_star.append(surface.AeroGridSurface(gridmapping.AeroGridMap(M_star, N), zeta=zeta_star,
+                                                  gamma=np.zeros((M_star, N)), vortex_radius=vortex_radius))
+
+    List_AICs, List_AICs_star = assembly.AICs(Surfs, Surfs_star, target='collocation', Project=True)
+    for ss_out in range(len(Surfs)):
+        for ss_in in range(len(Surfs)):
+            N_star = Surfs_star[ss_in].maps.N
+            aic_star = List_AICs_star[ss_out][ss_in]
+            for jj in range(N_star):
+                List_AICs[ss_out][ss_in][:, -N_star + jj] += np.sum(aic_star[:, jj::N_star], axis=1)
+    return np.block(List_AICs)
+
+
+class TestHierarchicalAIC(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(3)
+        zeta_right, zeta_star_right = lattice(4, 40, 10, 0., 10.)
+        zeta_left, zeta_star_left = lattice(4, 40, 10, -10., 10.)
+        self.zetas = [zeta_right, zeta_left[:, :, ::-1]]
+        self.zeta_stars = [zeta_star_right, zeta_star_left[:, :, ::-1]]
+        self.kernel = libaic.FoldedAIC(self.zetas, self.zeta_stars, vortex_radius=1e-6)
+        self.aic = self.kernel.todense()
+
+    def test_dense(self):
+        reference = dense_aic(self.zetas, self.zeta_stars, vortex_radius=1e-6)
+        np.testing.assert_allclose(self.aic, reference, rtol=1e-10, atol=1e-12 * np.abs(reference).max())
+
+        operator = libaic.HierarchicalAIC(self.kernel, tol=1e-8, leaf_size=16, eta=1.0)
+        x = np.random.rand(self.kernel.K)
+        np.testing.assert_allclose(operator.matvec(x), reference.dot(x), rtol=1e-6)
+
+    def test_blocks(self):
+        rows = np.array([3, 100, 250])
+        cols = np.array([0, 39, 160, 319])
+        np.testing.assert_allclose(self.kernel.get_block(rows, cols), self.aic[np.ix_(rows, cols)])
+
+    def test_aca(self):
+        rows, cols = np.arange(40), np.arange(200, 240)
+        block = self.aic[np.ix_(rows, cols)]
+        U, V = libaic.aca(lambda ii: block[ii, :], lambda jj: block[:, jj], 40, 40, tol=1e-8)
+
+        self.assertIsNotNone(U)
+        self.assertLess(U.shape[1], 20)
+        self.assertLess(np.linalg.norm(U.dot(V) - block), 1e-6 * np.linalg.norm(block))
+
+    def test_operator(self):
+        operator = libaic.HierarchicalAIC(self.kernel, tol=1e-8, leaf_size=16, eta=1.0)
+        self.assertLess(operator.compression, 1.)
+
+        x = np.random.rand(self.kernel.K)
+        np.testing.assert_allclose(operator.matvec(x), self.aic.dot(x), rtol=1e-6)
+
+        gamma = operator.solve(x)
+        np.testing.assert_allclose(gamma, np.linalg.solve(self.aic, x), rtol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import shutil
+import tempfile
+import types
+import unittest
+
+import numpy as np
+
+import sharpy.utils.algebra as algebra
+from sharpy.postproc.aeroforcescalculator import AeroForcesCalculator
+from sharpy.postproc.liftdistribution import LiftDistribution
+
+
+class AeroStep(object):
+    # minimal stand-in of the aerodynamic time step information
+
+    def __init__(self, dimensions):
+        self.n_surf = len(dimensions)
+        self.zeta = []
+        self.forces = []
+        self.dynamic_forces = []
+        for (n_m, n_n) in dimensions:
+            zeta = np.zeros((3, n_m + 1, n_n + 1))
+            zeta[0] = np.linspace(0., 1.5, n_m + 1)[:, None]
+            zeta[1] = np.linspace(0., 5., n_n + 1)[None, :]
+            self.zeta.append(zeta)
+            self.forces.append(np.random.rand(6, n_m + 1, n_n + 1) - 0.5)
+            self.dynamic_forces.append(np.random.rand(6, n_m + 1, n_n + 1) - 0.5)
+        self.inertial_steady_forces = np.zeros((self.n_surf, 6))
+        self.inertial_unsteady_forces = np.zeros((self.n_surf, 6))
+        self.body_steady_forces = np.zeros((self.n_surf, 6))
+        self.body_unsteady_forces = np.zeros((self.n_surf, 6))
+
+
+class StructuralStep(object):
+    # minimal stand-in of the structural time step information
+
+    def __init__(self):
+        self.quat = algebra.euler2quat(np.random.rand(3) - 0.5)
+        self.postproc_node = dict()
+
+    def cga(self):
+        return algebra.quat2rotation(self.quat)
+
+
+def loop_forces(data, ts_max):
+    # loop implementation of the total forces, as reference
+    force_matrix = np.zeros((ts_max, 13))
+    for ts in range(ts_max):
+        rot = algebra.quat2rotation(data.structure.timestep_info[ts].quat)
+        aero_tstep = data.aero.timestep_info[ts]
+        force_matrix[ts, 0] = ts
+        for i_surf in range(aero_tstep.n_surf):
+            steady = np.zeros((3,))
+            unsteady = np.zeros((3,))
+            _, n_rows, n_cols = aero_tstep.forces[i_surf].shape
+            for i_m in range(n_rows):
+                for i_n in range(n_cols):
+                    steady += aero_tstep.forces[i_surf][0:3, i_m, i_n]
+                    unsteady += aero_tstep.dynamic_forces[i_surf][0:3, i_m, i_n]
+            force_matrix[ts, 1:4] += steady
+            force_matrix[ts, 4:7] += unsteady
+            force_matrix[ts, 7:10] += np.dot(rot.T, steady)
+            force_matrix[ts, 10:13] += np.dot(rot.T, unsteady)
+    return force_matrix
+
+
+def loop_lift_distribution(data, ts, normalise=True):
+    # loop implementation of the sectional forces, as reference
+    aero_tstep = data.aero.timestep_info[ts]
+    cag = data.structure.timestep_info[ts].cga().T
+    norm = 1.
+    if normalise:
+        norm = np.linalg.norm(aero_tstep.zeta[0][:, -1, 0] - aero_tstep.zeta[0][:, 0, 0])
+    sectional_forces = np.zeros((data.structure.num_node, 3))
+    for i_surf in range(aero_tstep.n_surf):
+        _, n_m, n_n = aero_tstep.zeta[i_surf].shape
+        for i_n in range(n_n):
+            i_node = data.aero.aero2struct_mapping[i_surf][i_n]
+            for i_m in range(n_m):
+                force = aero_tstep.forces[i_surf][0:3, i_m, i_n] + aero_tstep.dynamic_forces[i_surf][0:3, i_m, i_n]
+                sectional_forces[i_node] += np.dot(cag, force)/norm
+    return sectional_forces
+
+
+class TestAeroForces(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(6)
+        self.folder = tempfile.mkdtemp()
+        self.n_tsteps = 4
+        # two surfaces sharing the root node 0
+        dimensions = [(3, 4), (3, 4)]
+        aero2struct_mapping = [[0, 1, 2, 3, 4], [0, 5, 6, 7, 8]]
+
+        structure = types.SimpleNamespace(timestep_info=[StructuralStep() for _ in range(self.n_tsteps)],
+                                          num_node=9,
+                                          settings={'unsteady': False})
+        aero = types.SimpleNamespace(timestep_info=[AeroStep(dimensions) for _ in range(self.n_tsteps)],
+                                     aero2struct_mapping=aero2struct_mapping)
+        self.data = types.SimpleNamespace(ts=self.n_tsteps - 1, structure=structure, aero=aero,
+                                          settings={'SHARPy': {'case': 'test_case'}})
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_aero_forces(self):
+        self.data.settings['AeroForcesCalculator'] = {'folder': self.folder,
+                                                      'write_text_file': True,
+                                                      'screen_output': False}
+        calculator = AeroForcesCalculator()
+        calculator.initialise(self.data)
+        calculator.run()
+
+        reference = loop_forces(self.data, self.n_tsteps)
+        np.testing.assert_allclose(calculator.force_matrix(list(range(self.n_tsteps))), reference,
+                                   rtol=1e-12, atol=1e-12)
+        text_output = np.loadtxt(self.folder + '/test_case/forces/aeroforces.txt', delimiter=',')
+        np.testing.assert_allclose(text_output, reference, rtol=1e-6, atol=1e-12)
+
+        # online, only the last time step is computed
+        self.data.aero.timestep_info[-1].forces[0][2] += 1.
+        calculator.run(online=True)
+        np.testing.assert_allclose(calculator.force_matrix([self.n_tsteps - 1]),
+                                   loop_forces(self.data, self.n_tsteps)[-1:], rtol=1e-12, atol=1e-12)
+
+    def test_lift_distribution(self):
+        self.data.settings['LiftDistribution'] = {'folder': self.folder,
+                                                  'write_text_file': True,
+                                                  'print_info': False}
+        postproc = LiftDistribution()
+        postproc.initialise(self.data)
+        postproc.run()
+
+        text_output = np.loadtxt(self.folder + '/test_case/forces/liftdistribution.txt', delimiter=',')
+        for ts in range(self.n_tsteps):
+            reference = loop_lift_distribution(self.data, ts)
+            lift = self.data.structure.timestep_info[ts].postproc_node['lift_distribution']
+            np.testing.assert_allclose(lift, reference, rtol=1e-12, atol=1e-12)
+            np.testing.assert_allclose(text_output[ts*9:(ts + 1)*9, 2:], reference, rtol=1e-6, atol=1e-12)
+
+    def test_scalar_lift(self):
+        # with the vertex forces normal to the surface the magnitude of the sectional force matches the scalar sum of
+        # the magnitude of the vertex forces of the previous implementation
+        for ts in range(self.n_tsteps):
+            struct_tstep = self.data.structure.timestep_info[ts]
+            struct_tstep.quat = algebra.euler2quat(np.array([0., 0., 0.]))
+            aero_tstep = self.data.aero.timestep_info[ts]
+            for i_surf in range(aero_tstep.n_surf):
+                aero_tstep.forces[i_surf][0:2] = 0.
+                aero_tstep.forces[i_surf][2] = np.abs(aero_tstep.forces[i_surf][2])
+                aero_tstep.dynamic_forces[i_surf][:] = 0.
+
+        self.data.settings['LiftDistribution'] = {'print_info': False}
+        postproc = LiftDistribution()
+        postproc.initialise(self.data)
+        postproc.run()
+
+        for ts in range(self.n_tsteps):
+            aero_tstep = self.data.aero.timestep_info[ts]
+            chord = np.abs(aero_tstep.zeta[0][:, -1, 0] - aero_tstep.zeta[0][:, 0, 0]).sum()
+            scalar_lift = np.zeros((self.data.structure.num_node, ))
+            for i_surf in range(aero_tstep.n_surf):
+                _, n_m, n_n = aero_tstep.zeta[i_surf].shape
+                for i_n in range(n_n):
+                    abs_forces = np.linalg.norm(aero_tstep.forces[i_surf][0:3, :, i_n], axis=0)
+                    scalar_lift[self.data.aero.aero2struct_mapping[i_surf][i_n]] += np.sum(abs_forces)/chord
+            lift = self.data.structure.timestep_info[ts].postproc_node['lift_distribution']
+            np.testing.assert_allclose(np.linalg.norm(lift, axis=1), scalar_lift, rtol=1e-12)
+            np.testing.assert_allclose(lift[:, 2], scalar_lift, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
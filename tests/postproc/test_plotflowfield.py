@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import sharpy.generators
+import sharpy.postproc.plotflowfield as plotflowfield
+from sharpy.generators.gridbox import GridBox
+
+
+def induced_velocity(aero_tstep, target_triads, vortex_radius, for_pos, num_cores):
+    # analytical field standing in for the UVLM library, depending on the position of each point only
+    x, y, z = target_triads.T
+    return np.column_stack((np.sin(x)*y, x*z - y, np.cos(y + z))) + aero_tstep.offset
+
+
+def loop_grid(x0, x1, dx, y0, y1, dy, z0, z1, dz):
+    # grid points generated with loops, as reference
+    nx = np.abs(int((x1 - x0)/dx + 1))
+    ny = np.abs(int((y1 - y0)/dy + 1))
+    nz = np.abs(int((z1 - z0)/dz + 1))
+    xarray = np.linspace(x0, x1, nx)
+    yarray = np.linspace(y0, y1, ny)
+    zarray = np.linspace(z0, z1, nz)
+    grid = []
+    for iz in range(nz):
+        grid.append(np.zeros((3, nx, ny)))
+        for ix in range(nx):
+            for iy in range(ny):
+                grid[iz][:, ix, iy] = [xarray[ix], yarray[iy], zarray[iz]]
+    return grid
+
+
+class TestPlotFlowField(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.n_tsteps = 5
+        structure = types.SimpleNamespace(timestep_info=[types.SimpleNamespace(for_pos=np.zeros((6,)))
+                                                         for _ in range(self.n_tsteps)])
+        aero = types.SimpleNamespace(timestep_info=[types.SimpleNamespace(offset=float(ts))
+                                                    for ts in range(self.n_tsteps)])
+        self.data = types.SimpleNamespace(ts=self.n_tsteps - 1, structure=structure, aero=aero,
+                                          case_route=self.folder + '/', case_name='test_case')
+        self.grid_input = {'coords_0': [-1., -2., 0.],
+                           'coords_1': [3., 2., 1.5],
+                           'spacing': [0.5, 1., 0.5]}
+        self.written = dict()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write_data(self, vtk_info, filename):
+        ts = int(filename[-10:-4])
+        self.written[ts] = {vtk_info.point_data.get_array(i).name: vtk_info.point_data.get_array(i).to_array()
+                            for i in range(vtk_info.point_data.number_of_arrays)}
+
+    def run_postproc(self, max_points_per_call, stride=1):
+        self.written = dict()
+        postproc = plotflowfield.PlotFlowField()
+        postproc.initialise(self.data, {'postproc_grid_generator': 'GridBox',
+                                        'postproc_grid_input': dict(self.grid_input),
+                                        'velocity_field_generator': 'SteadyVelocityField',
+                                        'velocity_field_input': {'u_inf': 10.,
+                                                                 'u_inf_direction': [1., 0., 0.]},
+                                        'max_points_per_call': max_points_per_call,
+                                        'stride': stride})
+        with mock.patch.object(plotflowfield.uvlmlib, 'uvlm_calculate_total_induced_velocity_at_points',
+                               side_effect=induced_velocity) as induced_mock, \
+                mock.patch.object(plotflowfield, 'write_data', side_effect=self.write_data):
+            postproc.run()
+        return induced_mock.call_count
+
+    def test_grid(self):
+        generator = GridBox()
+        generator.initialise(dict(self.grid_input))
+        vtk_info, grid = generator.generate({'for_pos': np.zeros((3,))})
+        reference = loop_grid(-1., 3., 0.5, -2., 2., 1., 0., 1.5, 0.5)
+        self.assertEqual(len(grid), len(reference))
+        for iz in range(len(grid)):
+            np.testing.assert_array_equal(grid[iz], reference[iz])
+        np.testing.assert_array_equal(vtk_info.dimensions, [9, 5, 4])
+
+        # the points of the sub-box are those of the full grid within it
+        sub_box = dict(self.grid_input, sub_box_0=[0., -1., 0.4], sub_box_1=[2., 1., 1.5])
+        generator = GridBox()
+        generator.initialise(sub_box)
+        _, sub_grid = generator.generate({'for_pos': np.zeros((3,))})
+        for iz in range(len(sub_grid)):
+            np.testing.assert_array_equal(sub_grid[iz], reference[iz + 1][:, 2:7, 1:4])
+
+    def test_chunks(self):
+        n_calls_full = self.run_postproc(0)
+        full = self.written
+        self.assertEqual(n_calls_full, self.n_tsteps)
+        # 9 x 5 x 4 points in chunks of 7
+        n_calls_chunked = self.run_postproc(7)
+        self.assertEqual(n_calls_chunked, self.n_tsteps*int(np.ceil(180/7)))
+
+        reference = loop_grid(-1., 3., 0.5, -2., 2., 1., 0., 1.5, 0.5)
+        for ts in range(self.n_tsteps):
+            for name in ('induced_velocity', 'external_velocity', 'velocity'):
+                np.testing.assert_array_equal(self.written[ts][name], full[ts][name])
+
+            # vtk point ordering: x varies fastest, then y and z
+            u_ind = full[ts]['induced_velocity']
+            i_point = 0
+            for iz in range(len(reference)):
+                for iy in range(reference[iz].shape[2]):
+                    for ix in range(reference[iz].shape[1]):
+                        np.testing.assert_allclose(u_ind[i_point],
+                                                   induced_velocity(self.data.aero.timestep_info[ts],
+                                                                    reference[iz][:, ix, iy][None, :],
+                                                                    None, None, None)[0])
+                        i_point += 1
+            np.testing.assert_allclose(full[ts]['external_velocity'], np.array([[10., 0., 0.]]*i_point))
+
+    def test_stride(self):
+        self.run_postproc(0, stride=2)
+        self.assertEqual(sorted(self.written.keys()), [0, 2, 4])
+
+        self.data.structure.timestep_info[2] = None
+        self.run_postproc(0, stride=2)
+        self.assertEqual(sorted(self.written.keys()), [0, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
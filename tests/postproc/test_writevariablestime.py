@@ -0,0 +1,170 @@
+import copy
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import numpy as np
+
+import sharpy.postproc.writevariablestime as writevariablestime
+import sharpy.utils.settings as settings
+from sharpy.solvers.dynamicuvlm import DynamicUVLM
+
+
+class TestOutputBuffer(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(2)
+        self.folder = tempfile.mkdtemp() + '/'
+        self.reference_folder = tempfile.mkdtemp() + '/'
+        self.n_steps = 7
+        self.delimiter = ' '
+        self.vectors = np.random.rand(self.n_steps, 2, 3)
+        self.scalars = np.random.rand(self.n_steps)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        shutil.rmtree(self.reference_folder)
+
+    def write_reference(self):
+        # files written row by row as before the buffer
+        postproc = writevariablestime.WriteVariablesTime()
+        with open(self.reference_folder + 'vector.dat', 'w') as fid:
+            fid.write('# vector\n')
+            for ts in range(self.n_steps):
+                postproc.write_nparray_to_file(fid, ts, self.vectors[ts], self.delimiter)
+                postproc.write_nparray_to_file(fid, ts, 2*self.vectors[ts], self.delimiter)
+        with open(self.reference_folder + 'scalar.dat', 'w') as fid:
+            for ts in range(self.n_steps):
+                postproc.write_value_to_file(fid, ts, self.scalars[ts], self.delimiter)
+
+    def fill(self, buffer, folder):
+        buffer.set_header(folder + 'vector.dat', '# vector')
+        for ts in range(self.n_steps):
+            # two rows in the same step
+            buffer.append(folder + 'vector.dat', ts, self.vectors[ts])
+            buffer.append(folder + 'vector.dat', ts, 2*self.vectors[ts])
+            buffer.append(folder + 'scalar.dat', ts, self.scalars[ts], scalar=True)
+            buffer.step()
+        buffer.flush()
+
+    def assert_same_files(self, folder, reference_folder):
+        for name in ('vector.dat', 'scalar.dat'):
+            with open(folder + name) as fid:
+                lines = fid.readlines()
+            with open(reference_folder + name) as fid:
+                reference_lines = fid.readlines()
+            self.assertEqual(lines, reference_lines)
+
+    def test_dat(self):
+        self.write_reference()
+        buffer = writevariablestime.OutputBuffer(self.folder, self.delimiter, buffer_size=3)
+
+        buffer.set_header(self.folder + 'scalar.dat', '')
+        buffer.append(self.folder + 'scalar.dat', 0, 1., scalar=True)
+        buffer.step()
+        # nothing is written until the buffer is full
+        with open(self.folder + 'scalar.dat') as fid:
+            self.assertEqual(fid.read(), '\n')
+        os.remove(self.folder + 'scalar.dat')
+        buffer = writevariablestime.OutputBuffer(self.folder, self.delimiter, buffer_size=3)
+
+        self.fill(buffer, self.folder)
+        self.assertEqual(buffer.n_steps, 0)
+        for channel in buffer.channels.values():
+            self.assertEqual(channel['count'], 0)
+        self.assert_same_files(self.folder, self.reference_folder)
+
+    def test_h5(self):
+        buffer = writevariablestime.OutputBuffer(self.folder, self.delimiter, buffer_size=3, output_format='h5')
+        self.fill(buffer, self.folder)
+        self.assertFalse(os.path.isfile(self.folder + 'vector.dat'))
+
+        self.write_reference()
+        export_folder = self.folder + 'export/'
+        written_files = writevariablestime.export_dat(buffer.h5_filename, export_folder, delimiter=self.delimiter)
+        self.assertEqual(sorted(os.path.basename(f) for f in written_files), ['scalar.dat', 'vector.dat'])
+        self.assert_same_files(export_folder, self.reference_folder)
+
+
+class StructuralStep(object):
+    # minimal stand-in of the structural time step information
+
+    def __init__(self):
+        self.for_pos = np.arange(6.)
+        self.in_global_AFoR = True
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+class AeroStep(object):
+    # minimal stand-in of the aerodynamic time step information
+
+    def copy(self):
+        return AeroStep()
+
+
+class FailingAeroSolver(object):
+    # stand-in of the UVLM solver that fails at the given time step
+
+    def __init__(self, data, failing_ts):
+        self.data = data
+        self.failing_ts = failing_ts
+
+    def update_custom_grid(self, structure_tstep, aero_tstep):
+        pass
+
+    def run(self, **kwargs):
+        if self.data.ts == self.failing_ts:
+            raise RuntimeError('diverged')
+        return self.data
+
+    def add_step(self):
+        self.data.aero.timestep_info.append(self.data.aero.timestep_info[-1].copy())
+
+
+class TestFlushOnFailure(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        structure = types.SimpleNamespace(timestep_info=[StructuralStep()])
+        aero = types.SimpleNamespace(timestep_info=[AeroStep()])
+        self.data = types.SimpleNamespace(ts=0, structure=structure, aero=aero,
+                                          settings={'SHARPy': {'case': 'test_case'}})
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_dynamic_uvlm(self):
+        postproc = writevariablestime.WriteVariablesTime()
+        postproc.initialise(self.data, {'folder': self.folder,
+                                        'FoR_variables': ['for_pos'],
+                                        'buffer_size': 100})
+
+        solver = DynamicUVLM()
+        solver.data = self.data
+        solver.settings = {'structural_solver': 'NonLinearDynamicPrescribedStep',
+                           'structural_solver_settings': dict(),
+                           'aero_solver': 'StepUvlm',
+                           'aero_solver_settings': dict(),
+                           'n_time_steps': 10,
+                           'dt': 0.1,
+                           'print_info': False}
+        settings.to_custom_types(solver.settings, DynamicUVLM.settings_types, DynamicUVLM.settings_default)
+        solver.aero_solver = FailingAeroSolver(self.data, failing_ts=4)
+        solver.postprocessors = {'WriteVariablesTime': postproc}
+        solver.with_postprocessors = True
+
+        with self.assertRaises(RuntimeError):
+            solver.run()
+
+        # the time steps before the failure are written although the buffer is not full
+        output = np.loadtxt(postproc.dir + 'FoR_00_for_pos.dat')
+        np.testing.assert_array_equal(output[:, 0], [1, 2, 3])
+        np.testing.assert_array_equal(output[:, 1:], np.tile(np.arange(6.), (3, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
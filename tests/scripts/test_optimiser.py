@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import scripts.optimiser.optimiser as optimiser
+
+# number of evaluations, shared with the forked workers
+n_evaluations = multiprocessing.get_context('fork').Value('i', 0)
+
+
+def stub_wrapper(x, yaml_dict):
+    # cost of the point without running any case, failing for negative parameters
+    with n_evaluations.get_lock():
+        n_evaluations.value += 1
+    if np.any(x < 0):
+        raise ValueError('Negative parameter')
+    if np.any(x > 100):
+        # the worker dies
+        os._exit(1)
+    return float(np.sum(x**2))
+
+
+class TestCaseEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        n_evaluations.value = 0
+        self.patch = mock.patch.object(optimiser, 'wrapper', stub_wrapper)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def run_evaluator(self, num_processes):
+        previous_x = np.array([[1., 2.], [3., 4.]])
+        previous_y = np.array([[-1.], [-2.]])
+        evaluator = optimiser.CaseEvaluator(dict(), num_processes=num_processes,
+                                            previous_x=previous_x, previous_y=previous_y)
+
+        # the previous cases are not run again
+        x = np.array([[1., 2.], [0.5, 0.5], [3., 4.]])
+        np.testing.assert_array_equal(evaluator(x), [[-1.], [0.5], [-2.]])
+        self.assertEqual(n_evaluations.value, 1)
+
+        # duplicated points within a batch and points that differ below the precision of the case names are
+        # evaluated once
+        x = np.array([[2., 2.], [2., 2.], [2. + 1e-8, 2.], [0.5, 0.5], [1., 1.]])
+        np.testing.assert_array_equal(evaluator(x), [[8.], [8.], [8.], [0.5], [2.]])
+        self.assertEqual(n_evaluations.value, 3)
+
+        # a failed case is recorded with the failure cost and the rest of the batch is kept
+        x = np.array([[-1., 1.], [3., 3.]])
+        np.testing.assert_array_equal(evaluator(x), [[optimiser.failed_cost], [18.]])
+        self.assertEqual(evaluator.failed, {evaluator.key([-1., 1.])})
+        np.testing.assert_array_equal(evaluator([[-1., 1.]]), [[optimiser.failed_cost]])
+        self.assertEqual(n_evaluations.value, 5)
+
+        x_all, y_all = evaluator.evaluated()
+        self.assertEqual(x_all.shape, (7, 2))
+        for x, y in zip(x_all, y_all):
+            self.assertEqual(evaluator([x])[0, 0], y[0])
+        self.assertEqual(n_evaluations.value, 5)
+        return evaluator
+
+    def test_serial(self):
+        self.run_evaluator(1)
+
+    def test_parallel(self):
+        evaluator = self.run_evaluator(3)
+
+        # the pool is replaced after a worker dies
+        x = np.array([[101., 0.], [4., 4.]])
+        costs = evaluator(x)
+        self.assertIn(evaluator.key([101., 0.]), evaluator.failed)
+        self.assertEqual(costs[0, 0], optimiser.failed_cost)
+        np.testing.assert_array_equal(evaluator([[5., 5.], [6., 6.]]), [[50.], [72.]])
+        evaluator.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
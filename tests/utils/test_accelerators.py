@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+import sharpy.utils.accelerators as accelerators
+
+
+class TestAccelerators(unittest.TestCase):
+    """
+    Solves a linear fixed point problem whose plain fixed point iterations diverge
+    """
+
+    def setUp(self):
+        np.random.seed(0)
+        self.n = 30
+        a_matrix = np.random.rand(self.n, self.n)
+        self.a_matrix = 1.6*a_matrix/np.abs(np.linalg.eigvals(a_matrix)).max()
+        self.b = np.random.rand(self.n, 1)
+        self.solution = np.linalg.solve(np.eye(self.n) - self.a_matrix, self.b)
+
+    def solve(self, accelerator, max_iter=100):
+        accelerator.reset()
+        x = np.zeros((self.n, 1))
+        for i_iter in range(max_iter):
+            x_tilde = self.a_matrix.dot(x) + self.b
+            if np.linalg.norm(x_tilde - x) < 1e-10*np.linalg.norm(self.solution):
+                return x, i_iter
+            x = accelerator.update(x_tilde)
+            self.assertEqual(x.shape, (self.n, 1))
+        return x, max_iter
+
+    def test_aitken(self):
+        x, n_iter = self.solve(accelerators.AitkenRelaxation(0.5))
+        np.testing.assert_allclose(x, self.solution, rtol=1e-8)
+        self.assertLess(n_iter, 50)
+
+    def test_iqn_ils(self):
+        accelerator = accelerators.IQNILS(0.5, reuse=1)
+        x, n_iter = self.solve(accelerator)
+        np.testing.assert_allclose(x, self.solution, rtol=1e-8)
+        # at most one iteration per unknown for a linear problem, plus the first evaluation
+        self.assertLessEqual(n_iter, self.n + 2)
+
+        # the secant information of the previous step makes the next one converge straight away
+        self.b *= 1.1
+        self.solution *= 1.1
+        x, n_iter_reused = self.solve(accelerator)
+        np.testing.assert_allclose(x, self.solution, rtol=1e-8)
+        self.assertLess(n_iter_reused, 5)
+
+        accelerator.clear()
+        self.assertEqual(accelerator.n_columns, 0)
+
+    def test_first_update_unchanged(self):
+        for accelerator in accelerators.dict_of_accelerators.values():
+            accelerator = accelerator(0.5)
+            accelerator.reset()
+            np.testing.assert_array_equal(accelerator.update(self.b), self.b)
+
+    def test_extrapolate(self):
+        times = np.arange(4)
+        history = [self.b*t**2 + 1. for t in times[::-1]]
+        # newest first, predicting t = 4
+        np.testing.assert_allclose(accelerators.extrapolate(history, 2), self.b*16 + 1.)
+        np.testing.assert_allclose(accelerators.extrapolate(history, 1), self.b*(2*9 - 4) + 1.)
+        np.testing.assert_array_equal(accelerators.extrapolate(history, 0), history[0])
+        # not enough history
+        np.testing.assert_allclose(accelerators.extrapolate(history[:2], 2), self.b*(2*9 - 4) + 1.)
+        with self.assertRaises(ValueError):
+            accelerators.extrapolate(history, 3)
+        # the order is checked also when the history is too short for it
+        with self.assertRaises(ValueError):
+            accelerators.extrapolate(history[:2], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -574,6 +574,39 @@ class TestAlgebra(unittest.TestCase):
         np.testing.assert_array_almost_equal(Pag_quat.dot(aircraft_nose_rotated), aircraft_nose,
                                              err_msg='Error in projection from A to G using quaternions')
 
+    def test_batched_rotations(self):
+        """
+        Checks the batched rotation functions against their single vector counterparts, including CRVs small
+        enough for the series expansions to be used.
+        """
+        np.random.seed(3)
+        N = 40
+        psi = np.pi * (2. * np.random.rand(N, 3) - 1)
+        psi[0, :] = 0.
+        psi[1, :] *= 1e-10
+        psi[2, :] *= 1e-17
+        v = np.random.rand(N, 3)
+        quat = 2. * np.random.rand(N, 4) - 1
+        angles = np.pi * (2. * np.random.rand(N) - 1)
+
+        def stack(function, *args):
+            return np.array([function(*arg) for arg in zip(*args)])
+
+        np.testing.assert_allclose(algebra.skew_vec(psi), stack(algebra.skew, psi), atol=1e-15)
+        np.testing.assert_allclose(algebra.cross3_vec(psi, v), stack(algebra.cross3, psi, v), atol=1e-15)
+        np.testing.assert_allclose(algebra.crv2rotation_vec(psi), stack(algebra.crv2rotation, psi), atol=1e-14)
+        np.testing.assert_allclose(algebra.crv2tan_vec(psi), stack(algebra.crv2tan, psi), atol=1e-14)
+        np.testing.assert_allclose(algebra.quat2rotation_vec(quat), stack(algebra.quat2rotation, quat), atol=1e-14)
+        for axis, function in zip(['x', 'y', 'z'], [algebra.rotation3d_x, algebra.rotation3d_y, algebra.rotation3d_z]):
+            np.testing.assert_allclose(algebra.rotation3d_vec(angles, axis), stack(function, angles), atol=1e-15)
+        np.testing.assert_allclose(algebra.der_Ccrv_by_v_vec(psi, v), stack(algebra.der_Ccrv_by_v, psi, v),
+                                   atol=1e-14)
+        np.testing.assert_allclose(algebra.der_CcrvT_by_v_vec(psi, v), stack(algebra.der_CcrvT_by_v, psi, v),
+                                   atol=1e-14)
+
+        v1, v2, v3 = algebra.crv2triad_vec(psi)
+        np.testing.assert_allclose(np.stack((v1, v2, v3), axis=2), stack(algebra.crv2rotation, psi), atol=1e-14)
+
 # if __name__=='__main__':
 # unittest.main()
 # # T=TestAlgebra()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+import sharpy.utils.broyden as broyden
+import sharpy.utils.exceptions as exc
+import sharpy.utils.parallel_utils as parallel_utils
+
+
+def residual(x):
+    # solution at x = [1, 2]
+    return np.array([x[0]**2 + x[1] - 3.,
+                     x[0] + x[1]**3 - 9.])
+
+
+class TestBroyden(unittest.TestCase):
+
+    def setUp(self):
+        self.x0 = np.array([1.3, 1.7])
+        self.solution = np.array([1., 2.])
+
+    def test_finite_difference_jacobian(self):
+        jacobian = broyden.finite_difference_jacobian(residual, self.x0, residual(self.x0), 1e-7)
+        np.testing.assert_allclose(jacobian, [[2*self.x0[0], 1.], [1., 3*self.x0[1]**2]], rtol=1e-5)
+
+    @unittest.skipUnless(parallel_utils.fork_available(), 'Forked processes not supported')
+    def test_parallel_jacobian(self):
+        steps = np.array([1e-3, 2e-3])
+        serial = broyden.finite_difference_jacobian(residual, self.x0, residual(self.x0), steps)
+        parallel = broyden.finite_difference_jacobian(residual, self.x0, residual(self.x0), steps,
+                                                      num_processes=2)
+        np.testing.assert_array_equal(parallel, serial)
+
+    def test_solve(self):
+        evaluated = []
+        solver = broyden.BroydenSolver(residual, tolerance=1e-8, steps=1e-4,
+                                       callback=lambda x, f: evaluated.append(x.copy()))
+        x, f = solver.solve(self.x0)
+        np.testing.assert_allclose(x, self.solution, rtol=1e-7)
+        self.assertTrue(np.all(np.abs(f) < 1e-8))
+        # far fewer evaluations than a derivative-free minimisation
+        self.assertLess(solver.n_evaluations, 15)
+        # the finite difference evaluations are not reported
+        self.assertEqual(len(evaluated), solver.n_evaluations - 2*solver.n_jacobians)
+
+        # a good Jacobian from a previous solution avoids the finite differences
+        solver.solve(self.x0 + 0.05)
+        self.assertEqual(solver.n_jacobians, 0)
+
+    def test_not_converged(self):
+        solver = broyden.BroydenSolver(residual, tolerance=1e-8, steps=1e-4, max_iter=1)
+        with self.assertRaises(exc.NotConvergedSolver):
+            solver.solve(self.x0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import ctypes as ct
+import functools
+import pickle
+import numpy as np
+import unittest
+
+from sharpy.utils.datastructures import StructTimeStepInfo, TimeStepCache, LazyTimeStepInfo
+
+
+def build_struct_tstep(num_node, index):
+    tstep = StructTimeStepInfo(num_node=num_node, num_elem=1, num_dof=ct.c_int(12))
+    tstep.pos[:, 0] = index
+    return tstep
+
+
+class TestLazyTimeStepInfo(unittest.TestCase):
+    """
+    Tests the on-demand generation of time steps
+    """
+
+    def setUp(self):
+        self.n_calls = 0
+
+        def builder(index):
+            self.n_calls += 1
+            tstep = StructTimeStepInfo(num_node=3, num_elem=1, num_dof=ct.c_int(12))
+            tstep.pos[:, 0] = index
+            return tstep, index
+
+        self.cache = TimeStepCache(builder, max_size=2)
+
+    def test_materialise_on_access(self):
+        tsteps = [LazyTimeStepInfo(self.cache, it, position=0) for it in range(5)]
+        self.assertEqual(self.n_calls, 0)
+
+        np.testing.assert_array_equal(tsteps[3].pos[:, 0], 3 * np.ones(3))
+        self.assertIsInstance(tsteps[3], StructTimeStepInfo)
+        self.assertEqual(self.n_calls, 1)
+
+        # cached
+        tsteps[3].psi
+        self.assertEqual(self.n_calls, 1)
+
+        # least recently used time step is discarded
+        tsteps[0].pos
+        tsteps[1].pos
+        tsteps[3].pos
+        self.assertEqual(self.n_calls, 4)
+
+    def test_assignment_is_kept(self):
+        tstep = LazyTimeStepInfo(self.cache, 0, position=0)
+        tstep.mb_dict = {'modified': True}
+        for it in range(1, 4):
+            LazyTimeStepInfo(self.cache, it, position=0).pos
+
+        self.assertTrue(tstep.mb_dict['modified'])
+
+    def test_postproc_is_kept(self):
+        tstep = LazyTimeStepInfo(self.cache, 0, position=0)
+        tstep.postproc_cell['value'] = 1.
+        tstep.postproc_node['value'] = 2.
+        for it in range(1, 4):
+            LazyTimeStepInfo(self.cache, it, position=0).pos
+
+        self.assertEqual(self.n_calls, 4)
+        # discarded by the cache and generated again, as it was not pinned
+        tstep.pos
+        self.assertEqual(self.n_calls, 5)
+        self.assertEqual(tstep.postproc_cell['value'], 1.)
+        self.assertEqual(tstep.postproc_node['value'], 2.)
+
+    def test_pickle(self):
+        cache = TimeStepCache(functools.partial(build_struct_tstep, 3), max_size=2)
+        tsteps = [LazyTimeStepInfo(cache, it) for it in range(3)]
+        tsteps[1].postproc_cell['value'] = 1.
+        tsteps[2].mb_dict = {'modified': True}
+
+        unpickled = pickle.loads(pickle.dumps(tsteps))
+        # the placeholders share the cache
+        self.assertIs(unpickled[0]._lazy_cache, unpickled[1]._lazy_cache)
+        self.assertEqual(len(unpickled[0]._lazy_cache._cache), 0)
+        np.testing.assert_array_equal(unpickled[1].pos[:, 0], np.ones(3))
+        self.assertEqual(unpickled[1].postproc_cell['value'], 1.)
+        self.assertTrue(unpickled[2].mb_dict['modified'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import h5py as h5
+import numpy as np
+
+import sharpy.structure.utils.dynamicinput as dynamicinput
+
+
+class TestDynamicInput(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.folder, 'case.dyn.h5')
+        self.num_steps = 50
+        self.num_node = 7
+        self.dynamic_forces = np.random.rand(self.num_steps, self.num_node, 6)
+        self.for_vel = np.random.rand(self.num_steps, 6)
+        with h5.File(self.file_name, 'w') as h5file:
+            h5file.create_dataset('dynamic_forces', data=self.dynamic_forces)
+            # compressed datasets cannot be mapped and are read from the file
+            h5file.create_dataset('for_vel', data=self.for_vel, compression='gzip')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_dyn_file(self):
+        dyn_file = dynamicinput.DynFile(self.file_name)
+        self.assertIsInstance(dyn_file['dynamic_forces'], np.memmap)
+        self.assertEqual(set(dyn_file.keys()), {'dynamic_forces', 'for_vel'})
+
+        # the contents are not pickled but mapped again
+        unpickled = pickle.loads(pickle.dumps(dyn_file))
+        self.assertLess(len(pickle.dumps(dyn_file)), self.dynamic_forces.nbytes)
+        np.testing.assert_array_equal(unpickled['dynamic_forces'][3], self.dynamic_forces[3])
+        np.testing.assert_array_equal(unpickled['for_vel'][3], self.for_vel[3])
+        dyn_file.close()
+        unpickled.close()
+
+    def test_dynamic_input(self):
+        dyn_file = dynamicinput.DynFile(self.file_name)
+        dynamic_input = dynamicinput.DynamicInput(dyn_file, self.num_steps, self.num_node)
+        self.assertEqual(len(dynamic_input), self.num_steps)
+
+        for it in (0, 17, -1):
+            np.testing.assert_array_equal(dynamic_input[it]['dynamic_forces'], self.dynamic_forces[it])
+            np.testing.assert_array_equal(dynamic_input[it]['for_vel'], self.for_vel[it])
+            np.testing.assert_array_equal(dynamic_input[it]['for_acc'], np.zeros(6))
+
+        # the missing inputs are shared between time steps and cannot be modified
+        self.assertIs(dynamic_input[0]['for_pos'], dynamic_input[1]['for_pos'])
+        with self.assertRaises(ValueError):
+            dynamic_input[0]['for_pos'][0] = 1.
+        with self.assertRaises(ValueError):
+            dynamic_input[0]['dynamic_forces'][0, 0] = 1.
+
+        with self.assertRaises(IndexError):
+            dynamic_input[self.num_steps]
+        with self.assertRaises(IndexError):
+            dynamicinput.DynamicInput(dyn_file, self.num_steps + 1, self.num_node)
+        dyn_file.close()
+
+    def test_no_input(self):
+        dynamic_input = dynamicinput.DynamicInput(dict(), 100000, self.num_node)
+        self.assertEqual(dynamic_input[99999]['dynamic_forces'].shape, (self.num_node, 6))
+        self.assertEqual(len(dynamic_input.zeros), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
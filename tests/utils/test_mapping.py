@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+import sharpy.aero.utils.mapping as mapping
+import sharpy.utils.algebra as algebra
+
+
+def loop_force_mapping(aero_forces, struct2aero_mapping, zeta, pos_def, psi_def, conn, cag):
+    # node by node mapping with the legacy structure, as reference
+    struct_forces = np.zeros((pos_def.shape[0], 6))
+    nodes = []
+    for i_elem in range(psi_def.shape[0]):
+        for i_local_node in range(3):
+            i_global_node = conn[i_elem, i_local_node]
+            if i_global_node in nodes:
+                continue
+            nodes.append(i_global_node)
+            for node_mapping in struct2aero_mapping[i_global_node]:
+                i_surf = node_mapping['i_surf']
+                i_n = node_mapping['i_n']
+                cbg = np.dot(algebra.crv2rotation(psi_def[i_elem, i_local_node, :]).T, cag)
+                for i_m in range(aero_forces[i_surf].shape[1]):
+                    chi_g = zeta[i_surf][:, i_m, i_n] - np.dot(cag.T, pos_def[i_global_node, :])
+                    struct_forces[i_global_node, 0:3] += np.dot(cbg, aero_forces[i_surf][0:3, i_m, i_n])
+                    struct_forces[i_global_node, 3:6] += np.dot(cbg, aero_forces[i_surf][3:6, i_m, i_n])
+                    struct_forces[i_global_node, 3:6] += np.dot(cbg, np.cross(chi_g, aero_forces[i_surf][0:3, i_m, i_n]))
+    return struct_forces
+
+
+class TestMappingTables(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(1)
+        # two wings sharing the root node 0, with a structural node (9) without aerodynamics
+        self.conn = np.array([[0, 2, 1],
+                              [2, 4, 3],
+                              [0, 6, 5],
+                              [6, 8, 7],
+                              [4, 9, 4]])
+        surface_nodes = [[0, 1, 2, 3, 4], [0, 5, 6, 7, 8]]
+        self.n_node = 10
+        self.struct2aero_mapping = [[] for _ in range(self.n_node)]
+        for i_surf, nodes in enumerate(surface_nodes):
+            for i_n, i_node in enumerate(nodes):
+                self.struct2aero_mapping[i_node].append({'i_surf': i_surf, 'i_n': i_n})
+        self.tables = mapping.MappingTables(self.struct2aero_mapping)
+
+    def test_tables(self):
+        self.assertEqual(self.tables.n_entries, 10)
+        self.assertEqual(list(self.tables.node_entries(0)), [0, 1])
+        self.assertEqual(len(self.tables.node_entries(9)), 0)
+        np.testing.assert_array_equal(self.tables.aero2struct[1], [0, 5, 6, 7, 8])
+        self.assertEqual(self.tables.spanwise_index(6, 1), 2)
+        self.assertEqual(self.tables.spanwise_index(6, 0), -1)
+        for i_surf in range(2):
+            entries = self.tables.entry[i_surf]
+            np.testing.assert_array_equal(self.tables.surf[entries], i_surf)
+            np.testing.assert_array_equal(self.tables.i_n[entries], np.arange(5))
+
+    def test_force_mapping(self):
+        n_m = 4
+        aero_forces = [np.random.rand(6, n_m, 5) for _ in range(2)]
+        zeta = [np.random.rand(3, n_m, 5) for _ in range(2)]
+        pos_def = np.random.rand(self.n_node, 3)
+        psi_def = 0.3*np.random.rand(self.conn.shape[0], 3, 3)
+        cag = algebra.crv2rotation(np.array([0.1, -0.2, 0.3]))
+
+        reference = loop_force_mapping(aero_forces, self.struct2aero_mapping, zeta, pos_def, psi_def, self.conn, cag)
+        for struct2aero_mapping in (self.tables, self.struct2aero_mapping):
+            struct_forces = mapping.aero2struct_force_mapping(aero_forces, struct2aero_mapping, zeta, pos_def,
+                                                              psi_def, None, self.conn, cag)
+            np.testing.assert_allclose(struct_forces, reference, rtol=1e-12, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import sharpy.utils.cout_utils as cout
+import sharpy.utils.multicase as multicase
+import sharpy.utils.parallel_utils as parallel_utils
+import sharpy.utils.solver_interface as solver_interface
+
+
+@solver_interface.solver
+class CommonStub(solver_interface.BaseSolver):
+    """Stand-in for the loaders and static solution common to all the cases"""
+    solver_id = 'CommonStub'
+
+    def initialise(self, data, custom_settings=None):
+        self.data = data
+
+    def run(self):
+        self.data.n_common_runs = getattr(self.data, 'n_common_runs', 0) + 1
+        self.data.history = []
+        return self.data
+
+
+@solver_interface.solver
+class CaseStub(solver_interface.BaseSolver):
+    """Stand-in for the solver that differs between cases"""
+    solver_id = 'CaseStub'
+
+    def initialise(self, data, custom_settings=None):
+        self.data = data
+
+    def run(self):
+        value = self.data.settings['CaseStub']['value']
+        if value < 0:
+            raise ValueError('Negative value')
+        self.data.history.append(value)
+        return self.data
+
+
+def collect(data):
+    return data.case_name, data.n_common_runs, list(data.history), os.getpid()
+
+
+class TestMultiCase(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = {'SHARPy': {'case': 'base',
+                                    'flow': ['BeamLoader', 'AerogridLoader', 'StaticCoupled', 'DynamicCoupled']},
+                         'BeamLoader': {'unsteady': 'on'},
+                         'AerogridLoader': {'mstar': 80},
+                         'StaticCoupled': {'n_load_steps': 4},
+                         'DynamicCoupled': {'n_time_steps': 100,
+                                            'aero_solver_settings': {'velocity_field_input': {'gust_length': 5.,
+                                                                                              'u_inf': 10.}}}}
+
+    def test_merge_settings(self):
+        merged = multicase.merge_settings(self.settings, {
+            'DynamicCoupled': {'aero_solver_settings': {'velocity_field_input': {'gust_length': 10.}}}})
+        self.assertEqual(merged['DynamicCoupled']['aero_solver_settings']['velocity_field_input'],
+                         {'gust_length': 10., 'u_inf': 10.})
+        self.assertEqual(merged['DynamicCoupled']['n_time_steps'], 100)
+        # the base settings are not modified
+        self.assertEqual(self.settings['DynamicCoupled']['aero_solver_settings']['velocity_field_input']['gust_length'],
+                         5.)
+
+    def test_common_flow(self):
+        gusts = [multicase.merge_settings(self.settings, {'DynamicCoupled': {'n_time_steps': n_steps}})
+                 for n_steps in (100, 200)]
+        self.assertEqual(multicase.common_flow(self.settings, gusts), ['BeamLoader', 'AerogridLoader',
+                                                                       'StaticCoupled'])
+
+        trims = gusts + [multicase.merge_settings(self.settings, {'StaticCoupled': {'n_load_steps': 1}})]
+        self.assertEqual(multicase.common_flow(self.settings, trims), ['BeamLoader', 'AerogridLoader'])
+
+        flows = gusts + [multicase.merge_settings(self.settings, {'SHARPy': {'flow': ['BeamLoader', 'Modal']}})]
+        self.assertEqual(multicase.common_flow(self.settings, flows), ['BeamLoader'])
+
+        self.assertEqual(multicase.common_flow(self.settings, [self.settings]), self.settings['SHARPy']['flow'])
+
+
+class TestRunCases(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.settings = {'SHARPy': {'case': 'base',
+                                    'route': self.folder,
+                                    'flow': ['CommonStub', 'CaseStub'],
+                                    'write_screen': 'off',
+                                    'write_log': 'off',
+                                    'log_folder': self.folder},
+                         'CommonStub': dict(),
+                         'CaseStub': {'value': 0.}}
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def run_cases(self, num_processes):
+        cases = [{'CaseStub': {'value': 1.}},
+                 {'CaseStub': {'value': 2.}},
+                 {'SHARPy': {'case': 'third'}, 'CaseStub': {'value': 3.}}]
+        results = multicase.run_cases(self.settings, cases, num_processes=num_processes, collect=collect)
+
+        self.assertEqual([result[0] for result in results], ['base_000', 'base_001', 'third'])
+        # the common solvers are run once and every case starts from their result
+        self.assertEqual([result[1] for result in results], [1, 1, 1])
+        self.assertEqual([result[2] for result in results], [[1.], [2.], [3.]])
+        return [result[3] for result in results]
+
+    def test_serial(self):
+        pids = self.run_cases(1)
+        self.assertEqual(pids, [os.getpid()]*3)
+
+    @unittest.skipUnless(parallel_utils.fork_available(), 'Forking not supported')
+    def test_forked(self):
+        pids = self.run_cases(3)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(len(set(pids)), 3)
+
+    def test_failed_case(self):
+        cases = [{'CaseStub': {'value': 1.}}, {'CaseStub': {'value': -1.}}]
+        for num_processes in (1, 2):
+            with self.subTest(num_processes=num_processes):
+                with mock.patch.object(multicase.cout, 'finish_writer', wraps=cout.finish_writer) as finish_writer:
+                    with self.assertRaises(ValueError):
+                        multicase.run_cases(self.settings, cases, num_processes=num_processes, collect=collect)
+                finish_writer.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+import sharpy.utils.parallel_utils as parallel_utils
+
+
+class Postprocessor(object):
+
+    def __init__(self, n_steps):
+        self.history = [np.random.rand(3) for _ in range(n_steps)]
+        self.visited = []
+
+    def step(self, ts):
+        self.visited.append(ts)
+        return ts, np.sum(self.history[ts]), parallel_utils.is_worker()
+
+
+class TestMapTimeSteps(unittest.TestCase):
+    """
+    Tests the distribution of the time steps of a stored time history among processes
+    """
+
+    def setUp(self):
+        np.random.seed(1)
+        self.postproc = Postprocessor(37)
+        self.reference = [(ts, np.sum(self.postproc.history[ts]), False) for ts in range(37)]
+
+    def test_chunks(self):
+        chunks = parallel_utils.chunks(range(10), 4)
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6, 7], [8, 9]])
+        self.assertEqual(len(parallel_utils.chunks(range(2), 4)), 2)
+
+    def test_serial(self):
+        results = parallel_utils.map_time_steps(self.postproc.step, range(37))
+        self.assertEqual(results, self.reference)
+        self.assertEqual(self.postproc.visited, list(range(37)))
+
+    @unittest.skipUnless(parallel_utils.fork_available(), 'Forked processes not supported')
+    def test_parallel(self):
+        results = parallel_utils.map_time_steps(self.postproc.step, range(37), num_processes=3)
+        self.assertEqual(results, [(ts, value, True) for ts, value, _ in self.reference])
+        self.assertFalse(parallel_utils.is_worker())
+        # the time steps are run in the worker processes
+        self.assertEqual(self.postproc.visited, [])
+
+    @unittest.skipUnless(parallel_utils.fork_available(), 'Forked processes not supported')
+    def test_fresh_processes(self):
+        def visited(ts):
+            self.postproc.step(ts)
+            return list(self.postproc.visited)
+
+        results = parallel_utils.map_time_steps(visited, range(6), num_processes=2, chunks_per_process=3,
+                                                max_tasks_per_process=1)
+        # every time step is run in a new process without the side effects of the previous ones
+        self.assertEqual(results, [[ts] for ts in range(6)])
+
+
+if __name__ == '__main__':
+    unittest.main()
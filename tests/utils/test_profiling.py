@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import sharpy.utils.profiling as profiling
+
+
+@profiling.timed()
+def library_call(x):
+    return 2*x
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        profiling.enable()
+
+    def test_nested_timers_and_counters(self):
+        for _ in range(3):
+            with profiling.timer('DynamicCoupled'):
+                with profiling.timer('aero'):
+                    self.assertEqual(library_call(2), 4)
+                profiling.count('fsi_iterations', 4)
+
+        records = profiling.records()
+        self.assertEqual(sorted(records), ['DynamicCoupled', 'DynamicCoupled/aero',
+                                           'DynamicCoupled/aero/test_profiling.library_call',
+                                           'DynamicCoupled/fsi_iterations'])
+        self.assertEqual(records['DynamicCoupled']['calls'], 3)
+        self.assertEqual(records['DynamicCoupled/aero/test_profiling.library_call']['calls'], 3)
+        self.assertEqual(records['DynamicCoupled/fsi_iterations']['total'], 12)
+        self.assertLessEqual(records['DynamicCoupled/aero']['total'], records['DynamicCoupled']['total'])
+
+    def test_timer_closed_on_exception(self):
+        with self.assertRaises(ValueError):
+            with profiling.timer('failing'):
+                raise ValueError
+        self.assertEqual(profiling.current_path(), '')
+        self.assertEqual(profiling.records()['failing']['calls'], 1)
+
+    def test_attached_thread(self):
+        def time_loop():
+            with profiling.timer('time_step'):
+                pass
+
+        with profiling.timer('DynamicCoupled'):
+            thread = threading.Thread(target=profiling.attached(time_loop))
+            thread.start()
+            thread.join()
+
+        self.assertIn('DynamicCoupled/time_step', profiling.records())
+
+    def test_disabled(self):
+        profiling.disable()
+        with profiling.timer('DynamicCoupled'):
+            profiling.count('fsi_iterations')
+            library_call(1)
+        self.assertEqual(profiling.records(), dict())
+
+    def test_write(self):
+        with profiling.timer('StaticCoupled'):
+            profiling.count('fsi_iterations', 5)
+
+        folder = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(folder, 'case.profiling')
+            profiling.write(filename)
+            with open(filename + '.json') as infile:
+                records = json.load(infile)
+            self.assertEqual(records['StaticCoupled/fsi_iterations']['total'], 5)
+
+            with open(filename + '.csv') as infile:
+                rows = list(csv.DictReader(infile))
+            self.assertEqual([row['name'] for row in rows], ['StaticCoupled', 'StaticCoupled/fsi_iterations'])
+        finally:
+            shutil.rmtree(folder)
+
+    def test_failed_case(self):
+        import configobj
+        import sharpy.sharpy_main
+
+        profiling.disable()
+        folder = tempfile.mkdtemp()
+        try:
+            # the structural input file is missing
+            config = configobj.ConfigObj()
+            config.filename = os.path.join(folder, 'failing.sharpy')
+            config['SHARPy'] = {'case': 'failing',
+                                'route': folder,
+                                'flow': ['BeamLoader'],
+                                'write_screen': 'off',
+                                'write_log': 'off',
+                                'log_folder': folder,
+                                'profiling': 'on'}
+            config['BeamLoader'] = {'unsteady': 'off'}
+            config.write()
+
+            with self.assertRaises(Exception):
+                sharpy.sharpy_main.main(['', config.filename])
+            self.assertFalse(profiling.is_enabled())
+            with open(os.path.join(folder, 'failing.profiling.json')) as infile:
+                records = json.load(infile)
+            self.assertEqual(records['BeamLoader']['calls'], 1)
+        finally:
+            shutil.rmtree(folder)
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+
+if __name__ == '__main__':
+    unittest.main()
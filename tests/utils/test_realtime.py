@@ -0,0 +1,90 @@
+import unittest
+
+from sharpy.utils.realtime import RealTimePacer
+
+
+class FakeClock(object):
+    """Clock that only advances when told to or when sleeping"""
+
+    def __init__(self):
+        self.now = 0.
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def work(self, seconds):
+        self.now += seconds
+
+
+class TestRealTimePacer(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pacer = RealTimePacer(0.1, margin=0.2, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_sleeps_until_deadline(self):
+        for _ in range(3):
+            self.pacer.start_step()
+            self.clock.work(0.03)
+            self.assertEqual(self.pacer.finish_step(), 0.)
+
+        self.assertAlmostEqual(self.clock.now, 0.3)
+        for slept in self.clock.slept:
+            self.assertAlmostEqual(slept, 0.07)
+        self.assertEqual(self.pacer.n_overruns, 0)
+        self.assertAlmostEqual(self.pacer.summary()['mean_compute_time'], 0.03)
+
+    def test_overrun(self):
+        self.pacer.start_step()
+        self.clock.work(0.25)
+        self.assertAlmostEqual(self.pacer.finish_step(), 0.15)
+
+        # the next step does not try to catch up
+        self.pacer.start_step()
+        self.assertAlmostEqual(self.pacer.deadline, 0.35)
+        self.clock.work(0.01)
+        self.pacer.finish_step()
+        self.assertAlmostEqual(self.clock.now, 0.35)
+
+        stats = self.pacer.summary()
+        self.assertEqual(stats['n_steps'], 2)
+        self.assertEqual(stats['n_overruns'], 1)
+        self.assertAlmostEqual(stats['max_overrun'], 0.15)
+        self.assertAlmostEqual(stats['max_compute_time'], 0.25)
+
+    def test_input_driven(self):
+        self.pacer.start_step(input_driven=True)
+        self.clock.work(0.03)
+        self.pacer.finish_step()
+        self.assertAlmostEqual(self.clock.now, 0.1)
+
+        # waiting for the input does not eat into the next step
+        self.clock.work(0.08)
+        self.pacer.start_step(input_driven=True)
+        self.assertAlmostEqual(self.pacer.deadline, 0.28)
+        self.clock.work(0.05)
+        self.assertEqual(self.pacer.finish_step(), 0.)
+        self.assertAlmostEqual(self.clock.now, 0.28)
+        self.assertEqual(self.pacer.n_overruns, 0)
+
+    def test_skip_optional_work(self):
+        self.pacer.start_step()
+        self.clock.work(0.05)
+        self.assertFalse(self.pacer.skip('postprocessors'))
+        self.clock.work(0.04)
+        self.assertTrue(self.pacer.skip('postprocessors'))
+        self.pacer.finish_step()
+        self.assertEqual(self.pacer.summary()['skipped_postprocessors'], 1)
+
+    def test_invalid_period(self):
+        with self.assertRaises(ValueError):
+            RealTimePacer(0.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+
+import h5py as h5
+import numpy as np
+
+import sharpy.utils.snapshot as snapshot
+
+
+class TimeStep(object):
+    """Stand-in for the structural and aerodynamic time step info"""
+
+    def __init__(self, num_node, n_surf=0):
+        self.pos = np.zeros((num_node, 3), order='F')
+        self.for_vel = np.zeros((6,))
+        self.in_global_AFoR = True
+        self.zeta = [np.zeros((3, 2, 3)) for _ in range(n_surf)]
+        self.gamma_star = [np.zeros((4, 2)) for _ in range(n_surf)]
+        self.postproc_node = dict()
+        self.mb_dict = None
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+
+class Model(object):
+
+    def __init__(self, ini_info, n_steps):
+        self.ini_info = ini_info
+        self.timestep_info = [ini_info.copy() for _ in range(n_steps)]
+
+
+class Data(object):
+
+    def __init__(self, n_steps):
+        self.settings = {'SHARPy': {'case': 'snapshot_test'},
+                         'DynamicCoupled': {'dt': 0.1}}
+        self.settings_hash = snapshot.settings_hash(self.settings)
+        self.structure = Model(TimeStep(5), n_steps)
+        self.aero = Model(TimeStep(5, n_surf=2), n_steps)
+        self.ts = n_steps - 1
+
+
+class Controller(object):
+
+    def __init__(self, data):
+        self.data = data
+        self.integral = 0.
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(2)
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'snapshot_test.snapshot.000007.h5')
+
+        self.data = Data(8)
+        for ts in range(8):
+            structure_tstep = self.data.structure.timestep_info[ts]
+            structure_tstep.pos[:] = np.random.rand(5, 3)
+            structure_tstep.for_vel[:] = ts
+            structure_tstep.in_global_AFoR = bool(ts % 2)
+            structure_tstep.postproc_node['loads'] = np.ones((5, 6))
+            structure_tstep.mb_dict = {'body_00': {'FoR_position': np.random.rand(6), 'FoR_movement': 'free'},
+                                       'constraint_00': {'behaviour': 'hinge_FoR', 'body': 0}}
+            aero_tstep = self.data.aero.timestep_info[ts]
+            aero_tstep.zeta[1][:] = np.random.rand(3, 2, 3)
+            # the wake grows
+            aero_tstep.gamma_star[0] = np.random.rand(ts + 1, 2)
+
+        self.controller = Controller(self.data)
+        self.controller.integral = 1.5
+
+    def restart(self):
+        restarted = Data(1)
+        self.assertTrue(snapshot.is_snapshot(self.filename))
+        return snapshot.restore(restarted, self.filename)
+
+    def test_restore(self):
+        snapshot.write(self.filename, self.data, n_steps=3, state={'controllers/pitch': self.controller},
+                       compression='gzip')
+        restarted = self.restart()
+
+        self.assertEqual(restarted.ts, 7)
+        self.assertEqual(len(restarted.structure.timestep_info), 8)
+        self.assertEqual(len(restarted.aero.timestep_info), 8)
+        self.assertTrue(all(tstep is None for tstep in restarted.structure.timestep_info[:5]))
+
+        for ts in range(5, 8):
+            original = self.data.structure.timestep_info[ts]
+            tstep = restarted.structure.timestep_info[ts]
+            np.testing.assert_array_equal(tstep.pos, original.pos)
+            self.assertTrue(np.isfortran(tstep.pos))
+            np.testing.assert_array_equal(tstep.for_vel, original.for_vel)
+            self.assertIs(tstep.in_global_AFoR, original.in_global_AFoR)
+            np.testing.assert_array_equal(tstep.mb_dict['body_00']['FoR_position'],
+                                          original.mb_dict['body_00']['FoR_position'])
+            self.assertEqual(tstep.mb_dict['constraint_00'], original.mb_dict['constraint_00'])
+            self.assertIsNone(restarted.aero.timestep_info[ts].mb_dict)
+            # postprocessing output is not stored
+            self.assertEqual(tstep.postproc_node, dict())
+
+            original = self.data.aero.timestep_info[ts]
+            tstep = restarted.aero.timestep_info[ts]
+            for i_surf in range(2):
+                np.testing.assert_array_equal(tstep.zeta[i_surf], original.zeta[i_surf])
+                np.testing.assert_array_equal(tstep.gamma_star[i_surf], original.gamma_star[i_surf])
+
+        controller = restarted.restart_state['controllers/pitch']
+        self.assertEqual(controller.integral, 1.5)
+        # the controller refers to the restarted data rather than to a copy of the original one
+        self.assertIs(controller.data, restarted)
+
+    def test_unsupported_state(self):
+        # state that cannot be stored is not silently left out
+        self.data.structure.timestep_info[-1].mb_dict = {'law': lambda t: t}
+        with self.assertRaises(TypeError):
+            snapshot.collect(self.data)
+
+    def test_version(self):
+        snapshot.write(self.filename, self.data)
+        with h5.File(self.filename, 'a') as handle:
+            handle.attrs['snapshot_version'] = snapshot.SNAPSHOT_VERSION + 1
+        with self.assertRaises(ValueError):
+            self.restart()
+
+    def test_not_a_snapshot(self):
+        filename = os.path.join(self.folder, 'data.pkl')
+        with open(filename, 'wb') as outfile:
+            outfile.write(b'pickle')
+        self.assertFalse(snapshot.is_snapshot(filename))
+
+    def test_settings_hash(self):
+        settings = copy.deepcopy(self.data.settings)
+        settings['SHARPy']['flow'] = ['BeamLoader']
+        self.assertEqual(snapshot.settings_hash(settings), self.data.settings_hash)
+        settings['DynamicCoupled']['dt'] = 0.2
+        self.assertNotEqual(snapshot.settings_hash(settings), self.data.settings_hash)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import unittest
+import xml.etree.ElementTree as ET
+
+import h5py as h5
+import numpy as np
+
+import sharpy.utils.xdmfutils as xdmfutils
+
+
+class TestXDMFTimeSeries(unittest.TestCase):
+    """
+    Tests the single file time series output of unstructured grids
+    """
+
+    route_test_dir = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+    def setUp(self):
+        self.folder = self.route_test_dir + '/output/xdmf/'
+        os.makedirs(self.folder, exist_ok=True)
+
+    def test_time_series(self):
+        series = xdmfutils.XDMFTimeSeries(self.folder + 'grid')
+        cells = np.array([[0, 1, 3, 2]])
+        for ts in range(3):
+            points = np.array([[0., 0, ts], [1, 0, ts], [0, 1, ts], [1, 1, ts]])
+            series.add_step('body', ts, points, cells, 'quad',
+                            point_data=[('n_id', np.arange(4)), ('velocity', points)],
+                            cell_data=[('panel_gamma', np.array([ts + 1.]))],
+                            topology_key='body')
+        series.write()
+
+        with h5.File(series.h5_filename, 'r') as h5file:
+            np.testing.assert_array_equal(h5file['/topology/body'][()], cells)
+            np.testing.assert_array_equal(h5file['/body/000002/points'][:, 2], 2 * np.ones(4))
+            self.assertEqual(h5file['/body/000001/panel_gamma'][0], 2.)
+            self.assertNotIn('cells', h5file['/body/000001'])
+
+        root = ET.parse(series.xdmf_filename).getroot()
+        steps = root.findall('./Domain/Grid/Grid')
+        self.assertEqual(len(steps), 3)
+        self.assertEqual([step.find('Time').get('Value') for step in steps], ['0', '1', '2'])
+        self.assertEqual(steps[0].find("./Attribute[@Name='velocity']").get('AttributeType'), 'Vector')
+        self.assertEqual(steps[0].find("./Attribute[@Name='panel_gamma']").get('Center'), 'Cell')
+
+    def tearDown(self):
+        shutil.rmtree(self.route_test_dir + '/output/', ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()